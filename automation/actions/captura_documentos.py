@@ -0,0 +1,278 @@
+"""
+Captura em memória dos anexos do LECOM via Chrome DevTools Protocol.
+
+O caminho clássico é clique -> ~/Downloads -> polling do diretório ->
+`fitz.open(caminho)`. Aqui o `href` do link é carregado pela própria
+sessão do navegador com `Network.loadNetworkResource` (mesmos cookies e
+autenticação do frame) e o corpo é lido em blocos com `IO.read`: os bytes
+vão direto para `fitz.open(stream=...)` e para o pipeline de imagens, sem
+passar pelo disco.
+
+Cada driver tem sua própria `CapturaRede` (várias sessões em paralelo não
+compartilham estado de CDP). O conteúdo fica num armazém endereçado por
+SHA-256 compartilhado pelo processo: o mesmo arquivo baixado duas vezes é
+guardado uma vez e, quando é preciso persistir
+(DOCUMENTOS_CAPTURA_PERSISTIR=1), é gravado uma única vez em
+`<dir>/<hash[:2]>/<hash><ext>`.
+
+Quando a captura não é possível (link sem href, CDP indisponível, resposta
+que não é PDF/imagem) o chamador volta ao download por arquivo.
+DOCUMENTOS_CAPTURA_MEMORIA=0 desliga a captura.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+TAMANHO_BLOCO_IO = 1 << 20
+LIMITE_MEMORIA_PADRAO_MB = 256
+
+_ASSINATURAS = (
+    (b'%PDF', '.pdf', 'application/pdf'),
+    (b'\xff\xd8\xff', '.jpg', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', '.png', 'image/png'),
+)
+
+_SCRIPT_HREF = (
+    "var el = arguments[0];"
+    "var a = el.closest ? el.closest('a[href]') : null;"
+    "if (!a && el.querySelector) { a = el.querySelector('a[href]'); }"
+    "return a ? a.href : null;"
+)
+
+
+@dataclass
+class DocumentoCapturado:
+    """Anexo capturado em memória (substitui o caminho do arquivo baixado)."""
+
+    conteudo: bytes
+    hash: str
+    extensao: str
+    tipo_mime: str
+    nome_arquivo: str
+    url: str
+    caminho: Optional[str] = None  # preenchido quando persistido
+
+    @property
+    def tamanho(self) -> int:
+        return len(self.conteudo)
+
+    def __str__(self) -> str:
+        return self.caminho or f"memoria:{self.nome_arquivo}"
+
+
+def captura_memoria_habilitada() -> bool:
+    return os.environ.get('DOCUMENTOS_CAPTURA_MEMORIA', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _persistencia_habilitada() -> bool:
+    return os.environ.get('DOCUMENTOS_CAPTURA_PERSISTIR', '').strip().lower() in ('1', 'true', 'sim')
+
+
+def identificar_tipo(conteudo: bytes) -> Optional[Tuple[str, str]]:
+    """(extensão, mime) pelo cabeçalho do arquivo; None se não for PDF/JPEG/PNG."""
+    inicio = conteudo[:1024].lstrip()
+    for assinatura, extensao, mime in _ASSINATURAS:
+        if inicio.startswith(assinatura):
+            return extensao, mime
+    return None
+
+
+class ArmazemDocumentos:
+    """Conteúdo endereçado por SHA-256: em memória (LRU limitado) e, se pedido, em disco."""
+
+    def __init__(self, diretorio: Optional[str] = None, limite_bytes: Optional[int] = None) -> None:
+        self.diretorio = diretorio or os.environ.get('DOCUMENTOS_CAPTURA_DIR') or os.path.join(
+            os.path.expanduser('~'), 'Downloads', '.capturas'
+        )
+        limite_mb = int(os.environ.get('DOCUMENTOS_CAPTURA_LIMITE_MB', LIMITE_MEMORIA_PADRAO_MB))
+        self.limite_bytes = limite_bytes if limite_bytes is not None else limite_mb * 1024 * 1024
+        self._itens: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.reaproveitados = 0
+
+    def guardar(self, conteudo: bytes) -> Tuple[str, bytes]:
+        """Guarda o conteúdo e devolve (hash, bytes canônicos já guardados)."""
+        chave = hashlib.sha256(conteudo).hexdigest()
+        with self._lock:
+            existente = self._itens.get(chave)
+            if existente is not None:
+                self._itens.move_to_end(chave)
+                self.reaproveitados += 1
+                return chave, existente
+            self._itens[chave] = conteudo
+            self._bytes += len(conteudo)
+            while self._bytes > self.limite_bytes and len(self._itens) > 1:
+                _, antigo = self._itens.popitem(last=False)
+                self._bytes -= len(antigo)
+        return chave, conteudo
+
+    def persistir(self, documento: DocumentoCapturado) -> str:
+        """Grava o documento uma única vez por hash e devolve o caminho."""
+        pasta = os.path.join(self.diretorio, documento.hash[:2])
+        caminho = os.path.join(pasta, f"{documento.hash}{documento.extensao}")
+        if not os.path.exists(caminho):
+            os.makedirs(pasta, exist_ok=True)
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(documento.conteudo)
+            os.replace(temporario, caminho)
+        documento.caminho = caminho
+        return caminho
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'documentos': len(self._itens), 'bytes': self._bytes, 'reaproveitados': self.reaproveitados}
+
+
+armazem_documentos = ArmazemDocumentos()
+
+
+def _nome_do_cabecalho(cabecalhos: Dict[str, Any]) -> Optional[str]:
+    for chave, valor in (cabecalhos or {}).items():
+        if chave.lower() != 'content-disposition' or not valor:
+            continue
+        m = re.search(r"filename\*=(?:UTF-8'')?([^;]+)", valor, re.IGNORECASE)
+        if m:
+            return unquote(m.group(1).strip().strip('"'))
+        m = re.search(r'filename="?([^";]+)"?', valor, re.IGNORECASE)
+        if m:
+            return m.group(1).strip()
+    return None
+
+
+class CapturaRede:
+    """Captura de anexos de uma sessão do navegador (um objeto por driver)."""
+
+    def __init__(self, driver: Any) -> None:
+        # Referência fraca: `_CAPTURAS` é chaveado pelo driver, e um valor que
+        # o segurasse impediria a coleta da entrada depois do quit().
+        self._driver = weakref.ref(driver)
+        self._lock = threading.Lock()
+        self.capturas = 0
+        self.falhas = 0
+        self.bytes_capturados = 0
+
+    @property
+    def driver(self) -> Any:
+        driver = self._driver()
+        if driver is None:
+            raise RuntimeError("driver da captura já foi encerrado")
+        return driver
+
+    def _href(self, elemento: Any) -> Optional[str]:
+        try:
+            href = self.driver.execute_script(_SCRIPT_HREF, elemento)
+        except Exception:
+            href = None
+        if not href:
+            try:
+                href = elemento.get_attribute('href')
+            except Exception:
+                href = None
+        if href and urlsplit(href).scheme in ('http', 'https'):
+            return href
+        return None
+
+    def _ler_stream(self, handle: str) -> bytes:
+        partes = []
+        try:
+            while True:
+                bloco = self.driver.execute_cdp_cmd('IO.read', {'handle': handle, 'size': TAMANHO_BLOCO_IO})
+                dados = bloco.get('data', '')
+                partes.append(base64.b64decode(dados) if bloco.get('base64Encoded') else dados.encode('utf-8'))
+                if bloco.get('eof'):
+                    break
+        finally:
+            try:
+                self.driver.execute_cdp_cmd('IO.close', {'handle': handle})
+            except Exception:
+                pass
+        return b''.join(partes)
+
+    def capturar(self, elemento: Any, nome_arquivo: Optional[str] = None) -> Optional[DocumentoCapturado]:
+        """Carrega o anexo apontado pelo link em memória; None -> usar o download por arquivo."""
+        url = self._href(elemento)
+        if not url:
+            return None
+        with self._lock:
+            try:
+                arvore = self.driver.execute_cdp_cmd('Page.getFrameTree', {})
+                frame_id = arvore['frameTree']['frame']['id']
+                recurso = self.driver.execute_cdp_cmd('Network.loadNetworkResource', {
+                    'frameId': frame_id,
+                    'url': url,
+                    'options': {'disableCache': False, 'includeCredentials': True},
+                }).get('resource', {})
+                status = int(recurso.get('httpStatusCode') or 0)
+                if not recurso.get('success') or not recurso.get('stream') or status >= 400:
+                    raise RuntimeError(f"HTTP {status or '?'} {recurso.get('netErrorName', '')}".strip())
+                conteudo = self._ler_stream(recurso['stream'])
+            except Exception as e:
+                self.falhas += 1
+                print(f"[AVISO] Captura em memória indisponível ({e}); usando download por arquivo")
+                return None
+
+        tipo = identificar_tipo(conteudo)
+        if tipo is None:
+            self.falhas += 1
+            print("[AVISO] Resposta capturada não é PDF/imagem; usando download por arquivo")
+            return None
+
+        chave, conteudo = armazem_documentos.guardar(conteudo)
+        extensao, mime = tipo
+        nome = _nome_do_cabecalho(recurso.get('headers') or {}) or nome_arquivo or os.path.basename(urlsplit(url).path)
+        documento = DocumentoCapturado(
+            conteudo=conteudo,
+            hash=chave,
+            extensao=extensao,
+            tipo_mime=mime,
+            nome_arquivo=nome or f"{chave[:16]}{extensao}",
+            url=url,
+        )
+        self.capturas += 1
+        self.bytes_capturados += documento.tamanho
+        if _persistencia_habilitada():
+            try:
+                armazem_documentos.persistir(documento)
+            except OSError as e:
+                print(f"[AVISO] Não foi possível persistir {documento.nome_arquivo}: {e}")
+        return documento
+
+    def resumo(self) -> Dict[str, Any]:
+        return {'capturas': self.capturas, 'falhas': self.falhas, 'bytes': self.bytes_capturados}
+
+
+_CAPTURAS: 'weakref.WeakKeyDictionary[Any, CapturaRede]' = weakref.WeakKeyDictionary()
+_CAPTURAS_LOCK = threading.Lock()
+
+
+def obter_captura(driver: Any) -> CapturaRede:
+    """Captura associada ao driver (criada na primeira chamada)."""
+    with _CAPTURAS_LOCK:
+        captura = _CAPTURAS.get(driver)
+        if captura is None:
+            captura = CapturaRede(driver)
+            _CAPTURAS[driver] = captura
+        return captura
+
+
+__all__ = [
+    'ArmazemDocumentos',
+    'CapturaRede',
+    'DocumentoCapturado',
+    'armazem_documentos',
+    'captura_memoria_habilitada',
+    'identificar_tipo',
+    'obter_captura',
+]
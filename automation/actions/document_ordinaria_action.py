@@ -6,10 +6,9 @@ Responsável por baixar documentos, fazer OCR e extrair dados
 import os
 import time
 import base64
-import tempfile
 import re
 import io
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -22,8 +21,12 @@ import fitz  # PyMuPDF
 from mistralai import Mistral
 import unicodedata
 
+from automation.utils.tracing import span
+from automation.actions.inventario_documentos import CAMPOS_DOCUMENTO, obter_inventario
+from automation.actions.captura_documentos import DocumentoCapturado, captura_memoria_habilitada, obter_captura
+from automation.utils.artefatos_caso import hash_conteudo
+from automation.utils.perfil_navegador import diretorio_download
 # Importar utilitários de OCR da camada modular
-from automation.ocr.preprocessing_ocr import ImagePreprocessor
 from automation.ocr.ocr_utils import (
     extrair_nome_completo,
     extrair_filiação_limpa,
@@ -34,6 +37,15 @@ from automation.ocr.ocr_utils import (
 )
 
 
+# Documentos só validados (texto não reaproveitado para extração de campos):
+# podem encerrar o OCR assim que a validação for decisiva
+DOCUMENTOS_VALIDACAO_STREAMING = {
+    'Certidão de antecedentes criminais (Brasil)': 'Antecedentes_Brasil',
+    'Atestado antecedentes criminais (país de origem)': 'Antecedentes_Origem',
+    'Comprovante de comunicação em português': 'Comunicacao_Portugues',
+}
+
+
 class DocumentAction:
     """
     Action responsável por download e processamento de documentos
@@ -56,6 +68,18 @@ class DocumentAction:
             'erros': []
         }
         self.ultimo_texto_ocr: Dict[str, str] = {}
+        self.estatisticas_ocr: Dict[str, Dict[str, Any]] = {}
+        # Pipeline entre casos: arquivos já baixados pelo estágio de navegador
+        # (ver `baixar_documento_bruto`). Quando definido, nenhum acesso ao
+        # navegador é feito e documentos ausentes do mapa contam como não anexados.
+        self.documentos_baixados: Optional[Dict[str, Dict[str, Any]]] = None
+        # Artefatos do caso (ver `automation/utils/artefatos_caso.py`):
+        # - registro_artefatos: quando dict, recebe por documento as tentativas
+        #   de OCR (texto + hash do conteúdo)
+        # - textos_gravados: reavaliação; os documentos vêm desse registro e
+        #   só a validação dos textos é refeita (sem navegador nem OCR)
+        self.registro_artefatos: Optional[Dict[str, Dict[str, Any]]] = None
+        self.textos_gravados: Optional[Dict[str, Dict[str, Any]]] = None
     
     def baixar_e_validar_documento_individual(self, nome_documento: str) -> bool:
         """
@@ -67,21 +91,42 @@ class DocumentAction:
         Returns:
             bool: True se documento foi baixado e validado com sucesso
         """
+        with span('documento', nome=nome_documento):
+            return self._baixar_e_validar_documento(nome_documento)
+    
+    def _baixar_e_validar_documento(self, nome_documento: str) -> bool:
+        if self.textos_gravados is not None:
+            return self._revalidar_texto_gravado(nome_documento)
         try:
-            print(f"[DOC] Baixando e validando: {nome_documento}")
-            
-            # Buscar documento na tabela ou campo específico
-            resultado_busca = self._buscar_documento(nome_documento)
-            
-            if not resultado_busca.get('encontrado', False):
-                print(f"[ERRO] {nome_documento}: NÃO ANEXADO")
-                return False
-            
-            processamento = self._processar_documento_encontrado(
-                nome_documento,
-                resultado_busca,
-                tentativa_fallback=False
-            )
+            if self.registro_artefatos is not None:
+                self.registro_artefatos[nome_documento] = {'encontrado': True, 'tentativas': []}
+            if self.documentos_baixados is not None:
+                print(f"[DOC] Validando (já baixado): {nome_documento}")
+                registro = self.documentos_baixados.get(nome_documento)
+                if registro is None:
+                    print(f"[AVISO] {nome_documento}: não antecipado pelo estágio de navegador")
+                if not registro or not registro.get('encontrado', False):
+                    print(f"[ERRO] {nome_documento}: NÃO ANEXADO")
+                    self._registrar_nao_anexado(nome_documento)
+                    return False
+                processamento = self._processar_documento_baixado(nome_documento, registro)
+            else:
+                print(f"[DOC] Baixando e validando: {nome_documento}")
+                
+                # Buscar documento na tabela ou campo específico
+                with span('busca'):
+                    resultado_busca = self._buscar_documento(nome_documento)
+                
+                if not resultado_busca.get('encontrado', False):
+                    print(f"[ERRO] {nome_documento}: NÃO ANEXADO")
+                    self._registrar_nao_anexado(nome_documento)
+                    return False
+                
+                processamento = self._processar_documento_encontrado(
+                    nome_documento,
+                    resultado_busca,
+                    tentativa_fallback=False
+                )
             
             if processamento.get('sucesso'):
                 print(f"[OK] {nome_documento}: VÁLIDO")
@@ -98,6 +143,91 @@ class DocumentAction:
             self.logs_download['erros'].append(f"{nome_documento}: {e}")
             return False
     
+    def _registrar_nao_anexado(self, nome_documento: str) -> None:
+        if self.registro_artefatos is not None:
+            self.registro_artefatos[nome_documento] = {'encontrado': False, 'tentativas': []}
+    
+    def _revalidar_texto_gravado(self, nome_documento: str) -> bool:
+        """Reavaliação: refaz só a validação dos textos gravados, na ordem das tentativas."""
+        registro = self.textos_gravados.get(nome_documento)
+        if not registro or not registro.get('encontrado'):
+            print(f"[ERRO] {nome_documento}: NÃO ANEXADO (artefato)")
+            return False
+        for tentativa in registro.get('tentativas') or []:
+            texto = tentativa.get('texto') or ''
+            if len(texto.strip()) < 10:
+                continue
+            self.ultimo_texto_ocr[nome_documento] = texto
+            if self._validar_conteudo_documento_especifico(nome_documento, texto):
+                print(f"[OK] {nome_documento}: VÁLIDO (artefato)")
+                return True
+        print(f"[ERRO] {nome_documento}: INVÁLIDO (artefato)")
+        return False
+    
+    def baixar_documento_bruto(self, nome_documento: str) -> Dict[str, Any]:
+        """
+        Estágio de navegador do pipeline: só busca e baixa (sem OCR).
+        
+        Quando o documento vem de campo específico, também baixa o candidato
+        da tabela, usado como fallback se o arquivo do campo falhar no OCR ou
+        na validação (o navegador já estará em outro caso nesse momento).
+        
+        Returns:
+            Dict com 'encontrado', 'fonte', 'arquivo' (None se o download falhou)
+            e, se houver, 'fallback' no mesmo formato
+        """
+        with span('documento', nome=nome_documento):
+            try:
+                with span('busca'):
+                    resultado_busca = self._buscar_documento(nome_documento)
+                if not resultado_busca.get('encontrado', False):
+                    return {'encontrado': False}
+                
+                registro = self._baixar_resultado_busca(nome_documento, resultado_busca)
+                if 'campo_especifico' in registro['fonte'] and not registro.get('sem_link'):
+                    resultado_tabela = self._buscar_documento_na_tabela(nome_documento)
+                    if not resultado_tabela.get('encontrado', False):
+                        resultado_tabela = self._buscar_documento_na_tabela_termos_amplos(
+                            self._extrair_termos_busca(nome_documento)
+                        )
+                    if resultado_tabela.get('encontrado', False):
+                        resultado_tabela.setdefault('fonte', 'tabela_fallback')
+                        registro['fallback'] = self._baixar_resultado_busca(nome_documento, resultado_tabela)
+                    else:
+                        registro['fallback'] = {'encontrado': False}
+                return registro
+            except Exception as e:
+                print(f"[ERRO] Erro ao baixar {nome_documento}: {e}")
+                return {'encontrado': False, 'erro': str(e)}
+    
+    def _baixar_resultado_busca(self, nome_documento: str, resultado_busca: Dict[str, Any]) -> Dict[str, Any]:
+        fonte_busca = resultado_busca.get('fonte', '') or 'tabela'
+        link_elemento = resultado_busca.get('elemento_link')
+        if not link_elemento:
+            return {'encontrado': True, 'fonte': fonte_busca, 'arquivo': None, 'sem_link': True}
+        with span('download', fonte=fonte_busca):
+            arquivo = self._executar_download_completo(link_elemento, fonte_busca, resultado_busca, nome_documento)
+        return {'encontrado': True, 'fonte': fonte_busca, 'arquivo': arquivo}
+    
+    def _processar_documento_baixado(self, nome_documento: str, registro: Dict[str, Any]) -> Dict[str, Any]:
+        """Equivalente a `_processar_documento_encontrado` para arquivos já baixados."""
+        if registro.get('sem_link'):
+            return {'sucesso': False, 'motivo': 'Link de download não encontrado'}
+        
+        arquivo = registro.get('arquivo')
+        resultado = self._ocr_e_validar_arquivo(nome_documento, arquivo) if arquivo else {
+            'sucesso': False, 'motivo': 'Falha no download', 'origem_falha': 'download'
+        }
+        fallback = registro.get('fallback')
+        if not resultado.get('sucesso') and fallback is not None:
+            print(f"[FALLBACK] {nome_documento}: {resultado.get('motivo')}. Usando arquivo da tabela (origem: {resultado.get('origem_falha')})...")
+            if not fallback.get('encontrado'):
+                print(f"[FALLBACK] {nome_documento}: Documento não localizado na tabela após falha no campo específico")
+                return {'sucesso': False, 'motivo': resultado.get('motivo')}
+            resultado = self._processar_documento_baixado(nome_documento, {k: v for k, v in fallback.items() if k != 'fallback'})
+        resultado.pop('origem_falha', None)
+        return resultado
+    
     def _buscar_documento(self, nome_documento: str) -> Dict[str, Any]:
         """
         Busca documento usando estratégias múltiplas (preserva lógica original)
@@ -238,6 +368,14 @@ class DocumentAction:
 
     def _buscar_documento_na_tabela(self, nome_documento: str) -> Dict[str, Any]:
         """Busca documento na tabela de anexos"""
+        inventario = obter_inventario(self.driver)
+        if inventario is not None:
+            resultado = inventario.buscar_na_tabela(nome_documento, self._linha_corresponde_documento)
+            if resultado.get('encontrado'):
+                print(f"[OK] Documento encontrado na tabela: {resultado['tipo_documento']} | {resultado['tipo_outro']}")
+            else:
+                print(f"[BUSCA] Documento '{nome_documento}' não encontrado na tabela")
+            return dict(resultado)
         try:
             print(f"[BUSCA] Procurando '{nome_documento}' na tabela de documentos...")
             linhas_tabela = self.driver.find_elements(By.CSS_SELECTOR, "tbody tr.table-row")
@@ -279,6 +417,12 @@ class DocumentAction:
 
     def _buscar_documento_na_tabela_termos_amplos(self, termos: List[str]) -> Dict[str, Any]:
         """Busca documento na tabela usando termos amplos"""
+        inventario = obter_inventario(self.driver)
+        if inventario is not None:
+            resultado = inventario.buscar_por_termos(termos)
+            if not resultado.get('encontrado'):
+                print(f"[BUSCA] Nenhum documento encontrado com termos: {termos}")
+            return dict(resultado)
         try:
             print(f"[BUSCA] Procurando na tabela com termos: {termos}")
             linhas_tabela = self.driver.find_elements(By.CSS_SELECTOR, "tbody tr.table-row")
@@ -321,22 +465,25 @@ class DocumentAction:
         """Busca documento em campos específicos baseado na automação original"""
         try:
             # Mapeamento baseado na automação original
-            mapeamento_ids = {
-                'comprovante de redução de prazo': 'DOC_REDUCAO',
-                'comprovante de comunicação em português': 'DOC_PTBR',
-                'certidão de antecedentes criminais (brasil)': 'DOC_CERTCRIME',
-                'atestado antecedentes criminais (país de origem)': 'DOC_ANTCRIME',
-                'carteira de registro nacional migratório': 'DOC_RNM',
-                'comprovante da situação cadastral do cpf': 'DOC_CPF',
-                'comprovante de tempo de residência': 'DOC_RESIDENCIA',
-                'documento de viagem internacional': 'DOC_VIAGEM'
-            }
+            mapeamento_ids = CAMPOS_DOCUMENTO
             
             nome_lower = nome_documento.lower()
+            inventario = obter_inventario(self.driver)
             
             # Buscar por campo específico
             for doc_key, campo_id in mapeamento_ids.items():
-                if doc_key in nome_lower:
+                if doc_key in nome_lower and inventario is not None:
+                    campo = inventario.campo(campo_id)
+                    if campo.get('existe') and campo.get('icone') and campo.get('botao') is not None:
+                        print(f"✅ Campo {campo_id} com arquivo (inventário)")
+                        return {
+                            'encontrado': True,
+                            'elemento_link': campo['botao'],
+                            'nome_arquivo': f'{doc_key} (campo específico)',
+                            'fonte': 'campo_especifico_direto'
+                        }
+                    print(f"❌ Campo {campo_id} sem arquivo para download (inventário)")
+                elif doc_key in nome_lower:
                     print(f"[BUSCA] Verificando campo específico para {doc_key}: {campo_id}")
                     
                     try:
@@ -374,12 +521,24 @@ class DocumentAction:
             print(f"[ERRO] Erro ao buscar em campos específicos: {e}")
             return {'encontrado': False, 'motivo': f'Erro na busca: {e}'}
     
-    def _executar_download_completo(self, link_elemento, fonte_busca: str, resultado_busca: Dict, nome_documento: str) -> Optional[str]:
-        """Executa download completo baseado na automação original"""
+    def _executar_download_completo(self, link_elemento, fonte_busca: str, resultado_busca: Dict,
+                                    nome_documento: str) -> Optional[Union[str, DocumentoCapturado]]:
+        """Executa download completo baseado na automação original.
+        
+        Com a captura em memória habilitada, tenta primeiro obter os bytes
+        pela sessão do navegador (CDP); só clica e monitora o diretório de
+        download da sessão se a captura não for possível.
+        """
         try:
             print(f"[DOWNLOAD] Iniciando download de: {nome_documento}")
             
-            diretorio_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
+            if captura_memoria_habilitada():
+                capturado = obter_captura(self.driver).capturar(link_elemento, resultado_busca.get('nome_arquivo'))
+                if capturado is not None:
+                    print(f"[OK] {nome_documento}: capturado em memória ({capturado.tamanho} bytes, sha256 {capturado.hash[:12]})")
+                    return capturado
+            
+            diretorio_downloads = diretorio_download(self.driver)
             
             # PASSO 1: Contar arquivos ANTES do clique
             arquivos_antes = []
@@ -452,7 +611,7 @@ class DocumentAction:
             
             # Salvar arquivo
             nome_arquivo = self._gerar_nome_arquivo(nome_documento)
-            caminho_arquivo = os.path.join(os.path.expanduser('~'), 'Downloads', nome_arquivo)
+            caminho_arquivo = os.path.join(diretorio_download(self.driver), nome_arquivo)
             
             with open(caminho_arquivo, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
@@ -475,7 +634,7 @@ class DocumentAction:
             time.sleep(3)
             
             # Procurar arquivo baixado
-            downloads_dir = os.path.join(os.path.expanduser('~'), 'Downloads')
+            downloads_dir = diretorio_download(self.driver)
             arquivos_recentes = self._obter_arquivos_recentes(downloads_dir)
             
             if arquivos_recentes:
@@ -492,7 +651,7 @@ class DocumentAction:
     def _detectar_ultimo_arquivo_adicionado(self, arquivos_antes: list, nome_documento: str, timeout: int = 5) -> Optional[str]:
         """Detecta o último arquivo adicionado ao diretório de downloads"""
         try:
-            diretorio_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
+            diretorio_downloads = diretorio_download(self.driver)
             tempo_inicial = time.time()
 
             print(f"[TEMPO] Aguardando {timeout} segundos por arquivo novo...")
@@ -528,7 +687,7 @@ class DocumentAction:
     def _detectar_arquivo_por_nome(self, nome_arquivo_esperado: str, nome_documento: str, timeout: int = 5) -> Optional[str]:
         """Detecta arquivo específico pelo nome esperado"""
         try:
-            diretorio_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
+            diretorio_downloads = diretorio_download(self.driver)
             tempo_inicial = time.time()
 
             print(f"[TARGET] Procurando especificamente por: {nome_arquivo_esperado}")
@@ -581,43 +740,51 @@ class DocumentAction:
                 return {'sucesso': False, 'motivo': 'Link de download não encontrado'}
 
             # Download seguindo regras do fluxo antigo
-            nome_arquivo_baixado = self._executar_download_completo(
-                link_elemento,
-                fonte_busca,
-                resultado_busca,
-                nome_documento
-            )
+            with span('download', fonte=fonte_busca):
+                nome_arquivo_baixado = self._executar_download_completo(
+                    link_elemento,
+                    fonte_busca,
+                    resultado_busca,
+                    nome_documento
+                )
 
             if not nome_arquivo_baixado:
-                motivo = 'Falha no download'
-                if 'campo_especifico' in fonte_busca and not tentativa_fallback:
-                    return self._tentar_fallback_tabela(nome_documento, motivo, origem_falha='download')
-                return {'sucesso': False, 'motivo': motivo}
-
-            texto_ocr = self._processar_arquivo_ocr(nome_arquivo_baixado, nome_documento)
-            if not texto_ocr or len(texto_ocr.strip()) < 10:
-                motivo = 'OCR falhou ou texto insuficiente'
-                if 'campo_especifico' in fonte_busca and not tentativa_fallback:
-                    return self._tentar_fallback_tabela(nome_documento, motivo, origem_falha='ocr')
-                return {'sucesso': False, 'motivo': motivo}
+                resultado = {'sucesso': False, 'motivo': 'Falha no download', 'origem_falha': 'download'}
+            else:
+                resultado = self._ocr_e_validar_arquivo(nome_documento, nome_arquivo_baixado)
 
-            try:
-                self.ultimo_texto_ocr[nome_documento] = texto_ocr
-            except Exception as e_atualizacao:
-                print(f"[AVISO] Não foi possível armazenar OCR de {nome_documento}: {e_atualizacao}")
+            origem_falha = resultado.pop('origem_falha', None)
+            if not resultado.get('sucesso') and 'campo_especifico' in fonte_busca and not tentativa_fallback:
+                return self._tentar_fallback_tabela(nome_documento, resultado.get('motivo'), origem_falha=origem_falha)
+            return resultado
 
-            valido = self._validar_conteudo_documento_especifico(nome_documento, texto_ocr)
-            if valido:
-                return {'sucesso': True}
+        except Exception as e:
+            return {'sucesso': False, 'motivo': f'Erro geral: {e}'}
 
-            motivo_invalido = 'Conteúdo inválido'
-            if 'campo_especifico' in fonte_busca and not tentativa_fallback:
-                return self._tentar_fallback_tabela(nome_documento, motivo_invalido, origem_falha='validacao')
+    def _ocr_e_validar_arquivo(self, nome_documento: str, caminho_arquivo: Union[str, DocumentoCapturado]) -> Dict[str, Any]:
+        """OCR + validação de um arquivo baixado (sem fallback; ver chamadores)."""
+        with span('ocr'):
+            texto_ocr = self._processar_arquivo_ocr(caminho_arquivo, nome_documento)
+        if self.registro_artefatos is not None:
+            self.registro_artefatos.setdefault(nome_documento, {'encontrado': True, 'tentativas': []})
+            self.registro_artefatos[nome_documento]['tentativas'].append({
+                'texto': texto_ocr or '',
+                'hash': hash_conteudo(caminho_arquivo),
+            })
+        if not texto_ocr or len(texto_ocr.strip()) < 10:
+            return {'sucesso': False, 'motivo': 'OCR falhou ou texto insuficiente', 'origem_falha': 'ocr'}
 
-            return {'sucesso': False, 'motivo': motivo_invalido}
+        try:
+            self.ultimo_texto_ocr[nome_documento] = texto_ocr
+        except Exception as e_atualizacao:
+            print(f"[AVISO] Não foi possível armazenar OCR de {nome_documento}: {e_atualizacao}")
 
-        except Exception as e:
-            return {'sucesso': False, 'motivo': f'Erro geral: {e}'}
+        with span('validacao'):
+            valido = self._validar_conteudo_documento_especifico(nome_documento, texto_ocr)
+        paginas_puladas = self.estatisticas_ocr.get(nome_documento, {}).get('paginas_puladas', [])
+        if valido:
+            return {'sucesso': True, 'paginas_puladas': paginas_puladas}
+        return {'sucesso': False, 'motivo': 'Conteúdo inválido', 'paginas_puladas': paginas_puladas, 'origem_falha': 'validacao'}
 
     def _tentar_fallback_tabela(self, nome_documento: str, motivo_original: str, origem_falha: str) -> Dict[str, Any]:
         """Repete o fluxo de download e validação buscando o documento diretamente na tabela."""
@@ -653,7 +820,7 @@ class DocumentAction:
             link_elemento.click()
             time.sleep(3)
             
-            downloads_dir = os.path.join(os.path.expanduser('~'), 'Downloads')
+            downloads_dir = diretorio_download(self.driver)
             arquivos_recentes = self._obter_arquivos_recentes(downloads_dir)
             
             if arquivos_recentes:
@@ -695,16 +862,21 @@ class DocumentAction:
         timestamp = int(time.time())
         return f"{nome_limpo}_{timestamp}.pdf"
     
-    def _processar_arquivo_ocr(self, caminho_arquivo: str, nome_documento: str) -> str:
+    def _processar_arquivo_ocr(self, caminho_arquivo: Union[str, DocumentoCapturado], nome_documento: str) -> str:
         """
         Processa arquivo com OCR (preserva lógica original)
+        
+        `caminho_arquivo` pode ser um arquivo em disco ou um documento
+        capturado em memória (`DocumentoCapturado`).
         """
         try:
-            if not os.path.exists(caminho_arquivo):
+            if isinstance(caminho_arquivo, DocumentoCapturado):
+                extensao = caminho_arquivo.extensao
+            elif not os.path.exists(caminho_arquivo):
                 print(f"[ERRO] Arquivo não encontrado: {caminho_arquivo}")
                 return ""
-            
-            extensao = os.path.splitext(caminho_arquivo)[1].lower()
+            else:
+                extensao = os.path.splitext(caminho_arquivo)[1].lower()
             
             if extensao == '.pdf':
                 return self._processar_pdf_ocr(caminho_arquivo, nome_documento)
@@ -718,31 +890,24 @@ class DocumentAction:
             print(f"[ERRO] Erro no OCR: {e}")
             return ""
     
-    def _processar_imagem_ocr(self, caminho_arquivo: str, nome_documento: str) -> str:
-        """Processa imagem com OCR Mistral + Pré-processamento"""
+    def _processar_imagem_ocr(self, caminho_arquivo: Union[str, DocumentoCapturado], nome_documento: str) -> str:
+        """Processa imagem com Pré-processamento + OCR em camadas (Tesseract -> Mistral)"""
         try:
             print(f"[MISTRAL OCR] Processando imagem: {caminho_arquivo}")
             
-            # Aplicar pré-processamento
-            preprocessor = ImagePreprocessor()
-            # Carregar imagem
-            img = cv2.imread(caminho_arquivo)
-            img_processada, metadata = preprocessor.preprocess(img, apply_all=True)
-            
-            print(f"[PRÉ-PROC] Etapas aplicadas: {', '.join(metadata.get('etapas_aplicadas', []))}")
-            
-            # Salvar imagem processada temporariamente
-            temp_path = caminho_arquivo.replace('.', '_processed.')
-            cv2.imwrite(temp_path, img_processada)
-            
-            # Executar OCR com Mistral
-            texto_ocr = self._executar_mistral_ocr(temp_path)
+            from automation.ocr.preprocessing_pool import obter_pool_preprocessamento
+            if isinstance(caminho_arquivo, DocumentoCapturado):
+                img = cv2.imdecode(np.frombuffer(caminho_arquivo.conteudo, dtype=np.uint8), cv2.IMREAD_COLOR)
+            else:
+                img = cv2.imread(caminho_arquivo)
+            paginas = obter_pool_preprocessamento().processar_imagens([img], tipo_documento=nome_documento)
+            print(f"[PRÉ-PROC] Etapas aplicadas: {', '.join(paginas[0].metadata.get('etapas_aplicadas', []))}")
             
-            # Limpar arquivo temporário
             try:
-                os.remove(temp_path)
-            except:
-                pass
+                texto_ocr = "\n".join(self._ocr_em_camadas(nome_documento, paginas))
+            except Exception as e_camadas:
+                print(f"[AVISO] OCR em camadas indisponível ({e_camadas}); usando Mistral")
+                texto_ocr = self._executar_mistral_ocr_data_url(paginas[0].data_url())
             
             print(f"[MISTRAL OCR] Concluído: {len(texto_ocr)} caracteres extraídos")
             return texto_ocr.strip()
@@ -751,13 +916,33 @@ class DocumentAction:
             print(f"[ERRO] Erro no OCR de imagem: {e}")
             # Fallback para Tesseract
             try:
-                img = Image.open(caminho_arquivo)
+                if isinstance(caminho_arquivo, DocumentoCapturado):
+                    img = Image.open(io.BytesIO(caminho_arquivo.conteudo))
+                else:
+                    img = Image.open(caminho_arquivo)
                 texto_ocr = pytesseract.image_to_string(img, lang='por+eng')
                 return texto_ocr.strip()
             except:
                 return ""
     
-    def _processar_pdf_ocr(self, caminho_arquivo: str, nome_documento: str) -> str:
+    def _abrir_pdf(self, arquivo: Union[str, DocumentoCapturado]):
+        if isinstance(arquivo, DocumentoCapturado):
+            return fitz.open(stream=arquivo.conteudo, filetype='pdf')
+        return fitz.open(arquivo)
+    
+    def _renderizar_paginas_pdf(self, arquivo: Union[str, DocumentoCapturado], paginas: List[int],
+                                nome_documento: str) -> List[Any]:
+        """Renderização + pré-processamento em paralelo, do disco ou da memória."""
+        from automation.ocr.preprocessing_pool import obter_pool_preprocessamento
+        
+        pool = obter_pool_preprocessamento()
+        if isinstance(arquivo, DocumentoCapturado):
+            return pool.processar_paginas_pdf_memoria(
+                arquivo.conteudo, arquivo.hash, paginas, zoom=3.0, tipo_documento=nome_documento
+            )
+        return pool.processar_paginas_pdf(arquivo, paginas, zoom=3.0, tipo_documento=nome_documento)
+    
+    def _processar_pdf_ocr(self, caminho_arquivo: Union[str, DocumentoCapturado], nome_documento: str) -> str:
         """Processa PDF com OCR Mistral + Pré-processamento"""
         try:
             # Configurar máximo de páginas baseado no documento
@@ -774,71 +959,48 @@ class DocumentAction:
             max_paginas = 1 if any(doc in nome_lower for doc in documentos_primeira_pagina) else None
             
             # Abrir PDF
-            doc = fitz.open(caminho_arquivo)
-            texto_completo = ""
+            doc = self._abrir_pdf(caminho_arquivo)
             
             paginas_a_processar = min(len(doc), max_paginas) if max_paginas else len(doc)
             print(f"[MISTRAL OCR] Processando PDF: {paginas_a_processar} página(s)")
             
+            # 1ª passada: texto direto; páginas-imagem ficam para o OCR
+            textos_pagina: List[str] = [""] * paginas_a_processar
+            paginas_ocr: List[int] = []
             for num_pagina in range(paginas_a_processar):
-                pagina = doc[num_pagina]
-                
-                # Tentar extrair texto diretamente
-                texto_pagina = pagina.get_text()
-                
+                texto_pagina = doc[num_pagina].get_text()
                 if texto_pagina.strip() and len(texto_pagina.strip()) > 50:
-                    texto_completo += texto_pagina + "\n"
+                    textos_pagina[num_pagina] = texto_pagina
                     print(f"[PDF] Página {num_pagina + 1}: Texto direto extraído")
                 else:
-                    # PDF é imagem - usar OCR
-                    print(f"[PDF] Página {num_pagina + 1}: Aplicando Mistral OCR...")
-                    
-                    # Converter página para imagem
-                    pix = pagina.get_pixmap(matrix=fitz.Matrix(3.0, 3.0))
-                    img_data = pix.tobytes("png")
-                    
-                    # Salvar imagem temporária
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp_img:
-                        tmp_img.write(img_data)
-                        temp_path = tmp_img.name
-                    
-                    try:
-                        # Aplicar pré-processamento
-                        preprocessor = ImagePreprocessor()
-                        # Carregar imagem
-                        img = cv2.imread(temp_path)
-                        img_processada, metadata = preprocessor.preprocess(img, apply_all=True)
-                        
-                        # Salvar imagem processada
-                        processed_path = temp_path.replace('.png', '_processed.png')
-                        cv2.imwrite(processed_path, img_processada)
-                        
-                        # Executar OCR
-                        texto_ocr = self._executar_mistral_ocr(processed_path)
-                        texto_completo += texto_ocr + "\n"
-                        
-                        # Limpar arquivos temporários
-                        try:
-                            os.remove(temp_path)
-                            os.remove(processed_path)
-                        except:
-                            pass
-                            
-                    except Exception as e_ocr:
-                        print(f"[ERRO] Erro no Mistral OCR: {e_ocr}")
-                        # Fallback para Tesseract
-                        try:
-                            img = Image.open(io.BytesIO(img_data))
-                            texto_ocr = pytesseract.image_to_string(img, lang='por+eng')
-                            texto_completo += texto_ocr + "\n"
-                        except:
-                            pass
-                        try:
-                            os.remove(temp_path)
-                        except:
-                            pass
-            
+                    paginas_ocr.append(num_pagina)
             doc.close()
+            
+            tipo_streaming = DOCUMENTOS_VALIDACAO_STREAMING.get(nome_documento)
+            self.estatisticas_ocr.pop(nome_documento, None)
+            if paginas_ocr and tipo_streaming and len(paginas_ocr) > 1:
+                # Validação em streaming: para o OCR assim que o resultado for decisivo
+                try:
+                    self._ocr_pdf_streaming(caminho_arquivo, nome_documento, tipo_streaming, textos_pagina, paginas_ocr)
+                    paginas_ocr = []
+                except Exception as e_stream:
+                    print(f"[AVISO] Validação em streaming indisponível ({e_stream}); processando todas as páginas")
+            
+            if paginas_ocr:
+                # 2ª passada: renderização + pré-processamento em paralelo (pool multiprocesso)
+                print(f"[PDF] Aplicando Mistral OCR em {len(paginas_ocr)} página(s)...")
+                preprocessadas = self._renderizar_paginas_pdf(caminho_arquivo, paginas_ocr, nome_documento)
+                
+                texto_direto = "\n".join(t for t in textos_pagina if t)
+                try:
+                    textos_ocr = self._ocr_em_camadas(nome_documento, preprocessadas, texto_direto)
+                except Exception as e_camadas:
+                    print(f"[AVISO] OCR em camadas indisponível ({e_camadas}); usando Mistral por página")
+                    textos_ocr = [self._ocr_mistral_com_fallback(pagina) for pagina in preprocessadas]
+                for num_pagina, texto_ocr in zip(paginas_ocr, textos_ocr):
+                    textos_pagina[num_pagina] = texto_ocr
+            
+            texto_completo = "".join(t + "\n" for t in textos_pagina if t)
             print(f"[MISTRAL OCR] PDF concluído: {len(texto_completo)} caracteres totais")
             return texto_completo.strip()
             
@@ -846,19 +1008,127 @@ class DocumentAction:
             print(f"[ERRO] Erro no OCR de PDF: {e}")
             return ""
     
+    def _ocr_pdf_em_lotes(self, caminho_arquivo: Union[str, DocumentoCapturado], nome_documento: str,
+                          paginas_ocr: List[int]):
+        """Gera (página, resultado OCR, página pré-processada) em ordem, em lotes
+        crescentes (1, 2, 4...) para que a primeira página chegue logo."""
+        from automation.ocr.ocr_camadas import obter_motor_ocr
+        from automation.ocr.preprocessing_pool import obter_pool_preprocessamento
+        
+        pool = obter_pool_preprocessamento()
+        motor = obter_motor_ocr()
+        tamanho, inicio = 1, 0
+        while inicio < len(paginas_ocr):
+            lote = paginas_ocr[inicio:inicio + tamanho]
+            preprocessadas = self._renderizar_paginas_pdf(caminho_arquivo, lote, nome_documento)
+            resultado = motor.reconhecer(preprocessadas, ocr_visao=self._executar_mistral_ocr_data_url)
+            for num_pagina, pagina_ocr, pagina in zip(lote, resultado.paginas, preprocessadas):
+                yield num_pagina, pagina_ocr, pagina
+            inicio += tamanho
+            tamanho = min(tamanho * 2, max(1, pool.workers))
+    
+    def _ocr_pdf_streaming(self, caminho_arquivo: Union[str, DocumentoCapturado], nome_documento: str, tipo_validacao: str,
+                           textos_pagina: List[str], paginas_ocr: List[int]) -> None:
+        """OCR página a página com validação incremental; preenche `textos_pagina`
+        e registra em `estatisticas_ocr` as páginas puladas."""
+        from automation.ocr.ocr_camadas import obter_motor_ocr
+        from ..data.termos_validacao_melhorados import ValidadorIncremental
+        
+        validador = ValidadorIncremental(tipo_validacao, minimo_confianca=70)
+        pendentes_ocr = set(paginas_ocr)
+        so_tesseract = []  # (página, resultado, pré-processada) ainda sem Mistral
+        gerador = self._ocr_pdf_em_lotes(caminho_arquivo, nome_documento, paginas_ocr)
+        ultima_vista = -1
+        try:
+            for num_pagina in range(len(textos_pagina)):
+                if num_pagina in pendentes_ocr:
+                    _, pagina_ocr, pagina = next(gerador)
+                    pendentes_ocr.discard(num_pagina)
+                    textos_pagina[num_pagina] = pagina_ocr.texto
+                    if pagina_ocr.motor == 'tesseract':
+                        so_tesseract.append((num_pagina, pagina_ocr, pagina))
+                ultima_vista = num_pagina
+                if validador.alimentar(textos_pagina[num_pagina]).get('decisao'):
+                    break
+        finally:
+            gerador.close()
+        
+        decisao = validador.decisao
+        if decisao is None and so_tesseract:
+            # Mesmo critério do OCR em camadas: validação insuficiente -> Mistral.
+            # Com decisão antecipada ('valido' ou 'invalido' confirmado) o
+            # resultado já está fechado e nada é escalado
+            escalado = obter_motor_ocr().escalar(
+                [p for _, _, p in so_tesseract], [r for _, r, _ in so_tesseract],
+                self._executar_mistral_ocr_data_url, 'validação insuficiente',
+            )
+            for (num_pagina, _, _), pagina_ocr in zip(so_tesseract, escalado.paginas):
+                textos_pagina[num_pagina] = pagina_ocr.texto
+        
+        puladas = sorted(pendentes_ocr)
+        self.estatisticas_ocr[nome_documento] = {
+            'validacao_streaming': True,
+            'decisao_antecipada': decisao,
+            'pagina_decisao': ultima_vista + 1 if decisao else None,
+            'paginas_ocr': len(paginas_ocr) - len(puladas),
+            'paginas_puladas': [n + 1 for n in puladas],
+        }
+        if puladas:
+            print(
+                f"[OCR] {nome_documento}: decisão '{decisao}' na página {ultima_vista + 1}; "
+                f"{len(puladas)} página(s) não processada(s): {', '.join(str(n + 1) for n in puladas)}"
+            )
+    
+    def _ocr_em_camadas(self, nome_documento: str, paginas: List[Any], texto_direto: str = "") -> List[str]:
+        """Tesseract local primeiro; escala ao Mistral só páginas de baixa confiança
+        ou quando o documento não passa na validação."""
+        from automation.ocr.ocr_camadas import obter_motor_ocr
+
+        resultado = obter_motor_ocr().reconhecer(
+            paginas,
+            ocr_visao=self._executar_mistral_ocr_data_url,
+            validador=lambda texto: self._validar_conteudo_documento_especifico(
+                nome_documento, f"{texto_direto}\n{texto}" if texto_direto else texto
+            ),
+        )
+        estatisticas = resultado.estatisticas()
+        self.estatisticas_ocr[nome_documento] = estatisticas
+        print(
+            f"[OCR] {nome_documento}: {estatisticas['paginas_tesseract']} página(s) Tesseract, "
+            f"{estatisticas['paginas_mistral']} Mistral"
+        )
+        return [pagina.texto for pagina in resultado.paginas]
+    
+    def _ocr_mistral_com_fallback(self, pagina: Any) -> str:
+        try:
+            return self._executar_mistral_ocr_data_url(pagina.data_url())
+        except Exception as e_ocr:
+            print(f"[ERRO] Erro no Mistral OCR: {e_ocr}")
+            # Fallback para Tesseract
+            try:
+                img = Image.open(io.BytesIO(pagina.payload))
+                return pytesseract.image_to_string(img, lang='por+eng')
+            except:
+                return ""
+    
     def _executar_mistral_ocr(self, caminho_imagem: str) -> str:
         """Executa OCR usando Mistral Pixtral-12b"""
+        # Carregar e codificar imagem
+        with open(caminho_imagem, "rb") as img_file:
+            img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
+        return self._executar_mistral_ocr_data_url(f"data:image/png;base64,{img_base64}")
+    
+    def _executar_mistral_ocr_data_url(self, data_url: str) -> str:
+        """Executa OCR Mistral sobre uma imagem já codificada (data URL)"""
         try:
             mistral_api_key = os.environ.get("MISTRAL_API_KEY")
             
             if not mistral_api_key:
                 raise ValueError("MISTRAL_API_KEY não configurada")
             
-            client = Mistral(api_key=mistral_api_key)
-            
-            # Carregar e codificar imagem
-            with open(caminho_imagem, "rb") as img_file:
-                img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
+            from automation.utils.lecom_urls import MISTRAL_API_URL
+            # MISTRAL_API_URL permite apontar para o OCR simulado (benchmark offline)
+            client = Mistral(api_key=mistral_api_key, server_url=MISTRAL_API_URL) if MISTRAL_API_URL else Mistral(api_key=mistral_api_key)
             
             # Prompt otimizado
             prompt = (
@@ -876,7 +1146,7 @@ class DocumentAction:
                         "role": "user",
                         "content": [
                             {"type": "text", "text": prompt},
-                            {"type": "image_url", "image_url": f"data:image/png;base64,{img_base64}"}
+                            {"type": "image_url", "image_url": data_url}
                         ]
                     }
                 ],
@@ -1282,7 +1552,7 @@ class DocumentAction:
     def _detectar_ultimo_arquivo_adicionado(self, arquivos_antes: List[str], nome_documento: str, timeout: int = 5) -> Optional[str]:
         """Detecta o último arquivo adicionado após o clique"""
         try:
-            diretorio_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
+            diretorio_downloads = diretorio_download(self.driver)
             tempo_inicial = time.time()
             
             print(f"[TEMPO] Aguardando {timeout} segundos por arquivo novo...")
@@ -1339,7 +1609,7 @@ class DocumentAction:
     def _detectar_arquivo_por_nome(self, nome_arquivo_esperado: str, nome_documento: str, timeout: int = 5) -> Optional[str]:
         """Detecta arquivo específico por nome"""
         try:
-            diretorio_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
+            diretorio_downloads = diretorio_download(self.driver)
             tempo_inicial = time.time()
             
             print(f"[TARGET] Procurando especificamente por: {nome_arquivo_esperado}")
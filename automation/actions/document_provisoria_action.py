@@ -16,6 +16,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from automation.utils.perfil_navegador import diretorio_download
+
 
 class DocumentProvisoriaAction:
     """Action para baixar e validar documentos específicos da Provisória."""
@@ -33,7 +35,7 @@ class DocumentProvisoriaAction:
     def __init__(self, driver: Any, wait: WebDriverWait):
         self.driver = driver
         self.wait = wait
-        self.download_dir = os.path.join(os.path.expanduser('~'), 'Downloads')
+        self.download_dir = diretorio_download(driver)
         
     def _normalizar_nome_documento(self, nome: str) -> str:
         """Normaliza o nome do documento para matching."""
@@ -0,0 +1,290 @@
+"""
+Inventário de documentos anexados de um caso (uma varredura por processo).
+
+Antes, cada documento procurado refazia `find_element(s)` no campo
+específico, depois em todas as linhas da tabela (`tbody tr.table-row`) e
+depois de novo com termos amplos, lendo cada célula via WebDriver; a
+análise de elegibilidade ainda relia `//table//tr`. Aqui um único
+`execute_script` coleta:
+
+- os campos de anexo (DOC_*), avaliando no navegador as mesmas XPaths de
+  `DocumentAction._verificar_icone_download_campo` e
+  `_buscar_botao_download_campo`;
+- as linhas da tabela de anexos (tipo, tipo "outro", link e nome do arquivo);
+- o texto de todas as linhas de tabela (busca por variações).
+
+O resultado é normalizado uma vez em Python e as buscas seguintes viram
+acesso a dicionário. O inventário é por driver e deve ser invalidado ao
+navegar para outro processo (`invalidar_inventario`).
+"""
+
+from __future__ import annotations
+
+import threading
+import unicodedata
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Campo específico -> documento (mesma tabela de `_buscar_documento_em_campo_especifico`)
+CAMPOS_DOCUMENTO: Dict[str, str] = {
+    'comprovante de redução de prazo': 'DOC_REDUCAO',
+    'comprovante de comunicação em português': 'DOC_PTBR',
+    'certidão de antecedentes criminais (brasil)': 'DOC_CERTCRIME',
+    'atestado antecedentes criminais (país de origem)': 'DOC_ANTCRIME',
+    'carteira de registro nacional migratório': 'DOC_RNM',
+    'comprovante da situação cadastral do cpf': 'DOC_CPF',
+    'comprovante de tempo de residência': 'DOC_RESIDENCIA',
+    'documento de viagem internacional': 'DOC_VIAGEM',
+}
+
+_ICONE_DOWNLOAD_ARIA = "//i[@type='cloud_download' and @aria-label='Download']"
+
+
+def xpaths_icone_campo(campo_id: str) -> List[str]:
+    """XPaths (em ordem) de `_verificar_icone_download_campo`."""
+    xpaths = [
+        f"//input[@id='{campo_id}']/ancestor::div[contains(@class, 'document-field')]//i[@type='cloud_download']",
+        f"//div[@id='input__{campo_id}']//i[@type='cloud_download']",
+    ]
+    if campo_id == 'DOC_REDUCAO':
+        xpaths += [
+            "//input[@id='DOC_REDUCAO']/following-sibling::*//i[@type='cloud_download']",
+            "//i[@type='cloud_download' and contains(@data-reactid, 'DOC_REDUCAO')]",
+        ]
+    if campo_id == 'DOC_VIAGEM':
+        xpaths.append(_ICONE_DOWNLOAD_ARIA)
+    return xpaths
+
+
+def xpaths_botao_campo(campo_id: str) -> List[str]:
+    """XPaths (em ordem) de `_buscar_botao_download_campo` e métodos específicos."""
+    botao = f"//div[@id='input__{campo_id}']//a[contains(@class, 'button') and .//i[@type='cloud_download']]"
+    botao_alt = (f"//input[@id='{campo_id}']/ancestor::div[contains(@class, 'document-field')]"
+                 f"//a[contains(@class, 'button') and .//i[@type='cloud_download']]")
+    if campo_id == 'DOC_RNM':
+        return [botao, botao_alt, _ICONE_DOWNLOAD_ARIA]
+    if campo_id == 'DOC_REDUCAO':
+        return [
+            botao, botao_alt,
+            "//i[@type='cloud_download' and contains(@data-reactid, 'DOC_REDUCAO')]",
+            "//input[@id='DOC_REDUCAO']/following-sibling::*//i[@type='cloud_download']",
+            "//input[@id='DOC_REDUCAO']/ancestor::*[3]//i[@type='cloud_download']",
+        ]
+    if campo_id == 'DOC_VIAGEM':
+        return [
+            botao, botao_alt,
+            "//i[@class='material-icons' and @type='cloud_download' and contains(@data-reactid, 'DOC_VIAGEM') and text()='cloud_download']",
+            "//span[contains(@data-reactid, 'DOC_VIAGEM')]/ancestor::*//i[@type='cloud_download' and text()='cloud_download']",
+            "//input[@id='DOC_VIAGEM']/following-sibling::*//i[@type='cloud_download']",
+        ]
+    # Genérico: sem botão, o próprio campo é usado como elemento clicável
+    return [botao, f"//*[@id='{campo_id}']"]
+
+
+_SCRIPT_INVENTARIO = r"""
+const campos = arguments[0];
+function primeiro(xpath, contexto) {
+    try {
+        return document.evaluate(xpath, contexto || document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) { return null; }
+}
+function texto(el) { return el ? (el.innerText || el.textContent || '').trim() : ''; }
+
+const saidaCampos = {};
+for (const c of campos) {
+    const info = {existe: !!document.getElementById(c.id), icone: false, botao: null, indice_botao: -1};
+    if (info.existe) {
+        info.icone = c.icone.some(x => primeiro(x) !== null);
+        for (let i = 0; i < c.botao.length; i++) {
+            const el = primeiro(c.botao[i]);
+            if (el) { info.botao = el; info.indice_botao = i; break; }
+        }
+    }
+    saidaCampos[c.id] = info;
+}
+
+const seletoresLink = ['.table-cell--DOCS_ANEXO a', '.table-cell--VIEWER a', '.table-cell--VIEWER button'];
+const linhas = [];
+for (const tr of document.querySelectorAll('tbody tr.table-row')) {
+    const tipo = tr.querySelector('.table-cell--DOCS_TIPO span');
+    if (!tipo) continue;
+    let link = null;
+    for (const s of seletoresLink) { link = tr.querySelector(s); if (link) break; }
+    if (!link) link = primeiro(".//a[contains(@href, 'download') or .//i[@type='cloud_download']]", tr);
+    linhas.push({
+        tipo: texto(tipo),
+        tipo_outro: texto(tr.querySelector('.table-cell--DOCS_TIPO_OUTRO span')),
+        link: link,
+        nome_arquivo: texto(link)
+    });
+}
+
+const textos = [];
+const trs = document.evaluate('//table//tr', document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (let i = 0; i < trs.snapshotLength; i++) textos.push(texto(trs.snapshotItem(i)).toLowerCase());
+
+return {campos: saidaCampos, linhas: linhas, textos_linhas: textos};
+"""
+
+
+def _sem_acento(texto: str) -> str:
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+
+class LinhaAnexo:
+    """Linha da tabela de anexos com os textos já normalizados."""
+
+    __slots__ = ('tipo', 'tipo_outro', 'link', 'nome_arquivo', 'texto_lower')
+
+    def __init__(self, tipo: str, tipo_outro: str, link: Any, nome_arquivo: str) -> None:
+        self.tipo = tipo
+        self.tipo_outro = tipo_outro
+        self.link = link
+        self.nome_arquivo = nome_arquivo
+        self.texto_lower = f"{tipo.lower()} {tipo_outro.lower()}"
+
+
+class InventarioDocumentos:
+    """Campos e linhas de anexos de um caso; buscas memoizadas por documento."""
+
+    def __init__(self, campos: Dict[str, Dict[str, Any]], linhas: List[LinhaAnexo], textos_linhas: List[str]) -> None:
+        self.campos = campos
+        self.linhas = linhas
+        self.textos_linhas = textos_linhas
+        self._por_documento: Dict[str, Dict[str, Any]] = {}
+        self._por_termos: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self.consultas = 0
+
+    @classmethod
+    def coletar(cls, driver) -> 'InventarioDocumentos':
+        campos_js = [
+            {'id': campo_id, 'icone': xpaths_icone_campo(campo_id), 'botao': xpaths_botao_campo(campo_id)}
+            for campo_id in CAMPOS_DOCUMENTO.values()
+        ]
+        bruto = driver.execute_script(_SCRIPT_INVENTARIO, campos_js) or {}
+        linhas = [
+            LinhaAnexo(l.get('tipo') or '', l.get('tipo_outro') or '', l.get('link'), l.get('nome_arquivo') or '')
+            for l in bruto.get('linhas') or []
+        ]
+        return cls(bruto.get('campos') or {}, linhas, list(bruto.get('textos_linhas') or []))
+
+    @property
+    def vazio(self) -> bool:
+        return not self.linhas and not self.textos_linhas and not any(c.get('existe') for c in self.campos.values())
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            'campos_com_arquivo': sorted(c for c, info in self.campos.items() if info.get('icone')),
+            'linhas_tabela': len(self.linhas),
+            'consultas': self.consultas,
+        }
+
+    # ------------------------------------------------------------------
+
+    def campo(self, campo_id: str) -> Dict[str, Any]:
+        self.consultas += 1
+        return self.campos.get(campo_id) or {'existe': False, 'icone': False, 'botao': None}
+
+    def buscar_na_tabela(self, nome_documento: str,
+                         corresponde: Callable[[str, str, str], bool]) -> Dict[str, Any]:
+        """Primeira linha que corresponde ao documento e tem link (como `_buscar_documento_na_tabela`)."""
+        self.consultas += 1
+        if nome_documento in self._por_documento:
+            return self._por_documento[nome_documento]
+        resultado: Dict[str, Any] = {'encontrado': False, 'motivo': 'Não encontrado na tabela'}
+        for linha in self.linhas:
+            if linha.link is not None and corresponde(nome_documento, linha.tipo, linha.tipo_outro):
+                resultado = {
+                    'encontrado': True,
+                    'elemento_link': linha.link,
+                    'nome_arquivo': linha.nome_arquivo,
+                    'fonte': 'tabela',
+                    'tipo_documento': linha.tipo,
+                    'tipo_outro': linha.tipo_outro,
+                }
+                break
+        self._por_documento[nome_documento] = resultado
+        return resultado
+
+    def buscar_por_termos(self, termos: List[str]) -> Dict[str, Any]:
+        """Primeira linha com algum dos termos e com link (como `_buscar_documento_na_tabela_termos_amplos`)."""
+        self.consultas += 1
+        chave = tuple(t.lower() for t in termos)
+        if chave in self._por_termos:
+            return self._por_termos[chave]
+        resultado: Dict[str, Any] = {'encontrado': False, 'motivo': 'Não encontrado com termos amplos'}
+        for linha in self.linhas:
+            if linha.link is not None and any(t in linha.texto_lower for t in chave):
+                resultado = {
+                    'encontrado': True,
+                    'elemento_link': linha.link,
+                    'nome_arquivo': linha.nome_arquivo,
+                    'fonte': 'tabela_termos_amplos',
+                }
+                break
+        self._por_termos[chave] = resultado
+        return resultado
+
+    def buscar_variacoes(self, variacoes: List[str]) -> Optional[str]:
+        """Primeira variação presente no texto de alguma linha de tabela (ordem das linhas)."""
+        self.consultas += 1
+        variacoes_lower = [v.lower() for v in variacoes]
+        for texto in self.textos_linhas:
+            for variacao, v_lower in zip(variacoes, variacoes_lower):
+                if v_lower in texto:
+                    return variacao
+        return None
+
+
+# --------------------------------------------------------------------------
+# Cache por driver
+# --------------------------------------------------------------------------
+
+_CACHE: 'weakref.WeakKeyDictionary[Any, InventarioDocumentos]' = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+
+def obter_inventario(driver) -> Optional[InventarioDocumentos]:
+    """Inventário do caso aberto no driver (coletado na primeira chamada).
+
+    Devolve None se a coleta falhar ou vier vazia (ex.: fora do iframe do
+    formulário): os chamadores então usam as buscas no WebDriver, e o
+    inventário vazio não é guardado, para ser coletado de novo.
+    """
+    if driver is None:
+        return None
+    with _LOCK:
+        inventario = _CACHE.get(driver)
+    if inventario is not None:
+        return inventario
+    try:
+        inventario = InventarioDocumentos.coletar(driver)
+    except Exception as e:
+        print(f"[AVISO] Inventário de documentos indisponível: {e}")
+        return None
+    if inventario.vazio:
+        return None
+    with _LOCK:
+        _CACHE[driver] = inventario
+    print(f"[INVENTARIO] {len(inventario.linhas)} linha(s) na tabela, "
+          f"{len(inventario.resumo()['campos_com_arquivo'])} campo(s) com arquivo")
+    return inventario
+
+
+def invalidar_inventario(driver) -> None:
+    """Descarta o inventário do driver (chamar ao abrir outro processo)."""
+    if driver is None:
+        return
+    with _LOCK:
+        _CACHE.pop(driver, None)
+
+
+__all__ = [
+    'CAMPOS_DOCUMENTO',
+    'InventarioDocumentos',
+    'invalidar_inventario',
+    'obter_inventario',
+    'xpaths_botao_campo',
+    'xpaths_icone_campo',
+]
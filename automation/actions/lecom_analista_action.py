@@ -11,6 +11,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from automation.utils.lecom_urls import LECOM_URL, url_fluxo, url_workspace
+from automation.utils.sessao_lecom import chave_login_manual, obter_sessao_lecom
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +21,7 @@ class LecomAnalistaAction:
     def __init__(self, driver=None, wait_timeout: int = 10):
         self.driver = driver
         self.wait = WebDriverWait(self.driver, wait_timeout) if driver else None
-        self.url_workspace = "https://justica.servicos.gov.br/workspace/"
+        self.url_workspace = url_workspace(barra_final=True)
 
         # seletores reutilizados
         self.seletores = {
@@ -64,9 +67,18 @@ class LecomAnalistaAction:
         return self.driver
 
     def login_manual(self, timeout: int = 300) -> bool:
+        """Reaproveita a sessão armazenada; sem ela, aguarda o login manual (até `timeout` s).
+
+        A sessão do analista fica numa chave própria (`chave_login_manual`),
+        separada da sessão da conta dos workers.
+        """
+        sessao = obter_sessao_lecom(chave_login_manual())
+        return sessao.garantir(self.driver, lambda: self._aguardar_login_manual(timeout))
+
+    def _aguardar_login_manual(self, timeout: int) -> bool:
         try:
             logger.info('[WEB] Acessando o LECOM...')
-            self.driver.get('https://justica.servicos.gov.br/bpm')
+            self.driver.get(LECOM_URL)
             logger.info('[USER] Aguarde e faça o login manual...')
             start = time.time()
             while time.time() - start < timeout:
@@ -417,7 +429,7 @@ class LecomAnalistaAction:
     def navigate_direct_to_process(self, codigo_processo: str) -> bool:
         try:
             numero_limpo = re.sub(r"\D", "", codigo_processo or '')
-            workspace_url = f'https://justica.servicos.gov.br/workspace/flow/{numero_limpo}'
+            workspace_url = url_fluxo(numero_limpo)
             self.driver.get(workspace_url)
             time.sleep(3)
             # buscar atividade Aprovar Parecer do Analista e clicar
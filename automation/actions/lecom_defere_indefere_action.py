@@ -9,6 +9,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from automation.utils.lecom_urls import url_fluxo, url_workspace
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,7 +23,7 @@ class LecomDefereIndefereAction:
     def navegar_para_processo(self, codigo: str) -> bool:
         try:
             numero_limpo = re.sub(r"\D", "", codigo or "")
-            url = f"https://justica.servicos.gov.br/workspace/flow/{numero_limpo}"
+            url = url_fluxo(numero_limpo)
             logger.info(f"[WEB] Navegando para: {url}")
             self.driver.get(url)
             time.sleep(3)
@@ -208,7 +210,7 @@ class LecomDefereIndefereAction:
 
     def voltar_workspace(self) -> bool:
         try:
-            self.driver.get('https://justica.servicos.gov.br/workspace')
+            self.driver.get(url_workspace())
             time.sleep(2)
             return 'workspace' in (self.driver.current_url or '')
         except Exception:
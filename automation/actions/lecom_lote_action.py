@@ -13,6 +13,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
 
 from automation.adapters.navegacao_ordinaria_adapter import NavegacaoOrdinaria
+from automation.repositories.lote_repository import JS_LINKS_PAGINACAO
+from automation.utils.lecom_urls import esta_no_lecom, url_workspace
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +25,9 @@ class LecomLoteAction:
     def __init__(self, driver, wait_timeout: int = 10):
         self.driver = driver
         self.wait = WebDriverWait(self.driver, wait_timeout)
-        self.url_workspace = "https://justica.servicos.gov.br/workspace/"
+        self.url_workspace = url_workspace(barra_final=True)
         self.ja_logado = False
+        self.url_formulario = None
 
         # Adaptador de navegação ordinária (reutiliza login automático existente)
         self.navegacao_ordinaria = NavegacaoOrdinaria(self.driver)
@@ -57,7 +60,7 @@ class LecomLoteAction:
                     current_url = self.driver.current_url
                 except Exception:
                     current_url = ""
-                if "justica.servicos.gov.br" in (current_url or ""):
+                if esta_no_lecom(current_url or ""):
                     logger.info("[OK] Usuário já está logado - pulando processo de login")
                     return True
                 logger.warning(
@@ -82,7 +85,7 @@ class LecomLoteAction:
                 self.ja_logado = True
                 return True
 
-            if "justica.servicos.gov.br" in current_url:
+            if esta_no_lecom(current_url):
                 logger.info("[OK] Login aparentemente bem-sucedido - está no domínio correto")
                 self.ja_logado = True
                 return True
@@ -163,6 +166,7 @@ class LecomLoteAction:
             if not iframe_src:
                 logger.error("[ERRO] iframe-form-app encontrado, mas sem atributo src")
                 return False
+            self.url_formulario = iframe_src
             self.driver.get(iframe_src)
             logger.info("[OK] Navegação para URL do formulário concluída")
             time.sleep(2)
@@ -171,6 +175,20 @@ class LecomLoteAction:
             logger.error(f"Erro ao processar iframe: {str(e)}")
             return False
 
+    def reabrir_formulario_lote(self) -> bool:
+        """Volta direto à URL do formulário já aberto antes (sem workspace/menu)."""
+        if not self.url_formulario:
+            return False
+        try:
+            self.driver.get(self.url_formulario)
+            self.wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self.seletores["etapa_dropdown"]))
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"[AVISO] Não foi possível reabrir o formulário de lote: {str(e)}")
+            return False
+
     def selecionar_etapa_aprovacao_conteudo(self) -> bool:
         """Seleciona a etapa 'Aprovação do Conteúdo' no dropdown de etapa."""
         try:
@@ -258,6 +276,100 @@ class LecomLoteAction:
             logger.error(f"Erro ao clicar em 'Atualizar': {str(e)}")
             return False
 
+    # ===================== APLICAÇÃO EM BLOCO =====================
+    _JS_EDITAR_LINHA = (
+        "var linha = document.querySelectorAll('.table-row')[arguments[0]];"
+        "var botao = linha ? linha.querySelector('.edit-line-grid') : null;"
+        "if (!botao) { return false; }"
+        "botao.scrollIntoView({block: 'center'}); botao.click(); return true;"
+    )
+
+    _JS_ESCOLHER_OPCAO = (
+        "var lista = document.querySelector(arguments[0]);"
+        "if (!lista) { return false; }"
+        "var opcoes = lista.querySelectorAll('.input-autocomplete__option');"
+        "for (var i = 0; i < opcoes.length; i++) {"
+        "  var span = opcoes[i].querySelector('span');"
+        "  var t = span ? (span.getAttribute('title') || span.textContent || '') : '';"
+        "  if (t.indexOf(arguments[1]) !== -1) { opcoes[i].click(); return true; }"
+        "}"
+        "return false;"
+    )
+
+    _JS_PAGINA = (
+        JS_LINKS_PAGINACAO +
+        "var alvo = String(arguments[0]);"
+        "var links = linksPaginacao();"
+        "for (var i = 0; i < links.length; i++) {"
+        "  if ((links[i].textContent || '').trim() === alvo) { links[i].click(); return true; }"
+        "}"
+        "return false;"
+    )
+
+    _JS_PRIMEIRO_PROCESSO = (
+        "var el = document.querySelector('.table-row .table-cell--NAT_PROCESSO .table-cell__content');"
+        "return el ? (el.innerText || el.textContent || '').trim() : null;"
+    )
+
+    def abrir_edicao_linha(self, indice: int) -> bool:
+        """Abre a edição da linha pela posição em `.table-row` (sem WebElement guardado)."""
+        try:
+            if not self.driver.execute_script(self._JS_EDITAR_LINHA, indice):
+                logger.error(f"Botão de edição não encontrado na linha {indice}")
+                return False
+            self.wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self.seletores["decisao_dropdown"]))
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao abrir edição da linha {indice}: {str(e)}")
+            return False
+
+    def selecionar_decisao_rapida(self, decisao: str) -> bool:
+        """Abre o dropdown e escolhe a opção com um único `execute_script`.
+
+        Cai para `selecionar_decisao` se a opção não for encontrada por JS.
+        """
+        try:
+            self.driver.find_element(By.CSS_SELECTOR, self.seletores["decisao_dropdown"]).click()
+            self.wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, self.seletores["decisao_list"]))
+            )
+            if self.driver.execute_script(self._JS_ESCOLHER_OPCAO, self.seletores["decisao_list"], decisao):
+                return True
+        except Exception as e:
+            logger.warning(f"[AVISO] Seleção rápida da decisão falhou: {str(e)}")
+        return self.selecionar_decisao(decisao)
+
+    def confirmar_atualizacao(self, timeout: float = 10) -> bool:
+        """Clica em 'Atualizar' e aguarda o editor fechar (sem espera fixa)."""
+        try:
+            botao_atualizar = self.wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self.seletores["botao_atualizar"]))
+            )
+            botao_atualizar.click()
+            WebDriverWait(self.driver, timeout).until(EC.staleness_of(botao_atualizar))
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao confirmar atualização: {str(e)}")
+            return False
+
+    def navegar_para_pagina(self, numero: int, timeout: float = 10) -> bool:
+        """Vai para a página `numero` da tabela e aguarda as linhas trocarem."""
+        try:
+            anterior = self.driver.execute_script(self._JS_PRIMEIRO_PROCESSO)
+            if not self.driver.execute_script(self._JS_PAGINA, numero):
+                logger.info(f"Página {numero} não encontrada na paginação")
+                return False
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script(self._JS_PRIMEIRO_PROCESSO) not in (None, anterior)
+            )
+            logger.info(f"[OK] Navegação para página {numero} concluída")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao navegar para página {numero}: {str(e)}")
+            return False
+
     def navegar_para_pagina_2(self) -> bool:
         """Navega explicitamente para a página 2 da tabela, se existir."""
         try:
@@ -43,6 +43,16 @@ from automation.ocr.ocr_utils import (
     comparar_campos,
     extrair_data_nasc_texto,
 )
+from automation.utils.lecom_urls import LECOM_URL, url_fluxo, url_form_web
+from automation.actions.inventario_documentos import invalidar_inventario
+from automation.utils.sessao_lecom import obter_sessao_lecom
+from automation.utils.perfil_navegador import (
+    PERFIL_DESEMPENHO,
+    aplicar_perfil_desempenho,
+    configurar_sessao_cdp,
+    liberar_diretorio_download,
+    resolver_perfil,
+)
 
 from dotenv import load_dotenv
 
@@ -50,7 +60,6 @@ from dotenv import load_dotenv
 env_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
 load_dotenv(dotenv_path=env_path)
 
-LECOM_URL = "https://justica.servicos.gov.br/bpm"
 LECOM_USER = os.environ.get("LECOM_USER")
 LECOM_PASS = os.environ.get("LECOM_PASS")
 
@@ -60,13 +69,15 @@ class LecomAction:
     Action responsável por todas as interações com o sistema LECOM
     """
     
-    def __init__(self, driver=None):
+    def __init__(self, driver=None, perfil_navegador: Optional[str] = None):
         """
         Inicializa a action do LECOM
         
         Args:
             driver: WebDriver do Selenium (opcional)
+            perfil_navegador: 'padrao' ou 'desempenho' (só vale quando o driver é criado aqui)
         """
+        self.perfil_navegador = resolver_perfil(perfil_navegador)
         if driver:
             self.driver = driver
             self.wait = WebDriverWait(self.driver, 40)
@@ -118,18 +129,36 @@ class LecomAction:
             "profile.content_settings.plugin_whitelist.adobe-flash-player": 0,
             "profile.default_content_setting_values.plugins": 2
         }
+        desempenho = self.perfil_navegador == PERFIL_DESEMPENHO
+        if desempenho:
+            aplicar_perfil_desempenho(chrome_options, prefs)
         chrome_options.add_experimental_option("prefs", prefs)
         
-        return webdriver.Chrome(options=chrome_options)
+        driver = webdriver.Chrome(options=chrome_options)
+        if desempenho:
+            sessao = configurar_sessao_cdp(driver)
+            if sessao['diretorio_download']:
+                print(f"[INFO] Downloads desta sessão em {sessao['diretorio_download']}")
+            print("[OK] Chrome iniciado com perfil de desempenho (headless, CDP)")
+        return driver
     
     def login(self) -> bool:
         """
         Realiza login no sistema LECOM
         
+        Reaproveita a sessão armazenada (ver `automation.utils.sessao_lecom`)
+        e só executa o login completo quando ela não existe ou expirou.
+        
         Returns:
             bool: True se login foi bem-sucedido
         """
         print('=== INÍCIO login ===')
+        ok = obter_sessao_lecom().garantir(self.driver, self._login_completo)
+        self.ja_logado = ok
+        return ok
+    
+    def _login_completo(self) -> bool:
+        """Fluxo completo: usuário -> Próxima -> senha -> Entrar -> popups."""
         print('Acessando o Lecom...')
         self.driver.get(LECOM_URL)
         
@@ -208,10 +237,12 @@ class LecomAction:
             self.numero_processo_limpo = numero_limpo
             
             # Navegar para workspace flow
-            workspace_url = f'https://justica.servicos.gov.br/workspace/flow/{numero_limpo}'
+            workspace_url = url_fluxo(numero_limpo)
             print(f'Navegando para: {workspace_url}')
             
             self.driver.get(workspace_url)
+            # Anexos mudam com o processo: o inventário é recoletado na primeira busca
+            invalidar_inventario(self.driver)
             time.sleep(3)
             
             # Extrair data inicial do processo
@@ -341,7 +372,7 @@ class LecomAction:
         try:
             ciclo_para_usar = getattr(self, 'ciclo_processo', 2)
             
-            form_url = f'https://justica.servicos.gov.br/form-web?processInstanceId={self.numero_processo_limpo}&activityInstanceId=24&cycle={ciclo_para_usar}&newWS=true'
+            form_url = url_form_web(self.numero_processo_limpo, activityInstanceId=24, cycle=ciclo_para_usar, newWS='true')
             print(f'Navegando para form-web: {form_url}')
             
             self.driver.get(form_url)
@@ -414,5 +445,8 @@ class LecomAction:
     def fechar_driver(self):
         """Fecha o driver do navegador"""
         if self.driver:
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            finally:
+                liberar_diretorio_download(self.driver)
             print('[OK] Driver fechado')
@@ -9,6 +9,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from automation.utils.lecom_urls import url_fluxo, url_form_web, url_workspace
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +25,7 @@ class LecomRecursoAction:
     def navegar_para_processo(self, codigo_processo: str) -> bool:
         try:
             numero_limpo = re.sub(r"\D", "", codigo_processo or "")
-            url = f"https://justica.servicos.gov.br/workspace/flow/{numero_limpo}"
+            url = url_fluxo(numero_limpo)
             logger.info(f"[WEB] Navegando para: {url}")
             self.driver.get(url)
             time.sleep(3)
@@ -107,8 +109,7 @@ class LecomRecursoAction:
                 logger.error('[ERRO] processInstanceId não disponível')
                 return False
             iframe_url = (
-                f"https://justica.servicos.gov.br/form-web?processInstanceId={self.process_instance_id}"
-                f"&activityInstanceId=15&cycle={self.ciclo_processo}&newWS=true"
+                url_form_web(self.process_instance_id, activityInstanceId=15, cycle=self.ciclo_processo, newWS='true')
             )
             logger.info(f"[WEB] Abrindo form-web: {iframe_url}")
             self.driver.get(iframe_url)
@@ -236,7 +237,7 @@ class LecomRecursoAction:
 
     def voltar_workspace(self) -> bool:
         try:
-            self.driver.get('https://justica.servicos.gov.br/workspace')
+            self.driver.get(url_workspace())
             time.sleep(2)
             return 'workspace' in (self.driver.current_url or '')
         except Exception:
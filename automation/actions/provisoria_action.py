@@ -16,6 +16,16 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException
 from dotenv import load_dotenv
 
+from automation.utils.lecom_urls import LECOM_URL, url_fluxo, url_form_web, url_workspace
+from automation.utils.sessao_lecom import obter_sessao_lecom
+from automation.utils.perfil_navegador import (
+    PERFIL_DESEMPENHO,
+    aplicar_perfil_desempenho,
+    configurar_sessao_cdp,
+    liberar_diretorio_download,
+    resolver_perfil,
+)
+
 # Carregar .env da raiz
 ROOT_ENV = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 try:
@@ -23,13 +33,14 @@ try:
 except Exception:
     pass
 
-LECOM_URL = "https://justica.servicos.gov.br/bpm"
 LECOM_USER = os.environ.get("LECOM_USER")
 LECOM_PASS = os.environ.get("LECOM_PASS")
 
 
 class ProvisoriaAction:
-    def __init__(self, driver: Any | None = None, wait_timeout: int = 40) -> None:
+    def __init__(self, driver: Any | None = None, wait_timeout: int = 40,
+                 perfil_navegador: str | None = None) -> None:
+        self.perfil_navegador = resolver_perfil(perfil_navegador)
         if driver:
             self.driver = driver
             self.wait = WebDriverWait(self.driver, wait_timeout)
@@ -61,6 +72,16 @@ class ProvisoriaAction:
             "profile.default_content_setting_values.automatic_downloads": 1,
             "profile.content_settings.exceptions.automatic_downloads.*.setting": 1,
         }
+        if self.perfil_navegador == PERFIL_DESEMPENHO:
+            # Headless: sem janela para manter aberta ou maximizar
+            aplicar_perfil_desempenho(chrome_options, prefs)
+            chrome_options.add_experimental_option("prefs", prefs)
+            drv = webdriver.Chrome(options=chrome_options)
+            sessao = configurar_sessao_cdp(drv)
+            if sessao['diretorio_download']:
+                print(f"[INFO] Downloads desta sessão em {sessao['diretorio_download']}")
+            print("[OK] Chrome iniciado com perfil de desempenho (headless, CDP)")
+            return drv
         chrome_options.add_experimental_option("prefs", prefs)
         # Manter janela aberta mesmo após o script (útil p/ inspeção visual)
         try:
@@ -75,6 +96,13 @@ class ProvisoriaAction:
         return drv
 
     def login(self) -> bool:
+        # Sessão armazenada primeiro; login completo só se ela expirou
+        ok = obter_sessao_lecom().garantir(self.driver, self._login_completo)
+        if ok:
+            self.ja_logado = True
+        return ok
+
+    def _login_completo(self) -> bool:
         try:
             self.driver.get(LECOM_URL)
             # Usuário → Próxima
@@ -110,7 +138,7 @@ class ProvisoriaAction:
             try:
                 WebDriverWait(self.driver, 15).until(lambda d: 'workspace' in (d.current_url or '').lower())
             except TimeoutException:
-                self.driver.get('https://justica.servicos.gov.br/workspace')
+                self.driver.get(url_workspace())
                 try:
                     WebDriverWait(self.driver, 10).until(lambda d: 'workspace' in (d.current_url or '').lower())
                 except TimeoutException:
@@ -170,7 +198,7 @@ class ProvisoriaAction:
             self.numero_processo_limpo = numero_limpo
 
             # PASSO 1: Navegar para a página do flow do processo
-            url = f"https://justica.servicos.gov.br/workspace/flow/{numero_limpo}"
+            url = url_fluxo(numero_limpo)
             print(f"[NAV] (Provisória) Navegando para: {url}")
             self.driver.get(url)
             time.sleep(3)  # Aguardar página carregar
@@ -257,8 +285,7 @@ class ProvisoriaAction:
             # PASSO 3: Navegar diretamente para o form-web, igual à Ordinária
             ciclo_para_usar = getattr(self, 'ciclo_processo', 2)
             form_url = (
-                f"https://justica.servicos.gov.br/form-web?processInstanceId={numero_limpo}"
-                f"&activityInstanceId=24&cycle={ciclo_para_usar}&newWS=true"
+                url_form_web(numero_limpo, activityInstanceId=24, cycle=ciclo_para_usar, newWS='true')
             )
             print(f"[NAV] (Provisória) Navegando para form-web: {form_url}")
 
@@ -278,6 +305,55 @@ class ProvisoriaAction:
             return False
 
 
+    # Ciclo mais recente de "Efetuar Distribuição" (/24/<ciclo>) em uma chamada JS
+    _JS_CICLO_DISTRIBUICAO = (
+        "var maior = null;"
+        "document.querySelectorAll('.ant-table-tbody tr a.col-with-link').forEach(function (a) {"
+        "  var titulo = (a.getAttribute('title') || a.textContent || '').toLowerCase();"
+        "  var m = (a.getAttribute('href') || '').match(/\\/24\\/(\\d+)/);"
+        "  if (m && titulo.indexOf('efetuar distribui') !== -1) {"
+        "    maior = Math.max(maior || 0, parseInt(m[1], 10));"
+        "  }"
+        "});"
+        "return maior;"
+    )
+
+    def abrir_formulario_triagem(self, numero_processo: str) -> bool:
+        """Navegação mínima para a triagem: flow (data inicial + ciclo) -> form-web.
+
+        Não clica na atividade nem espera o form-app; usa esperas explícitas em
+        vez de pausas fixas. Sem ciclo identificável, cai em `aplicar_filtros`.
+        """
+        import re
+
+        numero_limpo = re.sub(r"\D", "", numero_processo or "")
+        if not numero_limpo:
+            return False
+        self.numero_processo_limpo = numero_limpo
+        self.data_inicial_processo = None
+        try:
+            self.driver.get(url_fluxo(numero_limpo))
+            WebDriverWait(self.driver, 12).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".ant-table-tbody a.col-with-link"))
+            )
+            self._try_extract_data_inicial_from_subtitle()
+            ciclo = self.driver.execute_script(self._JS_CICLO_DISTRIBUICAO)
+            if not ciclo:
+                print("[TRIAGEM] (Provisória) Ciclo não identificado no flow; usando navegação completa")
+                return bool(self.aplicar_filtros(numero_processo))
+            self.ciclo_processo = int(ciclo)
+            self.driver.get(url_form_web(numero_limpo, activityInstanceId=24, cycle=self.ciclo_processo, newWS='true'))
+            WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.TAG_NAME, 'input'))
+            )
+            return True
+        except TimeoutException:
+            print(f"[AVISO] (Provisória) Timeout na navegação de triagem de {numero_limpo}")
+            return False
+        except Exception as e:
+            print(f"[ERRO] (Provisória) Falha na navegação de triagem: {e}")
+            return False
+
     def baixar_todos_documentos_e_ocr(self, *args, **kwargs):
         """Método de compatibilidade - retorna dicionário vazio.
         Download/OCR agora é gerenciado pelo ProvisoriaService.
@@ -597,7 +673,7 @@ class ProvisoriaAction:
     def voltar_para_pesquisa_processos(self) -> bool:
         """Volta para a página de workspace."""
         try:
-            self.driver.get('https://justica.servicos.gov.br/workspace')
+            self.driver.get(url_workspace())
             time.sleep(2)
             return True
         except Exception:
@@ -621,3 +697,6 @@ class ProvisoriaAction:
                 self.driver.quit()
         except Exception:
             pass
+        finally:
+            if self.driver:
+                liberar_diretorio_download(self.driver)
@@ -6,6 +6,8 @@ Este módulo contém os termos otimizados para cada tipo de documento,
 identificados através da análise estatística de documentos reais.
 """
 
+import re
+
 # ============================================================================
 # CRNM - Baseado em 1.068 documentos válidos (94.6% de sucesso)
 # ============================================================================
@@ -576,83 +578,66 @@ def verificar_padroes_regex(texto: str, padroes: list) -> dict:
     }
 
 
-def validar_documento_melhorado(tipo_documento: str, texto_ocr: str, minimo_confianca: int = 70) -> dict:
-    """
-    Valida documento usando termos otimizados baseados em análise de OCR real.
-    
-    Args:
-        tipo_documento: Tipo do documento (CRNM, CPF, Antecedentes_Brasil, etc.)
-        texto_ocr: Texto extraído via OCR
-        minimo_confianca: Percentual mínimo para considerar válido (padrão: 70%)
-        
-    Returns:
-        Dict com resultado da validação
-    """
-    if not texto_ocr or len(texto_ocr.strip()) < 50:
-        return {
-            'valido': False,
-            'confianca': 0,
-            'termos_encontrados': [],
-            'termos_faltando': [],
-            'motivo': 'Documento muito curto ou vazio'
-        }
-    
-    texto_lower = texto_ocr.lower()
-    
-    # Mapear tipo para termos
-    mapa_termos = {
-        'CRNM': TERMOS_CRNM,
-        'CPF': TERMOS_CPF,
-        'Antecedentes_Brasil': TERMOS_ANTECEDENTES_BRASIL,
-        'Comunicacao_Portugues': TERMOS_COMUNICACAO_PORTUGUES,
-        'Antecedentes_Origem': TERMOS_ANTECEDENTES_ORIGEM,
-        'Reducao_Prazo': TERMOS_REDUCAO_PRAZO,
+MAPA_TERMOS = {
+    'CRNM': TERMOS_CRNM,
+    'CPF': TERMOS_CPF,
+    'Antecedentes_Brasil': TERMOS_ANTECEDENTES_BRASIL,
+    'Comunicacao_Portugues': TERMOS_COMUNICACAO_PORTUGUES,
+    'Antecedentes_Origem': TERMOS_ANTECEDENTES_ORIGEM,
+    'Reducao_Prazo': TERMOS_REDUCAO_PRAZO,
+}
+
+# Heurística extra: palavras-chave básicas de tradução (Antecedentes_Origem)
+HEURISTICAS_TRADUCAO = ['tradução', 'traducao', 'juramentad', 'apostila', 'haia', 'legalização', 'legalizacao']
+
+_RE_CHARACTER_CERTIFICATE = re.compile(r'police\s+character\s+certificate')
+
+
+def _listas_termos(tipo_documento: str) -> dict:
+    """Listas de termos buscadas para o tipo (por categoria)."""
+    termos = MAPA_TERMOS[tipo_documento]
+    listas = {
+        'alta': termos.get('obrigatorios_alta_prioridade', []),
+        'media': termos.get('obrigatorios_media_prioridade', []),
+        'espec': termos.get('especificos', []),
     }
-    
-    if tipo_documento not in mapa_termos:
-        return {
-            'valido': False,
-            'confianca': 0,
-            'termos_encontrados': [],
-            'termos_faltando': [],
-            'motivo': f'Tipo de documento não suportado: {tipo_documento}'
-        }
-    
-    termos = mapa_termos[tipo_documento]
-    
-    # Verificar termos de alta prioridade
-    termos_alta = termos.get('obrigatorios_alta_prioridade', [])
-    encontrados_alta = [t for t in termos_alta if t in texto_lower]
-    
-    # Verificar termos de média prioridade
-    termos_media = termos.get('obrigatorios_media_prioridade', [])
-    encontrados_media = [t for t in termos_media if t in texto_lower]
-    
-    # Verificar termos específicos
-    termos_espec = termos.get('especificos', [])
-    encontrados_espec = [t for t in termos_espec if t in texto_lower]
-    
-    # PRIORIDADE MÁXIMA: Verificar termos de negação para antecedentes
-    tem_negacao = False
     if tipo_documento in ['Antecedentes_Brasil', 'Antecedentes_Origem']:
-        termos_negacao = termos.get('negacao_condenacao', [])
-        tem_negacao = any(termo in texto_lower for termo in termos_negacao)
-    
-    # Para Antecedentes_Origem, verificar requisitos especiais
-    tem_traducao = False
-    tem_exclusao_brasil = False
+        listas['negacao'] = termos.get('negacao_condenacao', [])
     if tipo_documento == 'Antecedentes_Origem':
-        termos_trad = termos.get('traducao_legalizacao', [])
-        if termos_trad:
-            tem_traducao = any(t in texto_lower for t in termos_trad)
-        # Heurística extra: palavras-chave básicas de tradução
-        if not tem_traducao:
-            heuristicas_trad = ['tradução', 'traducao', 'juramentad', 'apostila', 'haia', 'legalização', 'legalizacao']
-            tem_traducao = any(h in texto_lower for h in heuristicas_trad)
-
-        termos_exclusao = termos.get('exclusao_brasil', [])
-        if termos_exclusao:
-            tem_exclusao_brasil = any(t in texto_lower for t in termos_exclusao)
+        listas['traducao'] = list(termos.get('traducao_legalizacao', [])) + HEURISTICAS_TRADUCAO
+        listas['exclusao'] = termos.get('exclusao_brasil', [])
+    return listas
+
+
+def _contar_termos(tipo_documento: str, texto_lower: str) -> dict:
+    """Conjunto de termos encontrados por categoria (+ bloqueio Character Certificate)."""
+    contagem = {
+        categoria: {t for t in lista if t in texto_lower}
+        for categoria, lista in _listas_termos(tipo_documento).items()
+    }
+    contagem['character_certificate'] = (
+        tipo_documento == 'Antecedentes_Origem' and bool(_RE_CHARACTER_CERTIFICATE.search(texto_lower))
+    )
+    return contagem
+
+
+def _avaliar_contagem(tipo_documento: str, contagem: dict, minimo_confianca: int) -> dict:
+    """Regras de validação aplicadas sobre os termos encontrados."""
+    termos = MAPA_TERMOS[tipo_documento]
+    listas = _listas_termos(tipo_documento)
+    termos_alta, termos_media, termos_espec = listas['alta'], listas['media'], listas['espec']
+
+    # Manter a ordem das listas de termos
+    encontrados_alta = [t for t in termos_alta if t in contagem['alta']]
+    encontrados_media = [t for t in termos_media if t in contagem['media']]
+    encontrados_espec = [t for t in termos_espec if t in contagem['espec']]
+
+    # PRIORIDADE MÁXIMA: Verificar termos de negação para antecedentes
+    tem_negacao = bool(contagem.get('negacao'))
+
+    # Para Antecedentes_Origem, verificar requisitos especiais
+    tem_traducao = bool(contagem.get('traducao'))
+    tem_exclusao_brasil = bool(contagem.get('exclusao'))
     
     # Calcular pontuação
     pontos = 0
@@ -711,8 +696,7 @@ def validar_documento_melhorado(tipo_documento: str, texto_ocr: str, minimo_conf
             valido = False
 
         # Bloquear "Police Character Certificate" sem tradução
-        import re as _re
-        if _re.search(r'police\s+character\s+certificate', texto_lower):
+        if contagem.get('character_certificate'):
             if not tem_traducao:
                 bloqueio_character_certificate = True
                 valido = False
@@ -747,6 +731,118 @@ def validar_documento_melhorado(tipo_documento: str, texto_ocr: str, minimo_conf
         'requer_traducao': requer_traducao,
         'detectou_termo_brasil': tem_exclusao_brasil,
         'bloqueio_documento_brasil': bloqueio_documento_brasil,
+        'bloqueio_character_certificate': bloqueio_character_certificate,
         'motivo': f'Documento {"VÁLIDO" if valido else "INVÁLIDO"} - Confiança: {confianca}% ({total_encontrados}/{minimo_termos} termos obrigatórios){motivo_extra}'
     }
-         
\ No newline at end of file
+
+
+def validar_documento_melhorado(tipo_documento: str, texto_ocr: str, minimo_confianca: int = 70) -> dict:
+    """
+    Valida documento usando termos otimizados baseados em análise de OCR real.
+    
+    Args:
+        tipo_documento: Tipo do documento (CRNM, CPF, Antecedentes_Brasil, etc.)
+        texto_ocr: Texto extraído via OCR
+        minimo_confianca: Percentual mínimo para considerar válido (padrão: 70%)
+        
+    Returns:
+        Dict com resultado da validação
+    """
+    if not texto_ocr or len(texto_ocr.strip()) < 50:
+        return {
+            'valido': False,
+            'confianca': 0,
+            'termos_encontrados': [],
+            'termos_faltando': [],
+            'motivo': 'Documento muito curto ou vazio'
+        }
+    
+    if tipo_documento not in MAPA_TERMOS:
+        return {
+            'valido': False,
+            'confianca': 0,
+            'termos_encontrados': [],
+            'termos_faltando': [],
+            'motivo': f'Tipo de documento não suportado: {tipo_documento}'
+        }
+    
+    contagem = _contar_termos(tipo_documento, texto_ocr.lower())
+    return _avaliar_contagem(tipo_documento, contagem, minimo_confianca)
+
+
+class ValidadorIncremental:
+    """
+    Validação em streaming: recebe o texto página a página e atualiza a
+    contagem de termos sem reprocessar o texto já visto.
+
+    Termos encontrados nunca "somem" com mais páginas, então:
+    - VÁLIDO é decisivo assim que ocorre (o texto completo também seria
+      válido; para Antecedentes_Origem a validade já exige tradução, que
+      desarma os bloqueios);
+    - INVÁLIDO só é decisivo para bloqueios (Character Certificate ou
+      documento brasileiro sem tradução) que persistem por
+      `paginas_confirmacao_invalido` páginas seguidas, já que uma tradução
+      em página posterior desfaria o bloqueio.
+
+    O resultado de `alimentar` é o mesmo de `validar_documento_melhorado`
+    sobre "\n".join(páginas vistas), acrescido de 'decisao' e 'paginas'.
+    """
+
+    def __init__(self, tipo_documento: str, minimo_confianca: int = 70, paginas_confirmacao_invalido: int = 2):
+        if tipo_documento not in MAPA_TERMOS:
+            raise ValueError(f'Tipo de documento não suportado: {tipo_documento}')
+        self.tipo_documento = tipo_documento
+        self.minimo_confianca = minimo_confianca
+        self.paginas_confirmacao_invalido = max(1, paginas_confirmacao_invalido)
+        self._listas = _listas_termos(tipo_documento)
+        self._contagem = {categoria: set() for categoria in self._listas}
+        self._contagem['character_certificate'] = False
+        # Cauda do texto anterior: termos que cruzam a quebra de página
+        self._tamanho_cauda = max([len(t) for lista in self._listas.values() for t in lista] + [40])
+        self._cauda = ''
+        self._caracteres_uteis = 0
+        self._paginas = 0
+        self._paginas_bloqueado = 0
+        self.resultado: dict = {'valido': False, 'decisao': None}
+
+    @property
+    def decisao(self):
+        return self.resultado.get('decisao')
+
+    def alimentar(self, texto_pagina: str) -> dict:
+        texto_pagina = texto_pagina or ''
+        trecho = (self._cauda + ('\n' if self._paginas else '') + texto_pagina).lower()
+        self._paginas += 1
+        self._caracteres_uteis += len(texto_pagina.strip())
+        self._cauda = trecho[-self._tamanho_cauda:]
+
+        for categoria, lista in self._listas.items():
+            encontrados = self._contagem[categoria]
+            encontrados.update(t for t in lista if t not in encontrados and t in trecho)
+        if self.tipo_documento == 'Antecedentes_Origem' and not self._contagem['character_certificate']:
+            self._contagem['character_certificate'] = bool(_RE_CHARACTER_CERTIFICATE.search(trecho))
+
+        if self._caracteres_uteis < 50:
+            resultado = {
+                'valido': False,
+                'confianca': 0,
+                'termos_encontrados': [],
+                'termos_faltando': [],
+                'motivo': 'Documento muito curto ou vazio',
+            }
+        else:
+            resultado = _avaliar_contagem(self.tipo_documento, self._contagem, self.minimo_confianca)
+
+        bloqueado = resultado.get('bloqueio_character_certificate') or resultado.get('bloqueio_documento_brasil')
+        self._paginas_bloqueado = self._paginas_bloqueado + 1 if bloqueado else 0
+
+        if resultado['valido']:
+            decisao = 'valido'
+        elif bloqueado and self._paginas_bloqueado >= self.paginas_confirmacao_invalido:
+            decisao = 'invalido'
+        else:
+            decisao = None
+        resultado['decisao'] = decisao
+        resultado['paginas'] = self._paginas
+        self.resultado = resultado
+        return resultado
@@ -8,4 +8,7 @@ em `automation.data.termos_validacao_melhorados` (apenas uma cópia).
 __all__ = [
     "ocr_utils",
     "preprocessing_ocr",
+    "planejador_preprocessamento",
+    "preprocessing_pool",
+    "ocr_camadas",
 ]
@@ -0,0 +1,321 @@
+"""OCR em camadas: Tesseract local primeiro, Mistral Vision só quando necessário.
+
+Antes, o Tesseract só era usado como último recurso (após exceção do
+Mistral) e via `pytesseract.image_to_string`, que cria um processo novo
+por página. Aqui:
+
+1. Todas as páginas passam por Tesseract num pool persistente de
+   processos. Com `tesserocr` instalado cada worker mantém uma instância
+   `PyTessBaseAPI` carregada; sem ele, usa `pytesseract.image_to_data`
+   (uma chamada por página, já com a confiança de cada palavra).
+2. Páginas com confiança média abaixo do limiar (ou com pouco texto) são
+   escaladas para o OCR de visão (Mistral).
+3. Se o documento inteiro ainda não passar no validador (ex.:
+   `validar_documento_melhorado`), as páginas restantes também são
+   escaladas.
+
+Sem MISTRAL_API_KEY (ou com OCR_OFFLINE=1) nada é escalado: o motor
+funciona inteiramente offline.
+"""
+
+from __future__ import annotations
+
+import atexit
+import io
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from automation.ocr.preprocessing_pool import PaginaPreprocessada, pool_processos_permitido, workers_automaticos
+
+IDIOMA_PADRAO = 'por+eng'
+LIMIAR_CONFIANCA_PADRAO = 70.0
+MIN_PALAVRAS_PADRAO = 15
+
+
+@dataclass
+class ResultadoPaginaOCR:
+    indice: int
+    texto: str
+    motor: str  # 'tesseract' | 'mistral'
+    confianca: float = 0.0
+    palavras: int = 0
+    motivo_escalonamento: Optional[str] = None
+
+
+@dataclass
+class ResultadoOCRCamadas:
+    paginas: List[ResultadoPaginaOCR] = field(default_factory=list)
+    escaladas_confianca: int = 0
+    escaladas_validacao: int = 0
+    falhas_escalonamento: int = 0
+
+    @property
+    def texto(self) -> str:
+        return "\n".join(p.texto for p in self.paginas if p.texto)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            'paginas': len(self.paginas),
+            'paginas_tesseract': sum(1 for p in self.paginas if p.motor == 'tesseract'),
+            'paginas_mistral': sum(1 for p in self.paginas if p.motor == 'mistral'),
+            'escaladas_confianca': self.escaladas_confianca,
+            'escaladas_validacao': self.escaladas_validacao,
+            'falhas_escalonamento': self.falhas_escalonamento,
+        }
+
+
+# --------------------------------------------------------------------------
+# Workers Tesseract (nível de módulo -> picklable)
+# --------------------------------------------------------------------------
+
+_API_TESSERACT = None
+# A instância local (modo sem pool) não é thread-safe
+_LOCK_LOCAL = threading.Lock()
+
+
+def _inicializar_worker(idioma: str) -> None:
+    """Carrega o modelo do Tesseract uma vez por worker (quando há tesserocr)."""
+    global _API_TESSERACT
+    try:
+        import tesserocr
+        _API_TESSERACT = tesserocr.PyTessBaseAPI(lang=idioma)
+        atexit.register(_API_TESSERACT.End)
+    except Exception:
+        _API_TESSERACT = None
+
+
+def _confianca_ponderada(palavras: Sequence[str], confiancas: Sequence[float]) -> float:
+    peso_total = 0
+    soma = 0.0
+    for palavra, conf in zip(palavras, confiancas):
+        if conf < 0 or not palavra.strip():
+            continue
+        peso = len(palavra.strip())
+        soma += conf * peso
+        peso_total += peso
+    return soma / peso_total if peso_total else 0.0
+
+
+def _tesseract_pagina(indice: int, payload: bytes, idioma: str) -> ResultadoPaginaOCR:
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(payload))
+    if _API_TESSERACT is not None:
+        from tesserocr import RIL, iterate_level
+
+        _API_TESSERACT.SetImage(img)
+        _API_TESSERACT.Recognize()
+        texto = _API_TESSERACT.GetUTF8Text()
+        # Palavra e confiança do mesmo iterador: a segmentação do Tesseract
+        # não coincide com texto.split()
+        palavras, confiancas = [], []
+        for item in iterate_level(_API_TESSERACT.GetIterator(), RIL.WORD):
+            palavra = item.GetUTF8Text(RIL.WORD)
+            if palavra:
+                palavras.append(palavra)
+                confiancas.append(item.Confidence(RIL.WORD))
+    else:
+        import pytesseract
+
+        dados = pytesseract.image_to_data(img, lang=idioma, output_type=pytesseract.Output.DICT)
+        linhas: Dict[Any, List[str]] = {}
+        palavras, confiancas = [], []
+        for i, palavra in enumerate(dados['text']):
+            conf = float(dados['conf'][i])
+            if conf < 0 or not palavra.strip():
+                continue
+            chave = (dados['block_num'][i], dados['par_num'][i], dados['line_num'][i])
+            linhas.setdefault(chave, []).append(palavra)
+            palavras.append(palavra)
+            confiancas.append(conf)
+        texto = "\n".join(" ".join(ps) for _, ps in sorted(linhas.items()))
+    return ResultadoPaginaOCR(
+        indice=indice,
+        texto=texto.strip(),
+        motor='tesseract',
+        confianca=_confianca_ponderada(palavras, confiancas),
+        palavras=len(palavras),
+    )
+
+
+# --------------------------------------------------------------------------
+# Motor
+# --------------------------------------------------------------------------
+
+def escalonamento_disponivel() -> bool:
+    if os.environ.get('OCR_OFFLINE', '').lower() in ('1', 'true', 'sim'):
+        return False
+    return bool(os.environ.get('MISTRAL_API_KEY'))
+
+
+class MotorOCRCamadas:
+    """Tesseract em pool persistente + escalonamento seletivo para o OCR de visão."""
+
+    def __init__(self, workers: Optional[int] = None, idioma: str = IDIOMA_PADRAO,
+                 limiar_confianca: float = LIMIAR_CONFIANCA_PADRAO,
+                 min_palavras: int = MIN_PALAVRAS_PADRAO, max_escalonamentos_paralelos: int = 4) -> None:
+        self.workers = workers or workers_automaticos()
+        self.idioma = idioma
+        self.limiar_confianca = limiar_confianca
+        self.min_palavras = min_palavras
+        self.max_escalonamentos_paralelos = max(1, max_escalonamentos_paralelos)
+        self._executor: Optional[Executor] = None
+        self._em_processo = self.workers <= 1 or not pool_processos_permitido()
+        self._lock = threading.Lock()
+
+    def _obter_executor(self) -> Optional[Executor]:
+        if self._em_processo:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, initializer=_inicializar_worker, initargs=(self.idioma,)
+                    )
+                except Exception as e:
+                    print(f"[AVISO] Pool Tesseract indisponível ({e}); usando o processo atual")
+                    self._em_processo = True
+            return self._executor
+
+    def _tesseract(self, paginas: Sequence[PaginaPreprocessada]) -> List[ResultadoPaginaOCR]:
+        executor = self._obter_executor() if len(paginas) > 1 else None
+        if executor is not None:
+            try:
+                futuros = [executor.submit(_tesseract_pagina, p.indice, p.payload, self.idioma) for p in paginas]
+                return [f.result() for f in futuros]
+            except BrokenExecutor as e:
+                # Só o pool quebrado (worker morto, BrokenProcessPool) volta ao
+                # processo atual; erros da página em si propagam. A falha vale
+                # só para este lote: o próximo cria outro pool.
+                print(f"[AVISO] Pool Tesseract falhou ({e}); usando o processo atual neste lote")
+                self._descartar_executor(executor)
+        with _LOCK_LOCAL:
+            if _API_TESSERACT is None:
+                _inicializar_worker(self.idioma)
+            return [_tesseract_pagina(p.indice, p.payload, self.idioma) for p in paginas]
+
+    def _descartar_executor(self, executor: Executor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _precisa_escalar(self, resultado: ResultadoPaginaOCR) -> Optional[str]:
+        if resultado.palavras < self.min_palavras:
+            return f'poucas palavras ({resultado.palavras})'
+        if resultado.confianca < self.limiar_confianca:
+            return f'confiança {resultado.confianca:.0f} < {self.limiar_confianca:.0f}'
+        return None
+
+    def _escalar(self, indices: List[int], paginas: Sequence[PaginaPreprocessada],
+                 resultados: List[ResultadoPaginaOCR], ocr_visao: Callable[[str], str],
+                 motivos: Dict[int, str], saida: ResultadoOCRCamadas) -> None:
+        def _executar(i: int) -> Optional[str]:
+            try:
+                return ocr_visao(paginas[i].data_url())
+            except Exception as e:
+                print(f"[AVISO] Escalonamento da página {paginas[i].indice + 1} falhou ({e}); mantendo Tesseract")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.max_escalonamentos_paralelos, len(indices))) as pool:
+            for i, texto in zip(indices, pool.map(_executar, indices)):
+                if texto is None:
+                    saida.falhas_escalonamento += 1
+                    continue
+                anterior = resultados[i]
+                resultados[i] = ResultadoPaginaOCR(
+                    indice=anterior.indice,
+                    texto=texto.strip(),
+                    motor='mistral',
+                    confianca=anterior.confianca,
+                    palavras=len(texto.split()),
+                    motivo_escalonamento=motivos[i],
+                )
+
+    def reconhecer(self, paginas: Sequence[PaginaPreprocessada],
+                   ocr_visao: Optional[Callable[[str], str]] = None,
+                   validador: Optional[Callable[[str], bool]] = None) -> ResultadoOCRCamadas:
+        """OCR das páginas (na ordem recebida).
+
+        Args:
+            paginas: páginas pré-processadas (ver `preprocessing_pool`)
+            ocr_visao: função data URL -> texto usada no escalonamento
+            validador: recebe o texto do documento; False escala as páginas
+                que ainda estão só com Tesseract
+        """
+        saida = ResultadoOCRCamadas()
+        if not paginas:
+            return saida
+        resultados = self._tesseract(paginas)
+        pode_escalar = ocr_visao is not None and escalonamento_disponivel()
+
+        if pode_escalar:
+            motivos = {}
+            for i, r in enumerate(resultados):
+                motivo = self._precisa_escalar(r)
+                if motivo:
+                    motivos[i] = motivo
+            if motivos:
+                saida.escaladas_confianca = len(motivos)
+                print(f"[OCR] {len(motivos)}/{len(paginas)} página(s) escaladas para o Mistral (confiança baixa)")
+                self._escalar(sorted(motivos), paginas, resultados, ocr_visao, motivos, saida)
+
+            if validador is not None:
+                texto = "\n".join(r.texto for r in resultados if r.texto)
+                restantes = [i for i, r in enumerate(resultados) if r.motor == 'tesseract']
+                if restantes and not validador(texto):
+                    motivos = {i: 'validação insuficiente' for i in restantes}
+                    saida.escaladas_validacao = len(restantes)
+                    print(f"[OCR] Validação insuficiente com Tesseract; escalando {len(restantes)} página(s)")
+                    self._escalar(restantes, paginas, resultados, ocr_visao, motivos, saida)
+
+        saida.paginas = resultados
+        return saida
+
+    def escalar(self, paginas: Sequence[PaginaPreprocessada], resultados: Sequence[ResultadoPaginaOCR],
+                ocr_visao: Callable[[str], str], motivo: str) -> ResultadoOCRCamadas:
+        """Força o OCR de visão nas páginas dadas (ex.: validação em streaming insuficiente)."""
+        saida = ResultadoOCRCamadas(escaladas_validacao=len(paginas))
+        resultados = list(resultados)
+        if paginas and escalonamento_disponivel():
+            indices = list(range(len(paginas)))
+            self._escalar(indices, paginas, resultados, ocr_visao, {i: motivo for i in indices}, saida)
+        else:
+            saida.escaladas_validacao = 0
+        saida.paginas = resultados
+        return saida
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_MOTOR: Optional[MotorOCRCamadas] = None
+_MOTOR_LOCK = threading.Lock()
+
+
+def obter_motor_ocr() -> MotorOCRCamadas:
+    """Motor compartilhado do processo (OCR_TESSERACT_WORKERS, OCR_LIMIAR_CONFIANCA)."""
+    global _MOTOR
+    with _MOTOR_LOCK:
+        if _MOTOR is None:
+            _MOTOR = MotorOCRCamadas(
+                workers=int(os.environ.get('OCR_TESSERACT_WORKERS', '0')) or None,
+                limiar_confianca=float(os.environ.get('OCR_LIMIAR_CONFIANCA', LIMIAR_CONFIANCA_PADRAO)),
+            )
+            atexit.register(_MOTOR.fechar)
+        return _MOTOR
+
+
+__all__ = [
+    'MotorOCRCamadas',
+    'ResultadoOCRCamadas',
+    'ResultadoPaginaOCR',
+    'escalonamento_disponivel',
+    'obter_motor_ocr',
+]
@@ -0,0 +1,282 @@
+"""Planejador de pré-processamento por tipo de documento.
+
+A avaliação de qualidade original (`ImagePreprocessor._assess_image_quality`)
+roda Laplaciano, desvio e média na página inteira (render 3x) e decide as
+etapas com limiares fixos. Aqui:
+
+- as métricas são calculadas num nível reduzido da pirâmide gaussiana
+  (`cv2.pyrDown` até o maior lado ficar em ~1000 px), 4-16x menos pixels;
+  como a variância do Laplaciano muda com a escala, os limiares dos perfis
+  foram recalibrados para esse nível;
+- o contraste que decide a binarização é medido só sobre o texto (fundo
+  local menos tinta), não sobre a página inteira: numa página quase toda
+  branca o desvio-padrão é baixo mesmo com tinta preta bem nítida;
+- as etapas e limiares vêm do perfil do tipo de documento (CRNM,
+  antecedentes, comprovantes, padrão);
+- o plano escolhido é guardado por documento (`cache_planos`), e as
+  páginas seguintes do mesmo arquivo reutilizam o plano sem reavaliar.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Maior lado (px) do nível da pirâmide onde as métricas são calculadas
+LADO_MAX_PIRAMIDE = 1000
+
+# Contraste do texto (0-255, no nível da pirâmide) abaixo do qual perfis com
+# binarização a aplicam. Tinta preta nítida sobre papel branco fica acima de
+# ~80; tinta cinza, papel escurecido ou borrão forte ficam abaixo de 45.
+LIMIAR_CONTRASTE_TEXTO = 45.0
+
+
+@dataclass(frozen=True)
+class MetricasQualidade:
+    nitidez: float
+    contraste: float
+    brilho: float
+    score: float
+    contraste_texto: float = 0.0  # 0: sem texto detectado
+    nivel_piramide: int = 0
+
+
+@dataclass(frozen=True)
+class PerfilDocumento:
+    """Limiares e etapas de um tipo de documento (scores em 0-100)."""
+
+    limiar_clahe: float
+    limiar_sharpen: float
+    limiar_denoise: Optional[float] = None
+    binarizar_contraste_baixo: bool = False
+    limiar_contraste_texto: float = LIMIAR_CONTRASTE_TEXTO
+    largura_min: int = 1500
+    alvo_min: int = 1800
+    largura_max: int = 3500
+    alvo_max: int = 3000
+
+
+# Limiares no score do nível da pirâmide. Recalibrados a partir dos valores
+# em resolução cheia (PADRAO histórico 60/55) pelo limiar que mais concorda
+# com a decisão antiga: 40->33.5, 45->43, 50->47.5, 55->49.5; 60 e 65 não
+# mudam. A calibração usou páginas sintéticas sem ruído (em resolução cheia
+# o ruído e o JPEG dominam o Laplaciano e a decisão antiga não mede nitidez).
+PERFIS: Dict[str, PerfilDocumento] = {
+    # Cartão com foto, fundo colorido e fonte pequena: realce mais cedo
+    'CRNM': PerfilDocumento(limiar_clahe=65, limiar_sharpen=60, largura_min=1600, alvo_min=2000),
+    # Certidões impressas (geralmente PDF digital limpo): intervir pouco
+    'ANTECEDENTES': PerfilDocumento(limiar_clahe=47.5, limiar_sharpen=43, binarizar_contraste_baixo=True,
+                                    largura_max=3000, alvo_max=2500),
+    # Comprovantes escaneados/fotografados: ruído é comum
+    'COMPROVANTE': PerfilDocumento(limiar_clahe=60, limiar_sharpen=47.5, limiar_denoise=33.5),
+    'PADRAO': PerfilDocumento(limiar_clahe=60, limiar_sharpen=49.5),
+}
+
+
+@dataclass(frozen=True)
+class PlanoPreprocessamento:
+    tipo_documento: str
+    clahe: bool
+    sharpen: bool
+    denoise: bool
+    binarizar: bool
+    largura_min: int
+    alvo_min: int
+    largura_max: int
+    alvo_max: int
+    metricas: MetricasQualidade
+
+    def resumo(self) -> Dict[str, Any]:
+        dados = asdict(self)
+        dados['metricas'] = {k: round(v, 2) if isinstance(v, float) else v for k, v in dados['metricas'].items()}
+        return dados
+
+
+def _sem_acento(texto: str) -> str:
+    texto = unicodedata.normalize('NFD', texto or '')
+    return ''.join(c for c in texto if unicodedata.category(c) != 'Mn').lower()
+
+
+def normalizar_tipo_documento(nome_ou_tipo: Optional[str]) -> str:
+    """Mapeia nome do documento/arquivo ou tipo Doccano para um perfil."""
+    n = _sem_acento(nome_ou_tipo or '')
+    if not n:
+        return 'PADRAO'
+    if any(k in n for k in ('crnm', 'rnm', 'carteira de registro', 'registro nacional', 'documento de identidade')):
+        return 'CRNM'
+    # Comprovante de comunicação em português (certificados/histórico): mesmo
+    # perfil do tipo Doccano 'Portugues', antes da regra de comprovantes
+    if 'portugu' in n or 'comunicacao' in n:
+        return 'PADRAO'
+    if 'antecedente' in n or 'certidao' in n:
+        return 'ANTECEDENTES'
+    if any(k in n for k in ('comprovante', 'residencia', 'reducao de prazo', 'viagem')):
+        return 'COMPROVANTE'
+    return 'PADRAO'
+
+
+def _cinza(img: np.ndarray) -> np.ndarray:
+    if img.ndim == 3:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return img
+
+
+def nivel_piramide(lado_maior: float, lado_max: int = LADO_MAX_PIRAMIDE) -> int:
+    """Quantos `pyrDown` levam `lado_maior` a no máximo `lado_max`."""
+    nivel = 0
+    while lado_maior > lado_max:
+        lado_maior = (lado_maior + 1) // 2
+        nivel += 1
+    return nivel
+
+
+def _contraste_texto(cinza: np.ndarray) -> float:
+    """Separação tinta/fundo medida só nos pixels de texto.
+
+    O fundo local (mediana) menos o pixel é alto na tinta e ~0 no papel; a
+    máscara exige uma diferença acima do ruído estimado. Devolve o percentil
+    90 da diferença na máscara (0 se quase não houver texto).
+    """
+    fundo = cv2.medianBlur(cinza, 21).astype(np.float32)
+    diferenca = fundo - cinza.astype(np.float32)
+    mediana = float(np.median(diferenca))
+    ruido = 1.4826 * float(np.median(np.abs(diferenca - mediana)))
+    mascara = diferenca > max(12.0, 4 * ruido)
+    if mascara.mean() < 0.002:
+        return 0.0
+    return float(np.percentile(diferenca[mascara], 90))
+
+
+def avaliar_qualidade_piramide(img: np.ndarray, lado_max: int = LADO_MAX_PIRAMIDE,
+                               nivel_inicial: int = 0) -> MetricasQualidade:
+    """Métricas de qualidade num nível reduzido da pirâmide gaussiana.
+
+    A fórmula do score é a mesma do `_assess_image_quality`; como o
+    Laplaciano é sensível à escala, os limiares dos perfis se referem a
+    este score (não ao da resolução cheia). `nivel_inicial` informa quantos
+    níveis o chamador já reduziu (ex.: página renderizada em zoom menor).
+    """
+    cinza = _cinza(img)
+    nivel = nivel_inicial
+    while max(cinza.shape[:2]) > lado_max:
+        cinza = cv2.pyrDown(cinza)
+        nivel += 1
+    nitidez = float(cv2.Laplacian(cinza, cv2.CV_64F).var())
+    contraste = float(cinza.std())
+    brilho = float(cinza.mean())
+    score = (
+        min(100.0, nitidez / 10)
+        + min(100.0, contraste / 2)
+        + (100 - abs(brilho - 128) / 1.28)
+    ) / 3
+    return MetricasQualidade(nitidez, contraste, brilho, score, _contraste_texto(cinza), nivel)
+
+
+def planejar(metricas: MetricasQualidade, tipo_documento: Optional[str]) -> PlanoPreprocessamento:
+    tipo = normalizar_tipo_documento(tipo_documento) if tipo_documento not in PERFIS else tipo_documento
+    perfil = PERFIS[tipo]
+    return PlanoPreprocessamento(
+        tipo_documento=tipo,
+        clahe=metricas.score < perfil.limiar_clahe,
+        sharpen=metricas.score < perfil.limiar_sharpen,
+        denoise=perfil.limiar_denoise is not None and metricas.score < perfil.limiar_denoise,
+        binarizar=(perfil.binarizar_contraste_baixo
+                   and 0 < metricas.contraste_texto < perfil.limiar_contraste_texto),
+        largura_min=perfil.largura_min,
+        alvo_min=perfil.alvo_min,
+        largura_max=perfil.largura_max,
+        alvo_max=perfil.alvo_max,
+        metricas=metricas,
+    )
+
+
+def planejar_imagem(img: np.ndarray, tipo_documento: Optional[str]) -> PlanoPreprocessamento:
+    return planejar(avaliar_qualidade_piramide(img), tipo_documento)
+
+
+def planejar_pdf(caminho: str, tipo_documento: Optional[str],
+                 renderizar: Callable[[], Tuple[np.ndarray, int]],
+                 conteudo: Optional[bytes] = None) -> PlanoPreprocessamento:
+    """Plano do documento (cacheado); sem cache, avalia o render de `renderizar()`.
+
+    `renderizar` devolve (imagem, nível da pirâmide já aplicado): o chamador
+    pode renderizar a página direto numa escala reduzida em vez de gerar o
+    render completo só para avaliar. Com `conteudo` (PDF em memória),
+    `caminho` é apenas o identificador do documento no cache (ex.:
+    'mem:<sha256>').
+    """
+    if conteudo is not None:
+        chave = (caminho, 0.0, len(conteudo), normalizar_tipo_documento(tipo_documento))
+    else:
+        chave = chave_documento(caminho, tipo_documento)
+    plano = cache_planos.obter(chave)
+    if plano is None:
+        img, nivel = renderizar()
+        plano = planejar(avaliar_qualidade_piramide(img, nivel_inicial=nivel), tipo_documento)
+        cache_planos.guardar(chave, plano)
+    return plano
+
+
+def chave_documento(caminho: str, tipo_documento: Optional[str]) -> Tuple[str, float, int, str]:
+    caminho = os.path.abspath(caminho)
+    st = os.stat(caminho)
+    return caminho, st.st_mtime, st.st_size, normalizar_tipo_documento(tipo_documento)
+
+
+class CachePlanos:
+    """LRU de planos por documento (thread-safe)."""
+
+    def __init__(self, capacidade: int = 512) -> None:
+        self.capacidade = capacidade
+        self._itens: 'OrderedDict[Any, PlanoPreprocessamento]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Any) -> Optional[PlanoPreprocessamento]:
+        with self._lock:
+            plano = self._itens.get(chave)
+            if plano is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return plano
+
+    def guardar(self, chave: Any, plano: PlanoPreprocessamento) -> None:
+        with self._lock:
+            self._itens[chave] = plano
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {'planos': len(self._itens), 'acertos': self.acertos, 'falhas': self.falhas}
+
+
+cache_planos = CachePlanos()
+
+
+__all__ = [
+    'LADO_MAX_PIRAMIDE',
+    'LIMIAR_CONTRASTE_TEXTO',
+    'MetricasQualidade',
+    'PerfilDocumento',
+    'PlanoPreprocessamento',
+    'PERFIS',
+    'avaliar_qualidade_piramide',
+    'cache_planos',
+    'nivel_piramide',
+    'normalizar_tipo_documento',
+    'planejar',
+    'planejar_imagem',
+    'planejar_pdf',
+]
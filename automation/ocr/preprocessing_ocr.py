@@ -12,6 +12,7 @@ import cv2
 import numpy as np
 from PIL import Image
 import logging
+from dataclasses import asdict
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,7 +30,8 @@ class ImagePreprocessor:
         Args:
             image: imagem PIL ou numpy array
             apply_all: se True, aplica pipeline básico (recomendado)
-            **kwargs: configurações específicas
+            **kwargs: configurações específicas; `plano` (PlanoPreprocessamento)
+                ou `tipo_documento` ativam o planejador por tipo de documento
         """
         metadata = {
             "etapas_aplicadas": [],
@@ -48,6 +50,14 @@ class ImagePreprocessor:
         
         metadata["original_shape"] = img.shape
         
+        # Plano por tipo de documento (avaliação em pirâmide, reutilizável entre páginas)
+        plano = kwargs.get("plano")
+        if plano is None and kwargs.get("tipo_documento"):
+            from automation.ocr.planejador_preprocessamento import planejar_imagem
+            plano = planejar_imagem(img, kwargs["tipo_documento"])
+        if plano is not None:
+            return self._aplicar_plano(img, plano, metadata)
+        
         try:
             # Avaliar qualidade da imagem inicial
             quality = self._assess_image_quality(img)
@@ -109,6 +119,37 @@ class ImagePreprocessor:
             logger.error(f"Erro no pré-processamento: {e}")
             return img, metadata
     
+    def _aplicar_plano(self, img, plano, metadata):
+        """Executa as etapas decididas por um `PlanoPreprocessamento`."""
+        metadata["quality_score"] = plano.metricas.score
+        metadata["plano"] = asdict(plano)  # metadados precisam continuar serializáveis em JSON
+        try:
+            if len(img.shape) == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                metadata["etapas_aplicadas"].append("grayscale")
+            
+            img = self._smart_resize(img, plano.largura_min, plano.alvo_min, plano.largura_max, plano.alvo_max)
+            metadata["etapas_aplicadas"].append("smart_resize")
+            
+            if plano.clahe:
+                img = self._gentle_clahe(img)
+                metadata["etapas_aplicadas"].append("gentle_clahe")
+            if plano.denoise:
+                img = self._gentle_denoise(img)
+                metadata["etapas_aplicadas"].append("gentle_denoise")
+            if plano.sharpen:
+                img = self._gentle_sharpen(img)
+                metadata["etapas_aplicadas"].append("gentle_sharpen")
+            if plano.binarizar:
+                img = self._gentle_threshold(img)
+                metadata["etapas_aplicadas"].append("gentle_threshold")
+            
+            metadata["final_shape"] = img.shape
+            return img, metadata
+        except Exception as e:  # pragma: no cover - defensivo
+            logger.error(f"Erro no pré-processamento (plano {plano.tipo_documento}): {e}")
+            return img, metadata
+    
     def _assess_image_quality(self, img):
         """Avalia qualidade da imagem (0-100)."""
         try:
@@ -137,13 +178,13 @@ class ImagePreprocessor:
         except Exception:  # pragma: no cover - defensivo
             return 50  # Qualidade média se falhar
     
-    def _smart_resize(self, img):
+    def _smart_resize(self, img, largura_min=1500, alvo_min=1800, largura_max=3500, alvo_max=3000):
         """Resize inteligente baseado em conteúdo."""
         height, width = img.shape[:2]
         
         # Se muito pequena, aumentar com interpolação cúbica
-        if width < 1500:
-            scale = 1800 / width
+        if width < largura_min:
+            scale = alvo_min / width
             new_width = int(width * scale)
             new_height = int(height * scale)
             img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
@@ -152,8 +193,8 @@ class ImagePreprocessor:
             )
         
         # Se muito grande, reduzir suavemente
-        elif width > 3500:
-            scale = 3000 / width
+        elif width > largura_max:
+            scale = alvo_max / width
             new_width = int(width * scale)
             new_height = int(height * scale)
             img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
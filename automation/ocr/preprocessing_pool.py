@@ -0,0 +1,439 @@
+"""Pool multiprocesso de pré-processamento de páginas para OCR.
+
+A rasterização (`fitz`) e o `ImagePreprocessor.preprocess` (grayscale,
+resize cúbico, CLAHE, Laplaciano) são CPU puros e rodavam na thread
+chamadora, uma página por vez. Este módulo distribui as páginas entre
+processos:
+
+- `processar_paginas_pdf`: envia apenas (caminho, número da página); cada
+  worker renderiza a página e trabalha sobre o buffer do pixmap.
+- `processar_paginas_pdf_memoria`: PDF em memória (capturado pela rede);
+  os bytes vão uma vez para `multiprocessing.shared_memory` e cada worker
+  abre o documento a partir do bloco.
+- `processar_imagens`: copia os arrays (pixmaps já renderizados) para um
+  único bloco `multiprocessing.shared_memory`; os workers recebem só
+  (nome, offset, shape, dtype) e montam views numpy sobre o bloco, sem
+  serializar pixels.
+
+Os resultados (payload JPEG/PNG codificado + metadados) voltam na ordem
+das páginas. Sem pool disponível (processo daemon, worker de outro pool,
+falha ao criar processos) tudo roda no próprio processo.
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from automation.ocr.planejador_preprocessamento import nivel_piramide, planejar_imagem, planejar_pdf
+from automation.ocr.preprocessing_ocr import ImagePreprocessor
+
+FORMATOS = {'JPEG': ('.jpg', 'image/jpeg'), 'PNG': ('.png', 'image/png')}
+
+
+@dataclass
+class PaginaPreprocessada:
+    """Página pré-processada e codificada, pronta para envio ao OCR."""
+
+    indice: int
+    payload: bytes
+    formato: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    duracao_ms: float = 0.0
+
+    def data_url(self) -> str:
+        mime = FORMATOS[self.formato][1]
+        return f"data:{mime};base64," + base64.b64encode(self.payload).decode()
+
+
+# --------------------------------------------------------------------------
+# Funções executadas nos workers (nível de módulo -> picklable)
+# --------------------------------------------------------------------------
+
+# Documento aberto por thread: páginas do mesmo PDF reaproveitam o handle.
+# O cache é por thread (o modo local roda em várias threads ao mesmo tempo),
+# então trocar de arquivo só fecha documentos que a própria thread abriu.
+_DOCS_THREAD = threading.local()
+_LOCK_SHM = threading.Lock()
+
+
+def _cache_docs() -> Dict[str, Any]:
+    docs = getattr(_DOCS_THREAD, 'docs', None)
+    if docs is None:
+        docs = _DOCS_THREAD.docs = {}
+    return docs
+
+
+def _limpar_cache_docs() -> None:
+    docs = _cache_docs()
+    for antigo in docs.values():
+        try:
+            antigo.close()
+        except Exception:
+            pass
+    docs.clear()
+
+
+def _abrir_pdf(caminho: str):
+    import fitz
+
+    chave = f"{caminho}:{os.path.getmtime(caminho)}"
+    docs = _cache_docs()
+    doc = docs.get(chave)
+    if doc is None:
+        _limpar_cache_docs()
+        doc = fitz.open(caminho)
+        docs[chave] = doc
+    return doc
+
+
+def _abrir_pdf_memoria(chave: str, obter_conteudo: Callable[[], bytes]):
+    import fitz
+
+    chave = f"mem:{chave}"
+    docs = _cache_docs()
+    doc = docs.get(chave)
+    if doc is None:
+        _limpar_cache_docs()
+        doc = fitz.open(stream=obter_conteudo(), filetype='pdf')
+        docs[chave] = doc
+    return doc
+
+
+def _anexar_shm(nome: str) -> shared_memory.SharedMemory:
+    """Abre no worker um bloco criado pelo processo principal, sem rastreá-lo.
+
+    Só o criador pode dar `unlink`: antes do 3.13 o `SharedMemory(name=...)`
+    também registra o bloco no `resource_tracker`; num worker com tracker
+    próprio o bloco aparece como "leaked" (e é removido) quando ele termina.
+    Desfazer o registro depois não serve: com o tracker herdado do pai, isso
+    apagaria o registro do próprio criador.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nome, track=False)
+    from multiprocessing import resource_tracker
+
+    with _LOCK_SHM:
+        registrar = resource_tracker.register
+        resource_tracker.register = lambda nome_rec, tipo: None if tipo == 'shared_memory' else registrar(nome_rec, tipo)
+        try:
+            return shared_memory.SharedMemory(name=nome)
+        finally:
+            resource_tracker.register = registrar
+
+
+def _codificar(img: np.ndarray, formato: str, qualidade: int) -> bytes:
+    extensao = FORMATOS[formato][0]
+    params = [cv2.IMWRITE_JPEG_QUALITY, int(qualidade)] if formato == 'JPEG' else []
+    ok, buf = cv2.imencode(extensao, img, params)
+    if not ok:
+        raise ValueError(f"Falha ao codificar página em {formato}")
+    return buf.tobytes()
+
+
+def _preprocessar_e_codificar(img: np.ndarray, formato: str, qualidade: int,
+                              opcoes: Dict[str, Any]) -> Tuple[bytes, Dict[str, Any]]:
+    try:
+        processada, metadata = ImagePreprocessor().preprocess(img, apply_all=True, **opcoes)
+        return _codificar(processada, formato, qualidade), metadata
+    except Exception as e:
+        # Mesmo fallback do fluxo sequencial: imagem original
+        return _codificar(img, formato, qualidade), {'erro_preprocessamento': str(e), 'etapas_aplicadas': []}
+
+
+def _pixmap_para_bgr(pix) -> np.ndarray:
+    buffer = getattr(pix, 'samples_mv', None) or pix.samples
+    arr = np.frombuffer(buffer, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if pix.n == 1:
+        return arr[:, :, 0]
+    if pix.n == 4:
+        return cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+    return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+
+
+def _renderizar_reduzida(doc: Any, num_pagina: int, zoom: float) -> Tuple[np.ndarray, int]:
+    """Primeira página em cinza já no nível da pirâmide usado pelo planejador.
+
+    Em vez de renderizar em `zoom` e reduzir k vezes, renderiza em
+    zoom / 2**(k-1) e aplica um único `pyrDown` (o render direto em escala
+    pequena é mais nítido que o reduzido pela pirâmide e inflaria o
+    Laplaciano). Devolve (imagem, k).
+    """
+    import fitz
+
+    pagina = doc[num_pagina]
+    nivel = nivel_piramide(max(pagina.rect.width, pagina.rect.height) * zoom)
+    escala = zoom / (2 ** (nivel - 1)) if nivel else zoom
+    pix = pagina.get_pixmap(matrix=fitz.Matrix(escala, escala), colorspace=fitz.csGRAY)
+    img = _pixmap_para_bgr(pix).copy()
+    return (cv2.pyrDown(img) if nivel else img), nivel
+
+
+def _pagina_do_documento(indice: int, doc: Any, num_pagina: int, zoom: float, formato: str,
+                         qualidade: int, opcoes: Dict[str, Any], inicio: float) -> PaginaPreprocessada:
+    import fitz
+
+    pix = doc[num_pagina].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    payload, metadata = _preprocessar_e_codificar(_pixmap_para_bgr(pix), formato, qualidade, opcoes)
+    metadata['pagina'] = num_pagina
+    return PaginaPreprocessada(indice, payload, formato, metadata, (time.perf_counter() - inicio) * 1000.0)
+
+
+def _tarefa_pagina_pdf(indice: int, caminho: str, num_pagina: int, zoom: float, formato: str,
+                       qualidade: int, opcoes: Dict[str, Any]) -> PaginaPreprocessada:
+    inicio = time.perf_counter()
+    return _pagina_do_documento(indice, _abrir_pdf(caminho), num_pagina, zoom, formato, qualidade, opcoes, inicio)
+
+
+def _tarefa_pagina_pdf_shm(indice: int, nome_shm: str, tamanho: int, chave: str, num_pagina: int,
+                           zoom: float, formato: str, qualidade: int,
+                           opcoes: Dict[str, Any]) -> PaginaPreprocessada:
+    inicio = time.perf_counter()
+
+    def _ler() -> bytes:
+        shm = _anexar_shm(nome_shm)
+        try:
+            return bytes(shm.buf[:tamanho])
+        finally:
+            shm.close()
+
+    doc = _abrir_pdf_memoria(chave, _ler)
+    return _pagina_do_documento(indice, doc, num_pagina, zoom, formato, qualidade, opcoes, inicio)
+
+
+def _tarefa_shm(indice: int, nome_shm: str, offset: int, shape: Tuple[int, ...], dtype: str,
+                formato: str, qualidade: int, opcoes: Dict[str, Any]) -> PaginaPreprocessada:
+    inicio = time.perf_counter()
+    shm = _anexar_shm(nome_shm)
+    try:
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        payload, metadata = _preprocessar_e_codificar(view, formato, qualidade, opcoes)
+        del view
+    finally:
+        shm.close()
+    return PaginaPreprocessada(indice, payload, formato, metadata, (time.perf_counter() - inicio) * 1000.0)
+
+
+def _tarefa_array(indice: int, img: np.ndarray, formato: str, qualidade: int,
+                  opcoes: Dict[str, Any]) -> PaginaPreprocessada:
+    inicio = time.perf_counter()
+    payload, metadata = _preprocessar_e_codificar(img, formato, qualidade, opcoes)
+    return PaginaPreprocessada(indice, payload, formato, metadata, (time.perf_counter() - inicio) * 1000.0)
+
+
+# --------------------------------------------------------------------------
+# Serviço
+# --------------------------------------------------------------------------
+
+def workers_automaticos() -> int:
+    """Núcleos disponíveis para o processo (afinidade), menos um para o chamador."""
+    try:
+        nucleos = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        nucleos = os.cpu_count() or 1
+    return max(1, nucleos - 1)
+
+
+def pool_processos_permitido() -> bool:
+    # Processos daemon não podem ter filhos; workers de outro pool não devem aninhar pools
+    processo = multiprocessing.current_process()
+    return not processo.daemon and multiprocessing.parent_process() is None
+
+
+def _para_bgr(imagem: Any) -> np.ndarray:
+    if isinstance(imagem, Image.Image):
+        arr = np.array(imagem.convert('RGB'))
+        return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+    return np.ascontiguousarray(imagem)
+
+
+class PoolPreprocessamento:
+    """Serviço de pré-processamento paralelo com fallback para execução local."""
+
+    def __init__(self, workers: Optional[int] = None, formato: str = 'JPEG', qualidade: int = 75,
+                 em_processo: bool = False) -> None:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato não suportado: {formato}")
+        self.workers = workers or workers_automaticos()
+        self.formato = formato
+        self.qualidade = qualidade
+        self.em_processo = em_processo or self.workers <= 1 or not pool_processos_permitido()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------- executor
+    def _obter_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.em_processo:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                except Exception as e:
+                    print(f"[AVISO] Pool de pré-processamento indisponível ({e}); usando o processo atual")
+                    self.em_processo = True
+            return self._executor
+
+    def _degradar(self, motivo: Exception) -> None:
+        print(f"[AVISO] Pool de pré-processamento falhou ({motivo}); voltando ao modo local")
+        with self._lock:
+            self.em_processo = True
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _mapear(self, funcao: Callable[..., PaginaPreprocessada], tarefas: List[Tuple],
+                local: Callable[[Tuple], PaginaPreprocessada]) -> List[PaginaPreprocessada]:
+        executor = self._obter_executor() if len(tarefas) > 1 else None
+        if executor is None:
+            return [local(t) for t in tarefas]
+        try:
+            futuros = [executor.submit(funcao, *t) for t in tarefas]
+            return [f.result() for f in futuros]
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            self._degradar(e)
+            return [local(t) for t in tarefas]
+
+    def _planejar_pdf(self, chave_plano: str, tipo_documento: str, abrir: Callable[[], Any],
+                      num_pagina: int, zoom: float, opcoes: Dict[str, Any],
+                      conteudo: Optional[bytes] = None) -> None:
+        """Coloca o plano do documento em `opcoes`.
+
+        Sem plano em cache, só a avaliação roda aqui, sobre um render barato
+        da primeira página (`_renderizar_reduzida`); o pré-processamento de
+        todas as páginas, inclusive a primeira, vai para o pool.
+        """
+        try:
+            opcoes['plano'] = planejar_pdf(chave_plano, tipo_documento,
+                                           lambda: _renderizar_reduzida(abrir(), num_pagina, zoom),
+                                           conteudo=conteudo)
+        except Exception as e:
+            print(f"[AVISO] Planejamento do pré-processamento falhou ({e}); usando pipeline padrão")
+
+    # ------------------------------------------------------------------ API
+    def processar_paginas_pdf(self, caminho: str, paginas: Iterable[int], zoom: float = 3.0,
+                              opcoes: Optional[Dict[str, Any]] = None,
+                              tipo_documento: Optional[str] = None) -> List[PaginaPreprocessada]:
+        """Renderiza e pré-processa as páginas indicadas (índices base 0), em ordem.
+
+        Com `tipo_documento`, o plano do documento (cacheado) é decidido uma
+        vez e enviado a todas as páginas.
+        """
+        caminho = os.path.abspath(caminho)
+        opcoes = dict(opcoes or {})
+        paginas = list(paginas)
+        if tipo_documento and paginas and 'plano' not in opcoes:
+            self._planejar_pdf(caminho, tipo_documento, lambda: _abrir_pdf(caminho), paginas[0], zoom, opcoes)
+        tarefas = [(i, caminho, p, zoom, self.formato, self.qualidade, opcoes) for i, p in enumerate(paginas)]
+        return self._mapear(_tarefa_pagina_pdf, tarefas, lambda t: _tarefa_pagina_pdf(*t))
+
+    def processar_paginas_pdf_memoria(self, conteudo: bytes, chave: str, paginas: Iterable[int],
+                                      zoom: float = 3.0, opcoes: Optional[Dict[str, Any]] = None,
+                                      tipo_documento: Optional[str] = None) -> List[PaginaPreprocessada]:
+        """Como `processar_paginas_pdf`, para um PDF em memória identificado por `chave` (hash)."""
+        opcoes = dict(opcoes or {})
+        paginas = list(paginas)
+        if tipo_documento and paginas and 'plano' not in opcoes:
+            self._planejar_pdf(f"mem:{chave}", tipo_documento, lambda: _abrir_pdf_memoria(chave, lambda: conteudo),
+                               paginas[0], zoom, opcoes, conteudo=conteudo)
+
+        def local(i: int, num_pagina: int) -> PaginaPreprocessada:
+            inicio = time.perf_counter()
+            doc = _abrir_pdf_memoria(chave, lambda: conteudo)
+            return _pagina_do_documento(i, doc, num_pagina, zoom, self.formato, self.qualidade, opcoes, inicio)
+
+        if len(paginas) <= 1 or self._obter_executor() is None:
+            return [local(i, p) for i, p in enumerate(paginas)]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(conteudo)))
+        try:
+            shm.buf[:len(conteudo)] = conteudo
+            tarefas = [
+                (i, shm.name, len(conteudo), chave, p, zoom, self.formato, self.qualidade, opcoes)
+                for i, p in enumerate(paginas)
+            ]
+            return self._mapear(_tarefa_pagina_pdf_shm, tarefas, lambda t: local(t[0], t[4]))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def processar_imagens(self, imagens: Sequence[Any], opcoes: Optional[Dict[str, Any]] = None,
+                          tipo_documento: Optional[str] = None) -> List[PaginaPreprocessada]:
+        """Pré-processa imagens já carregadas (PIL ou arrays BGR/cinza), em ordem."""
+        opcoes = dict(opcoes or {})
+        arrays = [_para_bgr(img) for img in imagens]
+        if tipo_documento and arrays and 'plano' not in opcoes:
+            try:
+                opcoes['plano'] = planejar_imagem(arrays[0], tipo_documento)
+            except Exception as e:
+                print(f"[AVISO] Planejamento do pré-processamento falhou ({e}); usando pipeline padrão")
+        local = lambda t: _tarefa_array(t[0], arrays[t[0]], self.formato, self.qualidade, opcoes)  # noqa: E731
+        if len(arrays) <= 1 or self._obter_executor() is None:
+            return [local((i,)) for i in range(len(arrays))]
+
+        # Um único bloco compartilhado; cada página ocupa uma fatia alinhada
+        offsets, total = [], 0
+        for arr in arrays:
+            offsets.append(total)
+            total += (arr.nbytes + 63) // 64 * 64
+        shm = shared_memory.SharedMemory(create=True, size=max(1, total))
+        try:
+            for arr, offset in zip(arrays, offsets):
+                destino = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=offset)
+                destino[...] = arr
+                del destino
+            tarefas = [
+                (i, shm.name, offsets[i], arr.shape, arr.dtype.str, self.formato, self.qualidade, opcoes)
+                for i, arr in enumerate(arrays)
+            ]
+            return self._mapear(_tarefa_shm, tarefas, lambda t: local((t[0],)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_POOL: Optional[PoolPreprocessamento] = None
+_POOL_LOCK = threading.Lock()
+
+
+def obter_pool_preprocessamento() -> PoolPreprocessamento:
+    """Pool compartilhado do processo (OCR_PREPROC_WORKERS=0 -> automático;
+    OCR_PREPROC_EM_PROCESSO=1 força o modo local)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = PoolPreprocessamento(
+                workers=int(os.environ.get('OCR_PREPROC_WORKERS', '0')) or None,
+                em_processo=os.environ.get('OCR_PREPROC_EM_PROCESSO', '').lower() in ('1', 'true', 'sim'),
+            )
+            atexit.register(_POOL.fechar)
+        return _POOL
+
+
+__all__ = [
+    'PaginaPreprocessada',
+    'PoolPreprocessamento',
+    'obter_pool_preprocessamento',
+    'pool_processos_permitido',
+    'workers_automaticos',
+]
@@ -4,11 +4,12 @@ Repository (Analista) - Acesso/leitura de dados do formulário e utilidades
 import logging
 import time
 from typing import Dict, List
-import pandas as pd
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from automation.utils.leitor_codigos import ColunaCodigoNaoEncontrada, LeitorCodigos
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,34 +86,11 @@ class AnalistaRepository:
 
     def ler_planilha_codigos(self, caminho_planilha: str, nome_coluna_codigo: str = 'codigo') -> List[str]:
         try:
-            if caminho_planilha.endswith('.xlsx'):
-                df = pd.read_excel(caminho_planilha)
-            elif caminho_planilha.endswith('.csv'):
-                df = pd.read_csv(caminho_planilha)
-            else:
-                df = pd.read_excel(caminho_planilha)
-            col_map = {str(c).strip().lower(): c for c in df.columns}
-            alvo = (nome_coluna_codigo or 'codigo').strip().lower()
-            real = None
-            for cand in [alvo, 'codigo', 'código']:
-                if cand in col_map:
-                    real = col_map[cand]
-                    break
-            if not real:
-                for low, orig in col_map.items():
-                    if 'codigo' in low or 'código' in low:
-                        real = orig
-                        break
-            if not real:
-                logger.error(f"Coluna '{nome_coluna_codigo}' não encontrada")
-                return []
-            codigos: List[str] = []
-            for v in df[real]:
-                if pd.notna(v):
-                    s = str(v).strip()
-                    if s:
-                        codigos.append(s)
-            return codigos
+            leitor = LeitorCodigos(caminho_planilha, nome_coluna_codigo, primeira_se_ausente=False)
+            return list(leitor)
+        except ColunaCodigoNaoEncontrada:
+            logger.error(f"Coluna '{nome_coluna_codigo}' não encontrada")
+            return []
         except Exception as e:
             logger.error(f"[ERRO] ler_planilha_codigos: {e}")
             return []
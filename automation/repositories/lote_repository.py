@@ -12,6 +12,28 @@ from selenium.webdriver.support import expected_conditions as EC
 
 logger = logging.getLogger(__name__)
 
+# Links numéricos só contam dentro do paginador: número de processo, ano ou
+# qualquer outro link numérico da página não pode virar "página". Sem um
+# container de paginação reconhecível, valem os links depois da tabela que
+# não pertencem a nenhuma linha.
+SELETOR_PAGINACAO = ".ant-pagination, .pagination, [class*='pagination'], [class*='paginacao']"
+JS_LINKS_PAGINACAO = (
+    "var linksPaginacao = function () {"
+    "  var caixas = document.querySelectorAll(\"" + SELETOR_PAGINACAO + "\");"
+    "  var links = [];"
+    "  caixas.forEach(function (c) {"
+    "    c.querySelectorAll('a').forEach(function (a) { if (links.indexOf(a) === -1) { links.push(a); } });"
+    "  });"
+    "  if (links.length) { return links; }"
+    "  var tabela = document.querySelector('.table.striped');"
+    "  if (!tabela) { return []; }"
+    "  return Array.prototype.filter.call(document.querySelectorAll('a'), function (a) {"
+    "    return (tabela.compareDocumentPosition(a) & Node.DOCUMENT_POSITION_FOLLOWING)"
+    "      && !tabela.contains(a) && !a.closest('.table-row');"
+    "  });"
+    "};"
+)
+
 
 class LoteRepository:
     """Repository com acesso à tabela de processos da tela de Aprovação em Lote."""
@@ -66,3 +88,88 @@ class LoteRepository:
         except Exception as e:
             logger.error(f"Erro ao extrair dados da linha da tabela: {str(e)}")
             return {}
+
+    # ===================== LEITURA EM BLOCO =====================
+    # Uma única chamada JS devolve número, análise MJ e decisão atual de
+    # todas as linhas da página (em vez de dois find_element por linha).
+    _JS_LER_LINHAS = (
+        "var linhas = document.querySelectorAll('.table-row');"
+        "var texto = function (linha, coluna) {"
+        "  var el = linha.querySelector('.table-cell--' + coluna + ' .table-cell__content');"
+        "  return el ? (el.innerText || el.textContent || '').trim() : null;"
+        "};"
+        "var dados = [];"
+        "for (var i = 0; i < linhas.length; i++) {"
+        "  var numero = texto(linhas[i], 'NAT_PROCESSO');"
+        "  if (numero === null) { continue; }"
+        "  dados.push({indice: i, numero_processo: numero,"
+        "              analise_mj: texto(linhas[i], 'NAT_ANALISE_MJ') || '',"
+        "              decisao_atual: texto(linhas[i], 'NAT_DECISAO') || ''});"
+        "}"
+        "return dados;"
+    )
+
+    _JS_TOTAL_PAGINAS = (
+        JS_LINKS_PAGINACAO +
+        "var maior = 1;"
+        "linksPaginacao().forEach(function (a) {"
+        "  var t = (a.textContent || '').trim();"
+        "  if (/^\\d+$/.test(t)) { maior = Math.max(maior, parseInt(t, 10)); }"
+        "});"
+        "return maior;"
+    )
+
+    _JS_CONTAR_PENDENTES = (
+        "var n = 0;"
+        "document.querySelectorAll('.table-row').forEach(function (linha) {"
+        "  if (!linha.querySelector('.table-cell--NAT_PROCESSO')) { return; }"
+        "  var d = linha.querySelector('.table-cell--NAT_DECISAO .table-cell__content');"
+        "  if (!d || !(d.innerText || d.textContent || '').trim()) { n++; }"
+        "});"
+        "return n;"
+    )
+
+    def contar_pendentes(self, timeout: float = 5) -> int:
+        """Sonda leve: linhas sem decisão na página atual, com uma chamada JS."""
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".table.striped"))
+            )
+            return int(self.driver.execute_script(self._JS_CONTAR_PENDENTES) or 0)
+        except Exception:
+            # Tabela não aparece quando não há processos na etapa
+            return 0
+
+    def ler_linhas_pagina(self, tentativas: int = 5) -> List[Dict[str, Any]]:
+        """Lê todas as linhas da página atual com um único `execute_script`.
+
+        Retorna dicts com `indice` (posição em `.table-row`), `numero_processo`,
+        `analise_mj` e `decisao_atual`.
+        """
+        try:
+            self.wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".table.striped"))
+            )
+            dados: List[Dict[str, Any]] = []
+            for tentativa in range(tentativas):
+                dados = self.driver.execute_script(self._JS_LER_LINHAS) or []
+                if dados:
+                    break
+                logger.info(
+                    f"[TABELA] Nenhuma linha ainda (tentativa {tentativa + 1}/{tentativas}), aguardando..."
+                )
+                import time as _time
+                _time.sleep(1)
+            logger.info(f"[TABELA] {len(dados)} linhas lidas em bloco")
+            return dados
+        except Exception as e:
+            logger.error(f"Erro ao ler linhas da tabela em bloco: {str(e)}")
+            return []
+
+    def total_paginas(self) -> int:
+        """Maior número de página exibido na paginação da tabela (1 se não houver)."""
+        try:
+            return max(1, int(self.driver.execute_script(self._JS_TOTAL_PAGINAS) or 1))
+        except Exception as e:
+            logger.warning(f"[AVISO] Não foi possível ler a paginação: {str(e)}")
+            return 1
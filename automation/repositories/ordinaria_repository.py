@@ -912,6 +912,11 @@ class OrdinariaRepository:
                 'alertas': [f'Erro na extração: {e}'],
             }
     
+    @staticmethod
+    def _codigo_processo(numero_processo: str, resultado_elegibilidade: Dict[str, Any]) -> str:
+        """Código limpo do caso vindo do resultado (no pipeline a action já está em outro caso)."""
+        return resultado_elegibilidade.get('numero_processo_limpo') or re.sub(r'\D', '', str(numero_processo)) or numero_processo
+
     def _montar_snapshot_legacy(self, numero_processo: str, resultado_elegibilidade: Dict[str, Any],
                                 resultado_decisao: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Replica o payload legado utilizado no exportador global."""
@@ -930,7 +935,7 @@ class OrdinariaRepository:
 
         return {
                 'numero_processo': numero_processo,
-                'codigo_processo': getattr(self.lecom_action, 'numero_processo_limpo', numero_processo),
+                'codigo_processo': self._codigo_processo(numero_processo, resultado_elegibilidade),
                 'tipo_analise': 'Naturalização Ordinária',
                 'data_analise': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
                 'nome': dados_pessoais.get('nome') or dados_pessoais.get('nome_completo', 'N/A'),
@@ -1088,7 +1093,7 @@ class OrdinariaRepository:
             total_documentos_texto = f"{total_documentos_validados}/{total_documentos}" if total_documentos > 0 else '0/0'
 
             # Dados principais
-            codigo_processo = getattr(self.lecom_action, 'numero_processo_limpo', numero_processo)
+            codigo_processo = self._codigo_processo(numero_processo, resultado_elegibilidade)
             nome_requerente = dados_pessoais.get('nome_completo') or dados_pessoais.get('nome') or 'N/A'
             data_inicial = resultado_elegibilidade.get('data_inicial_processo') or self.lecom_action.data_inicial_processo or 'N/A'
 
@@ -13,6 +13,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from automation.actions.inventario_documentos import obter_inventario
+
 # Importar termos melhorados baseados em análise de OCR (versão modular)
 try:
     from automation.data.termos_validacao_melhorados import (
@@ -1320,6 +1322,18 @@ class AnaliseElegibilidadeOrdinaria:
             # Obter variações para o documento
             variacoes = variacoes_documento.get(nome_documento, [nome_documento.lower()])
             
+            inventario = obter_inventario(self.lecom.driver)
+            if inventario is not None:
+                variacao = inventario.buscar_variacoes(variacoes)
+                if variacao is not None:
+                    print(f"[TABELA] Documento encontrado na tabela: {nome_documento} (variação: {variacao})")
+                return {
+                    'encontrado': variacao is not None,
+                    'texto': None,
+                    'localizacao': 'tabela_documentos' if variacao is not None else None,
+                    'variacao_encontrada': variacao
+                }
+            
             # Buscar na tabela de documentos
             try:
                 # Tentar encontrar tabela de documentos
@@ -2,23 +2,38 @@
 Processor (Analista) - Orquestração do fluxo Aprovar Parecer do Analista
 """
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from automation.actions.lecom_analista_action import LecomAnalistaAction
 from automation.repositories.analista_repository import AnalistaRepository
 from automation.services.analista_service import AnalistaService
+from automation.utils.lista_trabalho import ListaTrabalho, caminho_padrao
+from automation.utils.sessao_lecom import chave_login_manual, obter_sessao_lecom
 
 logger = logging.getLogger(__name__)
 
 
 class AnalistaProcessor:
-    def __init__(self, driver=None):
+    def __init__(self, driver=None, pre_coleta: Optional[bool] = None, paralelismo: Optional[int] = None,
+                 caminho_lista: Optional[str] = None):
         self.lecom = LecomAnalistaAction(driver)
         self.repo = AnalistaRepository(self.lecom.driver, wait_timeout=10)
         self.service = AnalistaService()
         self.resultados: List[Dict[str, Any]] = []
+        # Modo versão: coleta a caixa de entrada uma vez e visita cada item direto
+        # (ANALISTA_PRE_COLETA=0 volta ao fluxo "voltar à caixa + refiltrar" por item)
+        if pre_coleta is None:
+            pre_coleta = os.environ.get('ANALISTA_PRE_COLETA', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+        self.pre_coleta = pre_coleta
+        self.paralelismo = max(1, int(paralelismo or os.environ.get('ANALISTA_PARALELISMO', 1)))
+        self.caminho_lista = caminho_lista or caminho_padrao('analista_aprovar_parecer')
+        self.lista: Optional[ListaTrabalho] = None
+        self._lock = threading.Lock()
 
     def executar(self, modo: str = 'versao', caminho_planilha: Optional[str] = None) -> List[Dict[str, Any]]:
         logger.info(f"[EXEC] Iniciando Processor Analista - modo={modo}")
@@ -35,6 +50,8 @@ class AnalistaProcessor:
             return self._executar_por_versao()
 
     def _executar_por_versao(self) -> List[Dict[str, Any]]:
+        if self.pre_coleta:
+            return self._executar_por_lista()
         try:
             # Login manual (mesmo padrão das outras automações)
             if not self.lecom.login_manual():
@@ -86,6 +103,130 @@ class AnalistaProcessor:
             logger.error(f"[ERRO] _executar_por_versao: {e}")
             return self.resultados
 
+    # ===================== LISTA DE TRABALHO PRÉ-COLETADA =====================
+    def _executar_por_lista(self) -> List[Dict[str, Any]]:
+        """Coleta todos os itens da caixa de entrada uma vez (ou retoma a lista
+        gravada) e visita cada processo direto pelo href/código."""
+        extras: List[Tuple[LecomAnalistaAction, AnalistaRepository]] = []
+        try:
+            if not self.lecom.login_manual():
+                logger.error('[ERRO] Falha no login manual')
+                return []
+            self.lista = ListaTrabalho(self.caminho_lista)
+            retomar = self.lista.retomavel()
+            if not retomar and self.lista.itens and self.lista.expirada():
+                logger.info(f"[INFO] Lista de trabalho {self.caminho_lista} expirada; coletando a caixa de novo")
+            # Mesmo ao retomar a caixa é coletada de novo: só seguem os itens que ainda estão nela
+            itens = self._coletar_caixa_entrada()
+            if not itens:
+                logger.info('[INFO] Nenhum processo na caixa de entrada')
+                return []
+            if retomar:
+                fora = self.lista.reconciliar(itens)
+                logger.info(
+                    f"[INFO] Retomando lista de trabalho {self.caminho_lista}: {self.lista.resumo()} "
+                    f"({fora} item(ns) fora da caixa de entrada)"
+                )
+            else:
+                self.lista.substituir(itens)
+                logger.info(f"[OK] Lista de trabalho com {len(self.lista.itens)} processos gravada em {self.caminho_lista}")
+
+            extras = self._abrir_consumidores_extras(self.paralelismo - 1)
+            consumidores = [(self.lecom, self.repo)] + extras
+            if len(consumidores) == 1:
+                self._consumir(self.lecom, self.repo)
+            else:
+                logger.info(f"[INFO] Processando a lista com {len(consumidores)} navegadores")
+                with ThreadPoolExecutor(max_workers=len(consumidores)) as executor:
+                    for futuro in [executor.submit(self._consumir, lecom, repo) for lecom, repo in consumidores]:
+                        futuro.result()
+
+            self.resultados = self.lista.resultados()
+            logger.info(f"[OK] Lista de trabalho concluída: {self.lista.resumo()}")
+            return self.resultados
+        except Exception as e:
+            logger.error(f"[ERRO] _executar_por_lista: {e}")
+            return self.resultados
+        finally:
+            for lecom, _ in extras:
+                try:
+                    lecom.driver.quit()
+                except Exception:
+                    pass
+
+    def _coletar_caixa_entrada(self) -> List[Dict[str, Any]]:
+        """Filtra a caixa de entrada uma única vez e junta os itens de todas as páginas."""
+        if not self.lecom.go_to_workspace():
+            return []
+        if not self.lecom.click_inbox():
+            return []
+        if not self.lecom.apply_filters_for_analista():
+            return []
+        itens: List[Dict[str, Any]] = []
+        pagina = 1
+        while True:
+            encontrados = self.lecom.list_processes() or []
+            logger.info(f"[PÁGINA] Página {pagina}: {len(encontrados)} processos coletados")
+            itens.extend(encontrados)
+            if not self.lecom.next_page():
+                break
+            pagina += 1
+        return itens
+
+    def _abrir_consumidores_extras(self, quantidade: int) -> List[Tuple[LecomAnalistaAction, AnalistaRepository]]:
+        """Navegadores adicionais autenticados com a sessão do login manual (sem novo login)."""
+        extras: List[Tuple[LecomAnalistaAction, AnalistaRepository]] = []
+        sessao = obter_sessao_lecom(chave_login_manual())
+        for i in range(quantidade):
+            lecom = LecomAnalistaAction()
+            try:
+                lecom.inicializar_driver()
+                if not sessao.restaurar(lecom.driver):
+                    raise RuntimeError('sessão armazenada indisponível (LECOM_SESSAO_CHAVE)')
+                extras.append((lecom, AnalistaRepository(lecom.driver, wait_timeout=10)))
+            except Exception as e:
+                logger.warning(f"[AVISO] Navegador adicional {i + 2} não iniciado: {e}")
+                try:
+                    lecom.driver.quit()
+                except Exception:
+                    pass
+                break
+        return extras
+
+    def _consumir(self, lecom: LecomAnalistaAction, repo: AnalistaRepository) -> None:
+        while True:
+            item = self.lista.proximo()
+            if item is None:
+                return
+            try:
+                resultado = self._processar_item(lecom, repo, item)
+            except Exception as e:
+                logger.error(f"[ERRO] Processo {item.get('codigo')}: {e}")
+                self.lista.falhar(item, str(e))
+                continue
+            if resultado:
+                self.lista.concluir(item, resultado)
+            else:
+                self.lista.falhar(item, 'processo não abriu')
+
+    def _processar_item(self, lecom: LecomAnalistaAction, repo: AnalistaRepository,
+                        item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        codigo = item.get('codigo')
+        logger.info(f"[LISTA] Processo {codigo}")
+        # Só pelo href da caixa de entrada (conferido em `reconciliar`): abrir pelo
+        # flow poderia agir sobre um processo que já saiu da caixa
+        if not (item.get('href') and lecom.open_process_by_href(item)):
+            return None
+        data_inicio = lecom.extract_data_inicio() or ''
+        if not lecom.open_form_iframe():
+            return None
+        dados = repo.extrair_dados_formulario() or {}
+        analise = self.service.analisar_requisitos(dados, data_inicio)
+        decisao_ok = False
+        if analise.get('status') == 'ENVIAR PARA CPMIG':
+            decisao_ok = lecom.enviar_para_cpmig()
+        return self._registrar_resultado(codigo, dados, analise, data_inicio, decisao_ok)
+
     def _executar_por_planilha(self, codigos: List[str]) -> List[Dict[str, Any]]:
         try:
             if not self.lecom.login_manual():
@@ -114,9 +255,10 @@ class AnalistaProcessor:
             logger.error(f"[ERRO] _executar_por_planilha: {e}")
             return self.resultados
 
-    def _registrar_resultado(self, codigo: str, dados: dict, analise: dict, data_inicio: str, decisao_ok: bool):
+    def _registrar_resultado(self, codigo: str, dados: dict, analise: dict, data_inicio: str,
+                             decisao_ok: bool) -> Optional[Dict[str, Any]]:
         try:
-            self.resultados.append({
+            resultado = {
                 'processo': codigo,
                 'data_inicio': data_inicio or 'N/A',
                 'parecer_pf': dados.get('parecer_pf', 'N/A'),
@@ -128,6 +270,10 @@ class AnalistaProcessor:
                 'decisao_automatica': 'Sim' if decisao_ok and analise.get('status') == 'ENVIAR PARA CPMIG' else 'Não',
                 'motivo_analise_manual': '; '.join(analise.get('motivo_analise_manual') or []) if analise.get('motivo_analise_manual') else '',
                 'timestamp_processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-            })
+            }
+            with self._lock:
+                self.resultados.append(resultado)
+            return resultado
         except Exception as e:
             logger.warning(f"[AVISO] Falha ao registrar resultado de {codigo}: {e}")
+            return None
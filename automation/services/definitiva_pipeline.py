@@ -12,6 +12,8 @@ import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from automation.utils.tracing import span
+
 
 def analisar_processo_definitiva(
     lecom_instance: Any,
@@ -62,7 +64,8 @@ def analisar_processo_definitiva(
         idade_na_data_inicial: Optional[int] = None
         try:
             if hasattr(lecom_instance, "extrair_dados_pessoais_formulario"):
-                dados_formulario = lecom_instance.extrair_dados_pessoais_formulario() or {}
+                with span("dados_pessoais"):
+                    dados_formulario = lecom_instance.extrair_dados_pessoais_formulario() or {}
                 print(
                     "DEBUG: [MODULAR] Dados do formulário extraídos (chaves):",
                     list(dados_formulario.keys()),
@@ -73,7 +76,8 @@ def analisar_processo_definitiva(
         # -----------------------------------------------------------------
         # 1.5) EXTRAIR PARECER PF (ALERTAS)
         # -----------------------------------------------------------------
-        parecer_pf_dados = _extrair_parecer_pf(lecom_instance)
+        with span("parecer_pf"):
+            parecer_pf_dados = _extrair_parecer_pf(lecom_instance)
         print(f"DEBUG: [MODULAR] Parecer PF extraído - Alertas: {len(parecer_pf_dados.get('alertas', []))}")
         if parecer_pf_dados.get('alertas'):
             print(f"DEBUG: [MODULAR] Alertas PF detectados: {parecer_pf_dados.get('alertas')}")
@@ -468,10 +472,11 @@ def analisar_processo_definitiva(
             )
 
             analisador = AnalisadorElegibilidadeSimples()
-            resultado_analise = analisador.analisar_elegibilidade(
-                documentos_com_confirmacao,
-                dados_formulario,
-            )
+            with span("elegibilidade"):
+                resultado_analise = analisador.analisar_elegibilidade(
+                    documentos_com_confirmacao,
+                    dados_formulario,
+                )
 
             resultado_analise["dados_formulario_mascarados"] = {
                 "nome_completo": (
@@ -592,6 +597,8 @@ def analisar_processo_definitiva(
                         "erro": str(e_dec),
                     }
 
+            _salvar_artefato_definitiva(codigo_processo, documentos_com_confirmacao, dados_formulario,
+                                        resultado_analise, decisao_final)
             return resultado_final
 
         except Exception as e:
@@ -645,6 +652,28 @@ def analisar_processo_definitiva(
         }
 
 
+def _salvar_artefato_definitiva(codigo_processo: str, documentos: Dict[str, str],
+                                dados_formulario: Dict[str, Any], resultado_analise: Dict[str, Any],
+                                decisao_final: str) -> None:
+    """Entradas do `AnalisadorElegibilidadeSimples` para reavaliação offline."""
+    from automation.utils.artefatos_caso import obter_armazem_artefatos
+
+    armazem = obter_armazem_artefatos()
+    if not armazem.habilitado:
+        return
+    try:
+        armazem.salvar("definitiva", codigo_processo, {
+            "documentos": documentos,
+            "dados_formulario": dados_formulario,
+            "resultado": {
+                "elegibilidade": resultado_analise.get("elegibilidade"),
+                "decisao_final": decisao_final,
+            },
+        })
+    except Exception as e:
+        print(f"DEBUG: [MODULAR] Falha ao gravar artefato: {e}")
+
+
 def _extrair_parecer_pf(lecom_instance: Any) -> Dict[str, Any]:
     """Extrai parecer PF e detecta alertas críticos (coleta biométrica, etc.)."""
     parecer_dados = {
@@ -12,6 +12,7 @@ from typing import Any, Dict, Optional
 
 from automation.actions.definitiva_action import DefinitivaAction
 from .definitiva_service import DefinitivaService
+from ..utils.tracing import iniciar_trace, finalizar_trace, span
 
 
 class DefinitivaProcessor:
@@ -26,12 +27,27 @@ class DefinitivaProcessor:
         """Processa um processo de naturalização definitiva.
 
         Preserva a lógica existente de `analisar_processo_definitiva`,
-        apenas centralizando login/navegação aqui.
+        apenas centralizando login/navegação aqui. Os tempos de cada etapa
+        são anexados em ``tempos_etapas``/``trace``.
         """
+        tracer = iniciar_trace("definitiva", codigo=codigo_processo)
+        resultado: Dict[str, Any] = {}
+        try:
+            resultado = self._processar_processo(codigo_processo, timeout_global_minutos)
+            return resultado
+        finally:
+            trace = finalizar_trace(tracer)
+            if trace and isinstance(resultado, dict):
+                resultado["tempos_etapas"] = trace.get("tempos_etapas", {})
+                resultado["trace"] = trace
+
+    def _processar_processo(self, codigo_processo: str, timeout_global_minutos: Optional[int]) -> Dict[str, Any]:
         # Login se necessário
         if not getattr(self.lecom_action, "ja_logado", False):
             print("[DefinitivaProcessor] Realizando login no LECOM...")
-            if not self.lecom_action.login():
+            with span("login"):
+                ok_login = self.lecom_action.login()
+            if not ok_login:
                 return {
                     "status": "Erro",
                     "erro": "Falha no login no LECOM (Definitiva)",
@@ -40,7 +56,8 @@ class DefinitivaProcessor:
 
         # Navegação para o processo (usa fluxo novo da Ordinária)
         print(f"[DefinitivaProcessor] Navegando para processo {codigo_processo}...")
-        nav_result = self.lecom_action.navegar_para_processo(codigo_processo)
+        with span("navegacao"):
+            nav_result = self.lecom_action.navegar_para_processo(codigo_processo)
         if isinstance(nav_result, dict) and nav_result.get("status") == "erro":
             return {
                 "status": "Erro",
@@ -53,7 +70,8 @@ class DefinitivaProcessor:
             effective_timeout = self._timeout_default
 
         # Chama o pipeline legado via service
-        resultado = self.service.analisar_processo(codigo_processo, timeout_global_minutos=effective_timeout)
+        with span("analise"):
+            resultado = self.service.analisar_processo(codigo_processo, timeout_global_minutos=effective_timeout)
 
         # Garantir identificadores mínimos no resultado
         resultado.setdefault("codigo", codigo_processo)
@@ -4,6 +4,10 @@ Orquestra o fluxo "Naturalizar-se - Aprovação em Lote" reutilizando a arquitet
 """
 
 import logging
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 from automation.actions.lecom_lote_action import LecomLoteAction
 from automation.repositories.lote_repository import LoteRepository
@@ -15,66 +19,37 @@ logger = logging.getLogger(__name__)
 class LoteProcessor:
     """Processor que coordena Action, Repository e Service para Aprovação em Lote."""
 
-    def __init__(self, driver):
+    def __init__(self, driver, em_bloco: Optional[bool] = None):
         self.lecom = LecomLoteAction(driver)
         self.repo = LoteRepository(driver)
         self.service = LoteService()
+        # Leitura de todas as páginas + decisões agrupadas (LOTE_EM_BLOCO=0 volta ao fluxo linha a linha)
+        if em_bloco is None:
+            em_bloco = os.environ.get("LOTE_EM_BLOCO", "1").strip().lower() not in ("0", "false", "no", "off")
+        self.em_bloco = em_bloco
+        self.ultimo_resumo: Dict[str, Any] = {}
 
     def executar(self) -> bool:
         """Executa um ciclo completo de aprovação em lote.
 
         Retorna True se pelo menos um processo foi atualizado com sucesso.
         """
+        self.ultimo_resumo = {}
         try:
             logger.info(
                 "[EXEC] Iniciando Processor de Aprovação em Lote (arquitetura modular)..."
             )
 
-            # 1. Login (apenas se necessário)
-            if not self.lecom.fazer_login():
+            # 1-5. Login, workspace, menu, formulário e etapa
+            if not self.preparar_formulario():
                 return False
 
-            # 2. Ir para workspace
-            if not self.lecom.navegar_para_workspace():
-                return False
-
-            # 3. Abrir menu > Aprovação em Lote
-            if not self.lecom.clicar_menu_abrir():
-                return False
-            if not self.lecom.clicar_aprovacao_lote():
-                return False
-
-            # 4. Entrar na tela interna (iframe form-web)
-            if not self.lecom.abrir_formulario_lote():
+            # 6-7. Decisões + "Avançar"
+            total_processados = self.processar_formulario()
+            if total_processados is None:
                 return False
 
-            # 5. Selecionar etapa "Aprovação do Conteúdo"
-            if not self.lecom.selecionar_etapa_aprovacao_conteudo():
-                return False
-
-            total_processados = 0
-
-            # 6. Processar página 1
-            logger.info("[INFO] Processando página 1 da tabela de lote...")
-            processados_p1 = self._processar_tabela_atual()
-            if processados_p1 == 0:
-                logger.warning("[AVISO] Nenhum processo processado na página 1")
-            total_processados += processados_p1
-
-            # 7. Tentar navegar para página 2 e processar (mantém comportamento atual)
-            if self.lecom.navegar_para_pagina_2():
-                logger.info("[INFO] Processando página 2 da tabela de lote...")
-                processados_p2 = self._processar_tabela_atual()
-                if processados_p2 == 0:
-                    logger.warning("[AVISO] Nenhum processo processado na página 2")
-                total_processados += processados_p2
-
-            # 8. Finalizar clicando em "Avançar" (se houve pelo menos tentativa)
-            if total_processados > 0:
-                if not self.lecom.clicar_avancar():
-                    return False
-
-            # 9. Voltar para workspace para nova iteração
+            # 8. Voltar para workspace para nova iteração
             if not self.lecom.navegar_para_workspace():
                 return False
 
@@ -88,7 +63,227 @@ class LoteProcessor:
             logger.error(f"[ERRO] Erro durante execução do LoteProcessor: {str(e)}")
             return False
 
+    def preparar_formulario(self) -> bool:
+        """Login (se necessário) e abertura da tabela da etapa "Aprovação do Conteúdo"."""
+        # 1. Login (apenas se necessário)
+        if not self.lecom.fazer_login():
+            return False
+
+        # 2. Ir para workspace
+        if not self.lecom.navegar_para_workspace():
+            return False
+
+        # 3. Abrir menu > Aprovação em Lote
+        if not self.lecom.clicar_menu_abrir():
+            return False
+        if not self.lecom.clicar_aprovacao_lote():
+            return False
+
+        # 4. Entrar na tela interna (iframe form-web)
+        if not self.lecom.abrir_formulario_lote():
+            return False
+
+        # 5. Selecionar etapa "Aprovação do Conteúdo"
+        return self.lecom.selecionar_etapa_aprovacao_conteudo()
+
+    def processar_formulario(self) -> Optional[int]:
+        """Aplica as decisões na tabela aberta e clica em "Avançar" se houve processos.
+
+        Retorna o total processado ou None se o "Avançar" falhou.
+        """
+        # 6. Modo em bloco: lê todas as páginas, decide em Python e aplica agrupado
+        total_processados = None
+        if self.em_bloco:
+            total_processados = self._processar_em_bloco()
+            if total_processados is None:
+                logger.warning(
+                    "[AVISO] Leitura em bloco indisponível - usando processamento linha a linha"
+                )
+        if total_processados is None:
+            total_processados = self._processar_paginas_1_e_2()
+
+        # 7. Finalizar clicando em "Avançar" (se houve pelo menos tentativa)
+        if total_processados > 0:
+            if not self.lecom.clicar_avancar():
+                return None
+        return total_processados
+
+    # ===================== MODO VIGILÂNCIA =====================
+    def sondar(self, formulario_aberto: bool) -> Optional[int]:
+        """Recarrega a tabela já aberta e conta as linhas pendentes (1 chamada JS).
+
+        Se a tabela não estiver aberta, reabre a URL do formulário guardada; se a
+        sessão tiver caído, refaz o caminho completo. None = não foi possível sondar.
+        """
+        if formulario_aberto and self.lecom.selecionar_etapa_aprovacao_conteudo():
+            return self.repo.contar_pendentes()
+        if self.lecom.reabrir_formulario_lote() and self.lecom.selecionar_etapa_aprovacao_conteudo():
+            return self.repo.contar_pendentes()
+        logger.warning("[AVISO] Formulário de lote indisponível - refazendo login/navegação")
+        self.lecom.ja_logado = False
+        if self.preparar_formulario():
+            return self.repo.contar_pendentes()
+        return None
+
+    def vigiar(
+        self,
+        deve_parar: Callable[[], bool],
+        max_ciclos: int,
+        espera_min_s: float = 5.0,
+        espera_max_s: float = 300.0,
+        ao_ciclo: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Mantém a tela de lote aberta e só processa quando aparecem pendências.
+
+        A sonda recarrega a tabela (reseleção da etapa) e conta as linhas sem
+        decisão; sem pendências, a espera dobra de `espera_min_s` até
+        `espera_max_s`; ao encontrar trabalho volta ao mínimo. Retorna o número
+        de ciclos de processamento executados.
+        """
+        ciclos = 0
+        espera = espera_min_s
+        formulario_aberto = self.preparar_formulario()
+        while ciclos < max_ciclos and not deve_parar():
+            pendentes = self.sondar(formulario_aberto)
+            formulario_aberto = pendentes is not None
+            if pendentes:
+                logger.info(f"[INFO] {pendentes} processo(s) pendente(s) - iniciando processamento")
+                self.ultimo_resumo = {}
+                processados = self.processar_formulario() or 0
+                # Após o "Avançar" a tela muda; a próxima sonda reabre o formulário
+                formulario_aberto = False
+                if processados:
+                    ciclos += 1
+                    if ao_ciclo:
+                        ao_ciclo(ciclos, processados)
+                    espera = espera_min_s
+                    continue
+                # Só restaram linhas sem decisão automática: não insistir no intervalo mínimo
+                logger.info("[INFO] Pendências sem decisão automática - mantendo o intervalo de espera")
+
+            espera_atual = espera * random.uniform(0.9, 1.1)
+            logger.info(f"[AGUARDE] Sem pendências - nova sonda em {espera_atual:.0f}s")
+            limite = time.monotonic() + espera_atual
+            while time.monotonic() < limite and not deve_parar():
+                time.sleep(min(1.0, max(0.0, limite - time.monotonic())))
+            espera = min(espera * 2, espera_max_s)
+        return ciclos
+
     # ===================== MÉTODOS AUXILIARES =====================
+    def _processar_paginas_1_e_2(self) -> int:
+        """Fluxo original: processa linha a linha as páginas 1 e 2."""
+        total_processados = 0
+
+        # Página 1
+        logger.info("[INFO] Processando página 1 da tabela de lote...")
+        processados_p1 = self._processar_tabela_atual()
+        if processados_p1 == 0:
+            logger.warning("[AVISO] Nenhum processo processado na página 1")
+        total_processados += processados_p1
+
+        # Tentar navegar para página 2 (mantém comportamento atual)
+        if self.lecom.navegar_para_pagina_2():
+            logger.info("[INFO] Processando página 2 da tabela de lote...")
+            processados_p2 = self._processar_tabela_atual()
+            if processados_p2 == 0:
+                logger.warning("[AVISO] Nenhum processo processado na página 2")
+            total_processados += processados_p2
+        return total_processados
+
+    def _processar_em_bloco(self) -> Optional[int]:
+        """Lê todas as páginas (1 chamada JS por página), calcula as decisões e
+        aplica apenas as edições necessárias, agrupadas por decisão.
+
+        Retorna o número de processos atualizados ou None se a leitura em bloco
+        não funcionou nesta tela (o chamador volta ao fluxo linha a linha).
+        """
+        total_paginas = self.repo.total_paginas()
+        linhas_por_pagina: Dict[int, List[Dict[str, Any]]] = {}
+        pagina_atual = 1
+        for pagina in range(1, total_paginas + 1):
+            if pagina > 1:
+                if not self.lecom.navegar_para_pagina(pagina):
+                    break
+                pagina_atual = pagina
+            linhas = self.repo.ler_linhas_pagina()
+            for linha in linhas:
+                linha["pagina"] = pagina
+            linhas_por_pagina[pagina] = linhas
+
+        todas = [linha for linhas in linhas_por_pagina.values() for linha in linhas]
+        if not todas:
+            # Tabela com linhas que o script não reconhece -> fluxo linha a linha
+            return None if self.repo.listar_linhas_tabela() else 0
+
+        plano = self.service.planejar_decisoes(todas)
+        for linha in plano["sem_decisao"]:
+            logger.warning(
+                f"Não foi possível determinar decisão para o processo "
+                f"{linha.get('numero_processo') or 'DESCONHECIDO'}: {linha.get('analise_mj')}"
+            )
+        logger.info(
+            f"[INFO] {len(todas)} processos em {len(linhas_por_pagina)} página(s): "
+            + ", ".join(f"{len(v)} x '{k}'" for k, v in plano["grupos"].items())
+            + f"; {len(plano['ja_decididas'])} já decididos; {len(plano['sem_decisao'])} sem decisão"
+        )
+
+        # Aplica a partir da página em que a leitura parou (evita uma navegação)
+        paginas = sorted(
+            {linha["pagina"] for grupo in plano["grupos"].values() for linha in grupo},
+            key=lambda p: (p != pagina_atual, p),
+        )
+        atualizados = 0
+        falhas: List[str] = []
+        for pagina in paginas:
+            if pagina != pagina_atual:
+                if not self.lecom.navegar_para_pagina(pagina):
+                    falhas.extend(
+                        linha["numero_processo"]
+                        for grupo in plano["grupos"].values() for linha in grupo
+                        if linha["pagina"] == pagina
+                    )
+                    continue
+                pagina_atual = pagina
+            for decisao, grupo in plano["grupos"].items():
+                for linha in grupo:
+                    if linha["pagina"] != pagina:
+                        continue
+                    if self._aplicar_decisao(linha, decisao):
+                        atualizados += 1
+                    else:
+                        falhas.append(linha["numero_processo"])
+
+        self.ultimo_resumo = {
+            "paginas": len(linhas_por_pagina),
+            "linhas": len(todas),
+            "atualizados": atualizados,
+            "ja_decididos": len(plano["ja_decididas"]),
+            "sem_decisao": len(plano["sem_decisao"]),
+            "falhas": falhas,
+            "por_decisao": {k: len(v) for k, v in plano["grupos"].items()},
+        }
+        logger.info(
+            f"[OK] Aplicação em bloco: {atualizados} atualizados, "
+            f"{len(plano['ja_decididas'])} já decididos, {len(falhas)} falhas"
+        )
+        # Linhas já decididas também contam para liberar o "Avançar"
+        return atualizados + len(plano["ja_decididas"])
+
+    def _aplicar_decisao(self, linha: Dict[str, Any], decisao: str) -> bool:
+        """Editar -> decisão -> Atualizar para uma linha já lida (sem novas leituras)."""
+        numero_processo = linha.get("numero_processo") or "DESCONHECIDO"
+        if not self.lecom.abrir_edicao_linha(linha["indice"]):
+            logger.error(f"Falha ao abrir edição para o processo {numero_processo}")
+            return False
+        if not self.lecom.selecionar_decisao_rapida(decisao):
+            logger.error(f"Falha ao selecionar decisão para processo {numero_processo}")
+            return False
+        if not self.lecom.confirmar_atualizacao():
+            logger.error(f"Falha ao atualizar processo {numero_processo}")
+            return False
+        logger.info(f"[OK] Processo {numero_processo} atualizado com decisão: {decisao}")
+        return True
+
     def _processar_tabela_atual(self) -> int:
         """Processa todos os processos da tabela atualmente exibida."""
         try:
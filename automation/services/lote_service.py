@@ -4,6 +4,8 @@ Regras de negócio para mapear a análise do MJ em uma decisão do aprovador em
 """
 
 import logging
+import unicodedata
+from typing import Any, Dict, List
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +13,12 @@ logger = logging.getLogger(__name__)
 class LoteService:
     """Service com regras de decisão para aprovação em lote."""
 
+    @staticmethod
+    def normalizar_decisao(texto: str | None) -> str:
+        """Texto da decisão sem acentos, caixa e espaços extras (para comparar igualdade)."""
+        sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+        return " ".join(sem_acento.lower().split())
+
     def determinar_decisao(self, analise_mj: str | None) -> str | None:
         """Mapeia o texto de análise do MJ para a decisão a ser escolhida no formulário.
 
@@ -32,3 +40,27 @@ class LoteService:
 
         logger.warning(f"[AVISO] Análise MJ não reconhecida: {analise_mj}")
         return None
+
+    def planejar_decisoes(self, linhas: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calcula a decisão de todas as linhas lidas e agrupa por decisão.
+
+        Linhas cuja decisão atual já é a calculada não geram nova edição.
+
+        Returns:
+            Dict com `grupos` ({decisao: [linhas]}), `ja_decididas` e `sem_decisao`
+        """
+        grupos: Dict[str, List[Dict[str, Any]]] = {}
+        ja_decididas: List[Dict[str, Any]] = []
+        sem_decisao: List[Dict[str, Any]] = []
+        for linha in linhas:
+            decisao = self.determinar_decisao(linha.get("analise_mj"))
+            if not decisao:
+                sem_decisao.append(linha)
+                continue
+            # Igualdade (não substring): "Aprovo o parecer pelo Deferimento"
+            # está contido na opção "Não aprovo o parecer pelo Deferimento e Arquivo ..."
+            if self.normalizar_decisao(decisao) == self.normalizar_decisao(linha.get("decisao_atual")):
+                ja_decididas.append(linha)
+                continue
+            grupos.setdefault(decisao, []).append(linha)
+        return {"grupos": grupos, "ja_decididas": ja_decididas, "sem_decisao": sem_decisao}
@@ -0,0 +1,140 @@
+"""
+Pipeline entre casos para lotes de naturalização ordinária.
+
+Três estágios ligados por filas limitadas (`PipelineEstagios`):
+
+1. navegador (1 worker, o Chrome do processor): login, navegação,
+   formulário, leitura dos campos usados pelas regras e download dos
+   documentos (`OrdinariaProcessor.etapa_navegador`);
+2. análise (N workers): OCR, elegibilidade, decisão e resumo, cada worker
+   com sua própria `DocumentAction`/`OrdinariaService` sem navegador;
+3. persistência (1 worker): JSON e planilha consolidada.
+
+Enquanto o caso N está no OCR o navegador já trabalha no caso N+1; a
+vazão por navegador sobe até a do estágio mais lento.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..actions.document_ordinaria_action import DocumentAction
+from ..utils.pipeline_estagios import Estagio, ItemPipeline, PipelineEstagios
+from ..utils.tracing import finalizar_trace, iniciar_trace, vincular_trace
+from .ordinaria_processor import OrdinariaProcessor
+from .ordinaria_service import OrdinariaService
+
+
+class OrdinariaPipeline:
+    """Processa uma lista de códigos com sobreposição entre navegador, OCR e persistência."""
+
+    def __init__(self, processor: OrdinariaProcessor, workers_analise: Optional[int] = None,
+                 capacidade_fila: int = 2, deve_parar: Optional[Callable[[], bool]] = None,
+                 ao_concluir: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> None:
+        """
+        Args:
+            processor: processor já inicializado (o navegador usado no estágio 1)
+            workers_analise: workers do estágio de OCR/regras (ORDINARIA_WORKERS_ANALISE, padrão 2)
+            capacidade_fila: casos aguardando entre estágios (limita downloads adiantados)
+            deve_parar: consultado antes de cada novo caso
+            ao_concluir: chamado com (código, resultado) assim que cada caso termina
+        """
+        self.processor = processor
+        self.workers_analise = workers_analise or int(os.environ.get('ORDINARIA_WORKERS_ANALISE', '2'))
+        self.ao_concluir = ao_concluir
+        self._pipeline = PipelineEstagios(
+            [
+                Estagio('navegador', lambda: self._estagio_navegador, workers=1, capacidade_fila=1),
+                Estagio('analise', self._criar_estagio_analise, workers=self.workers_analise,
+                        capacidade_fila=capacidade_fila),
+                Estagio('persistencia', lambda: self._estagio_persistencia, workers=1,
+                        capacidade_fila=capacidade_fila),
+            ],
+            deve_parar=deve_parar,
+            ao_concluir=self._concluir,
+        )
+
+    @property
+    def parado(self) -> bool:
+        return self._pipeline.parado
+
+    # ------------------------------------------------------------------
+
+    def _estagio_navegador(self, codigo: str) -> Dict[str, Any]:
+        with vincular_trace(None):
+            tracer = iniciar_trace('ordinaria', numero_processo=codigo, modo='pipeline')
+            print(f"=== INICIANDO PROCESSAMENTO DO PROCESSO {codigo} (pipeline) ===")
+            try:
+                caso = self.processor.etapa_navegador(codigo, antecipar_documentos=True)
+            except Exception:
+                try:
+                    self.processor._voltar_workspace()
+                except Exception:
+                    pass
+                finalizar_trace(tracer)
+                raise
+        caso['_tracer'] = tracer
+        return caso
+
+    def _criar_estagio_analise(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        # Estado de OCR por worker: nada é compartilhado com o navegador
+        document_action = DocumentAction(None, None)
+        service = OrdinariaService(self.processor.lecom_action, document_action, self.processor.repository)
+
+        def _analisar(caso: Dict[str, Any]) -> Dict[str, Any]:
+            if 'resultado' in caso:
+                return caso
+            document_action.documentos_baixados = (caso.get('contexto_formulario') or {}).get('documentos', {})
+            document_action.ultimo_texto_ocr = {}
+            document_action.estatisticas_ocr = {}
+            with vincular_trace(caso.get('_tracer')):
+                return self.processor.etapa_analise(caso, service=service)
+
+        return _analisar
+
+    def _estagio_persistencia(self, caso: Dict[str, Any]) -> Dict[str, Any]:
+        with vincular_trace(caso.get('_tracer')):
+            return self.processor.etapa_persistencia(caso)
+
+    def _concluir(self, item: ItemPipeline) -> None:
+        caso = item.dados if isinstance(item.dados, dict) else {'numero_processo': item.entrada}
+        if item.erro:
+            print(f"[ERRO] {item.entrada}: falha no estágio '{item.estagio_erro}': {item.erro}")
+            resultado = {
+                'numero_processo': item.entrada,
+                'erro': f'Erro crítico no processamento: {item.erro}',
+                'status': 'Erro',
+                'sucesso': False,
+            }
+        else:
+            resultado = self.processor._montar_resultado(caso)
+
+        tracer = caso.pop('_tracer', None)
+        trace = finalizar_trace(tracer) if tracer is not None else {}
+        if trace:
+            resultado['tempos_etapas'] = trace.get('tempos_etapas', {})
+            resultado['trace'] = trace
+        resultado['tempos_estagios'] = dict(item.tempos_ms)
+        item.dados = resultado
+
+        if self.ao_concluir is not None:
+            self.ao_concluir(item.entrada, resultado)
+
+    # ------------------------------------------------------------------
+
+    def processar(self, codigos: Iterable[str]) -> List[Dict[str, Any]]:
+        """Processa os códigos e devolve os resultados na ordem de entrada."""
+        itens = self._pipeline.executar(codigos)
+        return [item.dados for item in itens]
+
+    def resumo(self) -> Dict[str, Any]:
+        return self._pipeline.resumo()
+
+
+def pipeline_ordinaria_habilitado() -> bool:
+    """ORDINARIA_PIPELINE=0 volta ao processamento serial."""
+    return os.environ.get('ORDINARIA_PIPELINE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+__all__ = ['OrdinariaPipeline', 'pipeline_ordinaria_habilitado']
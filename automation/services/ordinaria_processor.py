@@ -8,6 +8,9 @@ from ..actions.lecom_ordinaria_action import LecomAction
 from ..actions.document_ordinaria_action import DocumentAction
 from ..repositories.ordinaria_repository import OrdinariaRepository
 from .ordinaria_service import OrdinariaService
+from ..utils.tracing import iniciar_trace, finalizar_trace, span
+from ..utils.lecom_urls import url_workspace
+from ..utils.artefatos_caso import obter_armazem_artefatos
 
 
 class OrdinariaProcessor:
@@ -15,15 +18,16 @@ class OrdinariaProcessor:
     Façade que orquestra o processamento completo de naturalização ordinária
     """
     
-    def __init__(self, driver=None):
+    def __init__(self, driver=None, perfil_navegador: Optional[str] = None):
         """
         Inicializa o processor
         
         Args:
             driver: WebDriver do Selenium (opcional)
+            perfil_navegador: perfil do Chrome criado quando não há driver ('padrao'/'desempenho')
         """
         # Inicializar camadas
-        self.lecom_action = LecomAction(driver)
+        self.lecom_action = LecomAction(driver, perfil_navegador=perfil_navegador)
         self.document_action = DocumentAction(self.lecom_action.driver, self.lecom_action.wait)
         self.repository = OrdinariaRepository(self.lecom_action, self.document_action)
         self.service = OrdinariaService(self.lecom_action, self.document_action, self.repository)
@@ -42,141 +46,285 @@ class OrdinariaProcessor:
         """
         print(f"=== INICIANDO PROCESSAMENTO DO PROCESSO {numero_processo} ===")
         
+        tracer = iniciar_trace('ordinaria', numero_processo=numero_processo)
+        resultado: Dict[str, Any] = {}
         try:
-            # ETAPA 1: Login (se necessário)
+            resultado = self._executar_etapas(numero_processo)
+            return resultado
+        finally:
+            trace = finalizar_trace(tracer)
+            if trace and isinstance(resultado, dict):
+                resultado['tempos_etapas'] = trace.get('tempos_etapas', {})
+                resultado['trace'] = trace
+    
+    def _executar_etapas(self, numero_processo: str) -> Dict[str, Any]:
+        """Executa as 8 etapas do processamento, cada uma dentro de um span."""
+        try:
+            caso = self.etapa_navegador(numero_processo, antecipar_documentos=False)
+            if 'resultado' in caso:
+                return caso['resultado']
+            caso = self.etapa_analise(caso)
+            if 'resultado' in caso:
+                return caso['resultado']
+            caso = self.etapa_persistencia(caso)
+            self._voltar_workspace()
+            return self._montar_resultado(caso)
+            
+        except Exception as e:
+            return self._resultado_erro_critico(numero_processo, e)
+    
+    # ------------------------------------------------------------------
+    # Estágios (usados em série acima ou pelo pipeline entre casos, ver
+    # `ordinaria_pipeline.py`). Cada estágio recebe e devolve o dict do caso;
+    # a chave 'resultado' indica que o caso terminou (erro) antes do fim.
+    # ------------------------------------------------------------------
+    
+    def etapa_navegador(self, numero_processo: str, antecipar_documentos: bool = True) -> Dict[str, Any]:
+        """
+        Etapas 1-3 (login, navegação, formulário). Com `antecipar_documentos`
+        também lê os campos usados pelas regras e baixa os documentos, liberando
+        o navegador para o próximo caso antes do OCR.
+        """
+        caso: Dict[str, Any] = {'numero_processo': numero_processo}
+        
+        # ETAPA 1: Login (se necessário)
+        with span('login'):
             if not self.lecom_action.ja_logado:
                 print("\n[ETAPA 1] Realizando login...")
                 sucesso_login = self.lecom_action.login()
                 if not sucesso_login:
-                    return {
+                    caso['resultado'] = {
                         'numero_processo': numero_processo,
                         'erro': 'Falha no login',
                         'status': 'Erro'
                     }
+                    return caso
                 print("[OK] Login realizado com sucesso")
             else:
                 print("[INFO] Já logado - pulando etapa de login")
-            
-            # ETAPA 2: Navegar para o processo
-            print(f"\n[ETAPA 2] Navegando para processo {numero_processo}...")
+        
+        # ETAPA 2: Navegar para o processo
+        print(f"\n[ETAPA 2] Navegando para processo {numero_processo}...")
+        with span('navegacao'):
             resultado_navegacao = self.lecom_action.navegar_para_processo(numero_processo)
-            
-            if resultado_navegacao.get('status') == 'erro':
-                return {
-                    'numero_processo': numero_processo,
-                    'erro': f"Erro na navegação: {resultado_navegacao.get('mensagem')}",
-                    'status': 'Erro'
-                }
-            
-            print("[OK] Navegação para processo concluída")
-            
-            # Extrair data inicial do processo do resultado da navegação
-            data_inicial_processo = resultado_navegacao.get('data_inicial', '')
-            
-            # ETAPA 3: Extrair dados pessoais
-            print("\n[ETAPA 3] Extraindo dados pessoais...")
-            
-            # Extrair dados pessoais
+        
+        if resultado_navegacao.get('status') == 'erro':
+            caso['resultado'] = {
+                'numero_processo': numero_processo,
+                'erro': f"Erro na navegação: {resultado_navegacao.get('mensagem')}",
+                'status': 'Erro'
+            }
+            return caso
+        
+        print("[OK] Navegação para processo concluída")
+        
+        # Extrair data inicial do processo do resultado da navegação
+        caso['data_inicial_navegacao'] = resultado_navegacao.get('data_inicial', '')
+        
+        # ETAPA 3: Extrair dados pessoais
+        print("\n[ETAPA 3] Extraindo dados pessoais...")
+        
+        # Extrair dados pessoais
+        with span('dados_pessoais'):
             dados_pessoais = self.repository.obter_dados_pessoais_formulario()
-            
-            if not dados_pessoais:
-                return {
-                    'numero_processo': numero_processo,
-                    'erro': 'Não foi possível extrair dados pessoais',
-                    'status': 'Erro'
-                }
-            
-            # Verificar se temos data de nascimento (obrigatória para capacidade civil)
-            if not dados_pessoais.get('data_nascimento'):
-                return {
-                    'numero_processo': numero_processo,
-                    'erro': 'Data de nascimento não encontrada no formulário',
-                    'status': 'Erro'
-                }
-            
-            print(f"[OK] Dados pessoais extraídos: {len(dados_pessoais)} campos")
-            
-            # ETAPA 4: Análise de elegibilidade (com downloads integrados)
-            print("\n[ETAPA 4] Realizando análise de elegibilidade...")
-            resultado_elegibilidade = self.service.analisar_elegibilidade(dados_pessoais, data_inicial_processo, {})
-            
-            if resultado_elegibilidade.get('elegibilidade_final') == 'erro':
-                return {
-                    'numero_processo': numero_processo,
-                    'erro': resultado_elegibilidade.get('erro'),
-                    'status': 'Erro'
-                }
-            
-            print(f"[OK] Análise de elegibilidade concluída: {resultado_elegibilidade.get('elegibilidade_final')}")
-            
-            # ETAPA 5: Gerar decisão automática
-            print("\n[ETAPA 5] Gerando decisão automática...")
-            resultado_decisao = self.service.gerar_decisao_automatica(resultado_elegibilidade)
-            print(f"[OK] Decisão gerada: {resultado_decisao.get('status', 'ERRO')}")
-            
-            # ETAPA 6: Gerar resumo executivo
-            print("\n[ETAPA 6] Gerando resumo executivo...")
-            resumo_executivo = self.service.gerar_resumo_executivo(resultado_elegibilidade, resultado_decisao)
-            print("[OK] Resumo executivo gerado")
-            
-            # ETAPA 7: Salvar dados e gerar planilha
-            print("\n[ETAPA 7] Salvando dados e gerando planilha...")
-            resultado_planilha = self.service.salvar_dados_e_gerar_planilha(
-                numero_processo, dados_pessoais, resultado_elegibilidade, 
-                resultado_decisao, resumo_executivo
+        
+        if not dados_pessoais:
+            caso['resultado'] = {
+                'numero_processo': numero_processo,
+                'erro': 'Não foi possível extrair dados pessoais',
+                'status': 'Erro'
+            }
+            return caso
+        
+        # Verificar se temos data de nascimento (obrigatória para capacidade civil)
+        if not dados_pessoais.get('data_nascimento'):
+            caso['resultado'] = {
+                'numero_processo': numero_processo,
+                'erro': 'Data de nascimento não encontrada no formulário',
+                'status': 'Erro'
+            }
+            return caso
+        
+        print(f"[OK] Dados pessoais extraídos: {len(dados_pessoais)} campos")
+        caso['dados_pessoais'] = dados_pessoais
+        caso['data_inicial_processo'] = self.lecom_action.data_inicial_processo
+        caso['numero_processo_limpo'] = self.lecom_action.numero_processo_limpo or numero_processo
+        
+        if antecipar_documentos:
+            print("\n[ETAPA 3b] Lendo formulário e baixando documentos...")
+            with span('downloads'):
+                caso['contexto_formulario'] = self.service.coletar_contexto_navegador(
+                    dados_pessoais, caso.get('data_inicial_navegacao', '')
+                )
+            self._voltar_workspace()
+        elif obter_armazem_artefatos().habilitado:
+            # Snapshot para o artefato do caso (a análise em série continua lendo o DOM)
+            try:
+                caso['contexto_artefato'] = self.service.ler_contexto_formulario()
+            except Exception as e:
+                print(f"[AVISO] Snapshot do formulário para o artefato falhou: {e}")
+        return caso
+    
+    def etapa_analise(self, caso: Dict[str, Any], service: Optional[OrdinariaService] = None) -> Dict[str, Any]:
+        """Etapas 4-6 (OCR + elegibilidade, decisão, resumo).
+        
+        Args:
+            service: service de um worker do pipeline; sem ele usa o do processor
+                (e o navegador, se o caso não tiver `contexto_formulario`)
+        """
+        if 'resultado' in caso:
+            return caso
+        service = service or self.service
+        contexto = caso.get('contexto_formulario')
+        
+        # ETAPA 4: Análise de elegibilidade (com downloads integrados)
+        print("\n[ETAPA 4] Realizando análise de elegibilidade...")
+        if obter_armazem_artefatos().habilitado:
+            service.document_action.registro_artefatos = {}
+        service.document_action.estatisticas_ocr = {}
+        try:
+            with span('elegibilidade'):
+                resultado_elegibilidade = service.analisar_elegibilidade(
+                    caso['dados_pessoais'], caso.get('data_inicial_navegacao', ''), {}, contexto_formulario=contexto
+                )
+        finally:
+            caso['artefato_documentos'] = service.document_action.registro_artefatos
+            service.document_action.registro_artefatos = None
+        caso['documentos_sob_demanda'] = dict(service.estatisticas_documentos)
+        caso['estatisticas_ocr'] = dict(service.document_action.estatisticas_ocr)
+        
+        if resultado_elegibilidade.get('elegibilidade_final') == 'erro':
+            caso['resultado'] = {
+                'numero_processo': caso['numero_processo'],
+                'erro': resultado_elegibilidade.get('erro'),
+                'status': 'Erro'
+            }
+            return caso
+        if contexto is not None:
+            # A planilha lê a data do resultado antes de recorrer ao navegador,
+            # que no pipeline já está em outro caso
+            resultado_elegibilidade.setdefault('data_inicial_processo', caso.get('data_inicial_processo'))
+        # Código do caso capturado na etapa do navegador (a persistência não lê a action)
+        resultado_elegibilidade.setdefault('numero_processo_limpo', caso.get('numero_processo_limpo') or caso['numero_processo'])
+        
+        print(f"[OK] Análise de elegibilidade concluída: {resultado_elegibilidade.get('elegibilidade_final')}")
+        
+        # ETAPA 5: Gerar decisão automática
+        print("\n[ETAPA 5] Gerando decisão automática...")
+        with span('decisao'):
+            resultado_decisao = service.gerar_decisao_automatica(resultado_elegibilidade)
+        print(f"[OK] Decisão gerada: {resultado_decisao.get('status', 'ERRO')}")
+        
+        # ETAPA 6: Gerar resumo executivo
+        print("\n[ETAPA 6] Gerando resumo executivo...")
+        with span('resumo'):
+            resumo_executivo = service.gerar_resumo_executivo(resultado_elegibilidade, resultado_decisao)
+        print("[OK] Resumo executivo gerado")
+        
+        caso['resultado_elegibilidade'] = resultado_elegibilidade
+        caso['resultado_decisao'] = resultado_decisao
+        caso['resumo_executivo'] = resumo_executivo
+        return caso
+    
+    def etapa_persistencia(self, caso: Dict[str, Any]) -> Dict[str, Any]:
+        """Etapa 7 (salvar dados e gerar planilha)."""
+        if 'resultado' in caso:
+            return caso
+        
+        # ETAPA 7: Salvar dados e gerar planilha
+        print("\n[ETAPA 7] Salvando dados e gerando planilha...")
+        with span('planilha'):
+            caso['resultado_planilha'] = self.service.salvar_dados_e_gerar_planilha(
+                caso['numero_processo'], caso['dados_pessoais'], caso['resultado_elegibilidade'],
+                caso['resultado_decisao'], caso['resumo_executivo']
             )
-            print("[OK] Dados salvos e planilha gerada")
-            
-            # ETAPA 8: Finalizar processamento
-            print("\n[ETAPA 8] Finalizando processamento...")
+        print("[OK] Dados salvos e planilha gerada")
+        self._salvar_artefato(caso)
+        return caso
+    
+    def _salvar_artefato(self, caso: Dict[str, Any]) -> None:
+        """Grava o pacote para reavaliação sem navegador (ver `ordinaria_replay.py`)."""
+        armazem = obter_armazem_artefatos()
+        documentos = caso.get('artefato_documentos')
+        contexto = caso.get('contexto_formulario') or caso.get('contexto_artefato')
+        if not armazem.habilitado or documentos is None or contexto is None:
+            return
+        contexto = {chave: valor for chave, valor in contexto.items() if chave != 'documentos'}
+        elegibilidade = caso.get('resultado_elegibilidade') or {}
+        with span('artefato'):
+            armazem.salvar('ordinaria', caso['numero_processo'], {
+                'formulario': {'dados_pessoais': caso['dados_pessoais'], 'contexto': contexto},
+                'data_inicial_processo': caso.get('data_inicial_processo'),
+                'data_inicial_navegacao': caso.get('data_inicial_navegacao', ''),
+                'parecer_pf_texto': (contexto.get('parecer_pf') or {}).get('parecer_texto') or contexto.get('chpf_parecer'),
+                'documentos': documentos,
+                'resultado': {
+                    'elegibilidade_final': elegibilidade.get('elegibilidade_final'),
+                    'motivos_indeferimento': elegibilidade.get('motivos_indeferimento', []),
+                    'status_requisitos': elegibilidade.get('status_requisitos', {}),
+                },
+            })
+    
+    def _voltar_workspace(self) -> None:
+        # ETAPA 8: Finalizar processamento
+        print("\n[ETAPA 8] Finalizando processamento...")
+        with span('finalizacao'):
             self.lecom_action.voltar_do_iframe()
             
             # Retornar para workspace para próximo processo
             try:
-                self.lecom_action.driver.get('https://justica.servicos.gov.br/workspace/')
+                self.lecom_action.driver.get(url_workspace(barra_final=True))
                 print("[OK] Retornou para workspace")
             except Exception as e:
                 print(f"[AVISO] Erro ao retornar para workspace: {e}")
-            
-            # RESULTADO FINAL
-            eleg_final = resultado_elegibilidade.get('elegibilidade_final')
-            if eleg_final == 'deferimento':
-                status_final = 'Deferimento'
-            elif eleg_final == 'analise_manual':
-                status_final = 'Análise Manual'
-            else:
-                status_final = 'Indeferimento'
-            
-            resultado_final = {
-                'numero_processo': numero_processo,
-                'dados_pessoais': dados_pessoais,
-                'data_inicial_processo': self.lecom_action.data_inicial_processo,
-                'resultado_elegibilidade': resultado_elegibilidade,
-                'resultado_decisao': resultado_decisao,
-                'resumo_executivo': resumo_executivo,
-                'status': status_final,
-                'elegibilidade_final': resultado_elegibilidade.get('elegibilidade_final'),
-                'motivos_indeferimento': resultado_elegibilidade.get('requisitos_nao_atendidos', []),
-                'documentos_faltantes': resultado_elegibilidade.get('documentos_faltantes', []),
-                'exportado_para_planilha': resultado_planilha.get('sucesso', False),
-                'dados_planilha': resultado_planilha.get('dados'),
-                'sucesso': True
-            }
-            
-            print(f"\n=== PROCESSAMENTO CONCLUÍDO: {status_final.upper()} ===")
-            return resultado_final
-            
-        except Exception as e:
-            print(f"\n[ERRO CRÍTICO] Erro no processamento: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            return {
-                'numero_processo': numero_processo,
-                'erro': f'Erro crítico no processamento: {e}',
-                'status': 'Erro',
-                'sucesso': False
-            }
+    
+    def _montar_resultado(self, caso: Dict[str, Any]) -> Dict[str, Any]:
+        if 'resultado' in caso:
+            return caso['resultado']
+        
+        # RESULTADO FINAL
+        resultado_elegibilidade = caso['resultado_elegibilidade']
+        resultado_planilha = caso.get('resultado_planilha') or {}
+        eleg_final = resultado_elegibilidade.get('elegibilidade_final')
+        if eleg_final == 'deferimento':
+            status_final = 'Deferimento'
+        elif eleg_final == 'analise_manual':
+            status_final = 'Análise Manual'
+        else:
+            status_final = 'Indeferimento'
+        
+        resultado_final = {
+            'numero_processo': caso['numero_processo'],
+            'dados_pessoais': caso['dados_pessoais'],
+            'data_inicial_processo': caso.get('data_inicial_processo'),
+            'resultado_elegibilidade': resultado_elegibilidade,
+            'resultado_decisao': caso['resultado_decisao'],
+            'resumo_executivo': caso['resumo_executivo'],
+            'status': status_final,
+            'elegibilidade_final': resultado_elegibilidade.get('elegibilidade_final'),
+            'motivos_indeferimento': resultado_elegibilidade.get('requisitos_nao_atendidos', []),
+            'documentos_faltantes': resultado_elegibilidade.get('documentos_faltantes', []),
+            'exportado_para_planilha': resultado_planilha.get('sucesso', False),
+            'dados_planilha': resultado_planilha.get('dados'),
+            'documentos_sob_demanda': caso.get('documentos_sob_demanda', {}),
+            'estatisticas_ocr': caso.get('estatisticas_ocr', {}),
+            'sucesso': True
+        }
+        
+        print(f"\n=== PROCESSAMENTO CONCLUÍDO: {status_final.upper()} ===")
+        return resultado_final
+    
+    def _resultado_erro_critico(self, numero_processo: str, e: Exception) -> Dict[str, Any]:
+        print(f"\n[ERRO CRÍTICO] Erro no processamento: {e}")
+        import traceback
+        traceback.print_exc()
+        
+        return {
+            'numero_processo': numero_processo,
+            'erro': f'Erro crítico no processamento: {e}',
+            'status': 'Erro',
+            'sucesso': False
+        }
     
     def fechar(self):
         """Fecha o processor e libera recursos"""
@@ -0,0 +1,112 @@
+"""
+Reavaliação das regras da Ordinária a partir dos artefatos gravados.
+
+Cada caso processado deixa um pacote em `automation/utils/artefatos_caso.py`
+(formulário, datas, Parecer PF e textos de OCR). Aqui o pacote alimenta
+`OrdinariaService.analisar_elegibilidade` com uma `LecomAction` sem
+navegador e uma `DocumentAction` que só refaz a validação dos textos
+gravados: mudanças em `ordinaria_service.py`,
+`analise_elegibilidade_ordinaria.py` ou `termos_validacao_melhorados.py`
+podem ser conferidas nos casos antigos sem Selenium e sem OCR.
+
+Uso:
+    python -m automation.services.ordinaria_replay 123456 654321
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, List, Optional
+
+from ..actions.document_ordinaria_action import DocumentAction
+from ..repositories.ordinaria_repository import OrdinariaRepository
+from ..utils.artefatos_caso import obter_armazem_artefatos
+from .ordinaria_service import OrdinariaService
+
+
+class LecomActionGravada:
+    """Substitui a LecomAction na reavaliação: sem navegador, dados vindos do artefato."""
+
+    def __init__(self, data_inicial_processo: Optional[str] = None) -> None:
+        self.driver = None
+        self.wait = None
+        self.ja_logado = True
+        self.data_inicial_processo = data_inicial_processo
+
+
+def criar_service_reavaliacao() -> OrdinariaService:
+    """Service montado sem navegador (um por thread/processo)."""
+    lecom_action = LecomActionGravada()
+    document_action = DocumentAction(None, None)
+    repository = OrdinariaRepository(lecom_action, document_action)
+    return OrdinariaService(lecom_action, document_action, repository)
+
+
+def reavaliar_artefato(artefato: Dict[str, Any], service: Optional[OrdinariaService] = None) -> Dict[str, Any]:
+    """
+    Reexecuta a análise de elegibilidade de um caso a partir do pacote gravado.
+
+    Returns:
+        Resultado de `analisar_elegibilidade` (mesmo formato do processamento)
+    """
+    service = service or criar_service_reavaliacao()
+    formulario = artefato.get('formulario') or {}
+
+    service.lecom_action.data_inicial_processo = artefato.get('data_inicial_processo')
+    document_action = service.document_action
+    document_action.textos_gravados = artefato.get('documentos') or {}
+    document_action.ultimo_texto_ocr = {}
+    document_action.estatisticas_ocr = {}
+
+    return service.analisar_elegibilidade(
+        formulario.get('dados_pessoais') or {},
+        artefato.get('data_inicial_navegacao') or '',
+        {},
+        contexto_formulario=dict(formulario.get('contexto') or {}),
+    )
+
+
+def comparar_decisao(artefato: Dict[str, Any], resultado: Dict[str, Any]) -> Dict[str, Any]:
+    """Decisão gravada x decisão reavaliada de um caso."""
+    original = artefato.get('resultado') or {}
+    antes = original.get('elegibilidade_final')
+    depois = resultado.get('elegibilidade_final')
+    return {
+        'numero_processo': artefato.get('numero_processo'),
+        'antes': antes,
+        'depois': depois,
+        'mudou': antes != depois,
+        'motivos_antes': original.get('motivos_indeferimento', []),
+        'motivos_depois': resultado.get('motivos_indeferimento', []),
+    }
+
+
+def reavaliar_caso(numero_processo: str, service: Optional[OrdinariaService] = None) -> Optional[Dict[str, Any]]:
+    """Carrega o artefato do processo e devolve a comparação (None sem artefato)."""
+    artefato = obter_armazem_artefatos().carregar(numero_processo, tipo='ordinaria')
+    if artefato is None:
+        print(f"[AVISO] Sem artefato para o processo {numero_processo}")
+        return None
+    return comparar_decisao(artefato, reavaliar_artefato(artefato, service))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    numeros = list(sys.argv[1:] if argv is None else argv)
+    if not numeros:
+        print("Uso: python -m automation.services.ordinaria_replay <numero_processo> [...]")
+        return 2
+    service = criar_service_reavaliacao()
+    mudancas = 0
+    for numero in numeros:
+        comparacao = reavaliar_caso(numero, service)
+        if comparacao is None:
+            continue
+        mudancas += int(comparacao['mudou'])
+        marca = '[AVISO]' if comparacao['mudou'] else '[OK]'
+        print(f"{marca} {numero}: {comparacao['antes']} -> {comparacao['depois']}")
+    print(f"[INFO] {mudancas} decisão(ões) alterada(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
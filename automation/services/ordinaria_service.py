@@ -1,8 +1,17 @@
 """
 Camada Service - Regras de negócio para naturalização ordinária
 Responsável por orquestrar a análise de elegibilidade e geração de decisões
+
+Documentos sob demanda (ORDINARIA_DOCUMENTOS_SOB_DEMANDA, padrão ligado):
+as regras pedem cada documento a `DocumentosSobDemanda`, que baixa e faz OCR
+só no primeiro pedido do caso. Quando o Requisito I ou os alertas do Parecer
+PF já decidem o caso (indeferimento ou análise manual), os requisitos II-IV e
+os complementares não são avaliados e nenhum documento é baixado; o dict do
+resultado mantém as mesmas chaves, com esses requisitos em 'avaliado': False.
+Com ORDINARIA_DOCUMENTOS_SOB_DEMANDA=0 todos os requisitos são avaliados.
 """
 
+import os
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from ..actions.lecom_ordinaria_action import LecomAction
@@ -14,6 +23,91 @@ from automation.services.analise_elegibilidade_ordinaria import AnaliseElegibili
 from automation.services.analise_decisoes_ordinaria import AnaliseDecisoesOrdinaria
 
 
+# Documentos baixados em toda análise (requisitos III, IV e complementares)
+DOCUMENTOS_ANALISE = [
+    'Comprovante de comunicação em português',
+    'Certidão de antecedentes criminais (Brasil)',
+    'Atestado antecedentes criminais (país de origem)',
+    'Comprovante de tempo de residência',
+    'Comprovante da situação cadastral do CPF',
+    'Carteira de Registro Nacional Migratório',
+    'Documento de viagem internacional',
+]
+DOCUMENTOS_CONJUGE = [
+    'Certidão de casamento',
+    'Comprovante de cônjuge brasileiro',
+    'Documento de cônjuge brasileiro',
+]
+DOCUMENTOS_FILHO = [
+    'Certidão de nascimento',
+    'Comprovante de filho brasileiro',
+    'Documento de filho brasileiro',
+]
+XPATH_REDUCAO_PRAZO = "//label[@for='HIP_CON_0' and contains(@aria-checked, 'true')]"
+CAMPOS_CONJUGE = ["CONJUGUE_BRASILEIRO", "CONJ_BRASILEIRO", "ESPOSO_BRASILEIRO", "ESPOSA_BRASILEIRO", "CONJUGE_BR"]
+CAMPOS_FILHO = ["FILHO_BRASILEIRO", "FILHOS_BRASILEIROS", "DESCENDENTE_BRASILEIRO", "FILHO_BR"]
+XPATH_TABELA_CONJUGE = "//table//tr[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'cônjuge') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'conjugue') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'esposo') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'esposa')]"
+XPATH_TABELA_FILHO = "//table//tr[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'filho') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'filha') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'descendente')]"
+TERMOS_TABELA_CONJUGE = ['cônjuge brasileiro', 'conjugue brasileiro', 'esposo brasileiro', 'esposa brasileiro', 'certidão de casamento']
+TERMOS_TABELA_FILHO = ['filho brasileiro', 'filha brasileiro', 'descendente brasileiro', 'certidão de nascimento']
+XPATH_LINK_DOWNLOAD_LINHA = ".//a[contains(@href, 'download') or .//i[@type='cloud_download']]"
+
+# Alertas PF que geram indeferimento automático, mesmo com documentos válidos
+ALERTAS_PF_INDEFERIMENTO = [
+    "REQUERENTE NÃO ESTÁ NO PAÍS",
+    "INDEFERIMENTO AUTOMÁTICO",
+    "DOCUMENTOS NÃO APRESENTADOS INTEGRALMENTE",
+    "DOCUMENTO DE PORTUGUÊS NÃO COMPROVADO NO ATENDIMENTO PRESENCIAL",
+    "EXCEDEU LIMITE DE AUSÊNCIA DO PAÍS",
+    "EXCEDEU LIMITE DE AUSÊNCIAS",
+    "NÃO CONSEGUE SE COMUNICAR EM PORTUGUÊS",
+    "ATENDIMENTO PRESENCIAL",
+    "REQUERENTE NÃO COMPARECEU",
+    "AUSÊNCIA DE COLETA BIOMÉTRICA",
+]
+# Alerta PF que força análise manual
+ALERTAS_PF_ANALISE_MANUAL = [
+    "⚠️ PARECER PF SEM PRAZO DE RESIDÊNCIA ESPECIFICADO",
+]
+
+
+def documentos_sob_demanda_habilitado() -> bool:
+    return os.environ.get('ORDINARIA_DOCUMENTOS_SOB_DEMANDA', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+class DocumentosSobDemanda:
+    """Documentos de um caso: baixa e valida (OCR) no primeiro pedido e memoriza o resultado."""
+
+    def __init__(self, document_action: DocumentAction, previstos: List[str]):
+        """
+        Args:
+            document_action: DocumentAction usada no download/OCR
+            previstos: documentos que o fluxo completo sempre baixa (base dos evitados)
+        """
+        self.document_action = document_action
+        self.previstos = list(previstos)
+        self._validos: Dict[str, bool] = {}
+        self.reaproveitados = 0
+
+    def validar(self, nome_documento: str) -> bool:
+        if nome_documento in self._validos:
+            self.reaproveitados += 1
+            print(f"[DOC] {nome_documento}: já validado neste caso")
+            return self._validos[nome_documento]
+        valido = bool(self.document_action.baixar_e_validar_documento_individual(nome_documento))
+        self._validos[nome_documento] = valido
+        return valido
+
+    def estatisticas(self) -> Dict[str, Any]:
+        evitados = [nome for nome in self.previstos if nome not in self._validos]
+        return {
+            'baixados': len(self._validos),
+            'reaproveitados': self.reaproveitados,
+            'evitados': len(evitados),
+            'documentos_evitados': evitados,
+        }
+
+
 class OrdinariaService:
     """
     Service responsável pelas regras de negócio de naturalização ordinária
@@ -35,9 +129,162 @@ class OrdinariaService:
         # Instanciar analisadores (preserva funcionalidade existente)
         self.analisador_elegibilidade = AnaliseElegibilidadeOrdinaria(lecom_action)
         self.gerador_decisao = AnaliseDecisoesOrdinaria()
+        # Pipeline entre casos: dados do formulário já lidos pelo estágio de
+        # navegador (ver `coletar_contexto_navegador`); None = ler do DOM
+        self.contexto_formulario: Optional[Dict[str, Any]] = None
+        # Documentos do caso em análise e estatísticas do último caso
+        self.documentos: Optional[DocumentosSobDemanda] = None
+        self.estatisticas_documentos: Dict[str, Any] = {}
+
+    def coletar_contexto_navegador(self, dados_pessoais: Optional[Dict[str, Any]] = None,
+                                   data_inicial_processo: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Estágio de navegador do pipeline: lê do formulário aberto tudo o que
+        `analisar_elegibilidade` consulta no DOM e baixa os documentos (sem OCR).
+
+        Args:
+            dados_pessoais: Dados do formulário; com eles (e documentos sob
+                demanda) nada é baixado quando o caso já está decidido
+            data_inicial_processo: Mesma data passada a `analisar_elegibilidade`
 
+        Returns:
+            Dict para `analisar_elegibilidade(..., contexto_formulario=...)`
+        """
+        contexto = self.ler_contexto_formulario()
+        
+        nomes = list(DOCUMENTOS_ANALISE)
+        if contexto['reducao_hip_con']:
+            nomes.append('Comprovante de redução de prazo')
+        # Só usados se a redução não for válida, o que depende do OCR: baixar já
+        if contexto['conjuge']['campo']:
+            nomes.extend(DOCUMENTOS_CONJUGE)
+        if contexto['filho']['campo']:
+            nomes.extend(DOCUMENTOS_FILHO)
+        
+        contexto['documentos'] = {}
+        if dados_pessoais is not None and documentos_sob_demanda_habilitado():
+            decisao = self._decisao_sem_documentos(dados_pessoais, data_inicial_processo, contexto['parecer_pf'])
+            if decisao:
+                print(f"[INFO] Caso decidido sem documentos ({decisao}): {len(nomes)} download(s) evitado(s)")
+                return contexto
+        for nome in nomes:
+            contexto['documentos'][nome] = self.document_action.baixar_documento_bruto(nome)
+        baixados = sum(1 for r in contexto['documentos'].values() if r.get('arquivo'))
+        print(f"[OK] Contexto do formulário coletado: {baixados}/{len(nomes)} documento(s) baixado(s)")
+        return contexto
     
-    def analisar_elegibilidade(self, dados_pessoais: Dict[str, Any], data_inicial_processo: str, documentos_ocr: Dict[str, str]) -> Dict[str, Any]:
+    def ler_contexto_formulario(self) -> Dict[str, Any]:
+        """Campos do formulário aberto consultados pelas regras (sem documentos)."""
+        from selenium.webdriver.common.by import By
+        
+        driver = self.lecom_action.driver
+        contexto: Dict[str, Any] = {'data_inicial_processo': self._data_inicial_processo()}
+        
+        try:
+            contexto['parecer_pf'] = self.repository.extrair_parecer_pf()
+        except Exception as e:
+            print(f"[AVISO] Falha ao extrair parecer PF: {e}")
+            contexto['parecer_pf'] = {}
+        
+        try:
+            elemento_reducao = driver.find_element(By.XPATH, XPATH_REDUCAO_PRAZO)
+            contexto['reducao_hip_con'] = bool(elemento_reducao and "Sim" in elemento_reducao.text)
+        except Exception:
+            contexto['reducao_hip_con'] = False
+        
+        try:
+            elemento_parecer = driver.find_element(By.ID, "CHPF_PARECER")
+            contexto['chpf_parecer'] = elemento_parecer.get_attribute("value") or elemento_parecer.text
+        except Exception:
+            contexto['chpf_parecer'] = None
+        
+        contexto['conjuge'] = self._ler_sinais_vinculo(CAMPOS_CONJUGE, XPATH_TABELA_CONJUGE, TERMOS_TABELA_CONJUGE)
+        contexto['filho'] = self._ler_sinais_vinculo(CAMPOS_FILHO, XPATH_TABELA_FILHO, TERMOS_TABELA_FILHO)
+        return contexto
+    
+    def _ler_sinais_vinculo(self, campos: List[str], xpath_tabela: str, termos: List[str]) -> Dict[str, bool]:
+        """Cônjuge/filho brasileiro: campo indicativo e linha da tabela com link."""
+        from selenium.webdriver.common.by import By
+        
+        sinais = {'campo': False, 'tabela': False}
+        for campo in campos:
+            try:
+                elemento = self.lecom_action.driver.find_element(By.ID, campo)
+                valor = elemento.get_attribute("value") or elemento.text
+                if valor and ("sim" in valor.lower() or "brasileiro" in valor.lower()):
+                    sinais['campo'] = True
+                    break
+            except Exception:
+                continue
+        try:
+            for elemento in self.lecom_action.driver.find_elements(By.XPATH, xpath_tabela):
+                if any(termo in elemento.text.lower() for termo in termos):
+                    try:
+                        if elemento.find_element(By.XPATH, XPATH_LINK_DOWNLOAD_LINHA):
+                            sinais['tabela'] = True
+                            break
+                    except Exception:
+                        pass
+        except Exception as e:
+            print(f"[AVISO] Erro ao verificar tabela de documentos: {e}")
+        return sinais
+    
+    def _vinculo_do_contexto(self, chave: str, verificar_documento) -> bool:
+        """Mesma decisão de `_verificar_conjugue/filho_brasileiro` a partir do contexto."""
+        sinais = self.contexto_formulario.get(chave) or {}
+        if sinais.get('campo') and verificar_documento():
+            return True
+        return bool(sinais.get('tabela'))
+    
+    def _validar_documento(self, nome_documento: str) -> bool:
+        """Baixa e valida pelo acesso memoizado do caso (ou direto, fora da análise)."""
+        if self.documentos is not None:
+            return self.documentos.validar(nome_documento)
+        return self.document_action.baixar_e_validar_documento_individual(nome_documento)
+
+    def _decisao_sem_documentos(self, dados_pessoais: Dict[str, Any], data_inicial_processo: Optional[str],
+                                parecer_pf: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Decisão que nenhum documento pode mudar: alerta PF de análise manual,
+        ou motivo de indeferimento já garantido (Requisito I ou alerta PF).
+        Segue exatamente a consolidação de `analisar_elegibilidade`.
+
+        Returns:
+            'analise_manual', 'indeferimento' ou None (documentos necessários)
+        """
+        from automation.utils.date_utils import normalizar_data_para_ddmmaaaa
+
+        parecer_pf = parecer_pf if isinstance(parecer_pf, dict) else {}
+        alertas_upper = [str(a).upper() for a in (parecer_pf.get('alertas') or [])]
+
+        def _possui(chaves: List[str]) -> bool:
+            return any(ch.upper() in alerta for ch in chaves for alerta in alertas_upper)
+
+        if not parecer_pf.get('nao_compareceu_pf') and _possui(ALERTAS_PF_ANALISE_MANUAL):
+            return 'analise_manual'
+        if _possui(ALERTAS_PF_INDEFERIMENTO):
+            return 'indeferimento'
+        try:
+            data_nasc = datetime.strptime(dados_pessoais['data_nascimento'], '%d/%m/%Y')
+            if not data_inicial_processo:
+                return None
+            data_inicio = datetime.strptime(normalizar_data_para_ddmmaaaa(data_inicial_processo), '%d/%m/%Y')
+        except Exception:
+            # Erro na verificação também indefere pelo inciso I
+            return 'indeferimento'
+        idade_anos = data_inicio.year - data_nasc.year
+        if (data_inicio.month, data_inicio.day) < (data_nasc.month, data_nasc.day):
+            idade_anos -= 1
+        return 'indeferimento' if idade_anos < 18 else None
+
+    def _data_inicial_processo(self) -> Optional[str]:
+        if self.contexto_formulario is not None:
+            return self.contexto_formulario.get('data_inicial_processo')
+        return self.lecom_action.data_inicial_processo
+
+    
+    def analisar_elegibilidade(self, dados_pessoais: Dict[str, Any], data_inicial_processo: str, documentos_ocr: Dict[str, str],
+                               contexto_formulario: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Realiza análise de elegibilidade completa (baseado no fluxo original)
         
@@ -45,10 +292,16 @@ class OrdinariaService:
             dados_pessoais: Dados extraídos do formulário
             data_inicial_processo: Data de início do processo
             documentos_ocr: Textos OCR dos documentos
+            contexto_formulario: Resultado de `coletar_contexto_navegador`; quando
+                informado a análise não acessa o navegador (pipeline entre casos)
             
         Returns:
             Dict com resultado da análise de elegibilidade
         """
+        self.contexto_formulario = contexto_formulario
+        if contexto_formulario is not None:
+            self._parecer_pf_cache = contexto_formulario.get('parecer_pf') or {}
+        self.documentos = DocumentosSobDemanda(self.document_action, DOCUMENTOS_ANALISE)
         try:
             print("\n=== ANÁLISE DE ELEGIBILIDADE ORDINÁRIA ===")
             print("Art. 65 da Lei nº 13.445/2017")
@@ -89,7 +342,10 @@ class OrdinariaService:
             resultado_documentos_comp = {'atendido': False, 'documentos_validos': 0, 'total_documentos': 0, 'percentual_completude': 0.0, 'documentos_faltantes': [], 'avaliado': False}
 
             try:
-                parecer_pf_dados = self.repository.extrair_parecer_pf()
+                if self.contexto_formulario is not None:
+                    parecer_pf_dados = dict(self.contexto_formulario.get('parecer_pf') or {})
+                else:
+                    parecer_pf_dados = self.repository.extrair_parecer_pf()
             except Exception as e:
                 print(f"[AVISO] Falha ao extrair parecer PF: {e}")
                 parecer_pf_dados = {}
@@ -199,195 +455,201 @@ class OrdinariaService:
             
             print("[DEBUG] REQUISITO I CONCLUÍDO - Indo para REQUISITO II...")
             
-            # REQUISITO II – Residência mínima (EXATAMENTE IGUAL À AUTOMAÇÃO ORIGINAL)
-            print('\n[INFO] REQUISITO II – Residência mínima')
-            resultado_residencia = self._verificar_residencia_minima_com_validacao_ocr()
-            status_requisitos['II'] = resultado_residencia.get('pode_continuar', False)
-            
-            # Normalizar para formato compatível
-            resultado_residencia = {
-                'atendido': bool(resultado_residencia.get('pode_continuar', False)),
-                'motivo': resultado_residencia.get('motivo', 'Verificação de residência concluída'),
-                'tem_reducao': resultado_residencia.get('tem_reducao', False),
-                'prazo_requerido': resultado_residencia.get('prazo_requerido'),
-                'tempo_comprovado': resultado_residencia.get('tempo_comprovado', 0),
-                'avaliado': True
-            }
-            
-            if not status_requisitos['II']:
-                motivos_indeferimento.append('Art. 65, inciso II da Lei nº 13.445/2017')
+            # Caso já decidido pelo Requisito I / Parecer PF: os documentos não mudam
+            # a decisão e os requisitos II-IV ficam 'avaliado': False
+            decisao_antecipada = None
+            if documentos_sob_demanda_habilitado():
+                decisao_antecipada = self._decisao_sem_documentos(dados_pessoais, data_inicial_processo, parecer_pf_dados)
+            requisitos_nao_avaliados: List[str] = []
+            if decisao_antecipada:
+                requisitos_nao_avaliados = ['II', 'III', 'IV']
+                print(f"[INFO] Decisão já definida sem documentos ({decisao_antecipada}): "
+                      "requisitos II-IV e documentos complementares não avaliados")
             else:
-                print('[OK] Residência mínima → check')
+                # REQUISITO II – Residência mínima (EXATAMENTE IGUAL À AUTOMAÇÃO ORIGINAL)
+                print('\n[INFO] REQUISITO II – Residência mínima')
+                resultado_residencia = self._verificar_residencia_minima_com_validacao_ocr()
+                status_requisitos['II'] = resultado_residencia.get('pode_continuar', False)
+            
+                # Normalizar para formato compatível
+                resultado_residencia = {
+                    'atendido': bool(resultado_residencia.get('pode_continuar', False)),
+                    'motivo': resultado_residencia.get('motivo', 'Verificação de residência concluída'),
+                    'tem_reducao': resultado_residencia.get('tem_reducao', False),
+                    'prazo_requerido': resultado_residencia.get('prazo_requerido'),
+                    'tempo_comprovado': resultado_residencia.get('tempo_comprovado', 0),
+                    'avaliado': True
+                }
             
-            # REQUISITO III – Comunicação em língua portuguesa
-            print("\n[INFO] REQUISITO III – Comunicação em língua portuguesa")
-            print("Verificando: Comprovante de comunicação em português")
+                if not status_requisitos['II']:
+                    motivos_indeferimento.append('Art. 65, inciso II da Lei nº 13.445/2017')
+                else:
+                    print('[OK] Residência mínima → check')
             
-            try:
-                print("[INFO] Verificando documento de comunicação em português...")
+                # REQUISITO III – Comunicação em língua portuguesa
+                print("\n[INFO] REQUISITO III – Comunicação em língua portuguesa")
+                print("Verificando: Comprovante de comunicação em português")
+            
+                try:
+                    print("[INFO] Verificando documento de comunicação em português...")
                 
-                # Tentar baixar e validar o documento real
-                print("[DOC] Baixando e validando: Comprovante de comunicação em português")
-                sucesso_download = self.document_action.baixar_e_validar_documento_individual('Comprovante de comunicação em português')
+                    # Tentar baixar e validar o documento real
+                    print("[DOC] Baixando e validando: Comprovante de comunicação em português")
+                    sucesso_download = self._validar_documento('Comprovante de comunicação em português')
                 
-                if sucesso_download:
-                    print("✅ Comprovante de comunicação em português: VÁLIDO")
-                    print("[OK] Comunicação em português → check")
-                    status_requisitos['III'] = True
-                    resultado_comunicacao = {'atendido': True, 'motivo': 'Anexou comprovante de comunicação em português', 'avaliado': True}
-                else:
-                    print("[ERRO] Comprovante de comunicação em português: NÃO ANEXADO")
-                    print("[ERRO] Não anexou item 13")
-                    print("📖 Fundamento: Art. 65, inciso III da Lei nº 13.445/2017")
+                    if sucesso_download:
+                        print("✅ Comprovante de comunicação em português: VÁLIDO")
+                        print("[OK] Comunicação em português → check")
+                        status_requisitos['III'] = True
+                        resultado_comunicacao = {'atendido': True, 'motivo': 'Anexou comprovante de comunicação em português', 'avaliado': True}
+                    else:
+                        print("[ERRO] Comprovante de comunicação em português: NÃO ANEXADO")
+                        print("[ERRO] Não anexou item 13")
+                        print("📖 Fundamento: Art. 65, inciso III da Lei nº 13.445/2017")
+                        motivos_indeferimento.append('Art. 65, inciso III da Lei nº 13.445/2017')
+                        status_requisitos['III'] = False
+                        resultado_comunicacao = {'atendido': False, 'motivo': 'Não anexou item 13 - Comprovante de comunicação em português', 'avaliado': True}
+                        
+                except Exception as e:
+                    print(f"[ERRO] Erro ao verificar comunicação: {e}")
                     motivos_indeferimento.append('Art. 65, inciso III da Lei nº 13.445/2017')
                     status_requisitos['III'] = False
-                    resultado_comunicacao = {'atendido': False, 'motivo': 'Não anexou item 13 - Comprovante de comunicação em português', 'avaliado': True}
-                        
-            except Exception as e:
-                print(f"[ERRO] Erro ao verificar comunicação: {e}")
-                motivos_indeferimento.append('Art. 65, inciso III da Lei nº 13.445/2017')
-                status_requisitos['III'] = False
-                resultado_comunicacao = {'atendido': False, 'motivo': f'Erro na verificação: {e}', 'avaliado': True}
-            
-            # REQUISITO IV – Antecedentes criminais
-            print("\n[INFO] REQUISITO IV – Antecedentes criminais")
-            print("Baixando e validando documentos individualmente:")
-            print("- Certidão de antecedentes criminais (Brasil)")
-            print("- Certidão de antecedentes criminais (outros países)")
-            print("- Comprovante de reabilitação (se necessário)")
+                    resultado_comunicacao = {'atendido': False, 'motivo': f'Erro na verificação: {e}', 'avaliado': True}
             
-            try:
-                brasil_valido = False
-                origem_valido = False
-                motivos_antecedentes = []
-                documentos_faltantes_antecedentes = []
+                # REQUISITO IV – Antecedentes criminais
+                print("\n[INFO] REQUISITO IV – Antecedentes criminais")
+                print("Baixando e validando documentos individualmente:")
+                print("- Certidão de antecedentes criminais (Brasil)")
+                print("- Certidão de antecedentes criminais (outros países)")
+                print("- Comprovante de reabilitação (se necessário)")
+            
+                try:
+                    brasil_valido = False
+                    origem_valido = False
+                    motivos_antecedentes = []
+                    documentos_faltantes_antecedentes = []
                 
-                # Baixar e validar Certidão de antecedentes criminais (Brasil)
-                print("\n[DOC] Processando: Certidão de antecedentes criminais (Brasil)")
-                print("[DOC] Baixando e validando: Certidão de antecedentes criminais (Brasil)")
-                sucesso_brasil = self.document_action.baixar_e_validar_documento_individual('Certidão de antecedentes criminais (Brasil)')
+                    # Baixar e validar Certidão de antecedentes criminais (Brasil)
+                    print("\n[DOC] Processando: Certidão de antecedentes criminais (Brasil)")
+                    print("[DOC] Baixando e validando: Certidão de antecedentes criminais (Brasil)")
+                    sucesso_brasil = self._validar_documento('Certidão de antecedentes criminais (Brasil)')
                 
-                if sucesso_brasil:
-                    brasil_valido = True
-                    print("✅ Certidão de antecedentes criminais (Brasil): VÁLIDO")
-                else:
-                    motivos_antecedentes.append('Certidão de antecedentes criminais do Brasil não anexada ou inválida')
-                    documentos_faltantes_antecedentes.append('Certidão de antecedentes criminais da Justiça Federal')
-                    documentos_faltantes_antecedentes.append('Certidão de antecedentes criminais da Justiça Estadual')
-                    print("❌ Certidão de antecedentes criminais (Brasil): NÃO ANEXADO OU INVÁLIDO")
+                    if sucesso_brasil:
+                        brasil_valido = True
+                        print("✅ Certidão de antecedentes criminais (Brasil): VÁLIDO")
+                    else:
+                        motivos_antecedentes.append('Certidão de antecedentes criminais do Brasil não anexada ou inválida')
+                        documentos_faltantes_antecedentes.append('Certidão de antecedentes criminais da Justiça Federal')
+                        documentos_faltantes_antecedentes.append('Certidão de antecedentes criminais da Justiça Estadual')
+                        print("❌ Certidão de antecedentes criminais (Brasil): NÃO ANEXADO OU INVÁLIDO")
                 
-                # Baixar e validar Atestado antecedentes criminais (país de origem)
-                print("\n[DOC] Processando: Atestado antecedentes criminais (país de origem)")
-                print("[DOC] Baixando e validando: Atestado antecedentes criminais (país de origem)")
-                sucesso_origem = self.document_action.baixar_e_validar_documento_individual('Atestado antecedentes criminais (país de origem)')
+                    # Baixar e validar Atestado antecedentes criminais (país de origem)
+                    print("\n[DOC] Processando: Atestado antecedentes criminais (país de origem)")
+                    print("[DOC] Baixando e validando: Atestado antecedentes criminais (país de origem)")
+                    sucesso_origem = self._validar_documento('Atestado antecedentes criminais (país de origem)')
                 
-                if sucesso_origem:
-                    origem_valido = True
-                    print("✅ Atestado antecedentes criminais (país de origem): VÁLIDO")
-                else:
-                    motivos_antecedentes.append('Atestado de antecedentes criminais do país de origem não anexado ou inválido')
-                    documentos_faltantes_antecedentes.append('Atestado de antecedentes criminais do país de origem')
-                    print("❌ Atestado antecedentes criminais (país de origem): NÃO ANEXADO OU INVÁLIDO")
+                    if sucesso_origem:
+                        origem_valido = True
+                        print("✅ Atestado antecedentes criminais (país de origem): VÁLIDO")
+                    else:
+                        motivos_antecedentes.append('Atestado de antecedentes criminais do país de origem não anexado ou inválido')
+                        documentos_faltantes_antecedentes.append('Atestado de antecedentes criminais do país de origem')
+                        print("❌ Atestado antecedentes criminais (país de origem): NÃO ANEXADO OU INVÁLIDO")
                 
-                # Verificar se AMBOS os documentos são válidos
-                print(f"\n{'='*60}")
-                print(f"📊 RESUMO REQUISITO IV: Brasil={brasil_valido}, Origem={origem_valido}")
-                print(f"{'='*60}")
+                    # Verificar se AMBOS os documentos são válidos
+                    print(f"\n{'='*60}")
+                    print(f"📊 RESUMO REQUISITO IV: Brasil={brasil_valido}, Origem={origem_valido}")
+                    print(f"{'='*60}")
                 
-                if brasil_valido and origem_valido:
-                    print("✅ REQUISITO IV: ATENDIDO - AMBOS os documentos de antecedentes válidos")
-                    print("[OK] Antecedentes criminais → check")
-                    status_requisitos['IV'] = True
-                    resultado_antecedentes = {
-                        'atendido': True, 
-                        'motivo': 'Antecedentes criminais em ordem (Brasil e país de origem)', 
-                        'brasil_valido': True,
-                        'origem_valido': True,
-                        'avaliado': True
-                    }
-                else:
-                    print("❌ REQUISITO IV: NÃO ATENDIDO")
-                    motivo_detalhado = '; '.join(motivos_antecedentes)
-                    print(f"[ERRO] {motivo_detalhado}")
-                    print("📖 Fundamento: Art. 65, inciso IV da Lei nº 13.445/2017")
+                    if brasil_valido and origem_valido:
+                        print("✅ REQUISITO IV: ATENDIDO - AMBOS os documentos de antecedentes válidos")
+                        print("[OK] Antecedentes criminais → check")
+                        status_requisitos['IV'] = True
+                        resultado_antecedentes = {
+                            'atendido': True, 
+                            'motivo': 'Antecedentes criminais em ordem (Brasil e país de origem)', 
+                            'brasil_valido': True,
+                            'origem_valido': True,
+                            'avaliado': True
+                        }
+                    else:
+                        print("❌ REQUISITO IV: NÃO ATENDIDO")
+                        motivo_detalhado = '; '.join(motivos_antecedentes)
+                        print(f"[ERRO] {motivo_detalhado}")
+                        print("📖 Fundamento: Art. 65, inciso IV da Lei nº 13.445/2017")
+                        motivos_indeferimento.append('Art. 65, inciso IV da Lei nº 13.445/2017')
+                        status_requisitos['IV'] = False
+                        resultado_antecedentes = {
+                            'atendido': False, 
+                            'motivo': motivo_detalhado,
+                            'motivos_especificos': motivos_antecedentes,
+                            'documentos_faltantes': documentos_faltantes_antecedentes,
+                            'brasil_valido': brasil_valido,
+                            'origem_valido': origem_valido,
+                            'avaliado': True
+                        }
+                    
+                except Exception as e:
+                    print(f"[ERRO] Erro ao verificar antecedentes: {e}")
                     motivos_indeferimento.append('Art. 65, inciso IV da Lei nº 13.445/2017')
                     status_requisitos['IV'] = False
-                    resultado_antecedentes = {
-                        'atendido': False, 
-                        'motivo': motivo_detalhado,
-                        'motivos_especificos': motivos_antecedentes,
-                        'documentos_faltantes': documentos_faltantes_antecedentes,
-                        'brasil_valido': brasil_valido,
-                        'origem_valido': origem_valido,
-                        'avaliado': True
-                    }
-                    
-            except Exception as e:
-                print(f"[ERRO] Erro ao verificar antecedentes: {e}")
-                motivos_indeferimento.append('Art. 65, inciso IV da Lei nº 13.445/2017')
-                status_requisitos['IV'] = False
-                resultado_antecedentes = {'atendido': False, 'motivo': f'Erro na verificação: {e}', 'avaliado': True}
+                    resultado_antecedentes = {'atendido': False, 'motivo': f'Erro na verificação: {e}', 'avaliado': True}
             
-            print("\n=== ETAPA 5: VERIFICAÇÕES PRELIMINARES CONCLUÍDAS ===")
-            print("[OK] Documentos já validados individualmente:")
+                print("\n=== ETAPA 5: VERIFICAÇÕES PRELIMINARES CONCLUÍDAS ===")
+                print("[OK] Documentos já validados individualmente:")
             
-            # DOCUMENTOS COMPLEMENTARES
-            print("\n[INFO] DOCUMENTOS COMPLEMENTARES (Anexo I da Portaria 623/2020)")
-            print("Baixando e validando documentos restantes individualmente:")
-            print("- Comprovante de tempo de residência → item 8")
-            print("- Comprovante de situação cadastral do CPF → item 4")
-            print("- CRNM → item 3")
-            print("- Documento de viagem internacional → item 2")
+                # DOCUMENTOS COMPLEMENTARES
+                print("\n[INFO] DOCUMENTOS COMPLEMENTARES (Anexo I da Portaria 623/2020)")
+                print("Baixando e validando documentos restantes individualmente:")
+                print("- Comprovante de tempo de residência → item 8")
+                print("- Comprovante de situação cadastral do CPF → item 4")
+                print("- CRNM → item 3")
+                print("- Documento de viagem internacional → item 2")
             
-            print("\n[BUSCA] Baixando e validando documentos complementares individualmente...")
+                print("\n[BUSCA] Baixando e validando documentos complementares individualmente...")
             
-            documentos_complementares = [
-                'Comprovante de tempo de residência',
-                'Comprovante da situação cadastral do CPF', 
-                'Carteira de Registro Nacional Migratório',
-                'Documento de viagem internacional'
-            ]
+                documentos_complementares = DOCUMENTOS_ANALISE[3:]
             
-            documentos_complementares_validos = 0
-            documentos_complementares_faltantes = []
+                documentos_complementares_validos = 0
+                documentos_complementares_faltantes = []
             
-            for documento in documentos_complementares:
-                print(f"\n[DOC] Processando: {documento}")
-                print(f"[DOC] Baixando e validando: {documento}")
-                sucesso = self.document_action.baixar_e_validar_documento_individual(documento)
+                for documento in documentos_complementares:
+                    print(f"\n[DOC] Processando: {documento}")
+                    print(f"[DOC] Baixando e validando: {documento}")
+                    sucesso = self._validar_documento(documento)
                 
-                if sucesso:
-                    print(f"✅ {documento}: VÁLIDO")
-                    documentos_complementares_validos += 1
-                else:
-                    print(f"[ERRO] {documento}: NÃO ANEXADO")
-                    # Mapear para item do anexo
-                    if 'registro nacional' in documento.lower() or 'migratório' in documento.lower() or 'crnm' in documento.lower():
-                        documentos_complementares_faltantes.append('Não anexou item 3')
-                    elif 'cpf' in documento.lower():
-                        documentos_complementares_faltantes.append('Não anexou item 4')
-                    elif 'viagem internacional' in documento.lower():
-                        documentos_complementares_faltantes.append('Não anexou item 2')
-                    elif 'tempo de residência' in documento.lower():
-                        documentos_complementares_faltantes.append('Não anexou item 8')
-            
-            print(f"\n============================================================")
-            print(f"📊 RESUMO DOCUMENTOS COMPLEMENTARES: {documentos_complementares_validos}/{len(documentos_complementares)} documentos válidos ({(documentos_complementares_validos/len(documentos_complementares)*100):.0f}%)")
-            print(f"============================================================")
-            
-            resultado_documentos_comp = {
-                'atendido': documentos_complementares_validos == len(documentos_complementares),
-                'documentos_validos': documentos_complementares_validos,
-                'total_documentos': len(documentos_complementares),
-                'percentual_completude': (documentos_complementares_validos/len(documentos_complementares))*100 if documentos_complementares else 0.0,
-                'documentos_faltantes': documentos_complementares_faltantes,
-                'avaliado': True
-            }
+                    if sucesso:
+                        print(f"✅ {documento}: VÁLIDO")
+                        documentos_complementares_validos += 1
+                    else:
+                        print(f"[ERRO] {documento}: NÃO ANEXADO")
+                        # Mapear para item do anexo
+                        if 'registro nacional' in documento.lower() or 'migratório' in documento.lower() or 'crnm' in documento.lower():
+                            documentos_complementares_faltantes.append('Não anexou item 3')
+                        elif 'cpf' in documento.lower():
+                            documentos_complementares_faltantes.append('Não anexou item 4')
+                        elif 'viagem internacional' in documento.lower():
+                            documentos_complementares_faltantes.append('Não anexou item 2')
+                        elif 'tempo de residência' in documento.lower():
+                            documentos_complementares_faltantes.append('Não anexou item 8')
+            
+                print(f"\n============================================================")
+                print(f"📊 RESUMO DOCUMENTOS COMPLEMENTARES: {documentos_complementares_validos}/{len(documentos_complementares)} documentos válidos ({(documentos_complementares_validos/len(documentos_complementares)*100):.0f}%)")
+                print(f"============================================================")
+            
+                resultado_documentos_comp = {
+                    'atendido': documentos_complementares_validos == len(documentos_complementares),
+                    'documentos_validos': documentos_complementares_validos,
+                    'total_documentos': len(documentos_complementares),
+                    'percentual_completude': (documentos_complementares_validos/len(documentos_complementares))*100 if documentos_complementares else 0.0,
+                    'documentos_faltantes': documentos_complementares_faltantes,
+                    'avaliado': True
+                }
             
-            if documentos_complementares_validos == len(documentos_complementares):
-                print("[OK] DOCUMENTOS COMPLEMENTARES: COMPLETOS (100%)")
-            else:
-                print(f"[AVISO] DOCUMENTOS COMPLEMENTARES: INCOMPLETOS ({documentos_complementares_validos}/{len(documentos_complementares)})")
+                if documentos_complementares_validos == len(documentos_complementares):
+                    print("[OK] DOCUMENTOS COMPLEMENTARES: COMPLETOS (100%)")
+                else:
+                    print(f"[AVISO] DOCUMENTOS COMPLEMENTARES: INCOMPLETOS ({documentos_complementares_validos}/{len(documentos_complementares)})")
             
             try:
                 # SEMPRE mostrar resumo dos requisitos
@@ -401,24 +663,8 @@ class OrdinariaService:
                 alertas_pf = parecer_pf_dados.get('alertas', []) or []
                 alertas_pf_upper = [str(a).upper() for a in alertas_pf]
 
-                # Alertas PF que geram indeferimento automático, mesmo com documentos válidos
-                alertas_pf_indeferimento_chaves = [
-                    "REQUERENTE NÃO ESTÁ NO PAÍS",
-                    "INDEFERIMENTO AUTOMÁTICO",
-                    "DOCUMENTOS NÃO APRESENTADOS INTEGRALMENTE",
-                    "DOCUMENTO DE PORTUGUÊS NÃO COMPROVADO NO ATENDIMENTO PRESENCIAL",
-                    "EXCEDEU LIMITE DE AUSÊNCIA DO PAÍS",
-                    "EXCEDEU LIMITE DE AUSÊNCIAS",
-                    "NÃO CONSEGUE SE COMUNICAR EM PORTUGUÊS",
-                    "ATENDIMENTO PRESENCIAL",
-                    "REQUERENTE NÃO COMPARECEU",
-                    "AUSÊNCIA DE COLETA BIOMÉTRICA",
-                ]
-
-                # Alerta PF que força análise manual
-                alertas_pf_analise_manual_chaves = [
-                    "⚠️ PARECER PF SEM PRAZO DE RESIDÊNCIA ESPECIFICADO",
-                ]
+                alertas_pf_indeferimento_chaves = ALERTAS_PF_INDEFERIMENTO
+                alertas_pf_analise_manual_chaves = ALERTAS_PF_ANALISE_MANUAL
 
                 def _possui_alerta(chave: str) -> bool:
                     chave_upper = chave.upper()
@@ -508,9 +754,14 @@ class OrdinariaService:
                         documentos_faltantes_totais.extend(resultado_antecedentes['documentos_faltantes'])
                     
                     # Gerar texto do despacho de indeferimento
+                    # O despacho cita apenas os requisitos efetivamente avaliados
+                    status_avaliados = {
+                        req: atendido for req, atendido in status_requisitos.items()
+                        if req not in requisitos_nao_avaliados
+                    }
                     despacho_indeferimento = self._gerar_despacho_indeferimento(
                         dados_pessoais, 
-                        status_requisitos,
+                        status_avaliados,
                         documentos_faltantes_totais
                     )
                     
@@ -575,6 +826,11 @@ class OrdinariaService:
                 'requisitos_atendidos': 0,
                 'total_requisitos': 4
             }
+        finally:
+            self.estatisticas_documentos = self.documentos.estatisticas()
+            self.documentos = None
+            print(f"[INFO] Documentos: {self.estatisticas_documentos['baixados']} baixado(s), "
+                  f"{self.estatisticas_documentos['evitados']} evitado(s)")
     
     def _verificar_residencia_minima_com_validacao_ocr(self):
         """
@@ -590,18 +846,19 @@ class OrdinariaService:
             
             # VERIFICAÇÃO 1: Campo HIP_CON_0 (redução de prazo geral)
             try:
-                elemento_reducao = self.lecom_action.driver.find_element(
-                    By.XPATH, 
-                    "//label[@for='HIP_CON_0' and contains(@aria-checked, 'true')]"
-                )
-                if elemento_reducao and "Sim" in elemento_reducao.text:
+                if self.contexto_formulario is not None:
+                    reducao_marcada = bool(self.contexto_formulario.get('reducao_hip_con'))
+                else:
+                    elemento_reducao = self.lecom_action.driver.find_element(By.XPATH, XPATH_REDUCAO_PRAZO)
+                    reducao_marcada = bool(elemento_reducao and "Sim" in elemento_reducao.text)
+                if reducao_marcada:
                     tem_reducao = True
                     motivo_reducao = "HIP_CON_0"
                     print("[OK] Redução de prazo (HIP_CON_0): SIM")
                     print("[INFO] Validando documento: Comprovante de redução de prazo")
                     
                     # BAIXAR E VALIDAR OCR DO COMPROVANTE DE REDUÇÃO
-                    doc_reducao_valido = self.document_action.baixar_e_validar_documento_individual('Comprovante de redução de prazo')
+                    doc_reducao_valido = self._validar_documento('Comprovante de redução de prazo')
                     
                     if not doc_reducao_valido:
                         print("[ERRO] Comprovante de redução de prazo: INVÁLIDO ou não anexado")
@@ -660,8 +917,13 @@ class OrdinariaService:
             # ========== PRIORIDADE 1: PARECER DA PF ==========
             print("[INFO] Passo 1 – Verificar parecer da PF (PRIORIDADE)")
             try:
-                elemento_parecer = self.lecom_action.driver.find_element(By.ID, "CHPF_PARECER")
-                parecer_texto = elemento_parecer.get_attribute("value") or elemento_parecer.text
+                if self.contexto_formulario is not None:
+                    parecer_texto = self.contexto_formulario.get('chpf_parecer')
+                    if parecer_texto is None:
+                        raise LookupError('CHPF_PARECER ausente no formulário')
+                else:
+                    elemento_parecer = self.lecom_action.driver.find_element(By.ID, "CHPF_PARECER")
+                    parecer_texto = elemento_parecer.get_attribute("value") or elemento_parecer.text
                 
                 if parecer_texto:
                     print("[INFO] Analisando campo CHPF_PARECER...")
@@ -767,19 +1029,13 @@ class OrdinariaService:
         
         try:
             print("[VERIFICAÇÃO] Procurando cônjuge brasileiro...")
+            if self.contexto_formulario is not None:
+                return self._vinculo_do_contexto('conjuge', self._verificar_documento_conjugue_brasileiro)
             
             # MÉTODO 1: Verificar campo específico de cônjuge brasileiro
             try:
                 # Procurar por campos que indiquem cônjuge brasileiro
-                campos_conjugue = [
-                    "CONJUGUE_BRASILEIRO",
-                    "CONJ_BRASILEIRO", 
-                    "ESPOSO_BRASILEIRO",
-                    "ESPOSA_BRASILEIRO",
-                    "CONJUGE_BR"
-                ]
-                
-                for campo in campos_conjugue:
+                for campo in CAMPOS_CONJUGE:
                     try:
                         elemento = self.lecom_action.driver.find_element(By.ID, campo)
                         valor = elemento.get_attribute("value") or elemento.text
@@ -805,18 +1061,16 @@ class OrdinariaService:
                 print("[INFO] Verificando tabela de documentos para cônjuge brasileiro...")
                 
                 # Procurar por linhas da tabela que mencionem cônjuge brasileiro
-                xpath_tabela = "//table//tr[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'cônjuge') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'conjugue') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'esposo') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'esposa')]"
-                
-                elementos_tabela = self.lecom_action.driver.find_elements(By.XPATH, xpath_tabela)
+                elementos_tabela = self.lecom_action.driver.find_elements(By.XPATH, XPATH_TABELA_CONJUGE)
                 
                 for elemento in elementos_tabela:
                     texto = elemento.text.lower()
-                    if any(termo in texto for termo in ['cônjuge brasileiro', 'conjugue brasileiro', 'esposo brasileiro', 'esposa brasileiro', 'certidão de casamento']):
+                    if any(termo in texto for termo in TERMOS_TABELA_CONJUGE):
                         print(f"[OK] Encontrado na tabela: {elemento.text[:100]}...")
                         
                         # Verificar se há link de download na linha
                         try:
-                            link_download = elemento.find_element(By.XPATH, ".//a[contains(@href, 'download') or .//i[@type='cloud_download']]")
+                            link_download = elemento.find_element(By.XPATH, XPATH_LINK_DOWNLOAD_LINHA)
                             if link_download:
                                 print("[OK] Link de download encontrado para documento de cônjuge")
                                 
@@ -845,17 +1099,12 @@ class OrdinariaService:
         
         try:
             print("[VERIFICAÇÃO] Procurando filho brasileiro...")
+            if self.contexto_formulario is not None:
+                return self._vinculo_do_contexto('filho', self._verificar_documento_filho_brasileiro)
             
             # MÉTODO 1: Verificar campo específico de filho brasileiro
             try:
-                campos_filho = [
-                    "FILHO_BRASILEIRO",
-                    "FILHOS_BRASILEIROS",
-                    "DESCENDENTE_BRASILEIRO",
-                    "FILHO_BR"
-                ]
-                
-                for campo in campos_filho:
+                for campo in CAMPOS_FILHO:
                     try:
                         elemento = self.lecom_action.driver.find_element(By.ID, campo)
                         valor = elemento.get_attribute("value") or elemento.text
@@ -881,18 +1130,16 @@ class OrdinariaService:
                 print("[INFO] Verificando tabela de documentos para filho brasileiro...")
                 
                 # Procurar por linhas da tabela que mencionem filho brasileiro
-                xpath_tabela = "//table//tr[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'filho') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'filha') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'descendente')]"
-                
-                elementos_tabela = self.lecom_action.driver.find_elements(By.XPATH, xpath_tabela)
+                elementos_tabela = self.lecom_action.driver.find_elements(By.XPATH, XPATH_TABELA_FILHO)
                 
                 for elemento in elementos_tabela:
                     texto = elemento.text.lower()
-                    if any(termo in texto for termo in ['filho brasileiro', 'filha brasileiro', 'descendente brasileiro', 'certidão de nascimento']):
+                    if any(termo in texto for termo in TERMOS_TABELA_FILHO):
                         print(f"[OK] Encontrado na tabela: {elemento.text[:100]}...")
                         
                         # Verificar se há link de download na linha
                         try:
-                            link_download = elemento.find_element(By.XPATH, ".//a[contains(@href, 'download') or .//i[@type='cloud_download']]")
+                            link_download = elemento.find_element(By.XPATH, XPATH_LINK_DOWNLOAD_LINHA)
                             if link_download:
                                 print("[OK] Link de download encontrado para documento de filho")
                                 
@@ -919,16 +1166,10 @@ class OrdinariaService:
         """
         try:
             # Tentar baixar documentos relacionados a cônjuge brasileiro
-            documentos_conjugue = [
-                'Certidão de casamento',
-                'Comprovante de cônjuge brasileiro',
-                'Documento de cônjuge brasileiro'
-            ]
-            
-            for doc_nome in documentos_conjugue:
+            for doc_nome in DOCUMENTOS_CONJUGE:
                 try:
                     print(f"[DOC] Tentando baixar: {doc_nome}")
-                    sucesso = self.document_action.baixar_e_validar_documento_individual(doc_nome)
+                    sucesso = self._validar_documento(doc_nome)
                     if sucesso:
                         print(f"[OK] {doc_nome}: VÁLIDO")
                         return True
@@ -948,16 +1189,10 @@ class OrdinariaService:
         """
         try:
             # Tentar baixar documentos relacionados a filho brasileiro
-            documentos_filho = [
-                'Certidão de nascimento',
-                'Comprovante de filho brasileiro',
-                'Documento de filho brasileiro'
-            ]
-            
-            for doc_nome in documentos_filho:
+            for doc_nome in DOCUMENTOS_FILHO:
                 try:
                     print(f"[DOC] Tentando baixar: {doc_nome}")
-                    sucesso = self.document_action.baixar_e_validar_documento_individual(doc_nome)
+                    sucesso = self._validar_documento(doc_nome)
                     if sucesso:
                         print(f"[OK] {doc_nome}: VÁLIDO")
                         return True
@@ -1232,7 +1467,7 @@ class OrdinariaService:
             print("\n[REQUISITO I] Verificando capacidade civil...")
             resultado_capacidade = self._verificar_capacidade_civil(
                 dados_pessoais, 
-                self.lecom_action.data_inicial_processo
+                self._data_inicial_processo()
             )
             
             if not resultado_capacidade['atendido']:
@@ -1322,7 +1557,7 @@ class OrdinariaService:
                 'requisitos_nao_atendidos': [],
                 'documentos_faltantes': resultado_documentos.get('documentos_faltantes', []),
                 'dados_pessoais': dados_pessoais,
-                'data_inicial_processo': self.lecom_action.data_inicial_processo,
+                'data_inicial_processo': self._data_inicial_processo(),
                 'parecer_pf': parecer_pf,
                 'status_requisitos': status_requisitos,
                 'requisitos_atendidos': requisitos_atendidos,
@@ -1668,7 +1903,7 @@ class OrdinariaService:
             'requisitos_nao_atendidos': [resultado_requisito['motivo']],
             'documentos_faltantes': [],
             'dados_pessoais': dados_pessoais,
-            'data_inicial_processo': self.lecom_action.data_inicial_processo
+            'data_inicial_processo': self._data_inicial_processo()
         }
     
     def _criar_resultado_indeferimento(self, requisito_falhou: str, resultados_requisitos: Dict, 
@@ -1684,7 +1919,7 @@ class OrdinariaService:
             'requisitos_nao_atendidos': motivos,
             'documentos_faltantes': [],
             'dados_pessoais': dados_pessoais,
-            'data_inicial_processo': self.lecom_action.data_inicial_processo
+            'data_inicial_processo': self._data_inicial_processo()
         }
         
         # Adicionar resultados dos requisitos
@@ -1967,6 +2202,8 @@ A pessoa referida nesta Portaria deverá comparecer perante a Justiça Eleitoral
             # Verificar se já existe cache
             if hasattr(self, '_parecer_pf_cache') and self._parecer_pf_cache:
                 return self._parecer_pf_cache
+            if self.contexto_formulario is not None:
+                return self.contexto_formulario.get('parecer_pf') or {}
             
             # Tentar obter do repository
             parecer_pf = self.repository.extrair_parecer_pf()
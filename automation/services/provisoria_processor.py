@@ -3,16 +3,18 @@ ProvisoriaProcessor (Automação)
 Orquestra navegação + extração de dados + download/OCR + avaliação de elegibilidade
 para Naturalização Provisória, reaproveitando o código original via loader dinâmico.
 """
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional
 import re
+import time
 
 from automation.actions.provisoria_action import ProvisoriaAction
 from automation.services.provisoria_service import ProvisoriaService
+from automation.utils.tracing import iniciar_trace, finalizar_trace, span
 
 
 class ProvisoriaProcessor:
-    def __init__(self, driver):
-        self.lecom = ProvisoriaAction(driver)
+    def __init__(self, driver, perfil_navegador: Optional[str] = None):
+        self.lecom = ProvisoriaAction(driver, perfil_navegador=perfil_navegador)
         self.service = ProvisoriaService()
 
     def _digits(self, s: str) -> str:
@@ -31,20 +33,159 @@ class ProvisoriaProcessor:
                 textos[nome] = ''
         return textos
 
-    def processar_codigo(self, codigo: str) -> Dict[str, Any]:
-        resultado = {
+    def processar_codigo(self, codigo: str, triagem: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        tracer = iniciar_trace('provisoria', codigo=codigo)
+        resultado: Dict[str, Any] = {}
+        try:
+            resultado = self._processar_codigo(codigo, triagem)
+            return resultado
+        finally:
+            trace = finalizar_trace(tracer)
+            if trace and isinstance(resultado, dict):
+                resultado['tempos_etapas'] = trace.get('tempos_etapas', {})
+                resultado['trace'] = trace
+
+    # ===================== TRIAGEM EM DUAS FASES =====================
+    def triar_codigo(self, codigo: str) -> Dict[str, Any]:
+        """Fase barata: só data de nascimento, data inicial e parecer PF.
+
+        Retorna `resultado` preenchido quando os gatilhos (idade ≥ 18, ingresso
+        depois dos 10) já encerram o caso; `resultado` None = segue para documentos.
+        """
+        tracer = iniciar_trace('provisoria', codigo=codigo)
+        triagem: Dict[str, Any] = {'codigo': codigo, 'resultado': None}
+        try:
+            if not getattr(self.lecom, 'ja_logado', False):
+                with span('login'):
+                    if not self.lecom.login():
+                        triagem['resultado'] = self._resultado_base(codigo, erro='Falha no login no LECOM')
+                        return triagem
+            with span('triagem_navegacao'):
+                ok_nav = self.lecom.abrir_formulario_triagem(codigo)
+            if not ok_nav:
+                # Não descarta: a navegação completa da fase 2 tenta de novo
+                triagem['erro_triagem'] = 'Falha na navegação de triagem'
+                return triagem
+            with span('dados_pessoais'):
+                dados = self.lecom.extrair_dados_pessoais_formulario() or {}
+            data_inicial = getattr(self.lecom, 'data_inicial_processo', None)
+            with span('triagem_gatilhos'):
+                final, contexto = self.service.avaliar_gatilhos(self.lecom, dados, data_inicial)
+            triagem.update({
+                'dados': dados,
+                'data_inicial_processo': data_inicial,
+                'parecer_pf': contexto.get('parecer_pf'),
+            })
+            if final is not None and final.get('elegibilidade_final') == 'indeferimento_automatico':
+                triagem['resultado'] = self._normalizar(self._resultado_base(codigo), final)
+            elif final is None:
+                # Gatilhos atendidos: a fase 2 reaproveita dados e parecer PF
+                triagem['aprovada'] = True
+            return triagem
+        except Exception as e:
+            triagem['erro_triagem'] = str(e)
+            return triagem
+        finally:
+            trace = finalizar_trace(tracer)
+            if trace and triagem.get('resultado'):
+                triagem['resultado']['tempos_etapas'] = trace.get('tempos_etapas', {})
+                triagem['resultado']['trace'] = trace
+
+    def processar_em_duas_fases(
+        self,
+        codigos: List[str],
+        deve_parar: Optional[Callable[[], bool]] = None,
+        ao_resultado: Optional[Callable[[int, int, str, Dict[str, Any], str], None]] = None,
+    ) -> Dict[str, Any]:
+        """Triagem de todos os códigos e, depois, documentos/OCR só para os sobreviventes.
+
+        `ao_resultado(i, total, codigo, resultado, fase)` é chamado a cada código
+        concluído. Retorna {'resultados': [...] na ordem de `codigos`, 'relatorio': {...}}.
+        """
+        deve_parar = deve_parar or (lambda: False)
+        total = len(codigos)
+        resultados: Dict[int, Dict[str, Any]] = {}
+        sobreviventes: List[tuple] = []
+        motivos: Dict[str, int] = {}
+        concluidos = 0
+
+        inicio = time.perf_counter()
+        for idx, codigo in enumerate(codigos):
+            if deve_parar():
+                break
+            triagem = self.triar_codigo(codigo)
+            if triagem.get('resultado') is not None:
+                resultados[idx] = triagem['resultado']
+                motivo = (triagem['resultado'].get('analise_elegibilidade') or {}).get('motivo_final') or ''
+                chave = 'idade_18_ou_mais' if '(≥ 18)' in motivo else 'ingresso_10_anos'
+                motivos[chave] = motivos.get(chave, 0) + 1
+                concluidos += 1
+                if ao_resultado:
+                    ao_resultado(concluidos, total, codigo, triagem['resultado'], 'triagem')
+            else:
+                sobreviventes.append((idx, codigo, triagem))
+        tempo_triagem = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        processados_fase2 = 0
+        for idx, codigo, triagem in sobreviventes:
+            if deve_parar():
+                break
+            # Triagem inconclusiva (navegação/datas) refaz a extração pela navegação completa
+            resultado = self.processar_codigo(codigo, triagem if triagem.get('aprovada') else None)
+            resultados[idx] = resultado
+            processados_fase2 += 1
+            concluidos += 1
+            if ao_resultado:
+                ao_resultado(concluidos, total, codigo, resultado, 'documentos')
+        tempo_documentos = time.perf_counter() - inicio
+
+        encerrados = sum(motivos.values())
+        media_documentos = tempo_documentos / processados_fase2 if processados_fase2 else 0.0
+        relatorio = {
+            'total': total,
+            'encerrados_na_triagem': encerrados,
+            'motivos_triagem': motivos,
+            'seguiram_para_documentos': len(sobreviventes),
+            'documentos_evitados': encerrados * len(self.service.DOCS_PROVISORIA),
+            'navegacoes_completas_evitadas': encerrados,
+            'tempo_triagem_s': round(tempo_triagem, 2),
+            'tempo_documentos_s': round(tempo_documentos, 2),
+            'tempo_medio_documentos_s': round(media_documentos, 2),
+            'tempo_estimado_economizado_s': round(encerrados * media_documentos, 2),
+        }
+        return {
+            'resultados': [resultados[i] for i in sorted(resultados)],
+            'relatorio': relatorio,
+        }
+
+    def _resultado_base(self, codigo: str, erro: str = '') -> Dict[str, Any]:
+        return {
             'codigo': codigo,
             'status': 'erro',
-            'erro': '',
+            'erro': erro,
             'analise_elegibilidade': {},
             'documentos_processados': [],
             'total_documentos': 0,
         }
+
+    def _normalizar(self, resultado: Dict[str, Any], res_full: Dict[str, Any]) -> Dict[str, Any]:
+        resultado['analise_elegibilidade'] = res_full.get('analise_elegibilidade') or res_full
+        resultado['status'] = 'sucesso' if (res_full.get('status') or '').lower() not in ('erro', 'timeout') else 'erro'
+        resultado['erro'] = res_full.get('erro', '')
+        resultado['total_documentos'] = res_full.get('total_documentos', 0)
+        if 'documentos_processados' in res_full:
+            resultado['documentos_processados'] = res_full.get('documentos_processados')
+        return resultado
+
+    def _processar_codigo(self, codigo: str, triagem: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        resultado = self._resultado_base(codigo)
         try:
             # 1) Garantir LOGIN no LECOM (evita ficar em data:, página em branco)
             try:
                 if not getattr(self.lecom, 'ja_logado', False):
-                    ok_login = self.lecom.login()
+                    with span('login'):
+                        ok_login = self.lecom.login()
                     if not ok_login:
                         resultado['erro'] = 'Falha no login no LECOM'
                         return resultado
@@ -54,7 +195,8 @@ class ProvisoriaProcessor:
 
             # 2) Navegar para o processo (aplicar filtros)
             try:
-                ok_nav = self.lecom.aplicar_filtros(codigo)
+                with span('navegacao'):
+                    ok_nav = self.lecom.aplicar_filtros(codigo)
                 if not ok_nav:
                     resultado['erro'] = 'Falha na navegação para o processo'
                     return resultado
@@ -64,7 +206,13 @@ class ProvisoriaProcessor:
 
             # 3) Fluxo (placeholder): tentar pipeline completo caso disponível
             try:
-                res_full = self.service.analisar_fluxo_completo(self.lecom, codigo) or {}
+                with span('avaliacao'):
+                    if triagem:
+                        res_full = self.service.analisar_fluxo_completo(
+                            self.lecom, codigo, triagem.get('dados'), triagem.get('parecer_pf')
+                        ) or {}
+                    else:
+                        res_full = self.service.analisar_fluxo_completo(self.lecom, codigo) or {}
             except Exception:
                 # Fallback básico: extrair dados e avaliar se possível
                 try:
@@ -76,13 +224,7 @@ class ProvisoriaProcessor:
                     return resultado
 
             # 4) Normalizar saída
-            resultado['analise_elegibilidade'] = res_full.get('analise_elegibilidade') or res_full
-            resultado['status'] = 'sucesso' if (res_full.get('status') or '').lower() not in ('erro', 'timeout') else 'erro'
-            resultado['erro'] = res_full.get('erro', '')
-            resultado['total_documentos'] = res_full.get('total_documentos', 0)
-            if 'documentos_processados' in res_full:
-                resultado['documentos_processados'] = res_full.get('documentos_processados')
-            return resultado
+            return self._normalizar(resultado, res_full)
         except Exception as e:
             resultado['erro'] = str(e)
             return resultado
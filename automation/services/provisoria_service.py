@@ -2,11 +2,12 @@
 ProvisoriaService: coordena a avaliação de elegibilidade de Naturalização Provisória
 usando o analisador original (carregado dinamicamente) e expõe uma API simples.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 import re
 
 from automation.utils.date_utils import normalizar_data_para_ddmmaaaa
+from automation.utils.tracing import span
 
 
 class ProvisoriaService:
@@ -110,16 +111,19 @@ class ProvisoriaService:
         ]
         return any(re.search(p, t) for p in padroes)
 
-    def avaliar(self, lecom: Any, dados_formulario: Optional[Dict[str, Any]], data_inicial_processo: Optional[str], documentos_ja_baixados: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    def avaliar_gatilhos(self, lecom: Any, dados_formulario: Optional[Dict[str, Any]],
+                         data_inicial_processo: Optional[str],
+                         parecer_pf: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Etapa barata: idade na data inicial e ingresso antes dos 10 anos.
+
+        Retorna (resultado_final, contexto). `resultado_final` é o dict de
+        indeferimento/erro quando algum gatilho encerra a análise; None quando o
+        processo segue para a validação de documentos. O parecer PF só é lido
+        (via `lecom`) se não vier pronto e a idade for < 18.
+        """
         dados = dados_formulario or {}
         data_ref_dt = self._parse_data(data_inicial_processo or '')
-
-        # Preparar DocumentProvisoriaAction para downloads e validações
-        try:
-            from automation.actions.document_provisoria_action import DocumentProvisoriaAction
-            doc_action = DocumentProvisoriaAction(lecom.driver, lecom.wait)
-        except Exception:
-            doc_action = None
+        contexto: Dict[str, Any] = {}
 
         # 1) Gatilho: idade < 18 anos na data inicial
         idade_anos = None
@@ -136,7 +140,8 @@ class ProvisoriaService:
                 'idade_naturalizando': None,
                 'idade_entrada_brasil': None,
                 'data_residencia_inicial': None,
-            }
+            }, contexto
+        contexto['idade_anos'] = idade_anos
         if idade_anos >= 18:
             return {
                 'status': 'Indeferimento automático',
@@ -146,17 +151,19 @@ class ProvisoriaService:
                 'idade_naturalizando': idade_anos,
                 'idade_entrada_brasil': None,
                 'data_residencia_inicial': None,
-            }
+            }, contexto
 
         # 2) Gatilho: residência/ingresso no Brasil antes dos 10 anos
         # Estratégia: usar parecer PF como fonte prioritária
-        parecer_pf = {}
-        try:
-            parecer_pf = lecom.extrair_parecer_pf() or {}
-            print(f'[PARECER PF] Extraído: {parecer_pf.get("proposta_pf")}, Antes 10 anos: {parecer_pf.get("antes_10_anos")}')
-        except Exception as e:
-            print(f'[AVISO] Não foi possível extrair parecer PF: {e}')
-            parecer_pf = {}
+        if parecer_pf is None:
+            try:
+                with span('parecer_pf'):
+                    parecer_pf = lecom.extrair_parecer_pf() or {}
+                print(f'[PARECER PF] Extraído: {parecer_pf.get("proposta_pf")}, Antes 10 anos: {parecer_pf.get("antes_10_anos")}')
+            except Exception as e:
+                print(f'[AVISO] Não foi possível extrair parecer PF: {e}')
+                parecer_pf = {}
+        contexto['parecer_pf'] = parecer_pf
 
         antes10_ok = False
         idade_entrada = None
@@ -199,7 +206,33 @@ class ProvisoriaService:
                 'idade_entrada_brasil': idade_entrada,
                 'data_residencia_inicial': data_resid_dt.strftime('%d/%m/%Y') if data_resid_dt else None,
                 'parecer_pf': parecer_pf,
-            }
+            }, contexto
+
+        contexto.update({
+            'idade_entrada': idade_entrada,
+            'data_resid_dt': data_resid_dt,
+            'justificativa_gatilho': justificativa_gatilho,
+        })
+        return None, contexto
+
+    def avaliar(self, lecom: Any, dados_formulario: Optional[Dict[str, Any]], data_inicial_processo: Optional[str],
+                documentos_ja_baixados: Optional[Dict[str, str]] = None,
+                parecer_pf: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        final, contexto = self.avaliar_gatilhos(lecom, dados_formulario, data_inicial_processo, parecer_pf)
+        if final is not None:
+            return final
+        idade_anos = contexto['idade_anos']
+        idade_entrada = contexto['idade_entrada']
+        data_resid_dt = contexto['data_resid_dt']
+        justificativa_gatilho = contexto['justificativa_gatilho']
+        parecer_pf = contexto['parecer_pf']
+
+        # Preparar DocumentProvisoriaAction para downloads e validações
+        try:
+            from automation.actions.document_provisoria_action import DocumentProvisoriaAction
+            doc_action = DocumentProvisoriaAction(lecom.driver, lecom.wait)
+        except Exception:
+            doc_action = None
 
         # 3) Validar APENAS 4 documentos
         documentos_processados: list[dict] = []
@@ -216,7 +249,8 @@ class ProvisoriaService:
 
         for nome_doc in self.DOCS_PROVISORIA:
             try:
-                ok = doc_action.baixar_e_validar_documento_individual(nome_doc)
+                with span('documento', nome=nome_doc):
+                    ok = doc_action.baixar_e_validar_documento_individual(nome_doc)
             except Exception as e:
                 print(f'[ERRO] ProvisoriaService: Exceção ao validar {nome_doc}: {e}')
                 ok = False
@@ -244,17 +278,21 @@ class ProvisoriaService:
             'total_documentos': len(self.DOCS_PROVISORIA),
         }
 
-    def analisar_fluxo_completo(self, lecom: Any, codigo: str) -> Dict[str, Any]:
+    def analisar_fluxo_completo(self, lecom: Any, codigo: str, dados: Optional[Dict[str, Any]] = None,
+                                parecer_pf: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Fluxo completo usando a regra acima.
         - Garante dados (nome, filiação, data nasc.) via navegação atual
         - Avalia gatilhos e valida os 4 documentos
+        `dados`/`parecer_pf` já lidos na triagem evitam nova extração.
         """
         try:
-            try:
-                dados = lecom.extrair_dados_pessoais_formulario() or {}
-            except Exception:
-                dados = {}
-            return self.avaliar(lecom, dados, getattr(lecom, 'data_inicial_processo', None))
+            if dados is None:
+                try:
+                    with span('dados_pessoais'):
+                        dados = lecom.extrair_dados_pessoais_formulario() or {}
+                except Exception:
+                    dados = {}
+            return self.avaliar(lecom, dados, getattr(lecom, 'data_inicial_processo', None), parecer_pf=parecer_pf)
         except Exception as e:
             return {'status': 'Erro', 'erro': str(e)}
 
@@ -0,0 +1,340 @@
+"""
+Reavaliação em lote das regras de elegibilidade sobre casos arquivados.
+
+Lê as entradas dos casos como um fluxo (um caso por vez), distribui em um
+pool de processos e compara a decisão gravada com a decisão das regras
+atuais. Nada acessa navegador, OCR ou disco de resultados: cada processo
+monta uma única vez o service com I/O substituído e descarta os `print`
+das regras.
+
+Fontes:
+- ``artefatos``: pacotes de `automation/utils/artefatos_caso.py`
+  (Ordinária: `OrdinariaService.analisar_elegibilidade` com os textos de
+  OCR gravados; Definitiva: `AnalisadorElegibilidadeSimples`);
+- ``snapshots``: `dados_exportacao_ordinaria/*.json` (o mais recente por
+  processo);
+- ``global``: `resultados_ordinaria_global.json`.
+
+Os snapshots legados não guardam textos nem a data de nascimento: os
+documentos respondem com o resultado gravado de cada requisito e o
+Requisito I é reproduzido a partir de `requisitos.capacidade_civil`. O que
+é reavaliado de fato é a residência (texto do Parecer PF), os alertas PF e
+a consolidação da decisão.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+TAMANHO_JANELA = 2000
+DIRETORIO_SNAPSHOTS = 'dados_exportacao_ordinaria'
+ARQUIVO_GLOBAL = 'resultados_ordinaria_global.json'
+
+# Item do anexo em `documentos_faltantes` -> documento complementar
+_ITENS_COMPLEMENTARES = {
+    'Comprovante de tempo de residência': 'Não anexou item 8',
+    'Comprovante da situação cadastral do CPF': 'Não anexou item 4',
+    'Carteira de Registro Nacional Migratório': 'Não anexou item 3',
+    'Documento de viagem internacional': 'Não anexou item 2',
+}
+
+
+def normalizar_decisao(valor: Any) -> Optional[str]:
+    """Decisões de snapshots ('DEFERIMENTO') e do service ('deferimento') no mesmo vocabulário."""
+    if valor is None:
+        return None
+    texto = str(valor).strip().lower()
+    if texto.startswith('indeferimento'):
+        return 'indeferimento'
+    return texto or None
+
+
+# ---------------------------------------------------------------------- fontes
+
+
+def casos_de_artefatos(tipo: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    from automation.utils.artefatos_caso import obter_armazem_artefatos
+
+    for pacote in obter_armazem_artefatos().percorrer(tipo):
+        yield {'origem': 'artefato', 'tipo': pacote.get('tipo'), 'numero_processo': pacote.get('numero_processo'),
+               'dados': pacote}
+
+
+def casos_de_snapshots(diretorio: str = DIRETORIO_SNAPSHOTS) -> Iterator[Dict[str, Any]]:
+    """Snapshot mais recente de cada processo (nomes `ordinaria_<numero>_<AAAAMMDD_HHMMSS>.json`)."""
+    try:
+        nomes = sorted(n for n in os.listdir(diretorio) if n.endswith('.json'))
+    except OSError:
+        return
+    recentes: Dict[str, str] = {}
+    for nome in nomes:
+        m = re.match(r'ordinaria_(.+)_\d{8}_\d{6}\.json$', nome)
+        recentes[m.group(1) if m else nome] = nome  # ordem lexicográfica = cronológica
+    for nome in recentes.values():
+        try:
+            with open(os.path.join(diretorio, nome), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[AVISO] Snapshot ilegível {nome}: {e}")
+            continue
+        yield {'origem': 'snapshot', 'tipo': 'ordinaria', 'numero_processo': snapshot.get('numero_processo'),
+               'dados': snapshot}
+
+
+def casos_do_json_global(caminho: str = ARQUIVO_GLOBAL) -> Iterator[Dict[str, Any]]:
+    """Registros do JSON global (uma lista; o último registro de cada processo vale)."""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            registros = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[AVISO] JSON global indisponível ({caminho}): {e}")
+        return
+    ultimos: Dict[str, Dict[str, Any]] = {}
+    for registro in registros if isinstance(registros, list) else []:
+        if isinstance(registro, dict):
+            ultimos[str(registro.get('numero_processo'))] = registro
+    for snapshot in ultimos.values():
+        yield {'origem': 'global', 'tipo': 'ordinaria', 'numero_processo': snapshot.get('numero_processo'),
+               'dados': snapshot}
+
+
+# ------------------------------------------------------------ I/O substituído
+
+
+class DocumentosRegistrados:
+    """Substitui a DocumentAction para snapshots: cada documento responde com o resultado gravado."""
+
+    def __init__(self, validos: Dict[str, bool]) -> None:
+        self.validos = validos
+        self.ultimo_texto_ocr: Dict[str, str] = {}
+        self.estatisticas_ocr: Dict[str, Dict[str, Any]] = {}
+
+    def baixar_e_validar_documento_individual(self, nome_documento: str) -> bool:
+        return bool(self.validos.get(nome_documento))
+
+
+def entradas_de_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Entradas de `analisar_elegibilidade` reconstruídas de um snapshot legado."""
+    from automation.utils.date_utils import normalizar_data_para_ddmmaaaa
+
+    requisitos = snapshot.get('requisitos') or {}
+    faltantes = set((snapshot.get('documentos_complementares') or {}).get('documentos_faltantes') or [])
+    antecedentes = bool(requisitos.get('antecedentes_criminais'))
+    validos = {
+        'Comprovante de comunicação em português': bool(requisitos.get('comunicacao_portugues')),
+        'Certidão de antecedentes criminais (Brasil)': antecedentes,
+        'Atestado antecedentes criminais (país de origem)': antecedentes,
+    }
+    for documento, item in _ITENS_COMPLEMENTARES.items():
+        validos[documento] = item not in faltantes
+
+    data_inicial = snapshot.get('data_inicial') or ''
+    if requisitos.get('capacidade_civil'):
+        data_nascimento = '01/01/1900'
+    else:
+        try:
+            data_nascimento = normalizar_data_para_ddmmaaaa(data_inicial) or '01/01/1900'
+        except Exception:
+            data_nascimento = '01/01/1900'
+
+    parecer_pf = dict(snapshot.get('parecer_pf') or {})
+    contexto = {
+        'data_inicial_processo': data_inicial,
+        'parecer_pf': parecer_pf,
+        'reducao_hip_con': False,
+        'chpf_parecer': parecer_pf.get('parecer_texto') or None,
+        'conjuge': {'campo': False, 'tabela': False},
+        'filho': {'campo': False, 'tabela': False},
+    }
+    return {
+        'dados_pessoais': {'data_nascimento': data_nascimento, 'nome_completo': snapshot.get('nome')},
+        'data_inicial': data_inicial,
+        'contexto': contexto,
+        'documentos': DocumentosRegistrados(validos),
+    }
+
+
+# ------------------------------------------------------------- por processo
+
+_SERVICE = None
+_ANALISADOR_DEFINITIVA = None
+
+
+def _inicializar_processo(silenciar: bool = True) -> None:
+    """Um service por processo do pool; as regras escrevem muito no stdout."""
+    if silenciar:
+        sys.stdout = open(os.devnull, 'w')
+        logging.disable(logging.INFO)
+
+
+def _service_ordinaria():
+    global _SERVICE
+    if _SERVICE is None:
+        from automation.services.ordinaria_replay import criar_service_reavaliacao
+        _SERVICE = criar_service_reavaliacao()
+    return _SERVICE
+
+
+def _reavaliar_ordinaria(caso: Dict[str, Any]) -> Dict[str, Any]:
+    service = _service_ordinaria()
+    dados = caso['dados']
+    if caso['origem'] == 'artefato':
+        from automation.services.ordinaria_replay import reavaliar_artefato
+        resultado = reavaliar_artefato(dados, service)
+        antes = (dados.get('resultado') or {}).get('elegibilidade_final')
+    else:
+        entradas = entradas_de_snapshot(dados)
+        document_action = service.document_action
+        service.document_action = entradas['documentos']
+        try:
+            resultado = service.analisar_elegibilidade(
+                entradas['dados_pessoais'], entradas['data_inicial'], {}, contexto_formulario=entradas['contexto']
+            )
+        finally:
+            service.document_action = document_action
+        antes = dados.get('resultado_final')
+    return {
+        'antes': normalizar_decisao(antes),
+        'depois': normalizar_decisao(resultado.get('elegibilidade_final')),
+        'motivos_depois': resultado.get('motivos_indeferimento', []),
+    }
+
+
+def _reavaliar_definitiva(caso: Dict[str, Any]) -> Dict[str, Any]:
+    global _ANALISADOR_DEFINITIVA
+    if _ANALISADOR_DEFINITIVA is None:
+        from automation.services.definitiva_elegibilidade_simples import AnalisadorElegibilidadeSimples
+        _ANALISADOR_DEFINITIVA = AnalisadorElegibilidadeSimples()
+    dados = caso['dados']
+    resultado = _ANALISADOR_DEFINITIVA.analisar_elegibilidade(dados.get('documentos') or {}, dados.get('dados_formulario') or {})
+    return {
+        'antes': normalizar_decisao((dados.get('resultado') or {}).get('elegibilidade')),
+        'depois': normalizar_decisao(resultado.get('elegibilidade')),
+        'motivos_depois': [],
+    }
+
+
+def reavaliar_caso(caso: Dict[str, Any]) -> Dict[str, Any]:
+    """Reavalia um caso (executado nos processos do pool)."""
+    saida = {'numero_processo': caso.get('numero_processo'), 'origem': caso.get('origem'), 'tipo': caso.get('tipo')}
+    try:
+        if caso.get('tipo') == 'definitiva':
+            saida.update(_reavaliar_definitiva(caso))
+        else:
+            saida.update(_reavaliar_ordinaria(caso))
+        # Sem decisão gravada não há o que comparar: vai para o grupo das novas
+        saida['nova'] = saida['antes'] is None
+        saida['mudou'] = not saida['nova'] and saida['antes'] != saida['depois']
+    except Exception as e:
+        saida['erro'] = f"{e.__class__.__name__}: {e}"
+    return saida
+
+
+def _reavaliar_silencioso(caso: Dict[str, Any]) -> Dict[str, Any]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return reavaliar_caso(caso)
+
+
+# ------------------------------------------------------------------ execução
+
+
+def _janelas(casos: Iterable[Dict[str, Any]], tamanho: int) -> Iterator[List[Dict[str, Any]]]:
+    janela: List[Dict[str, Any]] = []
+    for caso in casos:
+        janela.append(caso)
+        if len(janela) >= tamanho:
+            yield janela
+            janela = []
+    if janela:
+        yield janela
+
+
+def executar(casos: Iterable[Dict[str, Any]], processos: Optional[int] = None,
+             limite_mudancas: int = 500) -> Dict[str, Any]:
+    """
+    Reavalia os casos e monta o relatório de diferenças.
+
+    Args:
+        casos: fluxo de casos (ver `casos_de_*`)
+        processos: tamanho do pool (padrão: núcleos da máquina; 1 = no próprio processo)
+        limite_mudancas: máximo de mudanças listadas individualmente
+
+    Returns:
+        Dict com totais, transições 'antes -> depois', mudanças, erros e as
+        decisões novas (casos sem decisão gravada, fora das transições)
+    """
+    processos = processos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    transicoes: Counter = Counter()
+    novas: Counter = Counter()
+    mudancas: List[Dict[str, Any]] = []
+    erros: List[Dict[str, Any]] = []
+    total = 0
+
+    def _acumular(saida: Dict[str, Any]) -> None:
+        nonlocal total
+        total += 1
+        if 'erro' in saida:
+            erros.append(saida)
+            return
+        if saida['nova']:
+            novas[str(saida['depois'])] += 1
+            return
+        transicoes[f"{saida['antes']} -> {saida['depois']}"] += 1
+        if saida['mudou'] and len(mudancas) < limite_mudancas:
+            mudancas.append(saida)
+
+    if processos <= 1:
+        desabilitado = logging.root.manager.disable
+        logging.disable(max(desabilitado, logging.INFO))
+        try:
+            for caso in casos:
+                _acumular(_reavaliar_silencioso(caso))
+        finally:
+            logging.disable(desabilitado)
+    else:
+        with multiprocessing.Pool(processos, initializer=_inicializar_processo) as pool:
+            for janela in _janelas(casos, TAMANHO_JANELA):
+                tamanho_bloco = max(1, len(janela) // (processos * 4))
+                for saida in pool.imap_unordered(reavaliar_caso, janela, chunksize=tamanho_bloco):
+                    _acumular(saida)
+
+    duracao = time.perf_counter() - inicio
+    mudaram = sum(n for chave, n in transicoes.items() if chave.split(' -> ')[0] != chave.split(' -> ')[1])
+    return {
+        'gerado_em': datetime.now().isoformat(),
+        'processos': processos,
+        'total': total,
+        'reavaliados': total - len(erros),
+        'mudaram': mudaram,
+        'novas': sum(novas.values()),
+        'erros': len(erros),
+        'transicoes': dict(transicoes.most_common()),
+        'decisoes_novas': dict(novas.most_common()),
+        'mudancas': mudancas,
+        'detalhe_erros': erros[:limite_mudancas],
+        'duracao_s': round(duracao, 2),
+        'casos_por_s': round(total / duracao, 1) if duracao > 0 else None,
+    }
+
+
+__all__ = [
+    'casos_de_artefatos',
+    'casos_de_snapshots',
+    'casos_do_json_global',
+    'entradas_de_snapshot',
+    'executar',
+    'normalizar_decisao',
+    'reavaliar_caso',
+]
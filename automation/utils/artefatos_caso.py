@@ -0,0 +1,185 @@
+"""
+Artefatos por caso para reavaliar as regras sem navegador nem OCR.
+
+Ao final de cada caso o processor grava um pacote compacto com tudo o que
+as regras consultam: snapshot do formulário (dados pessoais e contexto lido
+do DOM), `data_inicial_processo`, texto do Parecer PF e, para cada documento,
+o texto do OCR e o hash SHA-256 do conteúdo. O pacote é JSON comprimido
+(zlib) e criptografado (Fernet, chave em ARTEFATOS_CHAVE ou ENCRYPTION_KEY),
+gravado em `<dir>/<tipo>/<hash[:2]>/<numero>.bin`. O índice por número de
+processo é um JSONL só de acréscimos (`indice.jsonl`; a última linha de cada
+número vale), seguro com vários workers gravando ao mesmo tempo.
+
+Sem chave configurada (ou com ARTEFATOS_CASO=0) nada é gravado.
+
+Variáveis:
+    ARTEFATOS_DIR   diretório (padrão ~/.lecom_artefatos)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional
+
+VERSAO_ARTEFATO = 1
+ARQUIVO_INDICE = 'indice.jsonl'
+
+
+def _fernet():
+    chave = os.environ.get('ARTEFATOS_CHAVE') or os.environ.get('ENCRYPTION_KEY')
+    if not chave:
+        return None
+    try:
+        from cryptography.fernet import Fernet
+        return Fernet(chave.encode() if isinstance(chave, str) else chave)
+    except Exception as e:
+        print(f"[AVISO] Criptografia dos artefatos indisponível: {e}")
+        return None
+
+
+def hash_conteudo(origem: Any) -> Optional[str]:
+    """SHA-256 de bytes, de um `DocumentoCapturado` (já tem hash) ou de um arquivo."""
+    if origem is None:
+        return None
+    if getattr(origem, 'hash', None):
+        return origem.hash
+    if isinstance(origem, (bytes, bytearray)):
+        return hashlib.sha256(origem).hexdigest()
+    try:
+        h = hashlib.sha256()
+        with open(str(origem), 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+class ArmazemArtefatos:
+    """Grava e lê os pacotes de artefatos por número de processo."""
+
+    def __init__(self, diretorio: Optional[str] = None) -> None:
+        self.diretorio = diretorio or os.environ.get('ARTEFATOS_DIR') or os.path.join(
+            os.path.expanduser('~'), '.lecom_artefatos'
+        )
+        self.arquivo_indice = os.path.join(self.diretorio, ARQUIVO_INDICE)
+        self._lock = threading.Lock()
+        self._fernet = _fernet()
+        self.habilitado = (
+            self._fernet is not None
+            and os.environ.get('ARTEFATOS_CASO', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+        )
+
+    @staticmethod
+    def _nome_arquivo(numero_processo: str) -> str:
+        return re.sub(r'[^0-9A-Za-z_-]', '_', str(numero_processo)) or 'sem_numero'
+
+    def _caminho_relativo(self, tipo: str, numero_processo: str) -> str:
+        fragmento = hashlib.sha256(str(numero_processo).encode('utf-8')).hexdigest()[:2]
+        return os.path.join(tipo, fragmento, f"{self._nome_arquivo(numero_processo)}.bin")
+
+    # ------------------------------------------------------------------ escrita
+
+    def salvar(self, tipo: str, numero_processo: str, artefato: Dict[str, Any]) -> Optional[str]:
+        """Grava o pacote do caso (substitui o anterior) e acrescenta a entrada no índice."""
+        if not self.habilitado:
+            return None
+        pacote = dict(artefato)
+        pacote.update({
+            'versao': VERSAO_ARTEFATO,
+            'tipo': tipo,
+            'numero_processo': numero_processo,
+            'gravado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        dados = self._fernet.encrypt(zlib.compress(
+            json.dumps(pacote, ensure_ascii=False, default=str).encode('utf-8'), 6
+        ))
+        relativo = self._caminho_relativo(tipo, numero_processo)
+        caminho = os.path.join(self.diretorio, relativo)
+        try:
+            os.makedirs(os.path.dirname(caminho), mode=0o700, exist_ok=True)
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(dados)
+            os.replace(temporario, caminho)
+            entrada = {
+                'numero_processo': numero_processo,
+                'tipo': tipo,
+                'caminho': relativo,
+                'gravado_em': pacote['gravado_em'],
+                'tamanho': len(dados),
+            }
+            with self._lock, open(self.arquivo_indice, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"[AVISO] Não foi possível gravar o artefato de {numero_processo}: {e}")
+            return None
+        print(f"[SALVO] Artefato do caso {numero_processo} ({len(dados) / 1024:.1f} KB)")
+        return caminho
+
+    # ------------------------------------------------------------------ leitura
+
+    def indice(self, tipo: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Entrada mais recente de cada número de processo (opcionalmente de um tipo)."""
+        entradas: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.arquivo_indice, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        entrada = json.loads(linha)
+                    except ValueError:
+                        continue  # linha truncada por queda do worker
+                    if tipo is None or entrada.get('tipo') == tipo:
+                        entradas[str(entrada.get('numero_processo'))] = entrada
+        except OSError:
+            pass
+        return entradas
+
+    def carregar(self, numero_processo: str, tipo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Pacote do caso; None se não houver ou não puder ser lido."""
+        if self._fernet is None:
+            print("[ERRO] Sem ARTEFATOS_CHAVE/ENCRYPTION_KEY não é possível ler artefatos")
+            return None
+        entrada = self.indice(tipo).get(str(numero_processo))
+        if entrada is None:
+            return None
+        return self._ler(os.path.join(self.diretorio, entrada['caminho']))
+
+    def _ler(self, caminho: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(caminho, 'rb') as f:
+                return json.loads(zlib.decompress(self._fernet.decrypt(f.read())).decode('utf-8'))
+        except Exception as e:
+            print(f"[AVISO] Artefato ilegível ({os.path.basename(caminho)}): {e.__class__.__name__}")
+            return None
+
+    def percorrer(self, tipo: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Itera pelos pacotes do índice, um por vez (sem carregar todos em memória)."""
+        if self._fernet is None:
+            return
+        for entrada in self.indice(tipo).values():
+            pacote = self._ler(os.path.join(self.diretorio, entrada['caminho']))
+            if pacote is not None:
+                yield pacote
+
+
+_ARMAZEM: Optional[ArmazemArtefatos] = None
+_ARMAZEM_LOCK = threading.Lock()
+
+
+def obter_armazem_artefatos() -> ArmazemArtefatos:
+    """Armazém compartilhado do processo."""
+    global _ARMAZEM
+    with _ARMAZEM_LOCK:
+        if _ARMAZEM is None:
+            _ARMAZEM = ArmazemArtefatos()
+        return _ARMAZEM
+
+
+__all__ = ['ArmazemArtefatos', 'hash_conteudo', 'obter_armazem_artefatos', 'VERSAO_ARTEFATO']
@@ -0,0 +1,75 @@
+"""
+Endereços do LECOM e do OCR externo, configuráveis por variável de ambiente.
+
+Por padrão apontam para o ambiente de produção. Para rodar contra o
+simulador local (`scripts/lecom_simulador.py`):
+
+    LECOM_URL=http://127.0.0.1:5055/bpm
+    MISTRAL_API_URL=http://127.0.0.1:5055
+
+`LECOM_BASE_URL` pode ser definido explicitamente; caso contrário é derivado
+do esquema + host de `LECOM_URL`.
+"""
+
+from __future__ import annotations
+
+import os
+from urllib.parse import urlencode, urlsplit
+
+try:
+    from dotenv import load_dotenv
+
+    # Mesmo .env usado pelas actions (raiz do projeto)
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
+except ImportError:
+    pass
+
+_PADRAO_LECOM_URL = 'https://justica.servicos.gov.br/bpm'
+
+
+def _base_de(url: str) -> str:
+    partes = urlsplit(url)
+    return f'{partes.scheme}://{partes.netloc}'
+
+
+LECOM_URL = os.environ.get('LECOM_URL', _PADRAO_LECOM_URL).strip() or _PADRAO_LECOM_URL
+LECOM_BASE_URL = (os.environ.get('LECOM_BASE_URL') or _base_de(LECOM_URL)).rstrip('/')
+LECOM_HOST = urlsplit(LECOM_BASE_URL).netloc
+
+# Base da API Mistral (o SDK acrescenta /v1/...); vazio = padrão do SDK
+MISTRAL_API_URL = (os.environ.get('MISTRAL_API_URL') or '').rstrip('/')
+
+
+def url_workspace(barra_final: bool = False) -> str:
+    return f"{LECOM_BASE_URL}/workspace{'/' if barra_final else ''}"
+
+
+def url_fluxo(numero_limpo: str) -> str:
+    return f'{LECOM_BASE_URL}/workspace/flow/{numero_limpo}'
+
+
+def url_form_web(process_instance_id: str, **params) -> str:
+    query = urlencode({'processInstanceId': process_instance_id, **params})
+    return f'{LECOM_BASE_URL}/form-web?{query}'
+
+
+def url_mistral_chat() -> str:
+    return f"{MISTRAL_API_URL or 'https://api.mistral.ai'}/v1/chat/completions"
+
+
+def esta_no_lecom(url: str) -> bool:
+    """True se a URL pertence ao host LECOM configurado."""
+    return bool(url) and LECOM_HOST in url
+
+
+__all__ = [
+    'LECOM_URL',
+    'LECOM_BASE_URL',
+    'LECOM_HOST',
+    'MISTRAL_API_URL',
+    'url_workspace',
+    'url_fluxo',
+    'url_form_web',
+    'url_mistral_chat',
+    'esta_no_lecom',
+]
@@ -0,0 +1,250 @@
+"""
+Leitura em streaming dos códigos de processo de uma planilha enviada.
+
+Os lotes chegam como .xlsx ou .csv com uma coluna de códigos. Aqui a planilha
+é lida linha a linha (openpyxl em modo `read_only` ou `csv.reader` sobre o
+arquivo aberto), então o primeiro código sai assim que o cabeçalho é lido e a
+memória não cresce com o tamanho do arquivo (só o conjunto de códigos já
+vistos, para descartar duplicados).
+
+A coluna é localizada só pelo cabeçalho: o nome pedido, `codigo`/`código`
+(inclusive a variante corrompida `cf3digo`) ou, em último caso, a primeira
+coluna. Cada código é normalizado (espaços e separadores `.`/`,` removidos).
+
+    leitor = LeitorCodigos(caminho, 'codigo')
+    for codigo in leitor:
+        ...
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import unicodedata
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+EXTENSOES_CSV = ('.csv', '.txt')
+COLUNA_PADRAO = 'codigo'
+# 'código' gravado em latin-1 e relido como texto escapado
+VARIANTES_CODIGO = ('codigo', 'cf3digo', 'c\\xf3digo')
+BLOCO_CONTAGEM = 1 << 20
+
+
+def normalizar_cabecalho(valor: Any) -> str:
+    """Minúsculas, sem acentos e sem espaços nas pontas."""
+    texto = str(valor if valor is not None else '').strip().lower()
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def normalizar_codigo(valor: Any) -> Optional[str]:
+    """Código como texto sem espaços e sem separadores; None para célula vazia."""
+    if valor is None:
+        return None
+    if isinstance(valor, float):
+        if valor != valor:  # NaN
+            return None
+        if valor.is_integer():
+            valor = int(valor)
+    texto = str(valor).strip().replace('.', '').replace(',', '')
+    return texto or None
+
+
+def localizar_coluna(cabecalho: Iterable[Any], nome: Optional[str] = COLUNA_PADRAO,
+                     primeira_se_ausente: bool = True) -> Optional[int]:
+    """Índice da coluna de códigos no cabeçalho (None se não houver)."""
+    nomes = [normalizar_cabecalho(c) for c in cabecalho]
+    alvo = normalizar_cabecalho(nome or COLUNA_PADRAO)
+    for candidato in (alvo,) + VARIANTES_CODIGO:
+        if candidato in nomes:
+            return nomes.index(candidato)
+    for indice, texto in enumerate(nomes):
+        if any(variante in texto for variante in VARIANTES_CODIGO):
+            return indice
+    if primeira_se_ausente and nomes:
+        return 0
+    return None
+
+
+class ColunaCodigoNaoEncontrada(ValueError):
+    """Cabeçalho sem coluna de códigos (com `primeira_se_ausente=False`)."""
+
+
+class LeitorCodigos:
+    """Gerador de códigos normalizados e sem duplicados de uma planilha."""
+
+    def __init__(self, caminho: str, coluna: Optional[str] = COLUNA_PADRAO,
+                 deduplicar: bool = True, primeira_se_ausente: bool = True) -> None:
+        self.caminho = caminho
+        self.coluna = coluna or COLUNA_PADRAO
+        self.deduplicar = deduplicar
+        self.primeira_se_ausente = primeira_se_ausente
+        self.coluna_encontrada: Optional[str] = None
+        self.lidos = 0
+        self.duplicados = 0
+        self.vazios = 0
+
+    @property
+    def _csv(self) -> bool:
+        return os.path.splitext(self.caminho.lower())[1] in EXTENSOES_CSV
+
+    def __iter__(self) -> Iterator[str]:
+        vistos = set()
+        for valor in self._valores():
+            codigo = normalizar_codigo(valor)
+            if codigo is None:
+                self.vazios += 1
+                continue
+            if self.deduplicar:
+                if codigo in vistos:
+                    self.duplicados += 1
+                    continue
+                vistos.add(codigo)
+            self.lidos += 1
+            yield codigo
+
+    def _escolher(self, cabecalho: List[Any]) -> int:
+        indice = localizar_coluna(cabecalho, self.coluna, self.primeira_se_ausente)
+        if indice is None:
+            raise ColunaCodigoNaoEncontrada(f"Coluna '{self.coluna}' não encontrada em {os.path.basename(self.caminho)}")
+        self.coluna_encontrada = str(cabecalho[indice])
+        return indice
+
+    def _valores(self) -> Iterator[Any]:
+        ext = os.path.splitext(self.caminho.lower())[1]
+        if self._csv:
+            yield from self._valores_csv()
+        elif ext == '.xls':
+            yield from self._valores_xls()
+        else:
+            yield from self._valores_xlsx()
+
+    def _valores_xlsx(self) -> Iterator[Any]:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(self.caminho, read_only=True, data_only=True)
+        try:
+            linhas = wb.worksheets[0].iter_rows(values_only=True)
+            cabecalho = next(linhas, None)
+            if not cabecalho:
+                return
+            indice = self._escolher(list(cabecalho))
+            for linha in linhas:
+                yield linha[indice] if linha and indice < len(linha) else None
+        finally:
+            wb.close()
+
+    def _valores_xls(self) -> Iterator[Any]:
+        # Formato binário antigo: sem leitor incremental, lê só o cabeçalho e depois a coluna
+        import pandas as pd
+
+        cabecalho = list(pd.read_excel(self.caminho, nrows=0).columns)
+        if not cabecalho:
+            return
+        indice = self._escolher(cabecalho)
+        serie = pd.read_excel(self.caminho, usecols=[indice], dtype=str).iloc[:, 0]
+        for valor in serie:
+            yield None if pd.isna(valor) else valor
+
+    def _codificacao(self) -> str:
+        with open(self.caminho, 'rb') as f:
+            amostra = f.read(64 * 1024)
+        try:
+            amostra.decode('utf-8')
+        except UnicodeDecodeError as e:
+            # Amostra cortada no meio de um caractere multibyte ainda é UTF-8
+            if e.start < len(amostra) - 3:
+                return 'latin-1'
+        return 'utf-8-sig'
+
+    def _valores_csv(self) -> Iterator[Any]:
+        with open(self.caminho, 'r', encoding=self._codificacao(), newline='') as f:
+            primeira = f.readline()
+            if not primeira.strip():
+                return
+            try:
+                dialeto = csv.Sniffer().sniff(primeira, delimiters=',;\t|')
+            except csv.Error:
+                dialeto = csv.excel
+            cabecalho = next(csv.reader(io.StringIO(primeira), dialeto))
+            indice = self._escolher(cabecalho)
+            for linha in csv.reader(f, dialeto):
+                if linha:
+                    yield linha[indice] if indice < len(linha) else None
+
+    def estimar_total(self) -> Optional[int]:
+        """
+        Linhas de dados da planilha (sem o cabeçalho), para o progresso.
+
+        É um teto: inclui vazios e duplicados. No .xlsx vem da dimensão
+        gravada na planilha (None se o arquivo não a tiver); no .csv conta as
+        quebras de linha em blocos, sem decodificar.
+        """
+        try:
+            if self._csv:
+                linhas = 0
+                ultimo = b'\n'
+                with open(self.caminho, 'rb') as f:
+                    while True:
+                        bloco = f.read(BLOCO_CONTAGEM)
+                        if not bloco:
+                            break
+                        linhas += bloco.count(b'\n')
+                        ultimo = bloco[-1:]
+                if ultimo != b'\n':
+                    linhas += 1
+                return max(0, linhas - 1)
+            if os.path.splitext(self.caminho.lower())[1] == '.xls':
+                return None
+            from openpyxl import load_workbook
+
+            wb = load_workbook(self.caminho, read_only=True)
+            try:
+                max_row = wb.worksheets[0].max_row
+            finally:
+                wb.close()
+            return max(0, max_row - 1) if max_row else None
+        except Exception:
+            return None
+
+
+def abrir_codigos(caminho: str, coluna: Optional[str] = COLUNA_PADRAO) -> Tuple[LeitorCodigos, Iterator[str]]:
+    """
+    Abre a planilha e já lê o primeiro código (antes de abrir o navegador).
+
+    Devolve o leitor (coluna, contadores, `estimar_total`) e o gerador com
+    todos os códigos; ValueError se a planilha não tiver nenhum. Chame
+    `close()` no gerador para liberar o arquivo antes de apagá-lo.
+    """
+    leitor = LeitorCodigos(caminho, coluna)
+    codigos = iter(leitor)
+    primeiro = next(codigos, None)
+    if primeiro is None:
+        raise ValueError('Nenhum código encontrado na planilha')
+    return leitor, _com_primeiro(primeiro, codigos)
+
+
+def _com_primeiro(primeiro: str, resto: Iterator[str]) -> Iterator[str]:
+    # Gerador (e não itertools.chain) para que close() também feche a planilha
+    try:
+        yield primeiro
+        yield from resto
+    finally:
+        resto.close()
+
+
+def ler_codigos(caminho: str, coluna: Optional[str] = COLUNA_PADRAO, deduplicar: bool = True) -> Iterator[str]:
+    """Atalho: gera os códigos de `caminho` (ver `LeitorCodigos`)."""
+    return iter(LeitorCodigos(caminho, coluna, deduplicar=deduplicar))
+
+
+__all__ = [
+    'LeitorCodigos',
+    'ColunaCodigoNaoEncontrada',
+    'abrir_codigos',
+    'ler_codigos',
+    'localizar_coluna',
+    'normalizar_codigo',
+    'normalizar_cabecalho',
+]
@@ -0,0 +1,195 @@
+"""
+Lista de trabalho durável (pré-coleta da caixa de entrada).
+
+A caixa de entrada é percorrida uma única vez (todas as páginas) e os itens
+(`codigo`, `href`) são gravados em JSON. Cada item passa por
+pendente -> em_andamento -> concluido/falha e o arquivo é regravado
+atomicamente a cada transição: se o worker cair, a próxima execução
+retoma a mesma lista a partir dos itens não concluídos (itens que ficaram
+`em_andamento` voltam para a fila).
+
+A retomada vale só dentro da janela da coleta (mesmo dia e até
+LISTA_TRABALHO_MAX_HORAS desde a coleta): fora dela a lista é descartada e
+a caixa é coletada de novo. Ao retomar, a caixa de entrada é percorrida
+outra vez e `reconciliar` tira da fila os itens que já não estão nela
+(status `fora_da_caixa`), para que nada seja reaberto ou decidido a partir
+de uma lista velha.
+
+Vários consumidores (um por navegador) podem pegar itens da mesma lista
+em paralelo; o acesso é serializado por um lock.
+
+Variáveis:
+    LISTA_TRABALHO_DIR        diretório das listas (padrão ~/.lecom_listas)
+    LISTA_TRABALHO_MAX_HORAS  idade máxima da coleta para retomar (padrão 8)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+PENDENTE = 'pendente'
+EM_ANDAMENTO = 'em_andamento'
+CONCLUIDO = 'concluido'
+FALHA = 'falha'
+FORA_DA_CAIXA = 'fora_da_caixa'
+
+MAX_HORAS_PADRAO = 8.0
+
+
+def caminho_padrao(nome: str) -> str:
+    diretorio = os.environ.get('LISTA_TRABALHO_DIR') or os.path.join(os.path.expanduser('~'), '.lecom_listas')
+    return os.path.join(diretorio, f"{nome}.json")
+
+
+class ListaTrabalho:
+    """Itens pré-coletados com estado persistido em disco."""
+
+    def __init__(self, caminho: str, max_tentativas: int = 2, max_idade_s: Optional[float] = None) -> None:
+        self.caminho = caminho
+        self.max_tentativas = max_tentativas
+        if max_idade_s is None:
+            max_idade_s = float(os.environ.get('LISTA_TRABALHO_MAX_HORAS', MAX_HORAS_PADRAO)) * 3600.0
+        self.max_idade_s = max_idade_s
+        self._lock = threading.Lock()
+        self._dados: Dict[str, Any] = {'criada_em': None, 'itens': []}
+        self._carregar()
+
+    # ------------------------------------------------------------------ disco
+
+    def _carregar(self) -> None:
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(dados, dict) and isinstance(dados.get('itens'), list):
+            # Itens interrompidos no meio voltam para a fila
+            for item in dados['itens']:
+                if item.get('status') == EM_ANDAMENTO:
+                    item['status'] = PENDENTE
+            self._dados = dados
+
+    def _gravar(self) -> None:
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        self._dados['atualizada_em'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._dados, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+    # ------------------------------------------------------------------ API
+
+    @property
+    def itens(self) -> List[Dict[str, Any]]:
+        return self._dados['itens']
+
+    def expirada(self) -> bool:
+        """Coleta de outro dia, mais velha que `max_idade_s` ou sem horário de coleta."""
+        coletada_em = self._dados.get('coletada_em')
+        if not isinstance(coletada_em, (int, float)):
+            return True
+        if datetime.fromtimestamp(coletada_em).date() != date.today():
+            return True
+        return time.time() - coletada_em > self.max_idade_s
+
+    def retomavel(self) -> bool:
+        """Há itens ainda não concluídos de uma coleta ainda válida (ver `expirada`)."""
+        with self._lock:
+            return not self.expirada() and any(self._disponivel(item) for item in self.itens)
+
+    def reconciliar(self, itens_caixa: Iterable[Dict[str, Any]]) -> int:
+        """Confere a fila com uma coleta nova da caixa de entrada.
+
+        Itens ainda disponíveis que não estão mais na caixa passam a
+        `fora_da_caixa`; os que continuam recebem o href atual. Devolve
+        quantos saíram da fila.
+        """
+        atuais: Dict[str, Optional[str]] = {}
+        for item in itens_caixa:
+            chave = item.get('codigo') if item.get('codigo') not in (None, 'DESCONHECIDO') else item.get('href')
+            if chave:
+                atuais[chave] = item.get('href')
+        removidos = 0
+        with self._lock:
+            for item in self.itens:
+                if not self._disponivel(item):
+                    continue
+                chave = item.get('codigo') if item.get('codigo') not in (None, 'DESCONHECIDO') else item.get('href')
+                if chave in atuais:
+                    item['href'] = atuais[chave] or item.get('href')
+                else:
+                    item['status'] = FORA_DA_CAIXA
+                    removidos += 1
+            self._dados['reconciliada_em'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            self._gravar()
+        return removidos
+
+    def substituir(self, itens: List[Dict[str, Any]]) -> None:
+        """Começa uma lista nova com os itens coletados (deduplicados por href/código)."""
+        vistos = set()
+        novos: List[Dict[str, Any]] = []
+        for item in itens:
+            chave = item.get('href') or item.get('codigo')
+            if not chave or chave in vistos:
+                continue
+            vistos.add(chave)
+            novos.append({
+                'codigo': item.get('codigo') or 'DESCONHECIDO',
+                'href': item.get('href'),
+                'status': PENDENTE,
+                'tentativas': 0,
+            })
+        with self._lock:
+            self._dados = {'criada_em': time.strftime('%Y-%m-%dT%H:%M:%S'), 'coletada_em': time.time(), 'itens': novos}
+            self._gravar()
+
+    def _disponivel(self, item: Dict[str, Any]) -> bool:
+        return item.get('status') == PENDENTE or (
+            item.get('status') == FALHA and int(item.get('tentativas', 0)) < self.max_tentativas
+        )
+
+    def proximo(self) -> Optional[Dict[str, Any]]:
+        """Reserva o próximo item disponível (None quando a lista acabou)."""
+        with self._lock:
+            for item in self.itens:
+                if self._disponivel(item):
+                    item['status'] = EM_ANDAMENTO
+                    item['tentativas'] = int(item.get('tentativas', 0)) + 1
+                    self._gravar()
+                    return dict(item)
+        return None
+
+    def _marcar(self, codigo: str, href: Optional[str], status: str, **extras: Any) -> None:
+        with self._lock:
+            for item in self.itens:
+                if item.get('codigo') == codigo and item.get('href') == href:
+                    item['status'] = status
+                    item.update(extras)
+                    break
+            self._gravar()
+
+    def concluir(self, item: Dict[str, Any], resultado: Optional[Dict[str, Any]] = None) -> None:
+        self._marcar(item.get('codigo'), item.get('href'), CONCLUIDO, resultado=resultado)
+
+    def falhar(self, item: Dict[str, Any], erro: str) -> None:
+        self._marcar(item.get('codigo'), item.get('href'), FALHA, erro=erro)
+
+    def resultados(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [item['resultado'] for item in self.itens if item.get('status') == CONCLUIDO and item.get('resultado')]
+
+    def resumo(self) -> Dict[str, int]:
+        with self._lock:
+            contagem = {PENDENTE: 0, EM_ANDAMENTO: 0, CONCLUIDO: 0, FALHA: 0, FORA_DA_CAIXA: 0}
+            for item in self.itens:
+                contagem[item.get('status', PENDENTE)] = contagem.get(item.get('status', PENDENTE), 0) + 1
+            contagem['total'] = len(self.itens)
+            return contagem
+
+
+__all__ = ['ListaTrabalho', 'caminho_padrao', 'PENDENTE', 'EM_ANDAMENTO', 'CONCLUIDO', 'FALHA', 'FORA_DA_CAIXA']
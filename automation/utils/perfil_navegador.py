@@ -0,0 +1,196 @@
+"""
+Perfis do Chrome usados pelas actions do LECOM.
+
+- ``padrao``: o Chrome visível de sempre (nada muda).
+- ``desempenho``: headless=new, viewport reduzido, sem rede em segundo
+  plano, com bloqueio via CDP (`Network.setBlockedURLs`) de fontes,
+  mídia, analytics e widgets de chat, e imagens desligadas nas páginas.
+  Cada sessão recebe o seu próprio diretório temporário de download via
+  `Page.setDownloadBehavior` (obrigatório no headless): workers
+  simultâneos não disputam o "arquivo mais novo" de ~/Downloads. As
+  actions de documento consultam `diretorio_download(driver)`; o
+  diretório criado aqui é apagado por `liberar_diretorio_download(driver)`
+  ao fechar o driver (ou quando o driver é coletado).
+
+O perfil é escolhido por worker (argumento `perfil_navegador`) ou, na
+falta dele, por LECOM_PERFIL_NAVEGADOR. Padrões extras de bloqueio podem
+ser acrescentados em LECOM_URLS_BLOQUEADAS (separados por vírgula).
+
+Imagens não entram no `setBlockedURLs` por padrão: os anexos do LECOM
+podem ser JPG/PNG e o bloqueio por URL não distingue o download do
+documento de uma imagem da página. Elas são desligadas pela preferência
+de conteúdo do Chrome, que não afeta downloads.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
+
+PERFIL_PADRAO = 'padrao'
+PERFIL_DESEMPENHO = 'desempenho'
+PERFIS = (PERFIL_PADRAO, PERFIL_DESEMPENHO)
+
+TAMANHO_JANELA_DESEMPENHO = (1280, 800)
+
+# Padrões do Network.setBlockedURLs (curinga '*')
+URLS_BLOQUEADAS_PADRAO = [
+    # Fontes e mídia
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3',
+    # Analytics / rastreamento
+    '*google-analytics.com*', '*googletagmanager.com*', '*gtag/js*', '*analytics.js*',
+    '*doubleclick.net*', '*hotjar.com*', '*clarity.ms*', '*connect.facebook.net*',
+    # Widgets de chat
+    '*tawk.to*', '*zendesk.com*', '*zdassets.com*', '*intercom.io*', '*livechatinc.com*',
+    '*chat-widget*',
+]
+
+ARGUMENTOS_DESEMPENHO = [
+    '--headless=new',
+    '--disable-gpu',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-translate',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--mute-audio',
+    '--hide-scrollbars',
+]
+
+PREFS_DESEMPENHO = {
+    'profile.managed_default_content_settings.images': 2,
+}
+
+
+def resolver_perfil(perfil: Optional[str] = None) -> str:
+    """Perfil explícito ou LECOM_PERFIL_NAVEGADOR; valores desconhecidos voltam ao padrão."""
+    valor = (perfil or os.environ.get('LECOM_PERFIL_NAVEGADOR') or PERFIL_PADRAO).strip().lower()
+    if valor not in PERFIS:
+        print(f"[AVISO] Perfil de navegador desconhecido '{valor}'; usando '{PERFIL_PADRAO}'")
+        return PERFIL_PADRAO
+    return valor
+
+
+def urls_bloqueadas() -> List[str]:
+    extras = [p.strip() for p in os.environ.get('LECOM_URLS_BLOQUEADAS', '').split(',') if p.strip()]
+    return URLS_BLOQUEADAS_PADRAO + [p for p in extras if p not in URLS_BLOQUEADAS_PADRAO]
+
+
+def aplicar_perfil_desempenho(chrome_options: Any, prefs: Dict[str, Any]) -> None:
+    """Acrescenta argumentos e preferências do perfil de desempenho (antes de criar o driver)."""
+    for argumento in ARGUMENTOS_DESEMPENHO:
+        chrome_options.add_argument(argumento)
+    largura, altura = TAMANHO_JANELA_DESEMPENHO
+    chrome_options.add_argument(f'--window-size={largura},{altura}')
+    prefs.update(PREFS_DESEMPENHO)
+
+
+# Diretório de download de cada driver configurado via CDP
+_DIRETORIOS: 'weakref.WeakKeyDictionary[Any, str]' = weakref.WeakKeyDictionary()
+# Limpeza dos diretórios temporários criados por este módulo (os passados
+# pelo chamador nunca são apagados)
+_LIMPEZAS: 'weakref.WeakKeyDictionary[Any, weakref.finalize]' = weakref.WeakKeyDictionary()
+_DIRETORIOS_LOCK = threading.Lock()
+
+
+def diretorio_download_padrao() -> str:
+    return os.path.join(os.path.expanduser('~'), 'Downloads')
+
+
+def criar_diretorio_download() -> str:
+    """Diretório temporário exclusivo de uma sessão (base em LECOM_DOWNLOADS_DIR, se definida)."""
+    base = os.environ.get('LECOM_DOWNLOADS_DIR') or None
+    if base:
+        os.makedirs(base, exist_ok=True)
+    return tempfile.mkdtemp(prefix='lecom_download_', dir=base)
+
+
+def diretorio_download(driver: Any) -> str:
+    """Onde os downloads deste driver caem (~/Downloads se a sessão não tiver um próprio)."""
+    try:
+        with _DIRETORIOS_LOCK:
+            diretorio = _DIRETORIOS.get(driver)
+    except TypeError:
+        diretorio = None
+    return diretorio or diretorio_download_padrao()
+
+
+def liberar_diretorio_download(driver: Any) -> None:
+    """Apaga o diretório temporário de download do driver (chamar ao fechá-lo)."""
+    try:
+        with _DIRETORIOS_LOCK:
+            _DIRETORIOS.pop(driver, None)
+            limpeza = _LIMPEZAS.pop(driver, None)
+    except TypeError:
+        return
+    if limpeza is not None:
+        limpeza()
+
+
+def configurar_sessao_cdp(driver: Any, diretorio: Optional[str] = None,
+                          bloquear: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Aplica bloqueio de URLs e comportamento de download na sessão já aberta.
+
+    Sem `diretorio`, a sessão ganha um diretório temporário só seu.
+
+    Returns:
+        Dict com o que foi aplicado (`urls_bloqueadas`, `download`, `diretorio_download`)
+    """
+    aplicado: Dict[str, Any] = {'urls_bloqueadas': 0, 'download': False, 'diretorio_download': None}
+    padroes = urls_bloqueadas() if bloquear is None else bloquear
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': padroes})
+        aplicado['urls_bloqueadas'] = len(padroes)
+    except Exception as e:
+        print(f"[AVISO] Bloqueio de URLs via CDP indisponível: {e}")
+    try:
+        temporario = not diretorio
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        else:
+            diretorio = criar_diretorio_download()
+        try:
+            driver.execute_cdp_cmd('Page.setDownloadBehavior', {
+                'behavior': 'allow',
+                'downloadPath': diretorio,
+            })
+        except Exception:
+            if temporario:
+                shutil.rmtree(diretorio, ignore_errors=True)
+            raise
+        liberar_diretorio_download(driver)
+        with _DIRETORIOS_LOCK:
+            _DIRETORIOS[driver] = diretorio
+            if temporario:
+                # Também roda se o driver for coletado sem passar pelo fechamento
+                _LIMPEZAS[driver] = weakref.finalize(driver, shutil.rmtree, diretorio, True)
+        aplicado['download'] = True
+        aplicado['diretorio_download'] = diretorio
+    except Exception as e:
+        print(f"[AVISO] Page.setDownloadBehavior indisponível: {e}")
+    return aplicado
+
+
+__all__ = [
+    'PERFIL_DESEMPENHO',
+    'PERFIL_PADRAO',
+    'PERFIS',
+    'URLS_BLOQUEADAS_PADRAO',
+    'aplicar_perfil_desempenho',
+    'configurar_sessao_cdp',
+    'criar_diretorio_download',
+    'diretorio_download',
+    'diretorio_download_padrao',
+    'liberar_diretorio_download',
+    'resolver_perfil',
+    'urls_bloqueadas',
+]
@@ -0,0 +1,212 @@
+"""
+Executor em estágios para lotes de processos (pipeline entre casos).
+
+No fluxo serial o Chrome fica parado enquanto OCR/regras rodam e a API de
+OCR fica parada enquanto o Chrome navega e baixa. Aqui cada estágio tem
+seus próprios workers (threads) ligados por filas limitadas: o navegador
+já trabalha no caso N+1 enquanto o caso N está no OCR, e a vazão tende à
+do estágio gargalo.
+
+Uso típico:
+
+    pipeline = PipelineEstagios([
+        Estagio('navegador', fabrica=lambda: proc.etapa_navegador),
+        Estagio('analise', fabrica=criar_analisador, workers=2),
+        Estagio('persistencia', fabrica=lambda: proc.etapa_persistencia),
+    ], deve_parar=lambda: cancelado, ao_concluir=registrar)
+    itens = pipeline.executar(codigos)
+    print(pipeline.resumo())
+
+Cada `fabrica` é chamada uma vez por worker (ex.: para ter estado próprio
+por thread) e devolve a função que processa um item. Uma exceção num
+estágio marca o item com `erro` e o encaminha direto para `ao_concluir`,
+sem passar pelos estágios seguintes.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_FIM = object()
+
+
+@dataclass
+class Estagio:
+    nome: str
+    fabrica: Callable[[], Callable[[Any], Any]]
+    workers: int = 1
+    # Itens aguardando este estágio (limite da fila de entrada)
+    capacidade_fila: int = 2
+
+
+@dataclass
+class ItemPipeline:
+    indice: int
+    entrada: Any
+    dados: Any = None
+    erro: Optional[str] = None
+    estagio_erro: Optional[str] = None
+    tempos_ms: Dict[str, float] = field(default_factory=dict)
+
+
+class _MetricasEstagio:
+    __slots__ = ('itens', 'erros', 'ocupado_s', 'bloqueado_s', 'ocioso_s')
+
+    def __init__(self) -> None:
+        self.itens = 0
+        self.erros = 0
+        self.ocupado_s = 0.0
+        self.bloqueado_s = 0.0  # esperando vaga na fila do próximo estágio
+        self.ocioso_s = 0.0     # esperando item do estágio anterior
+
+
+class PipelineEstagios:
+    """Estágios sequenciais com workers próprios e filas limitadas entre eles."""
+
+    def __init__(self, estagios: List[Estagio],
+                 deve_parar: Optional[Callable[[], bool]] = None,
+                 ao_concluir: Optional[Callable[[ItemPipeline], None]] = None) -> None:
+        if not estagios:
+            raise ValueError('Pipeline sem estágios')
+        self.estagios = estagios
+        self.deve_parar = deve_parar or (lambda: False)
+        self.ao_concluir = ao_concluir
+        self._filas = [queue.Queue(maxsize=max(1, e.capacidade_fila)) for e in estagios]
+        self._metricas = {e.nome: _MetricasEstagio() for e in estagios}
+        self._lock = threading.Lock()
+        self._ativos = [max(1, e.workers) for e in estagios]
+        self._concluidos: List[ItemPipeline] = []
+        self._inicio = 0.0
+        self._fim = 0.0
+        self.parado = False
+
+    # ------------------------------------------------------------------
+
+    def _entregar(self, item: ItemPipeline) -> None:
+        with self._lock:
+            self._concluidos.append(item)
+        if self.ao_concluir is not None:
+            try:
+                self.ao_concluir(item)
+            except Exception as e:
+                print(f"[AVISO] Callback de conclusão falhou para o item {item.indice}: {e}")
+
+    def _worker(self, pos: int) -> None:
+        estagio = self.estagios[pos]
+        metricas = self._metricas[estagio.nome]
+        entrada = self._filas[pos]
+        saida = self._filas[pos + 1] if pos + 1 < len(self._filas) else None
+        try:
+            processar = estagio.fabrica()
+        except Exception as e:
+            print(f"[ERRO] Falha ao inicializar worker do estágio '{estagio.nome}': {e}")
+            processar = None
+
+        while True:
+            t0 = time.perf_counter()
+            item = entrada.get()
+            espera = time.perf_counter() - t0
+            if item is _FIM:
+                break
+            with self._lock:
+                metricas.ocioso_s += espera
+
+            if processar is None:
+                item.erro = f"Estágio '{estagio.nome}' indisponível"
+                item.estagio_erro = estagio.nome
+            else:
+                t0 = time.perf_counter()
+                try:
+                    item.dados = processar(item.dados)
+                except Exception as e:
+                    item.erro = str(e) or e.__class__.__name__
+                    item.estagio_erro = estagio.nome
+                duracao = time.perf_counter() - t0
+                item.tempos_ms[estagio.nome] = round(duracao * 1000.0, 2)
+                with self._lock:
+                    metricas.itens += 1
+                    metricas.ocupado_s += duracao
+                    if item.erro:
+                        metricas.erros += 1
+
+            if item.erro or saida is None:
+                self._entregar(item)
+            else:
+                t0 = time.perf_counter()
+                saida.put(item)
+                with self._lock:
+                    metricas.bloqueado_s += time.perf_counter() - t0
+
+        # Último worker do estágio avisa o estágio seguinte
+        with self._lock:
+            self._ativos[pos] -= 1
+            ultimo = self._ativos[pos] == 0
+        if ultimo and saida is not None:
+            for _ in range(max(1, self.estagios[pos + 1].workers)):
+                saida.put(_FIM)
+
+    def executar(self, entradas: Iterable[Any]) -> List[ItemPipeline]:
+        """Processa as entradas e devolve os itens na ordem de entrada."""
+        self._inicio = time.perf_counter()
+        threads = []
+        for pos, estagio in enumerate(self.estagios):
+            for n in range(max(1, estagio.workers)):
+                t = threading.Thread(target=self._worker, args=(pos,), name=f'pipeline-{estagio.nome}-{n}', daemon=True)
+                t.start()
+                threads.append(t)
+
+        try:
+            for indice, entrada in enumerate(entradas):
+                if self.deve_parar():
+                    self.parado = True
+                    break
+                self._filas[0].put(ItemPipeline(indice=indice, entrada=entrada, dados=entrada))
+        finally:
+            for _ in range(max(1, self.estagios[0].workers)):
+                self._filas[0].put(_FIM)
+            for t in threads:
+                t.join()
+            self._fim = time.perf_counter()
+
+        with self._lock:
+            return sorted(self._concluidos, key=lambda i: i.indice)
+
+    # ------------------------------------------------------------------
+
+    def resumo(self) -> Dict[str, Any]:
+        """Ocupação por estágio e estágio gargalo (maior tempo ocupado por worker)."""
+        duracao = max(1e-9, (self._fim or time.perf_counter()) - self._inicio)
+        estagios: Dict[str, Any] = {}
+        gargalo, maior_carga = None, -1.0
+        with self._lock:
+            for e in self.estagios:
+                m = self._metricas[e.nome]
+                workers = max(1, e.workers)
+                carga = m.ocupado_s / workers
+                if carga > maior_carga:
+                    gargalo, maior_carga = e.nome, carga
+                estagios[e.nome] = {
+                    'workers': workers,
+                    'itens': m.itens,
+                    'erros': m.erros,
+                    'ocupado_s': round(m.ocupado_s, 2),
+                    'ms_por_item': round(m.ocupado_s * 1000.0 / m.itens, 1) if m.itens else 0.0,
+                    'ocupacao_pct': round(100.0 * carga / duracao, 1),
+                    'bloqueado_s': round(m.bloqueado_s, 2),
+                    'ocioso_s': round(m.ocioso_s, 2),
+                }
+            concluidos = len(self._concluidos)
+        return {
+            'duracao_s': round(duracao, 2),
+            'itens': concluidos,
+            'itens_por_minuto': round(concluidos * 60.0 / duracao, 2),
+            'gargalo': gargalo,
+            'estagios': estagios,
+        }
+
+
+__all__ = ['Estagio', 'ItemPipeline', 'PipelineEstagios']
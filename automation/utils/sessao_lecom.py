@@ -0,0 +1,289 @@
+"""
+Sessão autenticada do LECOM reaproveitada entre drivers e reinícios de worker.
+
+Depois de um login completo os cookies do navegador (`Network.getAllCookies`,
+inclusive os do provedor de SSO) são gravados criptografados (Fernet, chave
+em LECOM_SESSAO_CHAVE ou ENCRYPTION_KEY). Um driver novo recebe os cookies
+via `Network.setCookies` e a sessão é validada com uma única navegação ao
+workspace; o fluxo usuário -> Próxima -> senha -> Entrar -> "Entendi" ->
+fechar chat só roda quando a sessão expirou de fato. A sessão só é
+considerada válida quando um marcador do workspace autenticado aparece
+(menu "Caixa de entrada"); o redirecionamento para o login a invalida.
+
+Sem chave configurada (ou com LECOM_SESSAO_PERSISTENTE=0) nada é gravado e
+o login continua como antes. Métricas (reaproveitamentos, logins completos,
+idade da sessão) ficam em `metricas.json` no mesmo diretório e sobrevivem
+a reinícios.
+
+Variáveis:
+    LECOM_SESSAO_DIR        diretório (padrão ~/.lecom_sessao)
+    LECOM_SESSAO_MAX_HORAS  idade máxima antes de forçar novo login (padrão 8)
+    LECOM_SESSAO_ESPERA_S   espera máxima pelo workspace na validação (padrão 20)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from automation.utils.lecom_urls import LECOM_BASE_URL, url_workspace
+
+MAX_HORAS_PADRAO = 8.0
+ESPERA_VALIDACAO_S = 20.0
+# Marcador positivo do workspace autenticado (menu lateral do LECOM)
+XPATH_WORKSPACE = "//*[contains(text(), 'Caixa de entrada')]"
+XPATH_LOGIN = "//input[@name='username']"
+_CAMPOS_COOKIE = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+
+def _fernet():
+    chave = os.environ.get('LECOM_SESSAO_CHAVE') or os.environ.get('ENCRYPTION_KEY')
+    if not chave:
+        return None
+    try:
+        from cryptography.fernet import Fernet
+        return Fernet(chave.encode() if isinstance(chave, str) else chave)
+    except Exception as e:
+        print(f"[AVISO] Criptografia da sessão LECOM indisponível: {e}")
+        return None
+
+
+class SessaoLecom:
+    """Armazena, restaura e valida a sessão autenticada de um usuário do LECOM."""
+
+    def __init__(self, usuario: Optional[str] = None, diretorio: Optional[str] = None) -> None:
+        self.usuario = usuario if usuario is not None else (os.environ.get('LECOM_USER') or '')
+        self.diretorio = diretorio or os.environ.get('LECOM_SESSAO_DIR') or os.path.join(
+            os.path.expanduser('~'), '.lecom_sessao'
+        )
+        self.max_idade_s = float(os.environ.get('LECOM_SESSAO_MAX_HORAS', MAX_HORAS_PADRAO)) * 3600.0
+        self.espera_validacao_s = float(os.environ.get('LECOM_SESSAO_ESPERA_S', ESPERA_VALIDACAO_S))
+        identificador = hashlib.sha256(f"{self.usuario}@{LECOM_BASE_URL}".encode()).hexdigest()[:16]
+        self.arquivo = os.path.join(self.diretorio, f"sessao_{identificador}.bin")
+        self.arquivo_metricas = os.path.join(self.diretorio, 'metricas.json')
+        self._lock = threading.Lock()
+        self._fernet = _fernet()
+        self.habilitada = (
+            self._fernet is not None
+            and os.environ.get('LECOM_SESSAO_PERSISTENTE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+        )
+
+    # ------------------------------------------------------------------ disco
+
+    def _gravar_atomico(self, caminho: str, dados: bytes) -> None:
+        os.makedirs(self.diretorio, mode=0o700, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(dados)
+        try:
+            os.chmod(temporario, 0o600)
+        except OSError:
+            pass
+        os.replace(temporario, caminho)
+
+    def _carregar(self) -> Optional[Dict[str, Any]]:
+        if not os.path.isfile(self.arquivo):
+            return None
+        try:
+            with open(self.arquivo, 'rb') as f:
+                return json.loads(self._fernet.decrypt(f.read()).decode('utf-8'))
+        except Exception as e:
+            print(f"[AVISO] Sessão LECOM armazenada ilegível ({e.__class__.__name__}); descartando")
+            self.descartar()
+            return None
+
+    def descartar(self) -> None:
+        try:
+            os.remove(self.arquivo)
+        except OSError:
+            pass
+
+    def _registrar(self, evento: str, idade_s: Optional[float] = None,
+                   duracao_login_s: Optional[float] = None) -> None:
+        with self._lock:
+            try:
+                with open(self.arquivo_metricas, 'r', encoding='utf-8') as f:
+                    metricas = json.load(f)
+            except (OSError, ValueError):
+                metricas = {}
+            metricas[evento] = int(metricas.get(evento, 0)) + 1
+            if idade_s is not None:
+                metricas['idade_ultima_reutilizacao_s'] = round(idade_s, 1)
+                metricas['idade_maxima_reutilizacao_s'] = round(
+                    max(idade_s, float(metricas.get('idade_maxima_reutilizacao_s', 0))), 1
+                )
+            if duracao_login_s is not None:
+                metricas['duracao_ultimo_login_s'] = round(duracao_login_s, 2)
+            metricas['atualizado_em'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            try:
+                self._gravar_atomico(self.arquivo_metricas, json.dumps(metricas).encode('utf-8'))
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------ API
+
+    def salvar(self, driver: Any) -> bool:
+        """Grava os cookies do driver logo após um login completo."""
+        if not self.habilitada:
+            return False
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception:
+            try:
+                cookies = driver.get_cookies()
+            except Exception as e:
+                print(f"[AVISO] Não foi possível ler os cookies da sessão: {e}")
+                return False
+        if not cookies:
+            return False
+        registro = {
+            'usuario': self.usuario,
+            'base_url': LECOM_BASE_URL,
+            'criada_em': time.time(),
+            # expires <= 0 = cookie de sessão (no setCookies, ausência de expires)
+            'cookies': [
+                {k: c[k] for k in _CAMPOS_COOKIE if k in c and not (k == 'expires' and (c[k] or 0) <= 0)}
+                for c in cookies
+            ],
+        }
+        try:
+            self._gravar_atomico(self.arquivo, self._fernet.encrypt(json.dumps(registro).encode('utf-8')))
+        except OSError as e:
+            print(f"[AVISO] Não foi possível gravar a sessão LECOM: {e}")
+            return False
+        print(f"[SALVO] Sessão LECOM armazenada ({len(cookies)} cookie(s), criptografada)")
+        return True
+
+    def _aplicar_cookies(self, driver: Any, cookies: List[Dict[str, Any]]) -> None:
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            return
+        except Exception:
+            pass
+        # Sem CDP: add_cookie exige estar no domínio
+        driver.get(LECOM_BASE_URL)
+        for c in cookies:
+            cookie = {k: c[k] for k in ('name', 'value', 'path', 'secure', 'httpOnly') if k in c}
+            if c.get('expires') and c['expires'] > 0:
+                cookie['expiry'] = int(c['expires'])
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                continue
+
+    def _workspace_ativo(self, driver: Any) -> bool:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+
+        driver.get(url_workspace())
+
+        # O workspace é uma SPA: espera o menu autenticado aparecer (válida) ou
+        # o redirecionamento para o login (expirada); carregamento lento não
+        # conta como sessão válida
+        def _estado(d: Any) -> Optional[str]:
+            if d.find_elements(By.XPATH, XPATH_LOGIN):
+                return 'login'
+            if 'workspace' in (d.current_url or '').lower() and d.find_elements(By.XPATH, XPATH_WORKSPACE):
+                return 'workspace'
+            return None
+
+        try:
+            return WebDriverWait(driver, self.espera_validacao_s, poll_frequency=0.25).until(_estado) == 'workspace'
+        except TimeoutException:
+            print(f"[AVISO] Workspace do LECOM não carregou em {self.espera_validacao_s:.0f} s; sessão não confirmada")
+            return False
+
+    def restaurar(self, driver: Any) -> bool:
+        """Restaura a sessão armazenada no driver; True se o workspace abriu autenticado."""
+        if not self.habilitada:
+            return False
+        registro = self._carregar()
+        if not registro or not registro.get('cookies'):
+            self._registrar('sessao_ausente')
+            return False
+        idade_s = time.time() - float(registro.get('criada_em') or 0)
+        if idade_s > self.max_idade_s:
+            print(f"[INFO] Sessão LECOM armazenada com {idade_s / 3600:.1f} h; novo login necessário")
+            self.descartar()
+            self._registrar('sessao_expirada')
+            return False
+        try:
+            self._aplicar_cookies(driver, registro['cookies'])
+            valida = self._workspace_ativo(driver)
+        except Exception as e:
+            print(f"[AVISO] Falha ao restaurar sessão LECOM: {e}")
+            valida = False
+        if not valida:
+            print("[INFO] Sessão LECOM armazenada expirou; fazendo login completo")
+            self.descartar()
+            self._registrar('sessao_expirada')
+            return False
+        print(f"[OK] Sessão LECOM reaproveitada (idade {idade_s / 60:.0f} min); login completo evitado")
+        self._registrar('sessao_reaproveitada', idade_s)
+        return True
+
+    def garantir(self, driver: Any, login_completo: Callable[[], bool]) -> bool:
+        """Restaura a sessão ou, se não houver sessão válida, executa `login_completo` e a armazena."""
+        if self.restaurar(driver):
+            return True
+        inicio = time.perf_counter()
+        ok = login_completo()
+        if ok and self.habilitada:
+            self._registrar('login_completo', duracao_login_s=time.perf_counter() - inicio)
+            self.salvar(driver)
+        return ok
+
+    def metricas(self) -> Dict[str, Any]:
+        """Contadores acumulados, taxa de acerto e idade da sessão atual."""
+        try:
+            with open(self.arquivo_metricas, 'r', encoding='utf-8') as f:
+                metricas = json.load(f)
+        except (OSError, ValueError):
+            metricas = {}
+        reaproveitadas = int(metricas.get('sessao_reaproveitada', 0))
+        tentativas = reaproveitadas + int(metricas.get('sessao_expirada', 0)) + int(metricas.get('sessao_ausente', 0))
+        metricas['taxa_acerto'] = round(reaproveitadas / tentativas, 3) if tentativas else 0.0
+        metricas['habilitada'] = self.habilitada
+        try:
+            metricas['idade_sessao_atual_s'] = round(time.time() - os.path.getmtime(self.arquivo), 1)
+        except OSError:
+            metricas['idade_sessao_atual_s'] = None
+        return metricas
+
+
+_SESSOES: Dict[str, SessaoLecom] = {}
+_SESSOES_LOCK = threading.Lock()
+
+
+def chave_login_manual() -> str:
+    """Chave das sessões de login manual (analista humano), separada da conta dos workers."""
+    try:
+        import getpass
+        usuario_local = getpass.getuser()
+    except Exception:
+        usuario_local = ''
+    return f"login_manual:{usuario_local}"
+
+
+def obter_sessao_lecom(usuario: Optional[str] = None) -> SessaoLecom:
+    """Sessão compartilhada do processo para o usuário (padrão LECOM_USER).
+
+    Logins manuais usam `chave_login_manual()`: os cookies de um analista
+    não podem ser reaproveitados pelos workers (conta LECOM_USER) nem o
+    contrário.
+    """
+    chave = usuario if usuario is not None else (os.environ.get('LECOM_USER') or '')
+    with _SESSOES_LOCK:
+        sessao = _SESSOES.get(chave)
+        if sessao is None:
+            sessao = SessaoLecom(chave)
+            _SESSOES[chave] = sessao
+        return sessao
+
+
+__all__ = ['SessaoLecom', 'chave_login_manual', 'obter_sessao_lecom']
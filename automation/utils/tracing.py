@@ -0,0 +1,284 @@
+"""
+Instrumentação leve de tempos por etapa (spans) para os fluxos de automação.
+
+Uso típico dentro de um Processor:
+
+    tracer = iniciar_trace('ordinaria', numero_processo=numero)
+    try:
+        with span('login'):
+            ...
+        with span('documento', nome='CPF'):
+            with span('download'):
+                ...
+    finally:
+        trace = finalizar_trace(tracer)   # dict serializável + histogramas
+
+Os spans usam `time.perf_counter` (relógio monotônico) e são aninhados por
+thread. Com `TRACING_ENABLED=0` todas as chamadas viram no-op.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+TRACING_HABILITADO = os.environ.get('TRACING_ENABLED', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+# Limites superiores (ms) dos buckets dos histogramas por etapa
+BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000)
+
+
+class Span:
+    """Intervalo de tempo nomeado, com filhos e atributos opcionais."""
+
+    __slots__ = ('nome', 'atributos', 'inicio', 'fim', 'filhos', 'erro')
+
+    def __init__(self, nome: str, atributos: Optional[Dict[str, Any]] = None) -> None:
+        self.nome = nome
+        self.atributos = atributos or {}
+        self.inicio = time.perf_counter()
+        self.fim: Optional[float] = None
+        self.filhos: List['Span'] = []
+        self.erro: Optional[str] = None
+
+    @property
+    def duracao_ms(self) -> float:
+        fim = self.fim if self.fim is not None else time.perf_counter()
+        return (fim - self.inicio) * 1000.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        dados: Dict[str, Any] = {'nome': self.nome, 'duracao_ms': round(self.duracao_ms, 2)}
+        if self.atributos:
+            dados['atributos'] = dict(self.atributos)
+        if self.erro:
+            dados['erro'] = self.erro
+        if self.filhos:
+            dados['filhos'] = [f.to_dict() for f in self.filhos]
+        return dados
+
+
+class _SpanContexto:
+    """Context manager que abre/fecha um span na pilha do tracer."""
+
+    __slots__ = ('_tracer', '_span')
+
+    def __init__(self, tracer: 'Tracer', nome: str, atributos: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._span = Span(nome, atributos)
+
+    def __enter__(self) -> Span:
+        pilha = self._tracer._pilha
+        pilha[-1].filhos.append(self._span)
+        pilha.append(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        self._span.fim = time.perf_counter()
+        if exc_type is not None:
+            self._span.erro = f'{exc_type.__name__}: {exc_val}'
+        pilha = self._tracer._pilha
+        if len(pilha) > 1 and pilha[-1] is self._span:
+            pilha.pop()
+        return False
+
+
+class _SpanNulo:
+    """Context manager sem custo usado quando o tracing está desabilitado."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+class Tracer:
+    """Coleta a árvore de spans de um único caso (um processo)."""
+
+    def __init__(self, fluxo: str, /, **atributos: Any) -> None:
+        self.fluxo = fluxo
+        self.raiz = Span(fluxo, atributos)
+        self._pilha: List[Span] = [self.raiz]
+
+    def span(self, nome: str, /, **atributos: Any) -> _SpanContexto:
+        return _SpanContexto(self, nome, atributos)
+
+    def tempos_etapas(self) -> Dict[str, float]:
+        """Duração (ms) das etapas de primeiro nível, somando repetições."""
+        tempos: Dict[str, float] = {}
+        for filho in self.raiz.filhos:
+            tempos[filho.nome] = round(tempos.get(filho.nome, 0.0) + filho.duracao_ms, 2)
+        return tempos
+
+    def encerrar(self) -> Dict[str, Any]:
+        if self.raiz.fim is None:
+            self.raiz.fim = time.perf_counter()
+        return {
+            'fluxo': self.fluxo,
+            'duracao_total_ms': round(self.raiz.duracao_ms, 2),
+            'tempos_etapas': self.tempos_etapas(),
+            'spans': [f.to_dict() for f in self.raiz.filhos],
+        }
+
+
+class HistogramaEtapas:
+    """Histogramas cumulativos de duração por (fluxo, etapa), thread-safe."""
+
+    def __init__(self, buckets_ms=BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(buckets_ms)
+        self._dados: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, fluxo: str, etapa: str, duracao_ms: float) -> None:
+        chave = (fluxo, etapa)
+        with self._lock:
+            serie = self._dados.get(chave)
+            if serie is None:
+                serie = {'contagem': 0, 'soma_ms': 0.0, 'max_ms': 0.0, 'buckets': [0] * (len(self.buckets_ms) + 1)}
+                self._dados[chave] = serie
+            serie['contagem'] += 1
+            serie['soma_ms'] += duracao_ms
+            if duracao_ms > serie['max_ms']:
+                serie['max_ms'] = duracao_ms
+            for i, limite in enumerate(self.buckets_ms):
+                if duracao_ms <= limite:
+                    serie['buckets'][i] += 1
+                    break
+            else:
+                serie['buckets'][-1] += 1
+
+    def registrar_trace(self, trace: Dict[str, Any]) -> None:
+        """Alimenta os histogramas com um trace encerrado (etapas + documentos)."""
+        fluxo = trace.get('fluxo', 'desconhecido')
+        self.observar(fluxo, 'total', float(trace.get('duracao_total_ms') or 0.0))
+
+        def _visitar(spans: List[Dict[str, Any]], prefixo: str) -> None:
+            for s in spans:
+                etapa = f"{prefixo}{s['nome']}"
+                self.observar(fluxo, etapa, float(s.get('duracao_ms') or 0.0))
+                if s.get('filhos'):
+                    _visitar(s['filhos'], f'{etapa}/')
+
+        _visitar(trace.get('spans') or [], '')
+
+    def snapshot(self) -> Dict[str, Any]:
+        rotulos = [str(b) for b in self.buckets_ms] + ['+Inf']
+        with self._lock:
+            saida: Dict[str, Any] = {}
+            for (fluxo, etapa), serie in sorted(self._dados.items()):
+                acumulado = 0
+                buckets = {}
+                for rotulo, qtd in zip(rotulos, serie['buckets']):
+                    acumulado += qtd
+                    buckets[rotulo] = acumulado
+                saida.setdefault(fluxo, {})[etapa] = {
+                    'contagem': serie['contagem'],
+                    'soma_ms': round(serie['soma_ms'], 2),
+                    'media_ms': round(serie['soma_ms'] / max(1, serie['contagem']), 2),
+                    'max_ms': round(serie['max_ms'], 2),
+                    'buckets_ms': buckets,
+                }
+            return saida
+
+    def formato_prometheus(self) -> str:
+        """Exporta os histogramas no formato texto do Prometheus (segundos)."""
+        linhas = [
+            '# HELP automacao_etapa_duracao_segundos Duração das etapas de automação',
+            '# TYPE automacao_etapa_duracao_segundos histogram',
+        ]
+        for fluxo, etapas in self.snapshot().items():
+            for etapa, serie in etapas.items():
+                rotulo = f'fluxo="{fluxo}",etapa="{etapa}"'
+                for limite, qtd in serie['buckets_ms'].items():
+                    le = '+Inf' if limite == '+Inf' else f'{int(limite) / 1000.0:g}'
+                    linhas.append(f'automacao_etapa_duracao_segundos_bucket{{{rotulo},le="{le}"}} {qtd}')
+                linhas.append(f'automacao_etapa_duracao_segundos_sum{{{rotulo}}} {serie["soma_ms"] / 1000.0:.3f}')
+                linhas.append(f'automacao_etapa_duracao_segundos_count{{{rotulo}}} {serie["contagem"]}')
+        return '\n'.join(linhas) + '\n'
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+
+# Registro global consumido pelo endpoint /metrics
+metricas_etapas = HistogramaEtapas()
+
+_local = threading.local()
+
+
+def iniciar_trace(fluxo: str, /, **atributos: Any) -> Optional[Tracer]:
+    """Cria um tracer e o torna o tracer corrente da thread."""
+    if not TRACING_HABILITADO:
+        return None
+    tracer = Tracer(fluxo, **atributos)
+    _local.tracer = tracer
+    return tracer
+
+
+def trace_atual() -> Optional[Tracer]:
+    return getattr(_local, 'tracer', None)
+
+
+def span(nome: str, /, **atributos: Any):
+    """Abre um span no tracer corrente (no-op se não houver tracer ativo)."""
+    tracer = getattr(_local, 'tracer', None)
+    if tracer is None:
+        return _SPAN_NULO
+    return tracer.span(nome, **atributos)
+
+
+class vincular_trace:
+    """Torna `tracer` o corrente da thread durante o bloco (pipeline em estágios:
+    cada estágio de um mesmo caso roda numa thread diferente)."""
+
+    __slots__ = ('_tracer', '_anterior')
+
+    def __init__(self, tracer: Optional[Tracer]) -> None:
+        self._tracer = tracer
+        self._anterior = None
+
+    def __enter__(self) -> Optional[Tracer]:
+        self._anterior = getattr(_local, 'tracer', None)
+        _local.tracer = self._tracer
+        return self._tracer
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        _local.tracer = self._anterior
+        return False
+
+
+def finalizar_trace(tracer: Optional[Tracer]) -> Dict[str, Any]:
+    """Encerra o tracer, registra nos histogramas globais e o desvincula da thread."""
+    if tracer is None:
+        return {}
+    trace = tracer.encerrar()
+    if getattr(_local, 'tracer', None) is tracer:
+        _local.tracer = None
+    try:
+        metricas_etapas.registrar_trace(trace)
+    except Exception as e:
+        print(f"[AVISO] Falha ao registrar métricas de etapas: {e}")
+    return trace
+
+
+__all__ = [
+    'TRACING_HABILITADO',
+    'Span',
+    'Tracer',
+    'HistogramaEtapas',
+    'metricas_etapas',
+    'iniciar_trace',
+    'trace_atual',
+    'span',
+    'vincular_trace',
+    'finalizar_trace',
+]
@@ -64,6 +64,18 @@ def configure_beat_schedule(celery_app):
             'task': 'modular_app.tasks.celery_tasks.task_relatorio_mensal',
             'schedule': crontab(hour=8, minute=0, day_of_month=1),
         },
+        
+        # ============================================================================
+        # Arquivo Parquet dos resultados: anexar diariamente, compactar aos domingos
+        # ============================================================================
+        'arquivar-resultados-diario': {
+            'task': 'modular_app.tasks.celery_tasks.task_arquivar_resultados',
+            'schedule': crontab(hour=2, minute=30),
+        },
+        'compactar-arquivo-semanal': {
+            'task': 'modular_app.tasks.celery_tasks.task_compactar_arquivo',
+            'schedule': crontab(hour=3, minute=0, day_of_week='sun'),
+        },
     }
     
     # Timezone para as tasks agendadas
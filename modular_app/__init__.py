@@ -1,13 +1,37 @@
+import importlib
 import os
 from flask import Flask
-from .config import DevConfig
-from .routes.web import web_bp
-from .routes.api import api_bp
-from .security.middleware import register_security
-from .tasks.job_service import JobService
+
+# Blueprints opcionais: (nome, módulo, atributo). São importados apenas
+# dentro de create_app, e podem ser filtrados via APP_BLUEPRINTS
+# (ex.: "ocr,automacao") para workers que não precisam de todas as rotas.
+_BLUEPRINTS_OPCIONAIS = (
+    ('api_uploads', '.routes.api_uploads', 'api_uploads_bp'),
+    ('ocr', '.routes.ocr', 'ocr_bp'),
+    ('automacao', '.routes.automacao', 'automacao_bp'),
+    ('aprovacoes', '.routes.aprovacoes', 'aprovacoes_bp'),
+    ('pages', '.routes.pages', 'pages_bp'),
+)
+
+
+def _blueprints_habilitados(app: Flask) -> set[str] | None:
+    """Nomes habilitados em APP_BLUEPRINTS (config ou env); None = todos."""
+    valor = app.config.get('APP_BLUEPRINTS') or os.environ.get('APP_BLUEPRINTS', '')
+    if isinstance(valor, (list, tuple, set)):
+        nomes = {str(v).strip() for v in valor}
+    else:
+        nomes = {v.strip() for v in str(valor).split(',')}
+    nomes.discard('')
+    return nomes or None
 
 
 def create_app(config_object: str | type = None) -> Flask:
+    from .config import DevConfig
+    from .routes.web import web_bp
+    from .routes.api import api_bp
+    from .security.middleware import register_security
+    from .tasks.job_service import JobService
+
     if config_object is None:
         config_object = DevConfig()
     # Resolve caminhos absolutos normalizados para evitar problemas com UNC paths no Windows
@@ -66,41 +90,26 @@ def create_app(config_object: str | type = None) -> Flask:
     app.register_blueprint(web_bp)
     app.register_blueprint(api_bp, url_prefix="/api/v1")
     
-    # API v2 com OpenAPI/Swagger
-    try:
-        from .routes.api_v2 import api as api_v2
-        from flask import Blueprint
-        api_v2_bp = Blueprint('api_v2', __name__)
-        api_v2.init_app(api_v2_bp)
-        app.register_blueprint(api_v2_bp)
-    except Exception as e:
-        print(f"[AVISO] API v2 não pode ser carregada: {e}")
+    habilitados = _blueprints_habilitados(app)
+
+    # API v2 com OpenAPI/Swagger (flask_restx é pesado: só carrega se habilitada)
+    if habilitados is None or 'api_v2' in habilitados:
+        try:
+            from .routes.api_v2 import api as api_v2
+            from flask import Blueprint
+            api_v2_bp = Blueprint('api_v2', __name__)
+            api_v2.init_app(api_v2_bp)
+            app.register_blueprint(api_v2_bp)
+        except Exception as e:
+            print(f"[AVISO] API v2 não pode ser carregada: {e}")
 
     # Blueprints adicionais (uploads e automação)
-    try:
-        from .routes.api_uploads import api_uploads_bp
-        app.register_blueprint(api_uploads_bp)
-    except Exception:
-        pass
-    try:
-        from .routes.ocr import ocr_bp
-        app.register_blueprint(ocr_bp)
-    except Exception:
-        pass
-    try:
-        from .routes.automacao import automacao_bp
-        app.register_blueprint(automacao_bp)
-    except Exception:
-        pass
-    try:
-        from .routes.aprovacoes import aprovacoes_bp
-        app.register_blueprint(aprovacoes_bp)
-    except Exception:
-        pass
-    try:
-        from .routes.pages import pages_bp
-        app.register_blueprint(pages_bp)
-    except Exception:
-        pass
+    for nome, modulo, atributo in _BLUEPRINTS_OPCIONAIS:
+        if habilitados is not None and nome not in habilitados:
+            continue
+        try:
+            app.register_blueprint(getattr(importlib.import_module(modulo, __name__), atributo))
+        except Exception:
+            pass
 
     return app
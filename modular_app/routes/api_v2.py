@@ -41,6 +41,7 @@ ns_ordinaria = api.namespace('ordinaria', description='Operações de análise o
 ns_provisoria = api.namespace('provisoria', description='Operações de análise provisória')
 ns_definitiva = api.namespace('definitiva', description='Operações de análise definitiva')
 ns_tasks = api.namespace('tasks', description='Monitoramento de tarefas assíncronas')
+ns_resultados = api.namespace('resultados', description='Consulta do banco de resultados de análise')
 
 # ============================================================================
 # MODELOS (Schemas)
@@ -105,6 +106,33 @@ task_status = api.model('TaskStatus', {
     'result': fields.Raw(description='Resultado da tarefa (se concluída)'),
 })
 
+# Filtros da consulta de resultados
+resultados_parser = api.parser()
+resultados_parser.add_argument('numero_processo', type=str, location='args', help='Número do processo')
+resultados_parser.add_argument('tipo', type=str, location='args',
+                               help='ordinaria, provisoria, definitiva, parecer_analista, defere_indefere, aprovacao_parecer')
+resultados_parser.add_argument('resultado', type=str, location='args', help='deferimento, indeferimento, analise_manual, erro...')
+resultados_parser.add_argument('requisito', type=str, location='args', help='Requisito não atendido (ex.: antecedentes_criminais)')
+resultados_parser.add_argument('data_inicio', type=str, location='args', help='AAAA-MM-DD (inclusiva)')
+resultados_parser.add_argument('data_fim', type=str, location='args', help='AAAA-MM-DD (inclusiva)')
+resultados_parser.add_argument('cursor', type=str, location='args', help='Valor de next_cursor da página anterior')
+resultados_parser.add_argument('limite', type=int, location='args', default=50, help='Itens por página (máx. 500)')
+
+resultado_item = api.model('ResultadoAnalise', {
+    'id': fields.Integer(),
+    'numero_processo': fields.String(),
+    'tipo_analise': fields.String(),
+    'resultado': fields.String(description='Decisão normalizada'),
+    'status': fields.String(),
+    'data_analise': fields.String(description='ISO 8601'),
+    'percentual': fields.Float(),
+    'motivos': fields.List(fields.String),
+    'requisitos_nao_atendidos': fields.List(fields.String),
+    'erro': fields.String(),
+    'job_id': fields.String(),
+    'detalhes': fields.Raw(),
+})
+
 # ============================================================================
 # ENDPOINTS - HEALTH
 # ============================================================================
@@ -322,6 +350,125 @@ class TaskStatus(Resource):
             )
 
 
+# ============================================================================
+# ENDPOINTS - RESULTADOS
+# ============================================================================
+
+def _parse_data_filtro(valor, fim: bool = False):
+    """AAAA-MM-DD (ou ISO completo); `fim` torna o dia inclusivo."""
+    from datetime import datetime, timedelta
+    if not valor:
+        return None
+    data = datetime.fromisoformat(valor.strip())
+    if fim and len(valor.strip()) == 10:
+        data += timedelta(days=1)
+    return data
+
+
+@ns_resultados.route('')
+class ResultadosConsulta(Resource):
+    """Consulta paginada dos resultados gravados pelos workers."""
+
+    @ns_resultados.doc('resultados_consulta')
+    @ns_resultados.expect(resultados_parser)
+    @ns_resultados.response(200, 'Success', api.model('ResultadosResponse', {
+        'success': fields.Boolean(),
+        'message': fields.String(),
+        'data': fields.List(fields.Nested(resultado_item)),
+        'meta': fields.Raw(description='pagination.next_cursor / has_next'),
+    }))
+    @ns_resultados.response(400, 'Bad Request', error_response_model)
+    @ns_resultados.response(503, 'Banco indisponível', error_response_model)
+    def get(self):
+        """Lista resultados do mais recente para o mais antigo.
+
+        Paginação por cursor: repita a chamada com `cursor=<next_cursor>`
+        até `has_next` ser falso. Os filtros devem ser os mesmos em todas
+        as páginas.
+        """
+        from modular_app.services.resultados_db import LIMITE_MAXIMO, TIPOS_ANALISE, obter_banco_resultados
+
+        args = request.args
+        tipo = (args.get('tipo') or '').strip().lower() or None
+        if tipo and tipo not in TIPOS_ANALISE:
+            return bad_request(message='Tipo de análise inválido', details={'tipos': list(TIPOS_ANALISE)})
+        try:
+            data_inicio = _parse_data_filtro(args.get('data_inicio'))
+            data_fim = _parse_data_filtro(args.get('data_fim'), fim=True)
+            limite = int(args.get('limite', 50))
+        except ValueError as e:
+            return bad_request(message='Filtro inválido', details=str(e))
+
+        banco = obter_banco_resultados()
+        if banco is None:
+            return error_response(message='Banco de resultados indisponível', error_code='RESULTADOS_DB_OFF', status_code=503)
+        try:
+            pagina = banco.consultar(
+                numero_processo=args.get('numero_processo'),
+                tipo_analise=tipo,
+                resultado=args.get('resultado'),
+                requisito=args.get('requisito'),
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                cursor=args.get('cursor'),
+                limite=limite,
+            )
+        except ValueError as e:
+            return bad_request(message='Cursor inválido', details=str(e))
+        except Exception as e:
+            return internal_error(message='Erro ao consultar resultados', details=str(e))
+
+        return success_response(
+            data=pagina['itens'],
+            message=f"{len(pagina['itens'])} resultado(s)",
+            meta={'pagination': {
+                'limit': max(1, min(limite, LIMITE_MAXIMO)),
+                'next_cursor': pagina['proximo_cursor'],
+                'has_next': pagina['proximo_cursor'] is not None,
+            }},
+        )
+
+
+@ns_resultados.route('/estatisticas')
+class ResultadosEstatisticas(Resource):
+    """Agregados materializados (contadores e histogramas)."""
+
+    @ns_resultados.doc('resultados_estatisticas', params={
+        'tipo': 'Tipo de análise (padrão: todos)',
+        'data_inicio': 'AAAA-MM-DD (sem datas: acumulado geral)',
+        'data_fim': 'AAAA-MM-DD (inclusiva)',
+    })
+    @ns_resultados.response(200, 'Success', success_response_model)
+    @ns_resultados.response(503, 'Banco indisponível', error_response_model)
+    def get(self):
+        """Totais por resultado, requisito e OCR, série diária e histogramas de latência."""
+        from datetime import date, timedelta
+        from modular_app.services.resultados_db import TIPOS_ANALISE, obter_banco_resultados
+
+        args = request.args
+        tipo = (args.get('tipo') or '').strip().lower() or None
+        if tipo and tipo not in TIPOS_ANALISE:
+            return bad_request(message='Tipo de análise inválido', details={'tipos': list(TIPOS_ANALISE)})
+        try:
+            inicio = date.fromisoformat(args['data_inicio']) if args.get('data_inicio') else None
+            fim = date.fromisoformat(args['data_fim']) if args.get('data_fim') else None
+        except ValueError as e:
+            return bad_request(message='Data inválida', details=str(e))
+
+        banco = obter_banco_resultados()
+        if banco is None:
+            return error_response(message='Banco de resultados indisponível', error_code='RESULTADOS_DB_OFF', status_code=503)
+        from modular_app.services.agregados_resultados import histogramas, resumo, serie_diaria
+
+        dados = resumo(banco, inicio, fim, tipo_analise=tipo)
+        dados['histogramas'] = histogramas(banco, inicio, fim, tipo_analise=tipo)
+        if inicio or fim:
+            fim_serie = fim or date.today()
+            inicio_serie = max(inicio or fim_serie - timedelta(days=30), fim_serie - timedelta(days=366))
+            dados['por_dia'] = serie_diaria(banco, inicio_serie, fim_serie, tipo_analise=tipo)
+        return success_response(data=dados, message='Estatísticas agregadas')
+
+
 # ============================================================================
 # ADICIONAR MAIS NAMESPACES CONFORME NECESSÁRIO
 # ============================================================================
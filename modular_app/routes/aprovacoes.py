@@ -133,10 +133,16 @@ def api_aprovacao_parecer_iniciar():
                         return jsonify({'success': False, 'error': 'Nenhuma planilha encontrada em uploads/'}), 400
                     caminho_planilha = max(arquivos, key=os.path.getmtime)
 
+        paralelismo = request.form.get('paralelismo') or data_json.get('paralelismo')
+        try:
+            paralelismo = max(1, int(paralelismo)) if paralelismo else None
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'paralelismo deve ser um número inteiro'}), 400
+
         job_service = get_job_service(current_app)
 
         def _target(job_id, modo, caminho):
-            worker_aprovacao_parecer(job_service, job_id, modo, caminho)
+            worker_aprovacao_parecer(job_service, job_id, modo, caminho, paralelismo)
 
         job_id = job_service.enqueue(
             _target,
@@ -145,6 +151,7 @@ def api_aprovacao_parecer_iniciar():
             meta={
                 'type': 'aprovacao_parecer',
                 'modo': modo_selecao,
+                'paralelismo': paralelismo,
                 'arquivo': os.path.basename(caminho_planilha) if caminho_planilha else None
             }
         )
@@ -6,6 +6,23 @@ import os
 pages_bp = Blueprint("pages", __name__)
 
 
+@pages_bp.app_context_processor
+def contexto_agregados():
+    """`analises_registradas()` nos templates: total dos agregados materializados (leitura por chave)."""
+    def analises_registradas() -> int:
+        from ..services.resultados_db import obter_banco_resultados
+        banco = obter_banco_resultados()
+        if banco is None:
+            return 0
+        try:
+            from ..services.agregados_resultados import resumo
+            return resumo(banco)['analises']
+        except Exception:
+            current_app.logger.exception("Falha ao ler agregados de resultados")
+            return 0
+    return {'analises_registradas': analises_registradas}
+
+
 @pages_bp.get("/aprovacao_lote")
 @require_authentication
 def pagina_aprovacao_lote():
@@ -83,6 +100,7 @@ def pagina_analise_automatica():
                 worker_analise_definitiva,
             )
             tipo = request.form.get('tipo_processo', '').strip().lower()
+            perfil_navegador = request.form.get('perfil_navegador', '').strip().lower() or None
             f = request.files.get('planilha') or request.files.get('file')
             if not f or not f.filename:
                 return render_template('analise_automatica.html', resultado='[ERRO] Nenhum arquivo selecionado'), 400
@@ -101,11 +119,11 @@ def pagina_analise_automatica():
             job_service = get_job_service(current_app)
             if tipo == 'provisoria':
                 def _target(job_id, path, col):
-                    worker_analise_provisoria(job_service, job_id, path, col)
+                    worker_analise_provisoria(job_service, job_id, path, col, perfil_navegador=perfil_navegador)
                 meta_type = 'analise_provisoria'
             elif tipo == 'ordinaria':
                 def _target(job_id, path, col):
-                    worker_analise_ordinaria(job_service, job_id, path, col)
+                    worker_analise_ordinaria(job_service, job_id, path, col, perfil_navegador=perfil_navegador)
                 meta_type = 'analise_ordinaria'
             else:  # definitiva
                 def _target(job_id, path, col):
@@ -118,3 +136,31 @@ def pagina_analise_automatica():
             current_app.logger.exception("Falha ao iniciar processamento automático")
             return render_template('analise_automatica.html', resultado="[ERRO] Falha ao iniciar processamento. Verifique os logs do servidor."), 500
     return render_template('analise_automatica.html')
+
+
+@pages_bp.get("/estatisticas")
+@require_authentication
+def pagina_estatisticas():
+    """Totais e detalhamento dos últimos 30 dias a partir dos agregados materializados."""
+    from datetime import date, timedelta
+    from ..services.resultados_db import obter_banco_resultados
+
+    contexto = {}
+    banco = obter_banco_resultados()
+    if banco is not None:
+        try:
+            from ..services.agregados_resultados import resumo, serie_diaria
+            geral = resumo(banco)
+            hoje = date.today()
+            contexto = {
+                'total_processos': geral['analises'],
+                'processos_analisados': geral['analises'] - geral['erros'],
+                'deferimentos': geral['deferimentos'],
+                'indeferimentos': geral['indeferimentos'],
+                'estatisticas_detalhadas': [
+                    dia for dia in reversed(serie_diaria(banco, hoje - timedelta(days=29), hoje)) if dia['total']
+                ],
+            }
+        except Exception:
+            current_app.logger.exception("Falha ao ler agregados de resultados")
+    return render_template('estatisticas.html', **contexto)
@@ -24,6 +24,17 @@ def health():
     return {"status": "ok", "component": "web"}, 200
 
 
+@web_bp.get("/metrics")
+def metrics():
+    """Histogramas de duração por etapa (JSON; `?format=prometheus` para texto)."""
+    from flask import request, Response
+    from automation.utils.tracing import metricas_etapas
+
+    if request.args.get("format", "").lower() == "prometheus":
+        return Response(metricas_etapas.formato_prometheus(), mimetype="text/plain; version=0.0.4")
+    return jsonify({"etapas": metricas_etapas.snapshot()}), 200
+
+
 @web_bp.get("/download_planilha_modificada/<nome_arquivo>")
 def bp_download_planilha_modificada(nome_arquivo: str):
     """Download de planilha gerada/modificada. Usa UPLOAD_FOLDER da config."""
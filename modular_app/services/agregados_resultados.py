@@ -0,0 +1,343 @@
+"""
+Agregados materializados dos resultados (contadores e histogramas).
+
+Cada lote gravado por `BancoResultados.registrar` atualiza, na mesma
+transação, contadores por dia, tipo de análise, resultado e requisito não
+atendido, além de histogramas de latência por etapa (`tempos_etapas`) e de
+páginas de OCR por documento. Cada incremento também vai para a linha
+`dia='*'` (acumulado geral), então os painéis leem totais com uma busca pela
+chave primária, sem varrer `resultados`.
+
+`reconstruir_agregados` refaz tudo a partir de `resultados` (mesmo código
+do caminho incremental), para o backfill e depois de mudanças nas chaves:
+
+    python scripts/reconstruir_agregados.py
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, Float, Integer, String, Table, delete, func, select
+
+from automation.utils.tracing import BUCKETS_MS
+from modular_app.services.resultados_db import metadata, requisitos_tabela, resultados_tabela
+
+DIA_TOTAL = '*'
+TODOS_TIPOS = '*'
+
+# Limites superiores (páginas) do histograma de OCR por documento
+BUCKETS_PAGINAS = (1, 2, 3, 5, 10, 20, 50)
+
+METRICA_OCR_PAGINAS = 'ocr_paginas_documento'
+PREFIXO_ETAPA = 'etapa:'
+
+contadores_tabela = Table(
+    'agregados_contadores', metadata,
+    Column('dia', String(10), primary_key=True),
+    Column('tipo_analise', String(30), primary_key=True),
+    Column('dimensao', String(20), primary_key=True),
+    Column('chave', String(60), primary_key=True),
+    Column('valor', Integer, nullable=False, default=0),
+)
+
+histogramas_tabela = Table(
+    'agregados_histogramas', metadata,
+    Column('dia', String(10), primary_key=True),
+    Column('tipo_analise', String(30), primary_key=True),
+    Column('metrica', String(80), primary_key=True),
+    Column('balde', String(12), primary_key=True),
+    Column('contagem', Integer, nullable=False, default=0),
+    Column('soma', Float, nullable=False, default=0.0),
+)
+
+
+def _balde(valor: float, limites: Tuple[float, ...]) -> str:
+    for limite in limites:
+        if valor <= limite:
+            return str(limite)
+    return '+Inf'
+
+
+class Incrementos:
+    """Incrementos de um lote, somados em memória antes do upsert."""
+
+    def __init__(self) -> None:
+        self.contadores: Counter = Counter()
+        self.histogramas: Dict[Tuple[str, str, str, str], List[float]] = {}
+
+    def _contar(self, dia: str, tipo: str, dimensao: str, chave: str, valor: int = 1) -> None:
+        # Cada fato entra no dia e no acumulado geral, por tipo e somando os tipos
+        for d in (dia, DIA_TOTAL):
+            for t in (tipo, TODOS_TIPOS):
+                self.contadores[(d, t, dimensao, chave)] += valor
+
+    def _observar(self, dia: str, tipo: str, metrica: str, valor: float, limites: Tuple[float, ...]) -> None:
+        balde = _balde(valor, limites)
+        for d in (dia, DIA_TOTAL):
+            for t in (tipo, TODOS_TIPOS):
+                serie = self.histogramas.setdefault((d, t, metrica, balde), [0, 0.0])
+                serie[0] += 1
+                serie[1] += valor
+
+    def adicionar(self, tipo: str, data_analise: datetime, resultado: str,
+                  requisitos: Iterable[str], detalhes: Dict[str, Any]) -> None:
+        """Contribuição de um resultado (mesma regra no incremental e no backfill)."""
+        dia = data_analise.strftime('%Y-%m-%d')
+        self._contar(dia, tipo, 'analises', 'total')
+        self._contar(dia, tipo, 'resultado', resultado)
+        for requisito in requisitos:
+            self._contar(dia, tipo, 'requisito', requisito)
+
+        for etapa, ms in (detalhes.get('tempos_etapas') or {}).items():
+            try:
+                self._observar(dia, tipo, f'{PREFIXO_ETAPA}{etapa}', float(ms), BUCKETS_MS)
+            except (TypeError, ValueError):
+                continue
+
+        for estatisticas in (detalhes.get('estatisticas_ocr') or {}).values():
+            if not isinstance(estatisticas, dict):
+                continue
+            tesseract = int(estatisticas.get('paginas_tesseract') or 0)
+            mistral = int(estatisticas.get('paginas_mistral') or 0)
+            paginas = int(estatisticas.get('paginas_ocr') or estatisticas.get('paginas') or (tesseract + mistral))
+            puladas = len(estatisticas.get('paginas_puladas') or [])
+            self._contar(dia, tipo, 'ocr', 'documentos')
+            self._contar(dia, tipo, 'ocr', 'paginas', paginas)
+            if tesseract:
+                self._contar(dia, tipo, 'ocr', 'paginas_tesseract', tesseract)
+            if mistral:
+                self._contar(dia, tipo, 'ocr', 'paginas_mistral', mistral)
+            if puladas:
+                self._contar(dia, tipo, 'ocr', 'paginas_puladas', puladas)
+            self._observar(dia, tipo, METRICA_OCR_PAGINAS, float(paginas), BUCKETS_PAGINAS)
+
+    def gravar(self, conn) -> None:
+        """Upsert somando aos valores existentes (uma instrução por tabela)."""
+        if self.contadores:
+            linhas = [
+                {'dia': d, 'tipo_analise': t, 'dimensao': dim, 'chave': ch[:60], 'valor': v}
+                for (d, t, dim, ch), v in self.contadores.items()
+            ]
+            _upsert(conn, contadores_tabela, linhas, ('dia', 'tipo_analise', 'dimensao', 'chave'), ('valor',))
+        if self.histogramas:
+            linhas = [
+                {'dia': d, 'tipo_analise': t, 'metrica': m[:80], 'balde': b, 'contagem': c, 'soma': s}
+                for (d, t, m, b), (c, s) in self.histogramas.items()
+            ]
+            _upsert(conn, histogramas_tabela, linhas, ('dia', 'tipo_analise', 'metrica', 'balde'), ('contagem', 'soma'))
+
+
+def _upsert(conn, tabela: Table, linhas: List[Dict[str, Any]], chaves: Tuple[str, ...], somas: Tuple[str, ...]) -> None:
+    dialeto = conn.dialect.name
+    if dialeto in ('sqlite', 'postgresql'):
+        if dialeto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        instrucao = insert(tabela)
+        instrucao = instrucao.on_conflict_do_update(
+            index_elements=list(chaves),
+            set_={col: tabela.c[col] + instrucao.excluded[col] for col in somas},
+        )
+        conn.execute(instrucao, linhas)
+        return
+    for linha in linhas:  # outros bancos: atualiza e insere o que não existia
+        condicao = [tabela.c[col] == linha[col] for col in chaves]
+        res = conn.execute(
+            tabela.update().where(*condicao).values({col: tabela.c[col] + linha[col] for col in somas})
+        )
+        if not res.rowcount:
+            conn.execute(tabela.insert().values(**linha))
+
+
+# ---------------------------------------------------------------- backfill
+
+def reconstruir_agregados(banco, lote: int = 5000) -> Dict[str, Any]:
+    """Apaga e recalcula os agregados a partir de `resultados` (em blocos de `lote`).
+
+    Leitura e regravação acontecem numa única transação que começa travando
+    as escritas: um `registrar` concorrente espera o fim do backfill em vez
+    de ser contado duas vezes (entrou na leitura e somou ao agregado apagado)
+    ou perdido (somou antes do delete e não estava na leitura).
+    """
+    import json
+
+    inicio = datetime.now()
+    incrementos = Incrementos()
+    total = 0
+    ultimo_id = 0
+    with banco.engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            # SHARE bloqueia INSERT em `resultados` até o commit
+            conn.exec_driver_sql(f'LOCK TABLE {resultados_tabela.name} IN SHARE MODE')
+        # No SQLite o primeiro DELETE já toma o lock de escrita do banco; as
+        # leituras seguintes enxergam tudo o que foi gravado antes dele
+        conn.execute(delete(contadores_tabela))
+        conn.execute(delete(histogramas_tabela))
+        while True:
+            linhas = conn.execute(
+                select(resultados_tabela.c.id, resultados_tabela.c.tipo_analise, resultados_tabela.c.data_analise,
+                       resultados_tabela.c.resultado, resultados_tabela.c.detalhes)
+                .where(resultados_tabela.c.id > ultimo_id)
+                .order_by(resultados_tabela.c.id)
+                .limit(lote)
+            ).all()
+            if not linhas:
+                break
+            ids = [linha.id for linha in linhas]
+            requisitos: Dict[int, List[str]] = {}
+            for resultado_id, requisito in conn.execute(
+                select(requisitos_tabela.c.resultado_id, requisitos_tabela.c.requisito)
+                .where(requisitos_tabela.c.resultado_id.between(ids[0], ids[-1]))
+            ):
+                requisitos.setdefault(resultado_id, []).append(requisito)
+            for linha in linhas:
+                try:
+                    detalhes = json.loads(linha.detalhes or '{}')
+                except ValueError:
+                    detalhes = {}
+                incrementos.adicionar(linha.tipo_analise, linha.data_analise, linha.resultado,
+                                      requisitos.get(linha.id, []), detalhes)
+            total += len(linhas)
+            ultimo_id = ids[-1]
+        incrementos.gravar(conn)
+    return {
+        'resultados': total,
+        'contadores': len(incrementos.contadores),
+        'histogramas': len(incrementos.histogramas),
+        'duracao_s': round((datetime.now() - inicio).total_seconds(), 2),
+    }
+
+
+# ---------------------------------------------------------------- leitura
+
+def _intervalo(dia_inicio: Optional[date], dia_fim: Optional[date]):
+    """Condição sobre `dia`: acumulado geral sem intervalo; senão os dias (inclusivos)."""
+    if dia_inicio is None and dia_fim is None:
+        return lambda coluna: coluna == DIA_TOTAL
+    inicio = (dia_inicio or date(1970, 1, 1)).isoformat()
+    fim = (dia_fim or date(9999, 12, 31)).isoformat()
+    return lambda coluna: coluna.between(inicio, fim)
+
+
+def resumo(banco, dia_inicio: Optional[date] = None, dia_fim: Optional[date] = None,
+           tipo_analise: Optional[str] = None) -> Dict[str, Any]:
+    """Totais por resultado, requisito e OCR (sem intervalo: acumulado geral)."""
+    filtro_dia = _intervalo(dia_inicio, dia_fim)
+    c = contadores_tabela
+    consulta = (
+        select(c.c.dimensao, c.c.chave, func.sum(c.c.valor))
+        .where(filtro_dia(c.c.dia), c.c.tipo_analise == (tipo_analise or TODOS_TIPOS))
+        .group_by(c.c.dimensao, c.c.chave)
+    )
+    por_dimensao: Dict[str, Dict[str, int]] = {}
+    with banco.engine.connect() as conn:
+        for dimensao, chave, valor in conn.execute(consulta):
+            por_dimensao.setdefault(dimensao, {})[chave] = int(valor or 0)
+    por_resultado = por_dimensao.get('resultado', {})
+    analises = por_dimensao.get('analises', {}).get('total', 0)
+    decididos = por_resultado.get('deferimento', 0) + por_resultado.get('indeferimento', 0)
+    return {
+        'periodo': {
+            'inicio': dia_inicio.isoformat() if dia_inicio else None,
+            'fim': dia_fim.isoformat() if dia_fim else None,
+        },
+        'tipo_analise': tipo_analise,
+        'analises': analises,
+        'deferimentos': por_resultado.get('deferimento', 0),
+        'indeferimentos': por_resultado.get('indeferimento', 0),
+        'analise_manual': por_resultado.get('analise_manual', 0),
+        'erros': por_resultado.get('erro', 0),
+        'taxa_aprovacao': round(100.0 * por_resultado.get('deferimento', 0) / decididos, 1) if decididos else 0.0,
+        'por_resultado': dict(sorted(por_resultado.items(), key=lambda kv: -kv[1])),
+        'por_requisito': dict(sorted(por_dimensao.get('requisito', {}).items(), key=lambda kv: -kv[1])),
+        'ocr': por_dimensao.get('ocr', {}),
+    }
+
+
+def serie_diaria(banco, dia_inicio: date, dia_fim: date, tipo_analise: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Uma linha por dia com análises, deferimentos, indeferimentos e taxa de aprovação."""
+    c = contadores_tabela
+    consulta = select(c.c.dia, c.c.dimensao, c.c.chave, c.c.valor).where(
+        c.c.dia.between(dia_inicio.isoformat(), dia_fim.isoformat()),
+        c.c.tipo_analise == (tipo_analise or TODOS_TIPOS),
+        c.c.dimensao.in_(('analises', 'resultado')),
+    )
+    dias: Dict[str, Counter] = {}
+    with banco.engine.connect() as conn:
+        for dia, dimensao, chave, valor in conn.execute(consulta):
+            dias.setdefault(dia, Counter())[chave if dimensao == 'resultado' else 'total'] += int(valor or 0)
+    serie = []
+    dia = dia_inicio
+    while dia <= dia_fim:
+        contagem = dias.get(dia.isoformat(), Counter())
+        decididos = contagem['deferimento'] + contagem['indeferimento']
+        serie.append({
+            'periodo': dia.strftime('%d/%m/%Y'),
+            'total': contagem['total'],
+            'deferimentos': contagem['deferimento'],
+            'indeferimentos': contagem['indeferimento'],
+            'analise_manual': contagem['analise_manual'],
+            'taxa_aprovacao': round(100.0 * contagem['deferimento'] / decididos, 1) if decididos else 0.0,
+        })
+        dia += timedelta(days=1)
+    return serie
+
+
+def _percentil(baldes: List[Tuple[str, int]], total: int, fracao: float) -> Optional[str]:
+    alvo = fracao * total
+    acumulado = 0
+    for rotulo, contagem in baldes:
+        acumulado += contagem
+        if acumulado >= alvo:
+            return rotulo
+    return None
+
+
+def histogramas(banco, dia_inicio: Optional[date] = None, dia_fim: Optional[date] = None,
+                tipo_analise: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Histogramas por métrica: contagem, média, baldes cumulativos e p50/p95
+    (limite superior do balde; `etapa:<nome>` em ms, OCR em páginas).
+    """
+    filtro_dia = _intervalo(dia_inicio, dia_fim)
+    h = histogramas_tabela
+    consulta = (
+        select(h.c.metrica, h.c.balde, func.sum(h.c.contagem), func.sum(h.c.soma))
+        .where(filtro_dia(h.c.dia), h.c.tipo_analise == (tipo_analise or TODOS_TIPOS))
+        .group_by(h.c.metrica, h.c.balde)
+    )
+    brutos: Dict[str, Dict[str, Tuple[int, float]]] = {}
+    with banco.engine.connect() as conn:
+        for metrica, balde, contagem, soma in conn.execute(consulta):
+            brutos.setdefault(metrica, {})[balde] = (int(contagem or 0), float(soma or 0.0))
+
+    saida: Dict[str, Any] = {}
+    for metrica, por_balde in sorted(brutos.items()):
+        limites = BUCKETS_PAGINAS if metrica == METRICA_OCR_PAGINAS else BUCKETS_MS
+        rotulos = [str(limite) for limite in limites] + ['+Inf']
+        baldes = [(rotulo, por_balde.get(rotulo, (0, 0.0))[0]) for rotulo in rotulos]
+        total = sum(contagem for _, contagem in baldes)
+        soma = sum(s for _, s in por_balde.values())
+        acumulado = 0
+        cumulativos = {}
+        for rotulo, contagem in baldes:
+            acumulado += contagem
+            cumulativos[rotulo] = acumulado
+        saida[metrica] = {
+            'contagem': total,
+            'media': round(soma / total, 2) if total else 0.0,
+            'p50': _percentil(baldes, total, 0.5),
+            'p95': _percentil(baldes, total, 0.95),
+            'baldes': cumulativos,
+        }
+    return saida
+
+
+__all__ = [
+    'Incrementos', 'reconstruir_agregados', 'resumo', 'serie_diaria', 'histogramas',
+    'DIA_TOTAL', 'TODOS_TIPOS', 'BUCKETS_PAGINAS',
+]
@@ -0,0 +1,310 @@
+"""
+Arquivo colunar (Parquet) dos resultados históricos.
+
+As planilhas consolidadas crescem a cada caso e ficam lentas para abrir e
+consultar. Aqui os resultados do banco (`resultados_db.py`) são anexados
+diariamente em arquivos Parquet particionados por tipo de análise e mês:
+
+    <dir>/tipo_analise=ordinaria/mes=2026-10/parte-20261018020000-1a2b3c4d.parquet
+
+O esquema é fixo (`ESQUEMA`), cada arquivo é ordenado por `data_analise` e a
+marca `_marca.json` guarda o último `id` arquivado, então a tarefa diária só
+lê o que entrou desde a execução anterior. `compactar` junta as partes de
+cada partição num único arquivo.
+
+A leitura usa `pyarrow.dataset`: o filtro por tipo/mês descarta partições
+inteiras (só os diretórios necessários são listados e abertos) e o filtro
+por data/resultado/processo desce até as estatísticas dos row groups.
+
+Variáveis:
+    ARQUIVO_RESULTADOS_DIR   diretório (padrão <cwd>/planilhas/arquivo_parquet)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_DISPONIVEL = True
+except ImportError:  # pragma: no cover - dependência opcional (requirements.txt)
+    PYARROW_DISPONIVEL = False
+
+ARQUIVO_MARCA = '_marca.json'
+LINHAS_POR_ROW_GROUP = 50_000
+LOTE_ARQUIVAMENTO = 50_000
+
+if PYARROW_DISPONIVEL:
+    # Colunas gravadas nos arquivos (tipo_analise e mes vêm dos diretórios)
+    ESQUEMA = pa.schema([
+        ('id', pa.int64()),
+        ('numero_processo', pa.string()),
+        ('resultado', pa.string()),
+        ('status', pa.string()),
+        ('data_analise', pa.timestamp('ms')),
+        ('percentual', pa.float64()),
+        ('motivos', pa.list_(pa.string())),
+        ('requisitos_nao_atendidos', pa.list_(pa.string())),
+        ('erro', pa.string()),
+        ('job_id', pa.string()),
+        ('detalhes', pa.string()),
+    ])
+    ESQUEMA_PARTICAO = pa.schema([('tipo_analise', pa.string()), ('mes', pa.string())])
+
+# Cabeçalhos da exportação para Excel (mesma linguagem das planilhas)
+COLUNAS_EXCEL = {
+    'numero_processo': 'Número do Processo',
+    'tipo_analise': 'Tipo de Análise',
+    'resultado': 'Resultado',
+    'status': 'Status',
+    'data_analise': 'Data da Análise',
+    'percentual': 'Percentual',
+    'motivos': 'Motivos',
+    'requisitos_nao_atendidos': 'Requisitos Não Atendidos',
+    'erro': 'Erro',
+}
+
+
+def _mes(valor: datetime) -> str:
+    return valor.strftime('%Y-%m')
+
+
+class ArquivoResultados:
+    """Escrita particionada, compactação e leitura com filtros empurrados ao Parquet."""
+
+    def __init__(self, diretorio: Optional[str] = None) -> None:
+        if not PYARROW_DISPONIVEL:
+            raise RuntimeError('pyarrow não instalado')
+        self.diretorio = diretorio or os.environ.get('ARQUIVO_RESULTADOS_DIR') or os.path.join(
+            os.getcwd(), 'planilhas', 'arquivo_parquet'
+        )
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.arquivo_marca = os.path.join(self.diretorio, ARQUIVO_MARCA)
+
+    def _dir_particao(self, tipo_analise: str, mes: str) -> str:
+        return os.path.join(self.diretorio, f'tipo_analise={tipo_analise}', f'mes={mes}')
+
+    @staticmethod
+    def _gravar_tabela(tabela: 'pa.Table', caminho: str) -> None:
+        # Prefixo '.': a descoberta do dataset ignora o temporário (inclusive o
+        # que sobrar de uma gravação interrompida)
+        diretorio, nome = os.path.split(caminho)
+        temporario = os.path.join(diretorio, f".{nome}.{os.getpid()}.tmp")
+        pq.write_table(tabela, temporario, compression='zstd', row_group_size=LINHAS_POR_ROW_GROUP)
+        os.replace(temporario, caminho)
+
+    # ------------------------------------------------------------------ escrita
+
+    def anexar(self, linhas: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Grava as linhas (dicts com as colunas de `ESQUEMA` + `tipo_analise`)
+        como novas partes, uma por partição tocada.
+
+        Returns:
+            {'<tipo>/<mes>': linhas gravadas}
+        """
+        por_particao: Dict[tuple, List[Dict[str, Any]]] = {}
+        for linha in linhas:
+            chave = (linha['tipo_analise'], _mes(linha['data_analise']))
+            por_particao.setdefault(chave, []).append(linha)
+
+        carimbo = datetime.now().strftime('%Y%m%d%H%M%S')
+        gravadas: Dict[str, int] = {}
+        for (tipo, mes), itens in sorted(por_particao.items()):
+            itens.sort(key=lambda r: (r['data_analise'], r['id']))
+            tabela = pa.Table.from_pylist(
+                [{campo: item.get(campo) for campo in ESQUEMA.names} for item in itens], schema=ESQUEMA
+            )
+            destino = self._dir_particao(tipo, mes)
+            os.makedirs(destino, exist_ok=True)
+            self._gravar_tabela(tabela, os.path.join(destino, f'parte-{carimbo}-{uuid.uuid4().hex[:8]}.parquet'))
+            gravadas[f'{tipo}/{mes}'] = len(itens)
+        return gravadas
+
+    def _ler_marca(self) -> int:
+        try:
+            with open(self.arquivo_marca, 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('ultimo_id', 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _gravar_marca(self, ultimo_id: int) -> None:
+        temporario = f"{self.arquivo_marca}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'ultimo_id': ultimo_id, 'atualizado_em': datetime.now().isoformat()}, f)
+        os.replace(temporario, self.arquivo_marca)
+
+    def arquivar_do_banco(self, banco, lote: int = LOTE_ARQUIVAMENTO) -> Dict[str, Any]:
+        """Anexa os resultados gravados no banco desde a última marca."""
+        from sqlalchemy import select
+        from modular_app.services.resultados_db import requisitos_tabela, resultados_tabela
+
+        r = resultados_tabela
+        ultimo_id = self._ler_marca()
+        total = 0
+        particoes: Dict[str, int] = {}
+        with banco.engine.connect() as conn:
+            while True:
+                linhas = conn.execute(
+                    select(r).where(r.c.id > ultimo_id).order_by(r.c.id).limit(lote)
+                ).mappings().all()
+                if not linhas:
+                    break
+                ids = [linha['id'] for linha in linhas]
+                requisitos: Dict[int, List[str]] = {}
+                for resultado_id, requisito in conn.execute(
+                    select(requisitos_tabela.c.resultado_id, requisitos_tabela.c.requisito)
+                    .where(requisitos_tabela.c.resultado_id.between(ids[0], ids[-1]))
+                ):
+                    requisitos.setdefault(resultado_id, []).append(requisito)
+                registros = []
+                for linha in linhas:
+                    registro = dict(linha)
+                    registro['motivos'] = json.loads(linha['motivos'] or '[]')
+                    registro['requisitos_nao_atendidos'] = sorted(requisitos.get(linha['id'], []))
+                    registros.append(registro)
+                for chave, quantidade in self.anexar(registros).items():
+                    particoes[chave] = particoes.get(chave, 0) + quantidade
+                ultimo_id = ids[-1]
+                # A marca só avança depois das partes gravadas: uma falha repete o lote
+                self._gravar_marca(ultimo_id)
+                total += len(linhas)
+        return {'arquivados': total, 'ultimo_id': ultimo_id, 'particoes': particoes}
+
+    # ------------------------------------------------------------ compactação
+
+    def _partes(self, diretorio: str) -> List[str]:
+        return sorted(
+            os.path.join(diretorio, nome) for nome in os.listdir(diretorio) if nome.endswith('.parquet')
+        )
+
+    def compactar(self, tipo_analise: Optional[str] = None, mes: Optional[str] = None,
+                  minimo_partes: int = 2) -> Dict[str, int]:
+        """
+        Junta as partes de cada partição num único arquivo ordenado (sem
+        duplicar ids). O arquivo novo é gravado antes de remover as partes.
+
+        Returns:
+            {'<tipo>/<mes>': partes compactadas}
+        """
+        compactadas: Dict[str, int] = {}
+        for nome_tipo in sorted(os.listdir(self.diretorio)):
+            if not nome_tipo.startswith('tipo_analise=') or (tipo_analise and nome_tipo != f'tipo_analise={tipo_analise}'):
+                continue
+            dir_tipo = os.path.join(self.diretorio, nome_tipo)
+            for nome_mes in sorted(os.listdir(dir_tipo)):
+                if not nome_mes.startswith('mes=') or (mes and nome_mes != f'mes={mes}'):
+                    continue
+                dir_mes = os.path.join(dir_tipo, nome_mes)
+                partes = self._partes(dir_mes)
+                if len(partes) < minimo_partes:
+                    continue
+                tabela = pa.concat_tables([pq.read_table(p, schema=ESQUEMA) for p in partes])
+                tabela = tabela.sort_by([('data_analise', 'ascending'), ('id', 'ascending')])
+                # Uma parte regravada após falha na marca pode repetir ids
+                ids = tabela['id'].to_pylist()
+                vistos, manter = set(), []
+                for i, ident in enumerate(ids):
+                    if ident not in vistos:
+                        vistos.add(ident)
+                        manter.append(i)
+                if len(manter) < len(ids):
+                    tabela = tabela.take(pa.array(manter))
+                carimbo = datetime.now().strftime('%Y%m%d%H%M%S')
+                self._gravar_tabela(tabela, os.path.join(dir_mes, f'compactado-{carimbo}-{uuid.uuid4().hex[:8]}.parquet'))
+                for parte in partes:
+                    os.remove(parte)
+                compactadas[f"{nome_tipo.split('=', 1)[1]}/{nome_mes.split('=', 1)[1]}"] = len(partes)
+        return compactadas
+
+    # ------------------------------------------------------------------ leitura
+
+    def _arquivos_parquet(self) -> List[str]:
+        """Só os `*.parquet` das partições (sem temporários nem arquivos ocultos)."""
+        arquivos = []
+        for raiz, diretorios, nomes in os.walk(self.diretorio):
+            diretorios[:] = sorted(d for d in diretorios if not d.startswith(('_', '.')))
+            arquivos.extend(
+                os.path.join(raiz, nome) for nome in sorted(nomes)
+                if nome.endswith('.parquet') and not nome.startswith(('_', '.'))
+            )
+        return arquivos
+
+    def _dataset(self) -> 'ds.Dataset':
+        return ds.dataset(
+            self._arquivos_parquet(),
+            format='parquet',
+            schema=pa.unify_schemas([ESQUEMA, ESQUEMA_PARTICAO]),
+            partitioning=ds.partitioning(ESQUEMA_PARTICAO, flavor='hive'),
+            partition_base_dir=self.diretorio,
+            exclude_invalid_files=False,
+        )
+
+    @staticmethod
+    def filtro(tipo_analise: Optional[str] = None, data_inicio: Optional[date] = None,
+               data_fim: Optional[date] = None, resultado: Optional[str] = None,
+               numero_processo: Optional[str] = None) -> Optional['ds.Expression']:
+        """Expressão de filtro; `data_fim` é inclusiva (dia inteiro)."""
+        condicoes = []
+        if tipo_analise:
+            condicoes.append(ds.field('tipo_analise') == tipo_analise)
+        if data_inicio:
+            condicoes.append(ds.field('mes') >= data_inicio.strftime('%Y-%m'))
+            condicoes.append(ds.field('data_analise') >= pa.scalar(
+                datetime.combine(data_inicio, datetime.min.time()), type=pa.timestamp('ms')))
+        if data_fim:
+            condicoes.append(ds.field('mes') <= data_fim.strftime('%Y-%m'))
+            condicoes.append(ds.field('data_analise') < pa.scalar(
+                datetime.combine(data_fim + timedelta(days=1), datetime.min.time()), type=pa.timestamp('ms')))
+        if resultado:
+            condicoes.append(ds.field('resultado') == resultado)
+        if numero_processo:
+            condicoes.append(ds.field('numero_processo') == str(numero_processo).strip())
+        if not condicoes:
+            return None
+        expressao = condicoes[0]
+        for condicao in condicoes[1:]:
+            expressao = expressao & condicao
+        return expressao
+
+    def ler(self, colunas: Optional[Sequence[str]] = None, **filtros: Any) -> 'pa.Table':
+        """
+        Tabela Arrow com as linhas que atendem aos filtros de `filtro`.
+
+        Só as partições do tipo/meses pedidos são abertas; dentro delas os
+        row groups fora do intervalo de datas são pulados pelas estatísticas.
+        """
+        dataset = self._dataset()
+        tabela = dataset.to_table(columns=list(colunas) if colunas else None, filter=self.filtro(**filtros))
+        if 'data_analise' in tabela.column_names and tabela.num_rows:
+            tabela = tabela.sort_by([('data_analise', 'ascending')])
+        return tabela
+
+    def ler_dataframe(self, colunas: Optional[Sequence[str]] = None, **filtros: Any):
+        return self.ler(colunas, **filtros).to_pandas()
+
+    def exportar_excel(self, caminho: str, **filtros: Any) -> int:
+        """Planilha (.xlsx) só com o recorte pedido; devolve o número de linhas."""
+        df = self.ler_dataframe(list(COLUNAS_EXCEL), **filtros)
+        for coluna in ('motivos', 'requisitos_nao_atendidos'):
+            df[coluna] = df[coluna].map(lambda valores: '; '.join(valores) if valores is not None else '')
+        df['data_analise'] = df['data_analise'].dt.strftime('%d/%m/%Y %H:%M:%S')
+        df = df[list(COLUNAS_EXCEL)].rename(columns=COLUNAS_EXCEL)
+        df.to_excel(caminho, index=False)
+        return len(df)
+
+
+def obter_arquivo_resultados() -> Optional[ArquivoResultados]:
+    """Arquivo no diretório configurado; None sem pyarrow."""
+    if not PYARROW_DISPONIVEL:
+        return None
+    return ArquivoResultados()
+
+
+__all__ = ['ArquivoResultados', 'obter_arquivo_resultados', 'PYARROW_DISPONIVEL', 'COLUNAS_EXCEL']
@@ -0,0 +1,444 @@
+"""
+Banco de resultados consultável (SQLite via SQLAlchemy Core).
+
+Cada resultado de análise gravado pelos workers e pelo `UnifiedResultsService`
+vira uma linha em `resultados` (um registro por análise: o histórico de um
+processo fica preservado). Os requisitos não atendidos ficam em
+`resultado_requisitos`, com a data repetida para que o filtro por requisito
+use só o índice (`requisito, data_analise`).
+
+A consulta (`/api/v2/resultados`) é paginada por cursor: a ordem é sempre
+`data_analise DESC, id DESC` e o cursor carrega o último par visto, então cada
+página é uma busca no índice, sem OFFSET, qualquer que seja o tamanho da
+tabela.
+
+Contadores e histogramas por dia são mantidos na mesma transação de cada
+gravação (`agregados_resultados.py`).
+
+Variáveis:
+    RESULTADOS_DB_URL   URL SQLAlchemy (padrão sqlite:///<cwd>/planilhas/resultados.db)
+    RESULTADOS_DB=0     desliga a gravação (as planilhas continuam sendo geradas)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from sqlalchemy import (
+        Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+        and_, create_engine, event, or_, select,
+    )
+    SQLALCHEMY_DISPONIVEL = True
+except ImportError:  # pragma: no cover - dependência declarada em requirements.txt
+    SQLALCHEMY_DISPONIVEL = False
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+TIPOS_ANALISE = (
+    'ordinaria', 'provisoria', 'definitiva', 'parecer_analista', 'defere_indefere', 'aprovacao_parecer',
+)
+
+if SQLALCHEMY_DISPONIVEL:
+    metadata = MetaData()
+
+    resultados_tabela = Table(
+        'resultados', metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('numero_processo', String(40), nullable=False),
+        Column('tipo_analise', String(30), nullable=False),
+        Column('resultado', String(40), nullable=False),
+        Column('status', String(80)),
+        Column('data_analise', DateTime, nullable=False),
+        Column('percentual', Float),
+        Column('motivos', Text),
+        Column('erro', Text),
+        Column('job_id', String(64)),
+        Column('detalhes', Text),
+        Index('ix_resultados_processo', 'numero_processo', 'id'),
+        Index('ix_resultados_data', 'data_analise', 'id'),
+        Index('ix_resultados_tipo_data', 'tipo_analise', 'data_analise', 'id'),
+        Index('ix_resultados_resultado_data', 'resultado', 'data_analise', 'id'),
+    )
+
+    requisitos_tabela = Table(
+        'resultado_requisitos', metadata,
+        Column('resultado_id', Integer, ForeignKey('resultados.id', ondelete='CASCADE'), primary_key=True),
+        Column('requisito', String(60), primary_key=True),
+        Column('data_analise', DateTime, nullable=False),
+        Index('ix_requisitos_requisito_data', 'requisito', 'data_analise', 'resultado_id'),
+    )
+
+
+def banco_resultados_habilitado() -> bool:
+    return os.environ.get('RESULTADOS_DB', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _sem_acentos(texto: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+def normalizar_resultado(valor: Any) -> str:
+    """'INDEFERIMENTO', 'indeferimento_automatico', 'ANÁLISE MANUAL'... no mesmo vocabulário."""
+    texto = re.sub(r'[^a-z0-9]+', '_', _sem_acentos(str(valor or '')).strip().lower()).strip('_')
+    if texto.startswith('indeferimento'):
+        return 'indeferimento'
+    if texto in ('', 'n_a', 'none'):
+        return 'desconhecido'
+    return texto
+
+
+def _slug(texto: Any) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', _sem_acentos(str(texto or '')).lower()).strip('_')
+
+
+def _lista(valor: Any) -> List[str]:
+    if isinstance(valor, (list, tuple)):
+        return [str(v) for v in valor if v]
+    return [valor] if isinstance(valor, str) and valor else []
+
+
+# ------------------------------------------------------------ requisitos falhos
+
+REQUISITOS_ORDINARIA = {
+    'I': ('capacidade_civil', 'requisito_i_capacidade_civil'),
+    'II': ('residencia_minima', 'requisito_ii_residencia_minima'),
+    'III': ('comunicacao_portugues', 'requisito_iii_comunicacao_portugues'),
+    'IV': ('antecedentes_criminais', 'requisito_iv_antecedentes_criminais'),
+}
+
+
+def requisitos_falhados_ordinaria(resultado_elegibilidade: Dict[str, Any]) -> List[str]:
+    """Requisitos avaliados e não atendidos (os não avaliados, por decisão antecipada, ficam de fora)."""
+    status = resultado_elegibilidade.get('status_requisitos') or {}
+    falhados = []
+    for chave, (nome, detalhe) in REQUISITOS_ORDINARIA.items():
+        if status.get(chave) is False and (resultado_elegibilidade.get(detalhe) or {}).get('avaliado', True):
+            falhados.append(nome)
+    if resultado_elegibilidade.get('documentos_faltantes'):
+        falhados.append('documentos_complementares')
+    return falhados
+
+
+def _linha_ordinaria(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'numero_processo': r.get('codigo') or r.get('numero_processo'),
+        'resultado': r.get('elegibilidade_final') or ('erro' if r.get('status') == 'erro' else None),
+        'status': r.get('status'),
+        'percentual': r.get('percentual_final'),
+        'motivos': _lista(r.get('motivos_indeferimento')),
+        'requisitos': _lista(r.get('requisitos_nao_atendidos')),
+        'erro': r.get('erro'),
+        'detalhes': {
+            'motivo_final': r.get('motivo_final'),
+            'documentos_faltantes': _lista(r.get('documentos_faltantes')),
+        },
+    }
+
+
+def _linha_provisoria(r: Dict[str, Any]) -> Dict[str, Any]:
+    ae = r.get('analise_elegibilidade') or {}
+    resultado = ae.get('elegibilidade_final') or ('erro' if r.get('status') == 'erro' else None)
+    documentos = ae.get('documentos_processados') or []
+    requisitos = [_slug(d.get('documento')) for d in documentos if d.get('status') == 'INVÁLIDO']
+    if normalizar_resultado(resultado) == 'indeferimento' and not documentos:
+        # Encerrado nos gatilhos, antes dos documentos
+        idade = ae.get('idade_naturalizando')
+        requisitos.append('idade' if idade is not None and idade >= 18 else 'ingresso_antes_10_anos')
+    return {
+        'numero_processo': r.get('codigo'),
+        'resultado': resultado,
+        'status': r.get('status'),
+        'percentual': ae.get('percentual_final'),
+        'motivos': _lista(ae.get('motivo_final')),
+        'requisitos': requisitos,
+        'erro': r.get('erro'),
+        'detalhes': {'justificativa_gatilho_10anos': ae.get('justificativa_gatilho_10anos')},
+    }
+
+
+def _linha_definitiva(r: Dict[str, Any]) -> Dict[str, Any]:
+    validacoes = r.get('validacoes_individuais') or {}
+    decisao = r.get('decisao_final')
+    if decisao in (None, 'N/A') and r.get('status') == 'erro':
+        decisao = 'erro'
+    return {
+        'numero_processo': r.get('codigo'),
+        'resultado': decisao,
+        'status': r.get('status_detalhado') or r.get('status'),
+        'percentual': r.get('score_total'),
+        'motivos': _lista((r.get('parecer_pf') or {}).get('alertas')),
+        'requisitos': [chave for chave, v in validacoes.items() if isinstance(v, dict) and v.get('status') == 'INVÁLIDO'],
+        'erro': r.get('erro'),
+        'detalhes': {'observacoes': r.get('observacoes'), 'documento_baixado': r.get('documento_baixado')},
+    }
+
+
+def _linha_decisao(r: Dict[str, Any]) -> Dict[str, Any]:
+    """Parecer do Analista e Defere/Indefere: a decisão aplicada no LECOM."""
+    return {
+        'numero_processo': r.get('codigo'),
+        'resultado': 'erro' if r.get('status') == 'erro' else r.get('decisao'),
+        'status': r.get('status'),
+        'erro': r.get('erro'),
+        'detalhes': {'decisao_enviada': r.get('decisao_enviada'), 'valor_dnnr': r.get('valor_dnnr')},
+    }
+
+
+def _linha_aprovacao_parecer(r: Dict[str, Any]) -> Dict[str, Any]:
+    motivo = r.get('motivo_analise_manual') or ''
+    return {
+        'numero_processo': r.get('processo'),
+        'resultado': r.get('status'),
+        'status': r.get('status'),
+        'motivos': [m.strip() for m in motivo.split(';') if m.strip()],
+        'detalhes': {
+            'tipo_naturalizacao': r.get('tipo_naturalizacao'),
+            'decisao_automatica': r.get('decisao_automatica'),
+        },
+    }
+
+
+_EXTRATORES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'ordinaria': _linha_ordinaria,
+    'provisoria': _linha_provisoria,
+    'definitiva': _linha_definitiva,
+    'parecer_analista': _linha_decisao,
+    'defere_indefere': _linha_decisao,
+    'aprovacao_parecer': _linha_aprovacao_parecer,
+}
+
+
+# ------------------------------------------------------------------- cursor
+
+def codificar_cursor(data_analise: datetime, resultado_id: int) -> str:
+    bruto = f"{data_analise.isoformat()}|{resultado_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> tuple:
+    """(data_analise, id) do cursor; ValueError se for inválido."""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        data, ident = bruto.rsplit('|', 1)
+        return datetime.fromisoformat(data), int(ident)
+    except Exception as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+
+
+# ------------------------------------------------------------------- banco
+
+class BancoResultados:
+    """Gravação em lote e consulta paginada dos resultados de análise."""
+
+    def __init__(self, url: Optional[str] = None) -> None:
+        if not SQLALCHEMY_DISPONIVEL:
+            raise RuntimeError('SQLAlchemy não instalado')
+        if url is None:
+            url = os.environ.get('RESULTADOS_DB_URL')
+        if not url:
+            diretorio = os.path.join(os.getcwd(), 'planilhas')
+            os.makedirs(diretorio, exist_ok=True)
+            url = f"sqlite:///{os.path.join(diretorio, 'resultados.db')}"
+        self.url = url
+        sqlite = url.startswith('sqlite')
+        self.engine = create_engine(
+            url,
+            connect_args={'timeout': 30, 'check_same_thread': False} if sqlite else {},
+        )
+        if sqlite:
+            event.listen(self.engine, 'connect', self._configurar_sqlite)
+        from modular_app.services import agregados_resultados  # noqa: F401 - registra as tabelas de agregados
+        metadata.create_all(self.engine)
+
+    @staticmethod
+    def _configurar_sqlite(conexao, _registro) -> None:
+        # WAL: leituras da API não bloqueiam os workers gravando
+        cursor = conexao.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+    # ------------------------------------------------------------------ escrita
+
+    def registrar(self, tipo_analise: str, resultados: Iterable[Dict[str, Any]],
+                  job_id: Optional[str] = None) -> int:
+        """
+        Grava os resultados de um lote numa única transação, junto com os
+        incrementos dos agregados; devolve quantos foram gravados.
+        """
+        from modular_app.services.agregados_resultados import Incrementos
+
+        extrator = _EXTRATORES[tipo_analise]
+        agora = datetime.now()
+        gravados = 0
+        incrementos = Incrementos()
+        with self.engine.begin() as conn:
+            for r in resultados:
+                linha = extrator(r)
+                numero = linha.get('numero_processo')
+                if not numero:
+                    continue
+                detalhes = dict(linha.get('detalhes') or {})
+                # Métricas guardadas para reconstruir os histogramas no backfill
+                for chave in ('tempos_etapas', 'estatisticas_ocr'):
+                    if r.get(chave):
+                        detalhes[chave] = r[chave]
+                resultado = normalizar_resultado(linha.get('resultado'))
+                percentual = linha.get('percentual')
+                try:
+                    percentual = float(percentual) if percentual is not None else None
+                except (TypeError, ValueError):
+                    percentual = None
+                res = conn.execute(resultados_tabela.insert().values(
+                    numero_processo=str(numero).strip(),
+                    tipo_analise=tipo_analise,
+                    resultado=resultado,
+                    status=str(linha['status'])[:80] if linha.get('status') is not None else None,
+                    data_analise=agora,
+                    percentual=percentual,
+                    motivos=json.dumps(linha.get('motivos') or [], ensure_ascii=False),
+                    erro=str(linha['erro']) if linha.get('erro') else None,
+                    job_id=job_id,
+                    detalhes=json.dumps(detalhes, ensure_ascii=False, default=str),
+                ))
+                requisitos = sorted({_slug(req)[:60] for req in linha.get('requisitos') or [] if _slug(req)})
+                if requisitos:
+                    resultado_id = res.inserted_primary_key[0]
+                    conn.execute(requisitos_tabela.insert(), [
+                        {'resultado_id': resultado_id, 'requisito': req, 'data_analise': agora}
+                        for req in requisitos
+                    ])
+                incrementos.adicionar(tipo_analise, agora, resultado, requisitos, detalhes)
+                gravados += 1
+            incrementos.gravar(conn)
+        return gravados
+
+    # ------------------------------------------------------------------ leitura
+
+    def consultar(self, numero_processo: Optional[str] = None, tipo_analise: Optional[str] = None,
+                  resultado: Optional[str] = None, requisito: Optional[str] = None,
+                  data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None,
+                  cursor: Optional[str] = None, limite: int = LIMITE_PADRAO) -> Dict[str, Any]:
+        """
+        Página de resultados, do mais recente para o mais antigo.
+
+        `data_fim` é exclusiva. Com `requisito` a busca parte do índice de
+        requisitos (a ordenação usa as colunas repetidas lá).
+
+        Returns:
+            {'itens': [...], 'proximo_cursor': str | None}
+        """
+        limite = max(1, min(int(limite or LIMITE_PADRAO), LIMITE_MAXIMO))
+        r = resultados_tabela
+        if requisito:
+            q = requisitos_tabela
+            chave_data, chave_id = q.c.data_analise, q.c.resultado_id
+            consulta = select(r).select_from(q.join(r, r.c.id == q.c.resultado_id)).where(
+                q.c.requisito == _slug(requisito)
+            )
+        else:
+            chave_data, chave_id = r.c.data_analise, r.c.id
+            consulta = select(r)
+
+        if numero_processo:
+            consulta = consulta.where(r.c.numero_processo == str(numero_processo).strip())
+        if tipo_analise:
+            consulta = consulta.where(r.c.tipo_analise == tipo_analise)
+        if resultado:
+            consulta = consulta.where(r.c.resultado == normalizar_resultado(resultado))
+        if data_inicio:
+            consulta = consulta.where(chave_data >= data_inicio)
+        if data_fim:
+            consulta = consulta.where(chave_data < data_fim)
+        if cursor:
+            data_cursor, id_cursor = decodificar_cursor(cursor)
+            consulta = consulta.where(or_(
+                chave_data < data_cursor,
+                and_(chave_data == data_cursor, chave_id < id_cursor),
+            ))
+        consulta = consulta.order_by(chave_data.desc(), chave_id.desc()).limit(limite + 1)
+
+        with self.engine.connect() as conn:
+            linhas = conn.execute(consulta).mappings().all()
+            pagina = linhas[:limite]
+            requisitos_por_id: Dict[int, List[str]] = {}
+            if pagina:
+                ids = [linha['id'] for linha in pagina]
+                for resultado_id, req in conn.execute(
+                    select(requisitos_tabela.c.resultado_id, requisitos_tabela.c.requisito)
+                    .where(requisitos_tabela.c.resultado_id.in_(ids))
+                ):
+                    requisitos_por_id.setdefault(resultado_id, []).append(req)
+
+        itens = [self._item(linha, requisitos_por_id.get(linha['id'], [])) for linha in pagina]
+        proximo = None
+        if len(linhas) > limite:
+            ultimo = pagina[-1]
+            proximo = codificar_cursor(ultimo['data_analise'], ultimo['id'])
+        return {'itens': itens, 'proximo_cursor': proximo}
+
+    @staticmethod
+    def _item(linha: Any, requisitos: List[str]) -> Dict[str, Any]:
+        return {
+            'id': linha['id'],
+            'numero_processo': linha['numero_processo'],
+            'tipo_analise': linha['tipo_analise'],
+            'resultado': linha['resultado'],
+            'status': linha['status'],
+            'data_analise': linha['data_analise'].isoformat(),
+            'percentual': linha['percentual'],
+            'motivos': json.loads(linha['motivos'] or '[]'),
+            'requisitos_nao_atendidos': sorted(requisitos),
+            'erro': linha['erro'],
+            'job_id': linha['job_id'],
+            'detalhes': json.loads(linha['detalhes'] or '{}'),
+        }
+
+
+_BANCO: Optional[BancoResultados] = None
+_BANCO_LOCK = threading.Lock()
+
+
+def obter_banco_resultados() -> Optional[BancoResultados]:
+    """Banco compartilhado do processo; None se desligado ou indisponível."""
+    global _BANCO
+    if not SQLALCHEMY_DISPONIVEL or not banco_resultados_habilitado():
+        return None
+    with _BANCO_LOCK:
+        if _BANCO is None:
+            try:
+                _BANCO = BancoResultados()
+            except Exception as e:
+                print(f"[AVISO] Banco de resultados indisponível: {e}")
+                return None
+        return _BANCO
+
+
+def registrar_resultados(tipo_analise: str, resultados: Iterable[Dict[str, Any]],
+                         job_id: Optional[str] = None) -> int:
+    """Grava no banco sem nunca interromper quem chamou (planilhas seguem como fonte principal)."""
+    banco = obter_banco_resultados()
+    if banco is None:
+        return 0
+    try:
+        return banco.registrar(tipo_analise, resultados, job_id=job_id)
+    except Exception as e:
+        print(f"[AVISO] Falha ao gravar resultados ({tipo_analise}) no banco: {e}")
+        return 0
+
+
+__all__ = [
+    'BancoResultados', 'obter_banco_resultados', 'registrar_resultados', 'requisitos_falhados_ordinaria',
+    'normalizar_resultado', 'codificar_cursor', 'decodificar_cursor', 'TIPOS_ANALISE',
+    'LIMITE_PADRAO', 'LIMITE_MAXIMO',
+]
@@ -1,12 +1,15 @@
 """
 Serviço Unificado de Resultados
 Consolida geração de planilhas para Parecer do Analista e Ordinária em um único local
+e grava cada resultado no banco consultável (`resultados_db.py`)
 """
 import os
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from modular_app.services.resultados_db import registrar_resultados, requisitos_falhados_ordinaria
+
 
 class UnifiedResultsService:
     """
@@ -30,13 +33,15 @@ class UnifiedResultsService:
         self.consolidated_path = os.path.join(self.planilhas_dir, self.consolidated_file)
     
     def salvar_resultado_parecer_analista(self, resultados: List[Dict[str, Any]], 
-                                         timestamp: Optional[str] = None) -> str:
+                                         timestamp: Optional[str] = None,
+                                         job_id: Optional[str] = None) -> str:
         """
         Salva resultados do Parecer do Analista (aprovação de recurso)
         
         Args:
             resultados: Lista de dicionários com resultados
             timestamp: Timestamp opcional para nome do arquivo
+            job_id: Job de origem (gravado no banco de resultados)
             
         Returns:
             Caminho do arquivo salvo
@@ -68,6 +73,7 @@ class UnifiedResultsService:
         
         # Adicionar ao consolidado
         self._append_to_consolidated(df)
+        registrar_resultados('parecer_analista', resultados, job_id=job_id)
         
         return individual_path
     
@@ -111,17 +117,30 @@ class UnifiedResultsService:
         
         # Adicionar ao consolidado
         self._append_to_consolidated(df)
+        registrar_resultados('ordinaria', [{
+            'codigo': numero_processo,
+            'status': resultado.get('status'),
+            'elegibilidade_final': resultado.get('elegibilidade_final'),
+            'percentual_final': elegibilidade.get('percentual_final'),
+            'motivo_final': elegibilidade.get('motivo_final'),
+            'motivos_indeferimento': resultado.get('motivos_indeferimento', []),
+            'requisitos_nao_atendidos': requisitos_falhados_ordinaria(elegibilidade),
+            'documentos_faltantes': resultado.get('documentos_faltantes', []),
+            'erro': resultado.get('erro'),
+        }])
         
         return self.consolidated_path
     
     def salvar_lote_ordinaria(self, resultados: List[Dict[str, Any]],
-                             timestamp: Optional[str] = None) -> str:
+                             timestamp: Optional[str] = None,
+                             job_id: Optional[str] = None) -> str:
         """
         Salva múltiplos resultados de Análise Ordinária
         
         Args:
             resultados: Lista de resultados
             timestamp: Timestamp opcional
+            job_id: Job de origem (gravado no banco de resultados)
             
         Returns:
             Caminho do arquivo salvo
@@ -154,6 +173,7 @@ class UnifiedResultsService:
         
         # Adicionar ao consolidado
         self._append_to_consolidated(df)
+        registrar_resultados('ordinaria', resultados, job_id=job_id)
         
         return individual_path
     
@@ -159,8 +159,8 @@ def task_analise_ordinaria(self, filepath: str, column_name: str = 'codigo') ->
     Returns:
         Dict com resumo do processamento
     """
-    import pandas as pd
     from automation.services.ordinaria_processor import OrdinariaProcessor
+    from modular_app.services.resultados_db import requisitos_falhados_ordinaria
     
     proc = None
     try:
@@ -170,27 +170,10 @@ def task_analise_ordinaria(self, filepath: str, column_name: str = 'codigo') ->
             meta={'status': 'initializing', 'progress': 10, 'message': 'Inicializando...'}
         )
         
-        # Ler códigos
-        def _ler_codigos(caminho: str, col: str) -> list[str]:
-            _, ext = os.path.splitext(caminho.lower())
-            if ext in ('.xlsx', '.xls'):
-                df = pd.read_excel(caminho, dtype=str)
-            elif ext == '.csv':
-                df = pd.read_csv(caminho, dtype=str)
-            else:
-                df = pd.read_excel(caminho, dtype=str)
-            mapa = {str(c).strip().lower(): c for c in df.columns}
-            alvo = (col or 'codigo').strip().lower()
-            real = mapa.get(alvo) or mapa.get('codigo') or mapa.get('código')
-            if not real:
-                real = list(df.columns)[0]
-            serie = df[real].dropna().astype(str).map(lambda x: x.strip()).replace({'': None}).dropna()
-            serie = serie.str.replace('.', '', regex=False).str.replace(',', '', regex=False)
-            return serie.tolist()
-        
-        codigos = _ler_codigos(filepath, column_name)
-        if not codigos:
-            raise Exception('Nenhum código encontrado na planilha')
+        # Ler códigos em streaming (o primeiro já foi lido; o resto vem durante o processamento)
+        from automation.utils.leitor_codigos import abrir_codigos
+        leitor, codigos = abrir_codigos(filepath, column_name)
+        total = leitor.estimar_total() or 0
         
         # Inicializar Processor
         self.update_state(
@@ -213,19 +196,18 @@ def task_analise_ordinaria(self, filepath: str, column_name: str = 'codigo') ->
         
         # Processar
         resultados = []
-        total = len(codigos)
         
         for i, codigo in enumerate(codigos, 1):
-            progress = int(20 + (i / max(1, total)) * 70)
+            progress = int(20 + (i / max(i, total)) * 70)
             self.update_state(
                 state='PROGRESS',
                 meta={
                     'status': 'processing',
                     'progress': progress,
                     'current': i,
-                    'total': total,
+                    'total': max(i, total),
                     'codigo': codigo,
-                    'message': f'Processando {i}/{total}...'
+                    'message': f'Processando {i}/{max(i, total)}...'
                 }
             )
             
@@ -239,6 +221,7 @@ def task_analise_ordinaria(self, filepath: str, column_name: str = 'codigo') ->
                     'motivo_final': resultado.get('resultado_elegibilidade', {}).get('motivo_final'),
                     'motivos_indeferimento': resultado.get('motivos_indeferimento', []),
                     'documentos_faltantes': resultado.get('documentos_faltantes', []),
+                    'requisitos_nao_atendidos': requisitos_falhados_ordinaria(resultado.get('resultado_elegibilidade') or {}),
                     'erro': resultado.get('erro')
                 }
             except Exception as e:
@@ -251,7 +234,7 @@ def task_analise_ordinaria(self, filepath: str, column_name: str = 'codigo') ->
             from modular_app.services.unified_results_service import UnifiedResultsService
             ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             unified_service = UnifiedResultsService()
-            out_path = unified_service.salvar_lote_ordinaria(resultados, timestamp=ts)
+            out_path = unified_service.salvar_lote_ordinaria(resultados, timestamp=ts, job_id=self.request.id)
             out_name = os.path.basename(out_path)
         except Exception as e:
             out_name = f'erro_salvar: {str(e)}'
@@ -270,6 +253,10 @@ def task_analise_ordinaria(self, filepath: str, column_name: str = 'codigo') ->
         raise self.retry(exc=e, countdown=60, max_retries=3)
         
     finally:
+        try:
+            codigos.close()  # libera a planilha lida em streaming antes de removê-la
+        except Exception:
+            pass
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
@@ -489,27 +476,29 @@ def task_relatorio_semanal() -> Dict[str, Any]:
     """Task periódica: Gera relatório semanal de atividades.
     
     Agenda sugerida: Segunda a sexta às 9h
+    
+    Lê os agregados materializados do banco de resultados (sem varrer
+    planilhas nem a tabela de resultados).
     """
     from datetime import datetime, timedelta
+    from modular_app.services.resultados_db import obter_banco_resultados
     
     try:
-        # Exemplo: contar arquivos processados na última semana
-        planilhas_dir = os.path.join(os.getcwd(), 'planilhas')
-        if not os.path.exists(planilhas_dir):
-            return {'status': 'skipped', 'reason': 'Sem dados para relatório'}
-        
-        limite = time.time() - (7 * 24 * 3600)  # 7 dias
-        arquivos_semana = 0
-        
-        for filename in os.listdir(planilhas_dir):
-            filepath = os.path.join(planilhas_dir, filename)
-            if os.path.isfile(filepath) and os.path.getmtime(filepath) > limite:
-                arquivos_semana += 1
+        banco = obter_banco_resultados()
+        if banco is None:
+            return {'status': 'skipped', 'reason': 'Banco de resultados indisponível'}
+        from modular_app.services.agregados_resultados import histogramas, resumo, serie_diaria
         
+        hoje = datetime.now().date()
+        inicio = hoje - timedelta(days=6)
         return {
             'status': 'completed',
             'periodo': 'últimos 7 dias',
-            'arquivos_processados': arquivos_semana,
+            'inicio': inicio.isoformat(),
+            'fim': hoje.isoformat(),
+            'resumo': resumo(banco, inicio, hoje),
+            'por_dia': serie_diaria(banco, inicio, hoje),
+            'latencia_etapas': histogramas(banco, inicio, hoje),
             'gerado_em': datetime.now().isoformat(),
         }
     except Exception as e:
@@ -522,22 +511,73 @@ def task_relatorio_mensal() -> Dict[str, Any]:
     
     Agenda sugerida: Primeiro dia do mês às 8h
     """
-    from datetime import datetime
-    import pandas as pd
+    from datetime import datetime, timedelta
+    from modular_app.services.resultados_db import obter_banco_resultados
     
     try:
-        # Exemplo: consolidar dados do mês anterior
+        banco = obter_banco_resultados()
+        if banco is None:
+            return {'status': 'skipped', 'reason': 'Banco de resultados indisponível'}
+        from modular_app.services.agregados_resultados import histogramas, resumo
+        
+        # Consolidar o mês anterior
         agora = datetime.now()
-        mes_anterior = agora.replace(day=1) - timedelta(days=1)
+        fim = agora.date().replace(day=1) - timedelta(days=1)
+        inicio = fim.replace(day=1)
+        por_tipo = {}
+        for tipo in ('ordinaria', 'provisoria', 'definitiva'):
+            dados = resumo(banco, inicio, fim, tipo_analise=tipo)
+            if dados['analises']:
+                por_tipo[tipo] = dados
         
         return {
             'status': 'completed',
-            'mes_referencia': mes_anterior.strftime('%Y-%m'),
+            'mes_referencia': inicio.strftime('%Y-%m'),
+            'resumo': resumo(banco, inicio, fim),
+            'por_tipo': por_tipo,
+            'histogramas': histogramas(banco, inicio, fim),
             'gerado_em': agora.isoformat(),
         }
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
 
+@celery.task(name='modular_app.tasks.celery_tasks.task_arquivar_resultados')
+def task_arquivar_resultados() -> Dict[str, Any]:
+    """Task periódica: Anexa ao arquivo Parquet os resultados novos do banco.
+    
+    Agenda sugerida: Todos os dias às 2h30
+    """
+    from modular_app.services.arquivo_resultados import obter_arquivo_resultados
+    from modular_app.services.resultados_db import obter_banco_resultados
+    
+    try:
+        banco = obter_banco_resultados()
+        arquivo = obter_arquivo_resultados()
+        if banco is None or arquivo is None:
+            return {'status': 'skipped', 'reason': 'Banco de resultados ou pyarrow indisponível'}
+        estatisticas = arquivo.arquivar_do_banco(banco)
+        return {'status': 'completed', **estatisticas}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+
+@celery.task(name='modular_app.tasks.celery_tasks.task_compactar_arquivo')
+def task_compactar_arquivo() -> Dict[str, Any]:
+    """Task periódica: Junta as partes diárias de cada partição do arquivo Parquet.
+    
+    Agenda sugerida: Domingos às 3h
+    """
+    from modular_app.services.arquivo_resultados import obter_arquivo_resultados
+    
+    try:
+        arquivo = obter_arquivo_resultados()
+        if arquivo is None:
+            return {'status': 'skipped', 'reason': 'pyarrow indisponível'}
+        return {'status': 'completed', 'particoes': arquivo.compactar()}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+
 # Adicionar mais tasks conforme necessário...
 # task_analise_provisoria, task_analise_definitiva, task_aprovacao_parecer, etc.
@@ -1,7 +1,7 @@
 import os
 import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 def _should_stop(job_service, job_id: str) -> bool:
@@ -12,6 +12,40 @@ def _should_stop(job_service, job_id: str) -> bool:
         return False
 
 
+def _metricas_sessao_lecom() -> Dict[str, Any]:
+    """Reaproveitamento da sessão LECOM armazenada (taxa de acerto, idade)."""
+    try:
+        from automation.utils.sessao_lecom import obter_sessao_lecom
+        return obter_sessao_lecom().metricas()
+    except Exception:
+        return {}
+
+
+def _registrar_banco_resultados(job_service, job_id: str, tipo_analise: str, resultados: List[Dict[str, Any]]) -> None:
+    """Grava os resultados do job no banco consultável (falhas só geram aviso)."""
+    from modular_app.services.resultados_db import registrar_resultados
+
+    gravados = registrar_resultados(tipo_analise, resultados, job_id=job_id)
+    if gravados:
+        job_service.log(job_id, f'[SALVO] {gravados} resultado(s) gravados no banco de resultados', 'info')
+
+
+def _resumo_tempos_etapas(resultados: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Agrega `tempos_etapas` dos resultados do job (média/máximo por etapa, em ms)."""
+    acumulado: Dict[str, List[float]] = {}
+    for r in resultados:
+        for etapa, ms in (r.get('tempos_etapas') or {}).items():
+            acumulado.setdefault(etapa, []).append(float(ms or 0.0))
+    return {
+        etapa: {
+            'contagem': len(valores),
+            'media_ms': round(sum(valores) / len(valores), 2),
+            'max_ms': round(max(valores), 2),
+        }
+        for etapa, valores in acumulado.items()
+    }
+
+
 def worker_defere_indefere(job_service, job_id: str, filepath: str, column_name: str) -> None:
     """Worker para Defere/Indefere Recurso usando JobService para status/log (refatorado).
     Usa RecursoProcessor da arquitetura modular em automation/.
@@ -91,6 +125,7 @@ def worker_defere_indefere(job_service, job_id: str, filepath: str, column_name:
             job_service.log(job_id, f'[SALVO] Resultados salvos em planilhas/: {out_name}', 'success')
         except Exception as e:
             job_service.log(job_id, f'[AVISO] Erro ao salvar planilha: {e}', 'warning')
+        _registrar_banco_resultados(job_service, job_id, 'defere_indefere', resultados)
 
         job_service.update(job_id, status='completed', message='Processamento concluído!', detail='Finalizado', progress=100)
 
@@ -183,7 +218,7 @@ def worker_aprovacao_recurso(job_service, job_id: str, filepath: str, column_nam
             ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             unified_service = UnifiedResultsService()
-            out_path = unified_service.salvar_resultado_parecer_analista(resultados, timestamp=ts)
+            out_path = unified_service.salvar_resultado_parecer_analista(resultados, timestamp=ts, job_id=job_id)
             out_name = os.path.basename(out_path)
             
             job_service.log(job_id, f'[SALVO] Resultados salvos em planilhas/: {out_name}', 'success')
@@ -242,7 +277,27 @@ def worker_aprovacao_lote(job_service, job_id: str, max_iteracoes: int, modo_exe
         job_service.update(job_id, status='running', message='Inicializando Driver...', detail='Abrindo navegador VISUAL', progress=25)
         job_service.log(job_id, 'Processor de lote inicializado em MODO VISUAL (refatorado)', 'success')
 
-        if modo_execucao == 'continuo':
+        if modo_execucao == 'vigilancia':
+            # Mantém o formulário aberto e só processa quando a sonda encontra pendências
+            espera_min_s = float(os.environ.get('LOTE_VIGIA_ESPERA_MIN_S', 5))
+            espera_max_s = max(espera_min_s, max(1, tempo_espera_minutos) * 60.0)
+            job_service.update(job_id, status='running', message='Vigiando a fila de lote...', detail=f'Máximo {max_iteracoes} ciclos', progress=35)
+            job_service.log(job_id, f'[INFO] Modo vigilância: sonda a cada {espera_min_s:.0f}s, recuando até {espera_max_s:.0f}s sem pendências', 'info')
+
+            def _ao_ciclo(ciclo: int, processados: int) -> None:
+                progress = 35 + (ciclo / max(1, max_iteracoes)) * 50
+                job_service.update(job_id, status='running', message=f'Ciclo {ciclo}/{max_iteracoes}', detail=f'{processados} processos no último ciclo', progress=progress)
+                job_service.log(job_id, f'[OK] Ciclo {ciclo}: {processados} processos aprovados', 'success')
+
+            ciclos = processor.vigiar(
+                lambda: _should_stop(job_service, job_id),
+                max_iteracoes,
+                espera_min_s=espera_min_s,
+                espera_max_s=espera_max_s,
+                ao_ciclo=_ao_ciclo,
+            )
+            job_service.log(job_id, f'🏁 Vigilância finalizada após {ciclos} ciclo(s).', 'success')
+        elif modo_execucao == 'continuo':
             job_service.update(job_id, status='running', message='Executando Ciclos Contínuos...', detail=f'Máximo {max_iteracoes} ciclos', progress=35)
             job_service.log(job_id, f'Iniciando {max_iteracoes} ciclos completos de aprovação...', 'info')
             job_service.log(job_id, f'⏰ Tempo de espera entre ciclos: {tempo_espera_minutos} minutos', 'info')
@@ -257,6 +312,9 @@ def worker_aprovacao_lote(job_service, job_id: str, max_iteracoes: int, modo_exe
                 job_service.log(job_id, f'[RELOAD] Iniciando ciclo completo {i+1}/{max_iteracoes}...', 'info')
 
                 resultado_ciclo = processor.executar()
+                if processor.ultimo_resumo:
+                    r = processor.ultimo_resumo
+                    job_service.log(job_id, f"[INFO] {r['linhas']} processos em {r['paginas']} página(s): {r['atualizados']} atualizados, {r['ja_decididos']} já decididos, {r['sem_decisao']} sem decisão, {len(r['falhas'])} falhas", 'info')
                 if resultado_ciclo:
                     ciclos_executados += 1
                     job_service.log(job_id, f'[OK] Ciclo {i+1} concluído com sucesso', 'success')
@@ -301,47 +359,34 @@ def worker_aprovacao_lote(job_service, job_id: str, max_iteracoes: int, modo_exe
 from typing import Optional
 
 
-def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_name: str = 'codigo') -> None:
+def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_name: str = 'codigo',
+                             perfil_navegador: Optional[str] = None) -> None:
     """Worker para Análise Automática do tipo Ordinária (refatorado).
     Usa OrdinariaProcessor com login automático (.env) e fluxo completo.
     """
     import os
-    import pandas as pd
     from datetime import datetime
     import time
+    from automation.utils.lecom_urls import url_workspace
+    from modular_app.services.resultados_db import requisitos_falhados_ordinaria
     try:
         job_service.update(job_id, status='running', message='Inicializando...', detail='Configurando automação Ordinária', progress=10)
         job_service.log(job_id, 'Iniciando análise Ordinária (refatorado)...', 'info')
 
-        # Ler códigos (case-insensitive)
-        def _ler_codigos(caminho: str, col: str) -> list[str]:
-            _, ext = os.path.splitext(caminho.lower())
-            if ext in ('.xlsx', '.xls'):
-                df = pd.read_excel(caminho, dtype=str)
-            elif ext == '.csv':
-                df = pd.read_csv(caminho, dtype=str)
-            else:
-                df = pd.read_excel(caminho, dtype=str)
-            mapa = {str(c).strip().lower(): c for c in df.columns}
-            alvo = (col or 'codigo').strip().lower()
-            real = mapa.get(alvo) or mapa.get('codigo') or mapa.get('código')
-            if not real:
-                real = list(df.columns)[0]
-            serie = df[real].dropna().astype(str).map(lambda x: x.strip()).replace({'': None}).dropna()
-            # normalizar removendo separadores
-            serie = serie.str.replace('.', '', regex=False).str.replace(',', '', regex=False)
-            return serie.tolist()
-
-        codigos = _ler_codigos(filepath, column_name)
-        if not codigos:
-            raise Exception('Nenhum código encontrado na planilha')
-        job_service.log(job_id, f'[OK] {len(codigos)} códigos lidos', 'success')
+        # Ler códigos em streaming (o primeiro já foi lido; o resto vem durante o processamento)
+        from automation.utils.leitor_codigos import abrir_codigos
+        leitor, codigos = abrir_codigos(filepath, column_name)
+        total = leitor.estimar_total() or 0
+        job_service.log(job_id, f"[OK] Planilha aberta (coluna '{leitor.coluna_encontrada}', ~{total or '?'} linhas)", 'success')
 
         # Inicializar Processor (Selenium abre aqui)
         from automation.services.ordinaria_processor import OrdinariaProcessor
         job_service.update(job_id, status='running', message='Abrindo navegador...', detail='Inicializando Selenium', progress=15)
-        job_service.log(job_id, '[WEB] Inicializando Selenium (Chrome headful)...', 'info')
-        proc = OrdinariaProcessor(driver=None)
+        from automation.utils.perfil_navegador import PERFIL_DESEMPENHO, resolver_perfil
+        perfil_navegador = resolver_perfil(perfil_navegador)
+        modo_chrome = 'headless, perfil desempenho' if perfil_navegador == PERFIL_DESEMPENHO else 'Chrome headful'
+        job_service.log(job_id, f'[WEB] Inicializando Selenium ({modo_chrome})...', 'info')
+        proc = OrdinariaProcessor(driver=None, perfil_navegador=perfil_navegador)
 
         # Login automático
         job_service.update(job_id, status='running', message='Fazendo login automático...', detail='Autenticando no LECOM', progress=20)
@@ -352,7 +397,7 @@ def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_nam
         try:
             cur = proc.lecom_action.driver.current_url
             if 'workspace' not in (cur or '').lower():
-                proc.lecom_action.driver.get('https://justica.servicos.gov.br/workspace')
+                proc.lecom_action.driver.get(url_workspace())
                 time.sleep(2)
         except Exception:
             pass
@@ -360,45 +405,77 @@ def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_nam
 
         # Processar
         resultados = []
-        total = len(codigos)
-        for i, codigo in enumerate(codigos, 1):
-            if _should_stop(job_service, job_id):
-                job_service.log(job_id, '⏹️ Processo cancelado pelo usuário', 'warning')
-                break
-            progress = int(20 + (i / max(1, total)) * 70)
-            job_service.update(job_id, status='running', message=f'Processando {i}/{total}...', detail=f'Código: {codigo}', progress=progress)
-            job_service.log(job_id, f'[INFO] Ordinária: {codigo}', 'info')
-            try:
-                # Processar processo usando OrdinariaProcessor
-                resultado = proc.processar_processo(codigo)
-                
-                # Formatar saída
-                out = {
-                    'codigo': codigo,
-                    'status': 'sucesso' if resultado.get('sucesso') else 'erro',
-                    'elegibilidade_final': resultado.get('elegibilidade_final'),
-                    'percentual_final': resultado.get('resultado_elegibilidade', {}).get('percentual_final'),
-                    'motivo_final': resultado.get('resultado_elegibilidade', {}).get('motivo_final'),
-                    'motivos_indeferimento': resultado.get('motivos_indeferimento', []),
-                    'documentos_faltantes': resultado.get('documentos_faltantes', []),
-                    'erro': resultado.get('erro')
-                }
-            except Exception as e:
-                out = {'codigo': codigo, 'status': 'erro', 'erro': str(e)}
-            resultados.append(out)
+
+        def _formatar(codigo: str, resultado: dict) -> dict:
+            return {
+                'codigo': codigo,
+                'status': 'sucesso' if resultado.get('sucesso') else 'erro',
+                'elegibilidade_final': resultado.get('elegibilidade_final'),
+                'percentual_final': resultado.get('resultado_elegibilidade', {}).get('percentual_final'),
+                'motivo_final': resultado.get('resultado_elegibilidade', {}).get('motivo_final'),
+                'motivos_indeferimento': resultado.get('motivos_indeferimento', []),
+                'documentos_faltantes': resultado.get('documentos_faltantes', []),
+                'requisitos_nao_atendidos': requisitos_falhados_ordinaria(resultado.get('resultado_elegibilidade') or {}),
+                'erro': resultado.get('erro'),
+                'tempos_etapas': resultado.get('tempos_etapas', {}),
+                'documentos_sob_demanda': resultado.get('documentos_sob_demanda', {}),
+                'estatisticas_ocr': resultado.get('estatisticas_ocr', {}),
+            }
+
+        def _registrar(out: dict) -> None:
+            codigo = out.get('codigo')
             status_ok = str(out.get('status','')).lower()
             if status_ok in ('sucesso', 'processado com sucesso'):
                 job_service.log(job_id, f"[OK] {codigo}: {out.get('elegibilidade_final', 'N/A')}", 'success')
             else:
                 job_service.log(job_id, f"[ERRO] {codigo}: {out.get('erro','Erro desconhecido')}", 'error')
 
+        from automation.services.ordinaria_pipeline import OrdinariaPipeline, pipeline_ordinaria_habilitado
+        resumo_pipeline = None
+        if pipeline_ordinaria_habilitado() and total != 1:
+            # Navegador do caso N+1 em paralelo ao OCR/regras do caso N
+            concluidos = []
+
+            def _ao_concluir(codigo: str, resultado: dict) -> None:
+                out = _formatar(codigo, resultado)
+                concluidos.append(out)
+                _registrar(out)
+                n = len(concluidos)
+                job_service.update(job_id, status='running', message=f'Processados {n}/{max(n, total)}...', detail=f'Código: {codigo}', progress=int(20 + (n / max(n, total)) * 70))
+
+            job_service.log(job_id, '[INFO] Processamento em pipeline (navegador | OCR/regras | planilha)', 'info')
+            pipeline = OrdinariaPipeline(proc, deve_parar=lambda: _should_stop(job_service, job_id), ao_concluir=_ao_concluir)
+            resultados = [_formatar(r.get('numero_processo'), r) for r in pipeline.processar(codigos)]
+            if pipeline.parado:
+                job_service.log(job_id, '⏹️ Processo cancelado pelo usuário', 'warning')
+            resumo_pipeline = pipeline.resumo()
+            job_service.log(job_id, f"[INFO] Pipeline: {resumo_pipeline['itens_por_minuto']} processos/min, gargalo: {resumo_pipeline['gargalo']}", 'info')
+        else:
+            for i, codigo in enumerate(codigos, 1):
+                if _should_stop(job_service, job_id):
+                    job_service.log(job_id, '⏹️ Processo cancelado pelo usuário', 'warning')
+                    break
+                progress = int(20 + (i / max(i, total)) * 70)
+                job_service.update(job_id, status='running', message=f'Processando {i}/{max(i, total)}...', detail=f'Código: {codigo}', progress=progress)
+                job_service.log(job_id, f'[INFO] Ordinária: {codigo}', 'info')
+                try:
+                    # Processar processo usando OrdinariaProcessor
+                    resultado = proc.processar_processo(codigo)
+                    out = _formatar(codigo, resultado)
+                except Exception as e:
+                    out = {'codigo': codigo, 'status': 'erro', 'erro': str(e)}
+                resultados.append(out)
+                _registrar(out)
+
+        job_service.log(job_id, f'[DADOS] {leitor.lidos} código(s) lido(s) da planilha, {leitor.duplicados} duplicado(s) ignorado(s)', 'info')
+
         # Salvar planilha usando serviço unificado
         try:
             from modular_app.services.unified_results_service import UnifiedResultsService
             ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             unified_service = UnifiedResultsService()
-            out_path = unified_service.salvar_lote_ordinaria(resultados, timestamp=ts)
+            out_path = unified_service.salvar_lote_ordinaria(resultados, timestamp=ts, job_id=job_id)
             out_name = os.path.basename(out_path)
             
             job_service.log(job_id, f'[SALVO] Resultados salvos em planilhas/: {out_name}', 'success')
@@ -412,6 +489,17 @@ def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_nam
             'sucessos': len([r for r in resultados if str(r.get('status','')).lower() in ('sucesso','processado com sucesso') ]),
             'erros': len([r for r in resultados if str(r.get('status','')).lower() not in ('sucesso','processado com sucesso') ]),
             'arquivo_original': filepath,
+            'tempos_etapas': _resumo_tempos_etapas(resultados),
+            'documentos_sob_demanda': {
+                'baixados': sum((r.get('documentos_sob_demanda') or {}).get('baixados', 0) for r in resultados),
+                'evitados': sum((r.get('documentos_sob_demanda') or {}).get('evitados', 0) for r in resultados),
+                'casos_sem_download': sum(
+                    1 for r in resultados
+                    if (r.get('documentos_sob_demanda') or {}).get('evitados') and not r['documentos_sob_demanda'].get('baixados')
+                ),
+            },
+            'pipeline': resumo_pipeline,
+            'sessao_lecom': _metricas_sessao_lecom(),
         })
         job_service.update(job_id, status='completed', message='Concluído!', detail='Análise Ordinária finalizada', progress=100)
     except Exception as e:
@@ -419,6 +507,10 @@ def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_nam
         job_service.update(job_id, status='error', message='Erro', detail=str(e), progress=0)
     finally:
         # Cleanup
+        try:
+            codigos.close()  # libera a planilha lida em streaming antes de removê-la
+        except Exception:
+            pass
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
@@ -436,7 +528,8 @@ def worker_analise_ordinaria(job_service, job_id: str, filepath: str, column_nam
             pass
 
 
-def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_name: str = 'codigo') -> None:
+def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_name: str = 'codigo',
+                              perfil_navegador: Optional[str] = None) -> None:
     """Worker para Análise Automática do tipo Provisória (refatorado).
     Usa ProvisoriaAction/Processor com login automático (.env) e fluxo compatível com o original.
     """
@@ -444,39 +537,27 @@ def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_na
     import pandas as pd
     from datetime import datetime
     import time
+    from automation.utils.lecom_urls import url_workspace
     try:
         job_service.update(job_id, status='running', message='Inicializando...', detail='Configurando automação Provisória', progress=10)
         job_service.log(job_id, 'Iniciando análise Provisória (refatorado)...', 'info')
 
-        # Ler códigos (case-insensitive)
-        def _ler_codigos(caminho: str, col: str) -> list[str]:
-            _, ext = os.path.splitext(caminho.lower())
-            if ext in ('.xlsx', '.xls'):
-                df = pd.read_excel(caminho, dtype=str)
-            elif ext == '.csv':
-                df = pd.read_csv(caminho, dtype=str)
-            else:
-                df = pd.read_excel(caminho, dtype=str)
-            mapa = {str(c).strip().lower(): c for c in df.columns}
-            alvo = (col or 'codigo').strip().lower()
-            real = mapa.get(alvo) or mapa.get('codigo') or mapa.get('código')
-            if not real:
-                real = list(df.columns)[0]
-            serie = df[real].dropna().astype(str).map(lambda x: x.strip()).replace({'': None}).dropna()
-            # normalizar removendo separadores
-            serie = serie.str.replace('.', '', regex=False).str.replace(',', '', regex=False)
-            return serie.tolist()
-
-        codigos = _ler_codigos(filepath, column_name)
-        if not codigos:
-            raise Exception('Nenhum código encontrado na planilha')
+        # Ler códigos em streaming; a triagem em duas fases precisa da lista inteira
+        from automation.utils.leitor_codigos import abrir_codigos
+        leitor, codigos = abrir_codigos(filepath, column_name)
+        codigos = list(codigos)
         job_service.log(job_id, f'[OK] {len(codigos)} códigos lidos', 'success')
+        if leitor.duplicados:
+            job_service.log(job_id, f'[INFO] {leitor.duplicados} código(s) duplicado(s) ignorado(s)', 'info')
 
         # Inicializar Processor/Action (Selenium abre aqui)
         from automation.services.provisoria_processor import ProvisoriaProcessor
         job_service.update(job_id, status='running', message='Abrindo navegador...', detail='Inicializando Selenium', progress=15)
-        job_service.log(job_id, '[WEB] Inicializando Selenium (Chrome headful)...', 'info')
-        proc = ProvisoriaProcessor(driver=None)
+        from automation.utils.perfil_navegador import PERFIL_DESEMPENHO, resolver_perfil
+        perfil_navegador = resolver_perfil(perfil_navegador)
+        modo_chrome = 'headless, perfil desempenho' if perfil_navegador == PERFIL_DESEMPENHO else 'Chrome headful'
+        job_service.log(job_id, f'[WEB] Inicializando Selenium ({modo_chrome})...', 'info')
+        proc = ProvisoriaProcessor(driver=None, perfil_navegador=perfil_navegador)
 
         # Login automático
         job_service.update(job_id, status='running', message='Fazendo login automático...', detail='Autenticando no LECOM', progress=20)
@@ -486,7 +567,7 @@ def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_na
         try:
             cur = proc.lecom.driver.current_url
             if 'workspace' not in (cur or '').lower():
-                proc.lecom.driver.get('https://justica.servicos.gov.br/workspace')
+                proc.lecom.driver.get(url_workspace())
                 time.sleep(2)
         except Exception:
             pass
@@ -495,40 +576,78 @@ def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_na
         # Processar
         resultados = []
         total = len(codigos)
-        for i, codigo in enumerate(codigos, 1):
+        relatorio_triagem = None
+        triagem_ativa = os.environ.get('PROVISORIA_TRIAGEM', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+        if triagem_ativa:
+            # Fase 1: gatilhos baratos (idade / antes dos 10) para todos; fase 2: documentos só para quem passou
+            job_service.log(job_id, f'[INFO] Triagem: avaliando idade e ingresso antes dos 10 anos para {total} códigos', 'info')
+
+            def _ao_resultado(i: int, total_: int, codigo: str, resultado: dict, fase: str) -> None:
+                progress = int(20 + (i / max(1, total_)) * 70)
+                job_service.update(job_id, status='running', message=f'Processando {i}/{total_}...', detail=f'Código: {codigo} ({fase})', progress=progress)
+                ae = resultado.get('analise_elegibilidade') or {}
+                if fase == 'triagem':
+                    job_service.log(job_id, f"[OK] {codigo}: encerrado na triagem - {ae.get('motivo_final')}", 'success')
+                elif str(resultado.get('status', '')).lower() == 'sucesso':
+                    job_service.log(job_id, f"[OK] {codigo}: {resultado.get('status')}", 'success')
+                else:
+                    job_service.log(job_id, f"[ERRO] {codigo}: {resultado.get('erro') or 'Erro desconhecido'}", 'error')
+
+            saida = proc.processar_em_duas_fases(codigos, lambda: _should_stop(job_service, job_id), _ao_resultado)
+            relatorio_triagem = saida['relatorio']
+            for resultado in saida['resultados']:
+                resultados.append({
+                    'codigo': resultado.get('codigo'),
+                    'status': resultado.get('status', 'erro'),
+                    'analise_elegibilidade': resultado.get('analise_elegibilidade', {}),
+                    'erro': resultado.get('erro'),
+                    'tempos_etapas': resultado.get('tempos_etapas', {}),
+                })
+            job_service.log(
+                job_id,
+                f"[DADOS] Triagem: {relatorio_triagem['encerrados_na_triagem']}/{total} encerrados sem documentos "
+                f"({relatorio_triagem['documentos_evitados']} downloads/OCR evitados, "
+                f"~{relatorio_triagem['tempo_estimado_economizado_s']:.0f}s economizados)",
+                'info',
+            )
             if _should_stop(job_service, job_id):
                 job_service.log(job_id, '⏹️ Processo cancelado pelo usuário', 'warning')
-                break
-            progress = int(20 + (i / max(1, total)) * 70)
-            job_service.update(job_id, status='running', message=f'Processando {i}/{total}...', detail=f'Código: {codigo}', progress=progress)
-            job_service.log(job_id, f'[INFO] Provisória: {codigo}', 'info')
-            try:
-                # Garantir navegação visível p/ logs da Web (antes do Processor)
+        else:
+            for i, codigo in enumerate(codigos, 1):
+                if _should_stop(job_service, job_id):
+                    job_service.log(job_id, '⏹️ Processo cancelado pelo usuário', 'warning')
+                    break
+                progress = int(20 + (i / max(1, total)) * 70)
+                job_service.update(job_id, status='running', message=f'Processando {i}/{total}...', detail=f'Código: {codigo}', progress=progress)
+                job_service.log(job_id, f'[INFO] Provisória: {codigo}', 'info')
                 try:
-                    job_service.log(job_id, f"[NAV] Provisória: buscando processo {codigo}...", 'info')
-                    _ok_nav = proc.lecom.aplicar_filtros(codigo)
-                    if _ok_nav:
-                        job_service.log(job_id, f"[OK] Provisória: processo {codigo} carregado (workspace/form-web)", 'success')
-                    else:
-                        job_service.log(job_id, f"[AVISO] Provisória: não foi possível carregar {codigo} via aplicar_filtros (seguindo com Processor)", 'warning')
-                except Exception as _e_nav:
-                    job_service.log(job_id, f"[AVISO] Provisória: exceção ao navegar para {codigo}: {_e_nav}", 'warning')
-                # Usar Processor para executar o fluxo completo (login, navegação, avaliação)
-                resultado = proc.processar_codigo(codigo)
-                out = {
-                    'codigo': codigo,
-                    'status': resultado.get('status', 'erro'),
-                    'analise_elegibilidade': resultado.get('analise_elegibilidade', {}),
-                    'erro': resultado.get('erro')
-                }
-            except Exception as e:
-                out = {'codigo': codigo, 'status': 'erro', 'erro': str(e)}
-            resultados.append(out)
-            status_ok = str(out.get('status','')).lower()
-            if status_ok in ('sucesso', 'processado com sucesso'):
-                job_service.log(job_id, f"[OK] {codigo}: {out.get('status')}", 'success')
-            else:
-                job_service.log(job_id, f"[ERRO] {codigo}: {out.get('erro','Erro desconhecido')}", 'error')
+                    # Garantir navegação visível p/ logs da Web (antes do Processor)
+                    try:
+                        job_service.log(job_id, f"[NAV] Provisória: buscando processo {codigo}...", 'info')
+                        _ok_nav = proc.lecom.aplicar_filtros(codigo)
+                        if _ok_nav:
+                            job_service.log(job_id, f"[OK] Provisória: processo {codigo} carregado (workspace/form-web)", 'success')
+                        else:
+                            job_service.log(job_id, f"[AVISO] Provisória: não foi possível carregar {codigo} via aplicar_filtros (seguindo com Processor)", 'warning')
+                    except Exception as _e_nav:
+                        job_service.log(job_id, f"[AVISO] Provisória: exceção ao navegar para {codigo}: {_e_nav}", 'warning')
+                    # Usar Processor para executar o fluxo completo (login, navegação, avaliação)
+                    resultado = proc.processar_codigo(codigo)
+                    out = {
+                        'codigo': codigo,
+                        'status': resultado.get('status', 'erro'),
+                        'analise_elegibilidade': resultado.get('analise_elegibilidade', {}),
+                        'erro': resultado.get('erro'),
+                        'tempos_etapas': resultado.get('tempos_etapas', {}),
+                    }
+                except Exception as e:
+                    out = {'codigo': codigo, 'status': 'erro', 'erro': str(e)}
+                resultados.append(out)
+                status_ok = str(out.get('status','')).lower()
+                if status_ok in ('sucesso', 'processado com sucesso'):
+                    job_service.log(job_id, f"[OK] {codigo}: {out.get('status')}", 'success')
+                else:
+                    job_service.log(job_id, f"[ERRO] {codigo}: {out.get('erro','Erro desconhecido')}", 'error')
 
         # Salvar planilha no diretório planilhas/
         try:
@@ -553,6 +672,7 @@ def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_na
             job_service.log(job_id, f'[SALVO] Resultados salvos em planilhas/: {out_name}', 'success')
         except Exception as e:
             job_service.log(job_id, f'[AVISO] Erro ao salvar planilha: {e}', 'warning')
+        _registrar_banco_resultados(job_service, job_id, 'provisoria', resultados)
 
         # Summary
         job_service.set_result(job_id, {
@@ -560,6 +680,9 @@ def worker_analise_provisoria(job_service, job_id: str, filepath: str, column_na
             'sucessos': len([r for r in resultados if str(r.get('status','')).lower() in ('sucesso','processado com sucesso') ]),
             'erros': len([r for r in resultados if str(r.get('status','')).lower() not in ('sucesso','processado com sucesso') ]),
             'arquivo_original': filepath,
+            'tempos_etapas': _resumo_tempos_etapas(resultados),
+            'sessao_lecom': _metricas_sessao_lecom(),
+            'triagem': relatorio_triagem,
         })
         job_service.update(job_id, status='completed', message='Concluído!', detail='Análise Provisória finalizada', progress=100)
     except Exception as e:
@@ -593,6 +716,7 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
     import pandas as pd
     from datetime import datetime
     import time
+    from automation.utils.lecom_urls import url_workspace
 
     try:
         job_service.update(
@@ -604,27 +728,10 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
         )
         job_service.log(job_id, 'Iniciando ane1lise Definitiva (refatorado)...', 'info')
 
-        def _ler_codigos(caminho: str, col: str) -> list[str]:
-            _, ext = os.path.splitext(caminho.lower())
-            if ext in ('.xlsx', '.xls'):
-                df = pd.read_excel(caminho, dtype=str)
-            elif ext == '.csv':
-                df = pd.read_csv(caminho, dtype=str)
-            else:
-                df = pd.read_excel(caminho, dtype=str)
-            mapa = {str(c).strip().lower(): c for c in df.columns}
-            alvo = (col or 'codigo').strip().lower()
-            real = mapa.get(alvo) or mapa.get('codigo') or mapa.get('cf3digo')
-            if not real:
-                real = list(df.columns)[0]
-            serie = df[real].dropna().astype(str).map(lambda x: x.strip()).replace({'': None}).dropna()
-            serie = serie.str.replace('.', '', regex=False).str.replace(',', '', regex=False)
-            return serie.tolist()
-
-        codigos = _ler_codigos(filepath, column_name)
-        if not codigos:
-            raise Exception('Nenhum cf3digo encontrado na planilha')
-        job_service.log(job_id, f'[OK] {len(codigos)} cf3digos lidos', 'success')
+        from automation.utils.leitor_codigos import abrir_codigos
+        leitor, codigos = abrir_codigos(filepath, column_name)
+        total = leitor.estimar_total() or 0
+        job_service.log(job_id, f"[OK] Planilha aberta (coluna '{leitor.coluna_encontrada}', ~{total or '?'} linhas)", 'success')
 
         from automation.services.definitiva_processor import DefinitivaProcessor
 
@@ -652,24 +759,23 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
         try:
             cur = proc.lecom_action.driver.current_url
             if 'workspace' not in (cur or '').lower():
-                proc.lecom_action.driver.get('https://justica.servicos.gov.br/workspace')
+                proc.lecom_action.driver.get(url_workspace())
                 time.sleep(2)
         except Exception:
             pass
         job_service.log(job_id, '[OK] Login realizado e workspace acessado', 'success')
 
         resultados = []
-        total = len(codigos)
         for i, codigo in enumerate(codigos, 1):
             if _should_stop(job_service, job_id):
                 job_service.log(job_id, '3f9e0f Processo cancelado pelo usue1rio', 'warning')
                 break
 
-            progress = int(20 + (i / max(1, total)) * 70)
+            progress = int(20 + (i / max(i, total)) * 70)
             job_service.update(
                 job_id,
                 status='running',
-                message=f'Processando {i}/{total}...',
+                message=f'Processando {i}/{max(i, total)}...',
                 detail=f'Cf3digo: {codigo}',
                 progress=progress,
             )
@@ -745,6 +851,7 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
                     'decisao_final': resultado.get('decisao_final', 'N/A'),
                     'parecer_pf': resultado.get('parecer_pf', {}),
                     'despacho_automatico': resultado.get('despacho_automatico', ''),
+                    'tempos_etapas': resultado.get('tempos_etapas', {}),
                 }
                     
             except Exception as e:  # pragma: no cover - defensivo
@@ -856,6 +963,7 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
             job_service.log(job_id, f'[SALVO] Resultados salvos em planilhas/: {out_name}', 'success')
         except Exception as e:
             job_service.log(job_id, f'[AVISO] Erro ao salvar planilha: {e}', 'warning')
+        _registrar_banco_resultados(job_service, job_id, 'definitiva', resultados)
 
         # Summary
         job_service.set_result(job_id, {
@@ -863,6 +971,7 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
             'sucessos': len([r for r in resultados if str(r.get('status','')).lower() == 'sucesso']),
             'erros': len([r for r in resultados if str(r.get('status','')).lower() != 'sucesso']),
             'arquivo_original': filepath,
+            'tempos_etapas': _resumo_tempos_etapas(resultados),
         })
         job_service.update(job_id, status='completed', message='Conclueddo!', detail='Ane1lise Definitiva finalizada', progress=100)
     except Exception as e:
@@ -870,6 +979,10 @@ def worker_analise_definitiva(job_service, job_id: str, filepath: str, column_na
         job_service.update(job_id, status='error', message='Erro', detail=str(e), progress=0)
     finally:
         # Cleanup
+        try:
+            codigos.close()  # libera a planilha lida em streaming antes de removê-la
+        except Exception:
+            pass
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
@@ -892,49 +1005,17 @@ def worker_extracao_ocr(job_service, job_id: str, processos: list[str], base_out
     Estratégia: para cada número de processo, procurar arquivos na pasta de uploads cujo
     nome contenha o número (apenas dígitos) e aplicar OCR (texto bruto + mascaramento básico).
     Gera arquivos JSONL por tipo de documento em base_output_dir/diretorio_saida.
+
+    A execução usa `PipelineExtracaoOCR` (descoberta -> pré-processamento em pool de
+    processos + chamadas assíncronas à API -> escritor único em lotes).
     """
     import os
-    import re
     import json
     import time
     import traceback
     from datetime import datetime
-    from modular_app.utils.ocr_extractor import extrair_campos_ocr_mistral
-
-    def _digits(s: str) -> str:
-        return re.sub(r"\D", "", s or "")
-
-    def _tipo_arquivo(nome: str) -> str:
-        n = (nome or "").lower()
-        if any(k in n for k in ["crnm", "rnm", "rnM", "carteira", "registro nacional"]):
-            return "CRNM"
-        if "cpf" in n:
-            return "CPF"
-        if "antecedente" in n and ("brasil" in n or "nacional" in n):
-            return "Antecedentes_BR"
-        if "antecedente" in n and ("origem" in n or "pais" in n or "country" in n):
-            return "Antecedentes_Origem"
-        if any(k in n for k in ["portugues", "português", "comunicacao", "comunicação", "lingua", "língua"]):
-            return "Portugues"
-        if any(k in n for k in ["residencia", "residência"]):
-            return "RESIDENCIA"
-        if any(k in n for k in ["viagem", "passaporte"]):
-            return "VIAGEM"
-        return "OUTROS"
-
-    def _mascarar_basico(texto: str) -> str:
-        if not texto:
-            return texto
-        import re
-        t = texto
-        t = re.sub(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", "[CPF MASCARADO]", t)
-        t = re.sub(r"\b\d{11}\b", "[CPF MASCARADO]", t)
-        t = re.sub(r"CPF:\s*\d{3}\.\d{3}\.\d{3}-\d{2}", "CPF: [MASCARADO]", t)
-        t = re.sub(r"\b\d{2}\.\d{3}\.\d{3}-[0-9X]\b", "[RG MASCARADO]", t)
-        t = re.sub(r"RG:\s*\d{2}\.\d{3}\.\d{3}-[0-9X]", "RG: [MASCARADO]", t)
-        t = re.sub(r"\b\d{5}-\d{3}\b", "[CEP MASCARADO]", t)
-        t = re.sub(r"\(\d{2}\)\s*\d{4,5}-\d{4}", "[TELEFONE MASCARADO]", t)
-        return t
+    from modular_app.utils.indice_arquivos import IndiceArquivos
+    from modular_app.utils.pipeline_ocr import ARQUIVOS_DOCCANO, PipelineExtracaoOCR
 
     try:
         # Preparação
@@ -950,91 +1031,49 @@ def worker_extracao_ocr(job_service, job_id: str, processos: list[str], base_out
             os.makedirs(upload_dir, exist_ok=True)
         job_service.log(job_id, f"Diretório de uploads base: {upload_dir}", 'info')
 
-        total = len(processos or [])
-        processados = 0
-        erros = 0
-
-        # Abrir arquivos JSONL por tipo (append)
-        arquivos_por_tipo = {
-            'CRNM': os.path.join(output_root, 'crnm.jsonl'),
-            'CPF': os.path.join(output_root, 'cpf.jsonl'),
-            'Antecedentes_BR': os.path.join(output_root, 'antecedentes_br.jsonl'),
-            'Antecedentes_Origem': os.path.join(output_root, 'antecedentes_origem.jsonl'),
-            'Portugues': os.path.join(output_root, 'portugues.jsonl'),
-            'OUTROS': os.path.join(output_root, 'outros.jsonl'),
-        }
-        resumo = {k: {'total': 0, 'validados': 0, 'nao_validados': 0, 'arquivo_doccano': os.path.basename(v)} for k, v in arquivos_por_tipo.items()}
-
-        # Loop principal
-        for i, proc in enumerate(processos or [], 1):
-            if _should_stop(job_service, job_id):
-                job_service.update(job_id, status='stopped', message='Parado pelo usuário', progress=90)
-                job_service.log(job_id, '🛑 Execução interrompida pelo usuário', 'warning')
-                break
-
-            proc_digits = _digits(proc)
-            job_service.update(job_id, status='running', message=f'Processando {i}/{total}...', progress=int(5 + (i/ max(1,total))*90), results={'total': total, 'processados': processados, 'erros': erros, 'processo_atual': proc})
-            job_service.log(job_id, f'[BUSCA] Processo {proc} (digits={proc_digits})', 'info')
+        # Índice de nomes de arquivo (uma varredura por job, busca por dígitos)
+        t0 = time.perf_counter()
+        indice = IndiceArquivos(upload_dir, ignorar_dirs=[output_root]).construir()
+        stats_indice = indice.estatisticas()
+        job_service.log(
+            job_id,
+            f"[INDICE] {stats_indice['arquivos']} arquivos em {stats_indice['diretorios']} pastas "
+            f"indexados em {time.perf_counter() - t0:.2f}s",
+            'info',
+        )
 
-            # Buscar candidatos na pasta de uploads
-            candidatos = []
-            try:
-                for root, _, files in os.walk(upload_dir):
-                    for fn in files:
-                        if proc_digits and proc_digits in re.sub(r"\D", "", fn):
-                            if fn.lower().endswith(('.pdf', '.jpg', '.jpeg', '.png')):
-                                candidatos.append(os.path.join(root, fn))
-                if not candidatos:
-                    job_service.log(job_id, f'[AVISO] Nenhum arquivo encontrado para {proc}', 'warning')
-            except Exception as e:
-                job_service.log(job_id, f'[ERRO] Falha ao buscar arquivos para {proc}: {e}', 'error')
-                erros += 1
-                continue
-
-            # Processar candidatos
-            for caminho in candidatos:
-                if _should_stop(job_service, job_id):
-                    break
-                nome = os.path.basename(caminho)
-                tipo = _tipo_arquivo(nome)
-                if tipo in ('RESIDENCIA', 'VIAGEM'):
-                    job_service.log(job_id, f'[SKIP] {nome} ignorado por política (residência/viagem)', 'info')
-                    continue
+        total = len(processos or [])
 
-                job_service.log(job_id, f'[OCR] {nome} (tipo={tipo})', 'info')
-                try:
-                    res = extrair_campos_ocr_mistral(caminho, modo_texto_bruto=True, max_retries=1, max_paginas=1)
-                except Exception as e:
-                    job_service.log(job_id, f'[ERRO] Falha no OCR de {nome}: {e}', 'error')
-                    erros += 1
-                    continue
+        def _progresso(dados: dict) -> None:
+            feitos = dados['processados']
+            job_service.update(
+                job_id, status='running', message=f'Processando {feitos}/{total}...',
+                progress=int(5 + (feitos / max(1, total)) * 90),
+                results={k: dados[k] for k in ('total', 'processados', 'erros', 'processo_atual')},
+            )
 
-                texto = (res or {}).get('texto_bruto')
-                if texto:
-                    try:
-                        from data_protection import limpar_texto_ocr as _limpar
-                        texto = _limpar(texto)
-                        job_service.log(job_id, f'[LGPD] Mascaramento aplicado (externo) em {nome}', 'info')
-                    except Exception:
-                        texto = _mascarar_basico(texto)
-                        job_service.log(job_id, f'[LGPD] Mascaramento básico aplicado em {nome}', 'info')
-
-                # Registrar no JSONL
-                try:
-                    payload = {"text": texto or "", "meta": {"processo": proc, "arquivo": nome, "tipo": tipo}}
-                    with open(arquivos_por_tipo.get(tipo, arquivos_por_tipo['OUTROS']), 'a', encoding='utf-8') as f:
-                        f.write(json.dumps(payload, ensure_ascii=False) + "\n")
-                    resumo_key = tipo if tipo in resumo else 'OUTROS'
-                    resumo[resumo_key]['total'] += 1
-                    if texto and texto.strip():
-                        resumo[resumo_key]['validados'] += 1
-                    else:
-                        resumo[resumo_key]['nao_validados'] += 1
-                except Exception as e:
-                    job_service.log(job_id, f'[ERRO] Falha ao salvar JSONL para {nome}: {e}', 'error')
-                    erros += 1
+        pipeline = PipelineExtracaoOCR(
+            indice,
+            output_root,
+            log=lambda msg, nivel='info': job_service.log(job_id, msg, nivel),
+            deve_parar=lambda: _should_stop(job_service, job_id),
+            ao_progredir=_progresso,
+            workers_preproc=int(os.environ.get('OCR_WORKERS_PREPROC', '0')) or None,
+            concorrencia_api=int(os.environ.get('OCR_CONCORRENCIA_API', '4')),
+        )
+        t0 = time.perf_counter()
+        contadores = pipeline.executar(processos or [])
+        job_service.log(
+            job_id,
+            f"[PIPELINE] {contadores['arquivos_ocr']}/{contadores['arquivos_descobertos']} arquivos com OCR "
+            f"em {time.perf_counter() - t0:.1f}s ({contadores['arquivos_ignorados']} ignorados por política)",
+            'info',
+        )
+        if pipeline.parado:
+            job_service.update(job_id, status='stopped', message='Parado pelo usuário', progress=90)
+            job_service.log(job_id, '🛑 Execução interrompida pelo usuário', 'warning')
 
-            processados += 1
+        resumo = contadores['resumo_por_tipo']
 
         # Salvar resumo
         try:
@@ -1047,11 +1086,11 @@ def worker_extracao_ocr(job_service, job_id: str, processos: list[str], base_out
 
         resultado_final = {
             'total': total,
-            'processados': processados,
-            'erros': erros,
+            'processados': contadores['processados'],
+            'erros': contadores['erros'],
             'diretorio_saida': output_root,
             'resumo_por_tipo': resumo,
-            'arquivos_doccano': {k: os.path.basename(v) for k, v in arquivos_por_tipo.items()},
+            'arquivos_doccano': dict(ARQUIVOS_DOCCANO),
         }
         job_service.set_result(job_id, resultado_final)
         job_service.update(job_id, status='completed', message='Concluído', progress=100)
@@ -1062,7 +1101,8 @@ def worker_extracao_ocr(job_service, job_id: str, processos: list[str], base_out
         job_service.log(job_id, traceback.format_exc(), 'error')
         job_service.update(job_id, status='error', message=str(e), progress=0)
 
-def worker_aprovacao_parecer(job_service, job_id: str, modo_selecao: str, caminho_planilha: Optional[str]) -> None:
+def worker_aprovacao_parecer(job_service, job_id: str, modo_selecao: str, caminho_planilha: Optional[str],
+                             paralelismo: Optional[int] = None) -> None:
     """Worker para Aprovação de Parecer do Analista usando JobService (refatorado).
     Usa AnalistaProcessor da arquitetura modular.
     """
@@ -1084,7 +1124,7 @@ def worker_aprovacao_parecer(job_service, job_id: str, modo_selecao: str, caminh
         chrome_options.add_argument("--disable-dev-shm-usage")
         driver = webdriver.Chrome(options=chrome_options)
         driver.maximize_window()
-        processor = AnalistaProcessor(driver)
+        processor = AnalistaProcessor(driver, paralelismo=paralelismo)
         job_service.update(job_id, status='running', message='Inicializando Driver...', detail='Abrindo navegador VISUAL', progress=25)
         job_service.log(job_id, 'Processor de analista inicializado em MODO VISUAL (refatorado)', 'success')
 
@@ -1103,6 +1143,9 @@ def worker_aprovacao_parecer(job_service, job_id: str, modo_selecao: str, caminh
             cpmig = len([p for p in resultados if p.get('status') == 'ENVIAR PARA CPMIG'])
             manual = len([p for p in resultados if p.get('status') == 'ANÁLISE MANUAL'])
             job_service.log(job_id, f'[DADOS] Resumo: {total} processos | CPMIG: {cpmig} | Manual: {manual}', 'info')
+            _registrar_banco_resultados(job_service, job_id, 'aprovacao_parecer', resultados)
+            if processor.lista is not None:
+                job_service.log(job_id, f'[DADOS] Lista de trabalho: {processor.lista.resumo()}', 'info')
         else:
             job_service.update(job_id, status='error', message='Processo Finalizado com Problemas', detail='Nenhum processo foi processado', progress=90)
 
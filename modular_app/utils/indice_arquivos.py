@@ -0,0 +1,231 @@
+"""Índice de nomes de arquivo da pasta de uploads (busca por dígitos).
+
+Substitui o `os.walk` completo por processo do `worker_extracao_ocr`: o
+diretório é varrido uma vez por job, cada arquivo é reduzido aos dígitos do
+nome e indexado por n-gramas (índice invertido), permitindo localizar em
+tempo sublinear todos os arquivos cujo nome contém o número do processo.
+Tipo de documento, tamanho e mtime ficam pré-computados em cada entrada.
+
+O índice pode ser atualizado incrementalmente (`atualizar`): diretórios
+cujo mtime não mudou não são relistados.
+"""
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+EXTENSOES_PADRAO = ('.pdf', '.jpg', '.jpeg', '.png')
+
+# Tamanho dos n-gramas de dígitos usados no índice invertido
+TAMANHO_NGRAMA = 4
+
+_NAO_DIGITO = re.compile(r"\D")
+
+
+def classificar_tipo_arquivo(nome: str) -> str:
+    """Classifica o documento pelo nome do arquivo (tipos do export Doccano)."""
+    n = (nome or "").lower()
+    if any(k in n for k in ["crnm", "rnm", "carteira", "registro nacional"]):
+        return "CRNM"
+    if "cpf" in n:
+        return "CPF"
+    if "antecedente" in n and ("brasil" in n or "nacional" in n):
+        return "Antecedentes_BR"
+    if "antecedente" in n and ("origem" in n or "pais" in n or "country" in n):
+        return "Antecedentes_Origem"
+    if any(k in n for k in ["portugues", "português", "comunicacao", "comunicação", "lingua", "língua"]):
+        return "Portugues"
+    if any(k in n for k in ["residencia", "residência"]):
+        return "RESIDENCIA"
+    if any(k in n for k in ["viagem", "passaporte"]):
+        return "VIAGEM"
+    return "OUTROS"
+
+
+@dataclass(frozen=True)
+class EntradaArquivo:
+    """Metadados de um arquivo indexado."""
+
+    caminho: str
+    nome: str
+    digitos: str
+    tipo: str
+    tamanho: int
+    mtime: float
+
+
+class IndiceArquivos:
+    """Índice invertido (n-gramas de dígitos) dos arquivos sob `raiz`."""
+
+    def __init__(
+        self,
+        raiz: str,
+        extensoes: Iterable[str] = EXTENSOES_PADRAO,
+        classificador: Callable[[str], str] = classificar_tipo_arquivo,
+        ignorar_dirs: Iterable[str] = (),
+    ) -> None:
+        self.raiz = os.path.abspath(raiz)
+        self.extensoes = tuple(e.lower() for e in extensoes)
+        self.classificador = classificador
+        self.ignorar_dirs = {os.path.abspath(d) for d in ignorar_dirs}
+        self._entradas: Dict[str, EntradaArquivo] = {}
+        self._ngramas: Dict[str, Set[str]] = {}
+        # diretório -> (mtime, subdiretórios, arquivos indexados)
+        self._dirs: Dict[str, Tuple[float, List[str], Set[str]]] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ build
+    def construir(self) -> 'IndiceArquivos':
+        """Varre a raiz do zero."""
+        with self._lock:
+            self._entradas.clear()
+            self._ngramas.clear()
+            self._dirs.clear()
+            self._varrer(forcar=True)
+        return self
+
+    def atualizar(self) -> Dict[str, int]:
+        """Reflete mudanças no disco relistando apenas diretórios alterados."""
+        with self._lock:
+            return self._varrer(forcar=False)
+
+    def _varrer(self, forcar: bool) -> Dict[str, int]:
+        stats = {'adicionados': 0, 'removidos': 0, 'dirs_relistados': 0}
+        vistos: Set[str] = set()
+        pilha = [self.raiz]
+        while pilha:
+            diretorio = pilha.pop()
+            if diretorio in self.ignorar_dirs:
+                continue
+            try:
+                mtime_dir = os.stat(diretorio).st_mtime
+            except OSError:
+                continue
+            vistos.add(diretorio)
+            anterior = self._dirs.get(diretorio)
+            if not forcar and anterior and anterior[0] == mtime_dir:
+                pilha.extend(anterior[1])
+                continue
+
+            stats['dirs_relistados'] += 1
+            subdirs: List[str] = []
+            arquivos: Set[str] = set()
+            try:
+                with os.scandir(diretorio) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                            elif entry.is_file() and entry.name.lower().endswith(self.extensoes):
+                                arquivos.add(entry.path)
+                                if entry.path not in self._entradas:
+                                    st = entry.stat()
+                                    self._adicionar(entry.path, entry.name, st.st_size, st.st_mtime)
+                                    stats['adicionados'] += 1
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+            if anterior:
+                for caminho in anterior[2] - arquivos:
+                    self._remover(caminho)
+                    stats['removidos'] += 1
+            self._dirs[diretorio] = (mtime_dir, subdirs, arquivos)
+            pilha.extend(subdirs)
+
+        # Diretórios que sumiram
+        for diretorio in [d for d in self._dirs if d not in vistos]:
+            for caminho in self._dirs.pop(diretorio)[2]:
+                self._remover(caminho)
+                stats['removidos'] += 1
+        return stats
+
+    # -------------------------------------------------------------- mutation
+    def adicionar(self, caminho: str) -> Optional[EntradaArquivo]:
+        """Indexa um arquivo específico (ex.: recém-enviado)."""
+        caminho = os.path.abspath(caminho)
+        if not caminho.lower().endswith(self.extensoes):
+            return None
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return None
+        with self._lock:
+            self._remover(caminho)
+            entrada = self._adicionar(caminho, os.path.basename(caminho), st.st_size, st.st_mtime)
+            info = self._dirs.get(os.path.dirname(caminho))
+            if info:
+                info[2].add(caminho)
+            return entrada
+
+    def remover(self, caminho: str) -> bool:
+        caminho = os.path.abspath(caminho)
+        with self._lock:
+            info = self._dirs.get(os.path.dirname(caminho))
+            if info:
+                info[2].discard(caminho)
+            return self._remover(caminho)
+
+    def _adicionar(self, caminho: str, nome: str, tamanho: int, mtime: float) -> EntradaArquivo:
+        digitos = _NAO_DIGITO.sub("", nome)
+        entrada = EntradaArquivo(caminho, nome, digitos, self.classificador(nome), tamanho, mtime)
+        self._entradas[caminho] = entrada
+        for grama in self._ngramas_de(digitos):
+            self._ngramas.setdefault(grama, set()).add(caminho)
+        return entrada
+
+    def _remover(self, caminho: str) -> bool:
+        entrada = self._entradas.pop(caminho, None)
+        if entrada is None:
+            return False
+        for grama in self._ngramas_de(entrada.digitos):
+            postings = self._ngramas.get(grama)
+            if postings is not None:
+                postings.discard(caminho)
+                if not postings:
+                    del self._ngramas[grama]
+        return True
+
+    @staticmethod
+    def _ngramas_de(digitos: str) -> Set[str]:
+        k = TAMANHO_NGRAMA
+        return {digitos[i:i + k] for i in range(len(digitos) - k + 1)}
+
+    # ----------------------------------------------------------------- query
+    def buscar(self, digitos: str) -> List[EntradaArquivo]:
+        """Arquivos cujo nome (só dígitos) contém `digitos`, ordenados por caminho."""
+        digitos = _NAO_DIGITO.sub("", digitos or "")
+        if not digitos:
+            return []
+        with self._lock:
+            if len(digitos) < TAMANHO_NGRAMA:
+                candidatos: Iterable[str] = self._entradas.keys()
+            else:
+                listas = sorted(
+                    (self._ngramas.get(g, set()) for g in self._ngramas_de(digitos)),
+                    key=len,
+                )
+                if not listas or not listas[0]:
+                    return []
+                candidatos = set(listas[0])
+                for postings in listas[1:]:
+                    candidatos &= postings
+                    if not candidatos:
+                        return []
+            # Os n-gramas só filtram; a confirmação é por substring
+            achados = [self._entradas[c] for c in candidatos if digitos in self._entradas[c].digitos]
+        return sorted(achados, key=lambda e: e.caminho)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'arquivos': len(self._entradas),
+                'diretorios': len(self._dirs),
+                'ngramas': len(self._ngramas),
+                'bytes_total': sum(e.tamanho for e in self._entradas.values()),
+            }
@@ -2,9 +2,8 @@ import os
 import re
 import json
 import time
-import base64
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 def normalizar_nome_nome_sobrenome(nome: str) -> str:
@@ -54,111 +53,62 @@ def separar_filiacao(filiacao: str):
         return [' '.join(palavras[:meio]), ' '.join(palavras[meio:])]
 
 
-def extrair_campos_ocr_mistral(filepath: str, modo_texto_bruto: bool = False, max_retries: int = 3, max_paginas: Optional[int] = None) -> Dict[str, Any]:
-    """Extrai campos com Mistral Vision, com pré-processamento e retry."""
-    from mistralai import Mistral  # noqa: F401 (import side-effects tolerated)
-    from dotenv import load_dotenv
-    import mimetypes
-    import tempfile
-    try:
-        import fitz  # PyMuPDF - não requer Poppler
-    except ImportError:
-        print("[ERRO] PyMuPDF (fitz) não instalado. Instale com: pip install PyMuPDF")
-        return {"erro": "PyMuPDF não instalado"}
-    from PIL import Image
-    import cv2
-    import numpy as np
-    import io
+def _paginas_a_processar(total_paginas: int, modo_texto_bruto: bool, max_paginas: Optional[int]) -> int:
+    if max_paginas is not None:
+        return min(max_paginas, total_paginas)
+    if modo_texto_bruto and total_paginas > 4:
+        return 4
+    return min(8, total_paginas)
 
-    # Recarregar preprocessor se necessário
-    import sys
-    if 'preprocessing_ocr' in sys.modules:
-        del sys.modules['preprocessing_ocr']
-    from preprocessing_ocr import ImagePreprocessor
 
-    arquivo_nome = os.path.basename(filepath) if filepath else "arquivo_indefinido"
-    print(f"[OCR-DEBUG] Iniciando OCR para arquivo: {arquivo_nome}")
-    print(f"[OCR-DEBUG] Caminho completo: {filepath}")
-    print(f"[OCR-DEBUG] Modo texto bruto: {modo_texto_bruto}")
+def preparar_imagens_ocr(filepath: str, modo_texto_bruto: bool = False, max_paginas: Optional[int] = None,
+                         tipo_documento: Optional[str] = None) -> List[str]:
+    """Renderiza e pré-processa o arquivo, devolvendo as páginas como data URLs JPEG.
 
-    import random
-    cache_buster = random.randint(1000, 9999)
-    print(f"[OCR-DEBUG] Cache buster: {cache_buster}")
+    Etapa puramente de CPU (sem rede). Páginas de PDF são distribuídas pelo
+    pool multiprocesso de `automation.ocr.preprocessing_pool` (modo local
+    quando o pool não se aplica). Com `tipo_documento` as etapas seguem o
+    planejador por tipo. Exceções de leitura/renderização são propagadas.
+    """
+    import fitz  # PyMuPDF - não requer Poppler
+    from PIL import Image
+    from automation.ocr.preprocessing_pool import obter_pool_preprocessamento
 
-    load_dotenv()
-    api_key = os.environ.get("MISTRAL_API_KEY")
-    if not api_key:
-        print(f"[OCR-DEBUG] ERRO: API key não encontrada para {arquivo_nome}")
-        return {"erro": "Chave da API Mistral não configurada"}
+    pool = obter_pool_preprocessamento()
 
-    def image_to_base64_with_preprocessing(image: Image.Image) -> str:
-        import io
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp:
-                temp_path = tmp.name
-                image.save(temp_path)
-            preprocessor = ImagePreprocessor()
-            # Carregar imagem para preprocessamento
-            img = cv2.imread(temp_path)
-            img_processada, metadata = preprocessor.preprocess(img, apply_all=True)
+    if filepath.lower().endswith('.pdf'):
+        # Usar PyMuPDF (fitz) em vez de pdf2image - não requer Poppler!
+        print(f"[PDF] Abrindo PDF com PyMuPDF (sem Poppler)...")
+        with fitz.open(filepath) as doc:
+            total_paginas = len(doc)
+        paginas_processar = _paginas_a_processar(total_paginas, modo_texto_bruto, max_paginas)
+        print(f"[PDF] Total de páginas: {total_paginas}, processando: {paginas_processar}")
+
+        # Renderização 3x (melhor OCR) + pré-processamento, em paralelo por página
+        paginas = pool.processar_paginas_pdf(filepath, range(paginas_processar), zoom=3.0,
+                                              tipo_documento=tipo_documento)
+    else:
+        paginas = pool.processar_imagens([Image.open(filepath)], tipo_documento=tipo_documento)
+
+    for pagina in paginas:
+        metadata = pagina.metadata
+        if metadata.get('erro_preprocessamento'):
+            print(f"[ERRO] Falha no pré-processamento: {metadata['erro_preprocessamento']}, usando imagem original")
+        else:
             print(f"[PRÉ-PROC] Etapas: {', '.join(metadata.get('etapas_aplicadas', []))}")
             print(f"[PRÉ-PROC] Qualidade: {metadata.get('quality_score', 0):.1f}/100")
-            img_pil = Image.fromarray(cv2.cvtColor(img_processada, cv2.COLOR_GRAY2RGB))
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-            buf = io.BytesIO()
-            img_pil.save(buf, format="JPEG")
-            return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
-        except Exception as e:
-            print(f"[ERRO] Falha no pré-processamento: {e}, usando imagem original")
-            buf = io.BytesIO()
-            image.save(buf, format="JPEG")
-            return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
 
-    try:
-        if filepath.lower().endswith('.pdf'):
-            # Usar PyMuPDF (fitz) em vez de pdf2image - não requer Poppler!
-            print(f"[PDF] Abrindo PDF com PyMuPDF (sem Poppler)...")
-            doc = fitz.open(filepath)
-            total_paginas = len(doc)
-            
-            # Determinar quantas páginas processar
-            if max_paginas is not None:
-                paginas_processar = min(max_paginas, total_paginas)
-            elif modo_texto_bruto and total_paginas > 4:
-                paginas_processar = 4
-            else:
-                paginas_processar = min(8, total_paginas)
-            
-            print(f"[PDF] Total de páginas: {total_paginas}, processando: {paginas_processar}")
-            
-            imagens = []
-            for num_pagina in range(paginas_processar):
-                pagina = doc[num_pagina]
-                # Renderizar página como imagem (3x resolução para melhor OCR)
-                pix = pagina.get_pixmap(matrix=fitz.Matrix(3.0, 3.0))
-                img_bytes = pix.tobytes("png")
-                img = Image.open(io.BytesIO(img_bytes))
-                imagens.append(img)
-            
-            doc.close()
-            
-            image_urls = [image_to_base64_with_preprocessing(img) for img in imagens]
-            print(f"[MISTRAL OCR] {len(image_urls)} páginas pré-processadas de {total_paginas} total (PyMuPDF)")
-        else:
-            img = Image.open(filepath)
-            image_urls = [image_to_base64_with_preprocessing(img)]
-            print(f"[MISTRAL OCR] 1 imagem pré-processada")
-    except Exception as e:
-        print(f"[ERRO] Erro no processamento: {e}")
-        import traceback
-        traceback.print_exc()
-        return {}
+    image_urls = [pagina.data_url() for pagina in paginas]
+    if filepath.lower().endswith('.pdf'):
+        print(f"[MISTRAL OCR] {len(image_urls)} páginas pré-processadas de {total_paginas} total (PyMuPDF)")
+    else:
+        print(f"[MISTRAL OCR] 1 imagem pré-processada")
+    return image_urls
 
+
+def _prompt_ocr(modo_texto_bruto: bool, arquivo_nome: str, cache_buster: int) -> str:
     if modo_texto_bruto:
-        prompt = (
+        return (
             "Analise este documento e extraia TODO o texto visível de forma legível.\n\n"
             "IMPORTANTE:\n"
             "- Extraia APENAS o texto bruto do documento\n"
@@ -171,29 +121,70 @@ def extrair_campos_ocr_mistral(filepath: str, modo_texto_bruto: bool = False, ma
             "- Para documentos com muitas páginas, priorize o conteúdo principal\n\n"
             "Retorne apenas o texto extraído, sem formatação especial."
         )
-    else:
-        prompt = (
-            f"Analise este documento de identidade brasileiro pré-processado e extraia os seguintes campos com máxima precisão:\n\n"
-            "nome completo, CPF, filiação, data de nascimento, nacionalidade, validade, RNM, classificação, prazo de residência\n\n"
-            "IMPORTANTE:\n"
-            "- Use apenas os dados claramente legíveis DESTE DOCUMENTO ESPECÍFICO\n"
-            "- Para CPF, use formato XXX.XXX.XXX-XX\n"
-            "- Para datas, use formato DD/MM/AAAA\n"
-            "- Para filiação, separe os nomes de mãe e pai com quebra de linha ou barra\n"
-            "- Se algum campo não for encontrado ou não estiver legível, escreva \"Não encontrado\"\n"
-            "- Corrija caracteres óbvios (ex: 0 por O, 1 por l, 5 por S)\n"
-            f"- ANÁLISE ID: {cache_buster} para {arquivo_nome}\n\n"
-            "Retorne como um objeto JSON com os campos extraídos."
-        )
+    return (
+        f"Analise este documento de identidade brasileiro pré-processado e extraia os seguintes campos com máxima precisão:\n\n"
+        "nome completo, CPF, filiação, data de nascimento, nacionalidade, validade, RNM, classificação, prazo de residência\n\n"
+        "IMPORTANTE:\n"
+        "- Use apenas os dados claramente legíveis DESTE DOCUMENTO ESPECÍFICO\n"
+        "- Para CPF, use formato XXX.XXX.XXX-XX\n"
+        "- Para datas, use formato DD/MM/AAAA\n"
+        "- Para filiação, separe os nomes de mãe e pai com quebra de linha ou barra\n"
+        "- Se algum campo não for encontrado ou não estiver legível, escreva \"Não encontrado\"\n"
+        "- Corrija caracteres óbvios (ex: 0 por O, 1 por l, 5 por S)\n"
+        f"- ANÁLISE ID: {cache_buster} para {arquivo_nome}\n\n"
+        "Retorne como um objeto JSON com os campos extraídos."
+    )
 
-    url = "https://api.mistral.ai/v1/chat/completions"
+
+def _interpretar_campos(conteudo: str, arquivo_nome: str) -> Dict[str, Any]:
+    campos = json.loads(conteudo)
+    if 'filiação' in campos:
+        campos['filiação'] = separar_filiacao(campos['filiação'])
+        if len(campos['filiação']) >= 2:
+            campos['pai'] = campos['filiação'][1].strip()
+            campos['mae'] = campos['filiação'][0].strip()
+    elif 'filiacao' in campos:
+        campos['filiação'] = separar_filiacao(campos['filiacao'])
+        if len(campos['filiação']) >= 2:
+            campos['pai'] = campos['filiação'][1].strip()
+            campos['mae'] = campos['filiação'][0].strip()
+    campos['nome'] = campos.get('nome_completo', campos.get('nome', ''))
+    campos['data_nasc'] = campos.get('data_de_nascimento', campos.get('data_nasc', ''))
+    if campos.get('nome'):
+        campos['nome'] = normalizar_nome_nome_sobrenome(campos['nome'])
+    campos['_arquivo_origem'] = arquivo_nome
+    campos['_timestamp_ocr'] = time.time()
+    return campos
+
+
+def chamar_mistral_ocr(image_urls: List[str], arquivo_nome: str, modo_texto_bruto: bool = False, max_retries: int = 3) -> Dict[str, Any]:
+    """Envia as páginas já pré-processadas ao Mistral Vision (com retry).
+
+    Etapa de I/O de rede, separada de `preparar_imagens_ocr` para que o
+    pipeline em lote possa sobrepor chamadas à API e pré-processamento.
+    """
+    import random
+    from dotenv import load_dotenv
+    from automation.utils.lecom_urls import url_mistral_chat
+
+    load_dotenv()
+    api_key = os.environ.get("MISTRAL_API_KEY")
+    if not api_key:
+        print(f"[OCR-DEBUG] ERRO: API key não encontrada para {arquivo_nome}")
+        return {"erro": "Chave da API Mistral não configurada"}
+
+    cache_buster = random.randint(1000, 9999)
+    print(f"[OCR-DEBUG] Cache buster: {cache_buster}")
+
+    url = url_mistral_chat()
     headers = {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {os.environ.get('MISTRAL_API_KEY','')}",
+        "Authorization": f"Bearer {api_key}",
         "Cache-Control": "no-cache",
         "X-Request-ID": f"{arquivo_nome}-{cache_buster}",
     }
 
+    prompt = _prompt_ocr(modo_texto_bruto, arquivo_nome, cache_buster)
     messages = [
         {"role": "system", "content": [{"type": "text", "text": "Extraia os campos do documento conforme solicitado pelo usuário e retorne um JSON. Use máxima precisão e corrija caracteres óbvios."}]},
         {"role": "user", "content": ([{"type": "text", "text": prompt}] + [{"type": "image_url", "image_url": u} for u in image_urls])},
@@ -213,23 +204,7 @@ def extrair_campos_ocr_mistral(filepath: str, modo_texto_bruto: bool = False, ma
                 if modo_texto_bruto:
                     print(f"DEBUG FINAL: Texto extraído com sucesso - {len(conteudo)} caracteres")
                     return {"texto_bruto": conteudo}
-                campos = json.loads(conteudo)
-                if 'filiação' in campos:
-                    campos['filiação'] = separar_filiacao(campos['filiação'])
-                    if len(campos['filiação']) >= 2:
-                        campos['pai'] = campos['filiação'][1].strip()
-                        campos['mae'] = campos['filiação'][0].strip()
-                elif 'filiacao' in campos:
-                    campos['filiação'] = separar_filiacao(campos['filiacao'])
-                    if len(campos['filiação']) >= 2:
-                        campos['pai'] = campos['filiação'][1].strip()
-                        campos['mae'] = campos['filiação'][0].strip()
-                campos['nome'] = campos.get('nome_completo', campos.get('nome', ''))
-                campos['data_nasc'] = campos.get('data_de_nascimento', campos.get('data_nasc', ''))
-                if campos.get('nome'):
-                    campos['nome'] = normalizar_nome_nome_sobrenome(campos['nome'])
-                campos['_arquivo_origem'] = arquivo_nome
-                campos['_timestamp_ocr'] = time.time()
+                campos = _interpretar_campos(conteudo, arquivo_nome)
                 print(f"[OCR-DEBUG] FINAL: {len(campos)} campos extraídos com pré-processamento para {arquivo_nome}")
                 return campos
             elif resp.status_code in [429, 500, 502, 503, 504]:
@@ -267,3 +242,36 @@ def extrair_campos_ocr_mistral(filepath: str, modo_texto_bruto: bool = False, ma
 
     print(f"DEBUG: Todas as {max_retries} tentativas falharam")
     return {}
+
+
+async def chamar_mistral_ocr_async(image_urls: List[str], arquivo_nome: str, modo_texto_bruto: bool = False, max_retries: int = 3) -> Dict[str, Any]:
+    """Versão assíncrona de `chamar_mistral_ocr` (executa em thread, sem bloquear o loop)."""
+    import asyncio
+    return await asyncio.to_thread(chamar_mistral_ocr, image_urls, arquivo_nome, modo_texto_bruto, max_retries)
+
+
+def extrair_campos_ocr_mistral(filepath: str, modo_texto_bruto: bool = False, max_retries: int = 3, max_paginas: Optional[int] = None) -> Dict[str, Any]:
+    """Extrai campos com Mistral Vision, com pré-processamento e retry."""
+    arquivo_nome = os.path.basename(filepath) if filepath else "arquivo_indefinido"
+    print(f"[OCR-DEBUG] Iniciando OCR para arquivo: {arquivo_nome}")
+    print(f"[OCR-DEBUG] Caminho completo: {filepath}")
+    print(f"[OCR-DEBUG] Modo texto bruto: {modo_texto_bruto}")
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    if not os.environ.get("MISTRAL_API_KEY"):
+        print(f"[OCR-DEBUG] ERRO: API key não encontrada para {arquivo_nome}")
+        return {"erro": "Chave da API Mistral não configurada"}
+
+    try:
+        image_urls = preparar_imagens_ocr(filepath, modo_texto_bruto, max_paginas)
+    except ImportError:
+        print("[ERRO] PyMuPDF (fitz) não instalado. Instale com: pip install PyMuPDF")
+        return {"erro": "PyMuPDF não instalado"}
+    except Exception as e:
+        print(f"[ERRO] Erro no processamento: {e}")
+        import traceback
+        traceback.print_exc()
+        return {}
+
+    return chamar_mistral_ocr(image_urls, arquivo_nome, modo_texto_bruto, max_retries)
@@ -0,0 +1,362 @@
+"""Pipeline produtor/consumidor da extração massiva de OCR (export Doccano).
+
+Etapas:
+    1. Descoberta: para cada processo, busca os arquivos no `IndiceArquivos`
+       e enfileira as tarefas (fila limitada -> backpressure).
+    2. OCR: `concorrencia_api` consumidores assíncronos. O pré-processamento
+       (renderização + ImagePreprocessor, CPU) roda num pool de processos;
+       a chamada ao Mistral roda em thread via `chamar_mistral_ocr_async`.
+    3. Escrita: uma única thread mantém os seis JSONL abertos, aplica o
+       mascaramento LGPD (resolvido uma vez) e faz flush em lotes.
+
+Contadores de progresso e o `resumo` por tipo são atualizados sob lock.
+O callback `deve_parar` é consultado entre as etapas.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from modular_app.utils.indice_arquivos import EntradaArquivo, IndiceArquivos
+
+ARQUIVOS_DOCCANO = {
+    'CRNM': 'crnm.jsonl',
+    'CPF': 'cpf.jsonl',
+    'Antecedentes_BR': 'antecedentes_br.jsonl',
+    'Antecedentes_Origem': 'antecedentes_origem.jsonl',
+    'Portugues': 'portugues.jsonl',
+    'OUTROS': 'outros.jsonl',
+}
+
+# Tipos fora do export por política (residência/viagem)
+TIPOS_IGNORADOS = ('RESIDENCIA', 'VIAGEM')
+
+_FIM = object()
+
+
+def mascarar_basico(texto: str) -> str:
+    """Mascaramento mínimo (CPF, RG, CEP, telefone) quando `data_protection` não existe."""
+    if not texto:
+        return texto
+    t = texto
+    t = re.sub(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", "[CPF MASCARADO]", t)
+    t = re.sub(r"\b\d{11}\b", "[CPF MASCARADO]", t)
+    t = re.sub(r"CPF:\s*\d{3}\.\d{3}\.\d{3}-\d{2}", "CPF: [MASCARADO]", t)
+    t = re.sub(r"\b\d{2}\.\d{3}\.\d{3}-[0-9X]\b", "[RG MASCARADO]", t)
+    t = re.sub(r"RG:\s*\d{2}\.\d{3}\.\d{3}-[0-9X]", "RG: [MASCARADO]", t)
+    t = re.sub(r"\b\d{5}-\d{3}\b", "[CEP MASCARADO]", t)
+    t = re.sub(r"\(\d{2}\)\s*\d{4,5}-\d{4}", "[TELEFONE MASCARADO]", t)
+    return t
+
+
+def resolver_mascarador() -> Tuple[Callable[[str], str], str]:
+    """Resolve uma única vez a função de mascaramento (externa ou básica)."""
+    try:
+        from data_protection import limpar_texto_ocr
+        return limpar_texto_ocr, 'externo'
+    except Exception:
+        return mascarar_basico, 'básico'
+
+
+def _preparar_no_pool(caminho: str, max_paginas: Optional[int], tipo: Optional[str] = None) -> List[str]:
+    # Função de módulo (picklable) para o ProcessPoolExecutor
+    from modular_app.utils.ocr_extractor import preparar_imagens_ocr
+    return preparar_imagens_ocr(caminho, modo_texto_bruto=True, max_paginas=max_paginas, tipo_documento=tipo)
+
+
+@dataclass
+class TarefaOCR:
+    processo: str
+    entrada: EntradaArquivo
+
+
+class ContadoresPipeline:
+    """Progresso do job e resumo por tipo, atualizados atomicamente."""
+
+    def __init__(self, total_processos: int) -> None:
+        self._lock = threading.Lock()
+        self.total = total_processos
+        self.processados = 0
+        self.erros = 0
+        self.arquivos_descobertos = 0
+        self.arquivos_ocr = 0
+        self.arquivos_ignorados = 0
+        self.resumo: Dict[str, Dict[str, Any]] = {
+            k: {'total': 0, 'validados': 0, 'nao_validados': 0, 'arquivo_doccano': v}
+            for k, v in ARQUIVOS_DOCCANO.items()
+        }
+
+    def incrementar(self, campo: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + n)
+
+    def registrar_documento(self, tipo: str, validado: bool) -> None:
+        chave = tipo if tipo in self.resumo else 'OUTROS'
+        with self._lock:
+            self.resumo[chave]['total'] += 1
+            self.resumo[chave]['validados' if validado else 'nao_validados'] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'total': self.total,
+                'processados': self.processados,
+                'erros': self.erros,
+                'arquivos_descobertos': self.arquivos_descobertos,
+                'arquivos_ocr': self.arquivos_ocr,
+                'arquivos_ignorados': self.arquivos_ignorados,
+                'resumo_por_tipo': {k: dict(v) for k, v in self.resumo.items()},
+            }
+
+
+class EscritorDoccano(threading.Thread):
+    """Thread única de escrita: handles abertos durante o job, flush em lotes."""
+
+    def __init__(
+        self,
+        output_root: str,
+        contadores: ContadoresPipeline,
+        log: Callable[[str, str], None],
+        lote_flush: int = 50,
+        intervalo_flush_s: float = 2.0,
+        tamanho_fila: int = 256,
+    ) -> None:
+        super().__init__(name='escritor-doccano', daemon=True)
+        self.output_root = output_root
+        self.contadores = contadores
+        self.log = log
+        self.lote_flush = max(1, lote_flush)
+        self.intervalo_flush_s = intervalo_flush_s
+        self.fila: 'queue.Queue[Any]' = queue.Queue(maxsize=tamanho_fila)
+        self.mascarar, self.tipo_mascarador = resolver_mascarador()
+        # Abertos aqui (thread do job) para que falhas de I/O apareçam de imediato
+        self._handles: Dict[str, Any] = {
+            tipo: open(os.path.join(output_root, nome_arquivo), 'a', encoding='utf-8')
+            for tipo, nome_arquivo in ARQUIVOS_DOCCANO.items()
+        }
+
+    def enviar(self, processo: str, nome: str, tipo: str, texto: Optional[str]) -> None:
+        self.fila.put((processo, nome, tipo, texto))
+
+    def encerrar(self) -> None:
+        self.fila.put(_FIM)
+        self.join()
+
+    def run(self) -> None:
+        pendentes = 0
+        ultimo_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self.fila.get(timeout=self.intervalo_flush_s)
+                except queue.Empty:
+                    item = None
+                if item is _FIM:
+                    break
+                if item is not None:
+                    if self._gravar(*item):
+                        pendentes += 1
+                if pendentes and (pendentes >= self.lote_flush or time.monotonic() - ultimo_flush >= self.intervalo_flush_s):
+                    self._flush()
+                    pendentes = 0
+                    ultimo_flush = time.monotonic()
+        finally:
+            self._flush()
+            for f in self._handles.values():
+                try:
+                    f.close()
+                except Exception:
+                    pass
+
+    def _gravar(self, processo: str, nome: str, tipo: str, texto: Optional[str]) -> bool:
+        try:
+            if texto:
+                try:
+                    texto = self.mascarar(texto)
+                except Exception:
+                    texto = mascarar_basico(texto)
+            payload = {"text": texto or "", "meta": {"processo": processo, "arquivo": nome, "tipo": tipo}}
+            handle = self._handles.get(tipo, self._handles['OUTROS'])
+            handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            self.contadores.registrar_documento(tipo, bool(texto and texto.strip()))
+            return True
+        except Exception as e:
+            self.log(f'[ERRO] Falha ao salvar JSONL para {nome}: {e}', 'error')
+            self.contadores.incrementar('erros')
+            return False
+
+    def _flush(self) -> None:
+        for f in self._handles.values():
+            try:
+                f.flush()
+            except Exception:
+                pass
+
+
+class PipelineExtracaoOCR:
+    """Orquestra descoberta -> pré-processamento/OCR -> escrita para o job Doccano."""
+
+    def __init__(
+        self,
+        indice: IndiceArquivos,
+        output_root: str,
+        log: Callable[[str, str], None],
+        deve_parar: Callable[[], bool] = lambda: False,
+        ao_progredir: Optional[Callable[[Dict[str, Any]], None]] = None,
+        workers_preproc: Optional[int] = None,
+        concorrencia_api: int = 4,
+        max_paginas: Optional[int] = 1,
+        max_retries: int = 1,
+        tamanho_fila: int = 32,
+    ) -> None:
+        self.indice = indice
+        self.output_root = output_root
+        self.log = log
+        self.deve_parar = deve_parar
+        self.ao_progredir = ao_progredir
+        self.workers_preproc = workers_preproc or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.concorrencia_api = max(1, concorrencia_api)
+        self.max_paginas = max_paginas
+        self.max_retries = max_retries
+        self.tamanho_fila = max(1, tamanho_fila)
+        self.parado = False
+        self.contadores: Optional[ContadoresPipeline] = None
+
+    # ----------------------------------------------------------------- pools
+    def _criar_pool_preproc(self) -> Executor:
+        # Processos daemon (ex.: worker Celery prefork) não podem ter filhos
+        if multiprocessing.current_process().daemon:
+            self.log('[AVISO] Processo atual é daemon; pré-processamento em threads', 'warning')
+            return ThreadPoolExecutor(max_workers=self.workers_preproc, thread_name_prefix='preproc-ocr')
+        try:
+            return ProcessPoolExecutor(max_workers=self.workers_preproc)
+        except Exception as e:
+            self.log(f'[AVISO] Pool de processos indisponível ({e}); usando threads', 'warning')
+            return ThreadPoolExecutor(max_workers=self.workers_preproc, thread_name_prefix='preproc-ocr')
+
+    # -------------------------------------------------------------- execução
+    def executar(self, processos: Iterable[str]) -> Dict[str, Any]:
+        processos = list(processos or [])
+        self.contadores = ContadoresPipeline(len(processos))
+        escritor = EscritorDoccano(self.output_root, self.contadores, self.log)
+        escritor.start()
+        self.log(f'[LGPD] Mascaramento {escritor.tipo_mascarador} aplicado aos textos', 'info')
+        pool = self._criar_pool_preproc()
+        try:
+            asyncio.run(self._executar_async(processos, pool, escritor))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            escritor.encerrar()
+        return self.contadores.snapshot()
+
+    def _verificar_parada(self) -> bool:
+        if not self.parado and self.deve_parar():
+            self.parado = True
+        return self.parado
+
+    def _progredir(self, processo_atual: Optional[str] = None) -> None:
+        if self.ao_progredir:
+            dados = self.contadores.snapshot()
+            dados['processo_atual'] = processo_atual
+            self.ao_progredir(dados)
+
+    async def _executar_async(self, processos: List[str], pool: Executor, escritor: EscritorDoccano) -> None:
+        fila: asyncio.Queue = asyncio.Queue(maxsize=self.tamanho_fila)
+        pendentes: Dict[str, int] = {}
+
+        def _concluir_arquivo(processo: str) -> None:
+            pendentes[processo] -= 1
+            if pendentes[processo] == 0:
+                del pendentes[processo]
+                self.contadores.incrementar('processados')
+                self._progredir(processo)
+
+        consumidores = [
+            asyncio.create_task(self._consumidor(fila, pool, escritor, _concluir_arquivo))
+            for _ in range(self.concorrencia_api)
+        ]
+        try:
+            await self._descobrir(processos, fila, pendentes)
+        finally:
+            for _ in consumidores:
+                await fila.put(_FIM)
+            await asyncio.gather(*consumidores)
+
+    async def _descobrir(self, processos: List[str], fila: asyncio.Queue, pendentes: Dict[str, int]) -> None:
+        for proc in processos:
+            if self._verificar_parada():
+                return
+            proc_digits = re.sub(r"\D", "", proc or "")
+            self.log(f'[BUSCA] Processo {proc} (digits={proc_digits})', 'info')
+            try:
+                candidatos = self.indice.buscar(proc_digits)
+            except Exception as e:
+                self.log(f'[ERRO] Falha ao buscar arquivos para {proc}: {e}', 'error')
+                self.contadores.incrementar('erros')
+                continue
+
+            tarefas = []
+            for entrada in candidatos:
+                if entrada.tipo in TIPOS_IGNORADOS:
+                    self.log(f'[SKIP] {entrada.nome} ignorado por política (residência/viagem)', 'info')
+                    self.contadores.incrementar('arquivos_ignorados')
+                    continue
+                tarefas.append(TarefaOCR(proc, entrada))
+
+            if not candidatos:
+                self.log(f'[AVISO] Nenhum arquivo encontrado para {proc}', 'warning')
+            if not tarefas:
+                self.contadores.incrementar('processados')
+                self._progredir(proc)
+                continue
+
+            self.contadores.incrementar('arquivos_descobertos', len(tarefas))
+            pendentes[proc] = len(tarefas)
+            for tarefa in tarefas:
+                await fila.put(tarefa)
+
+    async def _consumidor(
+        self,
+        fila: asyncio.Queue,
+        pool: Executor,
+        escritor: EscritorDoccano,
+        concluir: Callable[[str], None],
+    ) -> None:
+        from modular_app.utils.ocr_extractor import chamar_mistral_ocr_async
+
+        loop = asyncio.get_running_loop()
+        while True:
+            tarefa = await fila.get()
+            if tarefa is _FIM:
+                return
+            entrada = tarefa.entrada
+            try:
+                if self._verificar_parada():
+                    continue
+                self.log(f'[OCR] {entrada.nome} (tipo={entrada.tipo})', 'info')
+                try:
+                    image_urls = await loop.run_in_executor(pool, _preparar_no_pool, entrada.caminho, self.max_paginas, entrada.tipo)
+                except Exception as e:
+                    # Mesmo comportamento do OCR unitário: registro vazio (não validado)
+                    self.log(f'[AVISO] Falha no pré-processamento de {entrada.nome}: {e}', 'warning')
+                    image_urls = None
+                if self._verificar_parada():
+                    continue
+                try:
+                    res = await chamar_mistral_ocr_async(image_urls, entrada.nome, True, self.max_retries) if image_urls else {}
+                except Exception as e:
+                    self.log(f'[ERRO] Falha no OCR de {entrada.nome}: {e}', 'error')
+                    self.contadores.incrementar('erros')
+                    continue
+                self.contadores.incrementar('arquivos_ocr')
+                # Handoff para a thread de escrita sem bloquear o loop
+                await asyncio.to_thread(escritor.enviar, tarefa.processo, entrada.nome, entrada.tipo, (res or {}).get('texto_bruto'))
+            finally:
+                concluir(tarefa.processo)
@@ -0,0 +1,109 @@
+"""
+Manutenção e consulta do arquivo Parquet dos resultados.
+
+Subcomandos:
+    arquivar   anexa ao arquivo os resultados novos do banco (mesmo que a task diária)
+    compactar  junta as partes de cada partição num único arquivo
+    consultar  conta/mostra os resultados de um recorte
+    exportar   grava o recorte numa planilha .xlsx
+
+Uso:
+    python scripts/arquivo_resultados.py arquivar
+    python scripts/arquivo_resultados.py compactar --tipo ordinaria
+    python scripts/arquivo_resultados.py consultar --tipo ordinaria --inicio 2026-03-01 --fim 2026-03-31 --resultado indeferimento
+    python scripts/arquivo_resultados.py exportar --tipo definitiva --inicio 2026-05-01 --fim 2026-05-31 --saida maio.xlsx
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from modular_app.services.arquivo_resultados import PYARROW_DISPONIVEL, ArquivoResultados  # noqa: E402
+
+
+def _data(valor: str) -> date:
+    return date.fromisoformat(valor)
+
+
+def _filtros(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        'tipo_analise': args.tipo,
+        'data_inicio': args.inicio,
+        'data_fim': args.fim,
+        'resultado': args.resultado,
+        'numero_processo': args.processo,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Arquivo Parquet dos resultados')
+    parser.add_argument('--dir', default=None, help='Diretório do arquivo (padrão: ARQUIVO_RESULTADOS_DIR)')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    arquivar = sub.add_parser('arquivar', help='Anexa os resultados novos do banco')
+    arquivar.add_argument('--url', default=None, help='URL SQLAlchemy do banco de resultados')
+
+    compactar = sub.add_parser('compactar', help='Junta as partes de cada partição')
+    compactar.add_argument('--tipo', default=None)
+    compactar.add_argument('--mes', default=None, help='AAAA-MM')
+
+    for nome in ('consultar', 'exportar'):
+        p = sub.add_parser(nome)
+        p.add_argument('--tipo', default=None)
+        p.add_argument('--inicio', type=_data, default=None, help='AAAA-MM-DD')
+        p.add_argument('--fim', type=_data, default=None, help='AAAA-MM-DD (inclusiva)')
+        p.add_argument('--resultado', default=None)
+        p.add_argument('--processo', default=None)
+        if nome == 'consultar':
+            p.add_argument('--limite', type=int, default=20, help='Linhas exibidas')
+        else:
+            p.add_argument('--saida', required=True, help='Caminho da planilha .xlsx')
+
+    args = parser.parse_args(argv)
+    if not PYARROW_DISPONIVEL:
+        print("[ERRO] pyarrow não instalado (pip install -r requirements.txt)")
+        return 1
+
+    arquivo = ArquivoResultados(args.dir)
+
+    if args.comando == 'arquivar':
+        from modular_app.services.resultados_db import BancoResultados
+        estatisticas = arquivo.arquivar_do_banco(BancoResultados(args.url))
+        print(f"[OK] {estatisticas['arquivados']} resultado(s) arquivado(s) até o id {estatisticas['ultimo_id']}")
+        for particao, linhas in sorted(estatisticas['particoes'].items()):
+            print(f"   {particao}: {linhas}")
+        return 0
+
+    if args.comando == 'compactar':
+        compactadas = arquivo.compactar(args.tipo, args.mes)
+        if not compactadas:
+            print("[INFO] Nenhuma partição com partes a compactar")
+        for particao, partes in sorted(compactadas.items()):
+            print(f"[OK] {particao}: {partes} parte(s) compactada(s)")
+        return 0
+
+    if args.comando == 'consultar':
+        df = arquivo.ler_dataframe(
+            ['numero_processo', 'tipo_analise', 'resultado', 'data_analise', 'requisitos_nao_atendidos'],
+            **_filtros(args),
+        )
+        print(f"[INFO] {len(df)} resultado(s)")
+        if len(df):
+            print(df.head(args.limite).to_string(index=False))
+        return 0
+
+    linhas = arquivo.exportar_excel(args.saida, **_filtros(args))
+    print(f"[SALVO] {linhas} resultado(s) em {args.saida}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Compara os perfis do Chrome ('padrao' x 'desempenho') contra o simulador do LECOM.
+
+Para cada perfil abre uma LecomAction, faz login e percorre N casos
+(workspace/flow -> form-web), medindo o carregamento de cada página pela
+Navigation Timing API e a memória (RSS) somada do chromedriver e de todos
+os processos do Chrome. O simulador sobe com --recursos-pesados para que
+as páginas carreguem fontes, imagens, analytics e widget de chat.
+
+Uso:
+    python scripts/benchmark_perfil_navegador.py --casos 10
+    python scripts/benchmark_perfil_navegador.py --perfis desempenho --latencia-ms 80 \
+        --saida benchmark_perfis.json
+
+A medição de RSS usa psutil quando instalado; sem ele, lê /proc (Linux).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from scripts.benchmark_processadores import _configurar_ambiente, _percentil  # noqa: E402
+
+_JS_CARREGAMENTO = (
+    "var n = performance.getEntriesByType('navigation')[0];"
+    "return n ? {carga: n.loadEventEnd - n.startTime, dom: n.domContentLoadedEventEnd - n.startTime,"
+    " recursos: performance.getEntriesByType('resource').length} : null;"
+)
+
+
+def _iniciar_simulador(porta: int, latencia_ms: int) -> str:
+    import threading
+    from werkzeug.serving import make_server
+    from scripts.lecom_simulador import criar_app
+
+    app = criar_app(None, latencia_ms, 0, recursos_pesados=True)
+    servidor = make_server('127.0.0.1', porta, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{porta}'
+
+
+def _filhos_proc(pid: int) -> List[int]:
+    filhos: List[int] = []
+    try:
+        for tid in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{tid}/children', 'r') as f:
+                filhos.extend(int(p) for p in f.read().split())
+    except OSError:
+        pass
+    return filhos
+
+
+def _rss_arvore_mb(pid: Optional[int]) -> Optional[float]:
+    """RSS (MB) do processo e de todos os descendentes."""
+    if not pid:
+        return None
+    try:
+        import psutil
+
+        raiz = psutil.Process(pid)
+        total = raiz.memory_info().rss
+        for filho in raiz.children(recursive=True):
+            try:
+                total += filho.memory_info().rss
+            except psutil.Error:
+                pass
+        return round(total / (1024 * 1024), 1)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    if not os.path.isdir('/proc'):
+        return None
+    total_kb, pendentes = 0, [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        try:
+            with open(f'/proc/{atual}/status', 'r') as f:
+                for linha in f:
+                    if linha.startswith('VmRSS:'):
+                        total_kb += int(linha.split()[1])
+                        break
+        except OSError:
+            continue
+        pendentes.extend(_filhos_proc(atual))
+    return round(total_kb / 1024.0, 1)
+
+
+def _carregar(driver, url: str, amostras: List[Dict[str, float]]) -> None:
+    t0 = time.perf_counter()
+    driver.get(url)
+    parede_ms = (time.perf_counter() - t0) * 1000.0
+    try:
+        medida = driver.execute_script(_JS_CARREGAMENTO) or {}
+    except Exception:
+        medida = {}
+    amostras.append({
+        'parede_ms': round(parede_ms, 2),
+        'carga_ms': round(float(medida.get('carga') or parede_ms), 2),
+        'dom_ms': round(float(medida.get('dom') or 0.0), 2),
+        'recursos': int(medida.get('recursos') or 0),
+    })
+
+
+def _executar_perfil(perfil: str, n_casos: int) -> Dict[str, Any]:
+    from automation.actions.lecom_ordinaria_action import LecomAction
+    from automation.utils.lecom_urls import url_fluxo, url_form_web
+
+    t0 = time.perf_counter()
+    action = LecomAction(perfil_navegador=perfil)
+    inicio_ms = round((time.perf_counter() - t0) * 1000.0, 2)
+    driver = action.driver
+    pid = getattr(getattr(driver, 'service', None), 'process', None)
+    pid = getattr(pid, 'pid', None)
+
+    amostras: List[Dict[str, float]] = []
+    rss: List[float] = []
+    try:
+        if not action.login():
+            raise RuntimeError('login falhou no simulador')
+        for i in range(1, n_casos + 1):
+            numero = f'1{i:05d}'
+            _carregar(driver, url_fluxo(numero), amostras)
+            _carregar(driver, url_form_web(numero), amostras)
+            medida = _rss_arvore_mb(pid)
+            if medida is not None:
+                rss.append(medida)
+            print(f'[BENCH] {perfil} {i}/{n_casos}: {amostras[-1]["carga_ms"]:.0f} ms (form-web)'
+                  f'{f", RSS {rss[-1]:.0f} MB" if rss else ""}')
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    cargas = [a['carga_ms'] for a in amostras]
+    return {
+        'perfil': perfil,
+        'paginas': len(amostras),
+        'inicio_navegador_ms': inicio_ms,
+        'carga_ms': {
+            'media': round(sum(cargas) / max(1, len(cargas)), 2),
+            'p50': _percentil(cargas, 50),
+            'p95': _percentil(cargas, 95),
+        },
+        'recursos_por_pagina': round(sum(a['recursos'] for a in amostras) / max(1, len(amostras)), 1),
+        'rss_mb': {'media': round(sum(rss) / len(rss), 1), 'max': max(rss)} if rss else None,
+        'amostras': amostras,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark dos perfis do Chrome (simulador LECOM)')
+    parser.add_argument('--perfis', default='padrao,desempenho', help='Perfis separados por vírgula')
+    parser.add_argument('--casos', type=int, default=5)
+    parser.add_argument('--porta', type=int, default=5056)
+    parser.add_argument('--latencia-ms', type=int, default=0)
+    parser.add_argument('--saida', default=None, help='Arquivo JSON para o relatório')
+    args = parser.parse_args(argv)
+
+    url = _iniciar_simulador(args.porta, args.latencia_ms)
+    _configurar_ambiente(url)
+    print(f'[OK] Simulador (recursos pesados): {url}')
+
+    relatorio: Dict[str, Any] = {'gerado_em': datetime.now().isoformat(), 'simulador': url, 'perfis': {}}
+    for perfil in [p.strip() for p in args.perfis.split(',') if p.strip()]:
+        relatorio['perfis'][perfil] = _executar_perfil(perfil, args.casos)
+
+    print('\n=== RESUMO ===')
+    for perfil, r in relatorio['perfis'].items():
+        rss = f"{r['rss_mb']['media']:.0f} MB" if r['rss_mb'] else 'n/d'
+        print(f"{perfil:<11} carga média {r['carga_ms']['media']:>8.1f} ms  p95 {r['carga_ms']['p95']:>8.1f} ms  "
+              f"recursos/página {r['recursos_por_pagina']:>5.1f}  RSS {rss}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f'[SALVO] Relatório em {args.saida}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
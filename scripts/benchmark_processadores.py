@@ -0,0 +1,174 @@
+"""
+Benchmark ponta a ponta dos Processors contra o simulador local do LECOM.
+
+Sobe o simulador (`scripts/lecom_simulador.py`) numa thread, aponta
+LECOM_URL/MISTRAL_API_URL para ele e executa OrdinariaProcessor,
+ProvisoriaProcessor e/ou DefinitivaProcessor sobre N casos sintéticos,
+reportando casos/hora e latência por etapa (a partir de `tempos_etapas`).
+
+Uso:
+    python scripts/benchmark_processadores.py --fluxo todos --casos 20
+    python scripts/benchmark_processadores.py --fluxo ordinaria --casos 50 \
+        --latencia-ms 150 --saida benchmark_ordinaria.json
+
+Com --url-simulador o benchmark usa um simulador já em execução.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+# Prefixo do número do processo -> perfil do caso no simulador
+PREFIXOS = {'ordinaria': 1, 'provisoria': 2, 'definitiva': 3}
+
+
+def _iniciar_simulador(porta: int, fixtures: Optional[str], latencia_ms: int, latencia_ocr_ms: int) -> str:
+    from werkzeug.serving import make_server
+    from scripts.lecom_simulador import criar_app
+
+    app = criar_app(fixtures, latencia_ms, latencia_ocr_ms)
+    servidor = make_server('127.0.0.1', porta, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{porta}'
+
+
+def _configurar_ambiente(url_simulador: str) -> None:
+    """Precisa rodar ANTES de importar `automation` (URLs são lidas no import)."""
+    os.environ['LECOM_URL'] = f'{url_simulador}/bpm'
+    os.environ['LECOM_BASE_URL'] = url_simulador
+    os.environ['MISTRAL_API_URL'] = url_simulador
+    os.environ.setdefault('MISTRAL_API_KEY', 'simulador')
+    os.environ.setdefault('LECOM_USER', 'usuario.simulador')
+    os.environ.setdefault('LECOM_PASS', 'senha-simulador')
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100.0 * (len(ordenados) - 1)))))
+    return round(ordenados[k], 2)
+
+
+def _resumir(fluxo: str, registros: List[Dict[str, Any]], duracao_total_s: float) -> Dict[str, Any]:
+    etapas: Dict[str, List[float]] = {}
+    for r in registros:
+        for etapa, ms in (r.get('tempos_etapas') or {}).items():
+            etapas.setdefault(etapa, []).append(float(ms or 0.0))
+    totais = [r['duracao_ms'] for r in registros]
+    return {
+        'fluxo': fluxo,
+        'casos': len(registros),
+        'sucessos': sum(1 for r in registros if r.get('ok')),
+        'duracao_total_s': round(duracao_total_s, 2),
+        'casos_por_hora': round(len(registros) / duracao_total_s * 3600.0, 1) if duracao_total_s > 0 else 0.0,
+        'caso_ms': {'media': round(sum(totais) / max(1, len(totais)), 2), 'p50': _percentil(totais, 50), 'p95': _percentil(totais, 95)},
+        'etapas_ms': {
+            etapa: {
+                'media': round(sum(v) / len(v), 2),
+                'p50': _percentil(v, 50),
+                'p95': _percentil(v, 95),
+                'max': round(max(v), 2),
+            }
+            for etapa, v in sorted(etapas.items())
+        },
+    }
+
+
+def _executar_fluxo(fluxo: str, n_casos: int) -> Dict[str, Any]:
+    codigos = [f'{PREFIXOS[fluxo]}{i:05d}' for i in range(1, n_casos + 1)]
+    processar: Callable[[str], Dict[str, Any]]
+
+    if fluxo == 'ordinaria':
+        from automation.services.ordinaria_processor import OrdinariaProcessor
+        proc = OrdinariaProcessor(driver=None)
+        processar = proc.processar_processo
+        fechar = proc.fechar
+    elif fluxo == 'provisoria':
+        from automation.services.provisoria_processor import ProvisoriaProcessor
+        proc = ProvisoriaProcessor(driver=None)
+        processar = proc.processar_codigo
+        fechar = lambda: proc.lecom.driver.quit()  # noqa: E731
+    else:
+        from automation.services.definitiva_processor import DefinitivaProcessor
+        proc = DefinitivaProcessor(driver=None)
+        processar = proc.processar_processo
+        fechar = proc.fechar
+
+    registros: List[Dict[str, Any]] = []
+    inicio = time.perf_counter()
+    try:
+        for i, codigo in enumerate(codigos, start=1):
+            t0 = time.perf_counter()
+            try:
+                resultado = processar(codigo) or {}
+                erro = resultado.get('erro')
+            except Exception as e:
+                resultado, erro = {}, str(e)
+            registros.append({
+                'codigo': codigo,
+                'ok': not erro,
+                'erro': erro,
+                'duracao_ms': round((time.perf_counter() - t0) * 1000.0, 2),
+                'tempos_etapas': resultado.get('tempos_etapas', {}),
+            })
+            print(f'[BENCH] {fluxo} {i}/{len(codigos)} {codigo}: {registros[-1]["duracao_ms"]:.0f} ms'
+                  f'{" (erro: " + str(erro) + ")" if erro else ""}')
+    finally:
+        try:
+            fechar()
+        except Exception:
+            pass
+    resumo = _resumir(fluxo, registros, time.perf_counter() - inicio)
+    resumo['registros'] = registros
+    return resumo
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark offline dos Processors (simulador LECOM)')
+    parser.add_argument('--fluxo', choices=['ordinaria', 'provisoria', 'definitiva', 'todos'], default='todos')
+    parser.add_argument('--casos', type=int, default=10)
+    parser.add_argument('--porta', type=int, default=5055)
+    parser.add_argument('--url-simulador', default=None, help='Usar simulador já em execução')
+    parser.add_argument('--fixtures', default=None)
+    parser.add_argument('--latencia-ms', type=int, default=0)
+    parser.add_argument('--latencia-ocr-ms', type=int, default=0)
+    parser.add_argument('--saida', default=None, help='Arquivo JSON para o relatório')
+    args = parser.parse_args(argv)
+
+    url = args.url_simulador or _iniciar_simulador(args.porta, args.fixtures, args.latencia_ms, args.latencia_ocr_ms)
+    _configurar_ambiente(url.rstrip('/'))
+    print(f'[OK] Simulador: {url}')
+
+    fluxos = ['ordinaria', 'provisoria', 'definitiva'] if args.fluxo == 'todos' else [args.fluxo]
+    relatorio: Dict[str, Any] = {'gerado_em': datetime.now().isoformat(), 'simulador': url, 'fluxos': {}}
+    for fluxo in fluxos:
+        relatorio['fluxos'][fluxo] = _executar_fluxo(fluxo, args.casos)
+
+    print('\n=== RESUMO ===')
+    for fluxo, r in relatorio['fluxos'].items():
+        print(f"{fluxo}: {r['casos']} casos, {r['sucessos']} ok, {r['casos_por_hora']} casos/h, "
+              f"p50 {r['caso_ms']['p50']:.0f} ms, p95 {r['caso_ms']['p95']:.0f} ms")
+        for etapa, m in r['etapas_ms'].items():
+            print(f"    {etapa:<16} média {m['media']:>9.1f} ms  p95 {m['p95']:>9.1f} ms")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f'[SALVO] Relatório em {args.saida}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
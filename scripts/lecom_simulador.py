@@ -0,0 +1,503 @@
+"""
+Simulador local do LECOM (workspace / form-web) + OCR para benchmark offline.
+
+Serve as páginas que as actions Selenium percorrem (login em duas etapas,
+workspace/flow com a atividade "Efetuar Distribuição", form-web com o
+iframe `iframe-form-app`, campos do formulário, `CHPF_PARECER`, tabela de
+anexos e campos `input__DOC_*` com ícone cloud_download) e os PDFs dos
+documentos. Também expõe `/v1/chat/completions` como stand-in do Mistral.
+
+Os casos são sintéticos e determinísticos a partir do número do processo:
+    1xxxxx / outros -> perfil Ordinária (adulto, residência indeterminada)
+    2xxxxx          -> perfil Provisória (menor, ingresso antes dos 10 anos)
+    3xxxxx          -> perfil Definitiva (18-20 anos na data inicial)
+
+Gravações anonimizadas podem substituir os sintéticos via --fixtures DIR:
+    DIR/<numero>/caso.json   campos que sobrescrevem o caso gerado
+    DIR/<numero>/flow.html   página workspace/flow gravada
+    DIR/<numero>/form.html   conteúdo gravado do iframe form-app
+    DIR/<numero>/<DOC_ID>.pdf  PDF real (anonimizado) do documento
+
+Com --recursos-pesados cada página HTML também carrega o que o LECOM real
+carrega e a automação não usa: fontes, imagens, um script de analytics e
+um widget de chat (usado pelo benchmark de perfis do navegador).
+
+Uso:
+    python scripts/lecom_simulador.py --porta 5055 [--fixtures DIR] [--latencia-ms 150]
+    LECOM_URL=http://127.0.0.1:5055/bpm MISTRAL_API_URL=http://127.0.0.1:5055 ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, Response, abort, make_response, redirect, request
+
+
+# Documentos disponíveis no formulário: (campo, tipo exibido na tabela, linhas do PDF)
+DOCUMENTOS = [
+    ('DOC_RNM', 'Carteira de Registro Nacional Migratório', [
+        'REPUBLICA FEDERATIVA DO BRASIL',
+        'CARTEIRA DE REGISTRO NACIONAL MIGRATORIO',
+        'NOME: {nome}',
+        'FILIACAO: {pai} / {mae}',
+        'DATA DE NASCIMENTO: {data_nasc}',
+        'NACIONALIDADE: {nacionalidade}',
+        'RNM: {rnm}',
+        'CLASSIFICACAO: RESIDENTE',
+        'PRAZO DE RESIDENCIA: INDETERMINADO',
+        'VALIDADE: {validade}',
+    ]),
+    ('DOC_CPF', 'Comprovante da situação cadastral do CPF', [
+        'RECEITA FEDERAL DO BRASIL',
+        'COMPROVANTE DE SITUACAO CADASTRAL NO CPF',
+        'No do CPF: {cpf}',
+        'Nome: {nome}',
+        'Data de Nascimento: {data_nasc}',
+        'Situacao Cadastral: REGULAR',
+    ]),
+    ('DOC_CERTCRIME', 'Certidão de antecedentes criminais (Brasil)', [
+        'PODER JUDICIARIO - JUSTICA FEDERAL',
+        'CERTIDAO JUDICIAL CRIMINAL NEGATIVA',
+        'CERTIFICAMOS que, pesquisando os registros de distribuicao de acoes criminais,',
+        'NADA CONSTA contra {nome}, CPF {cpf}.',
+        'Tribunal Regional Federal - antecedentes criminais',
+    ]),
+    ('DOC_ANTCRIME', 'Atestado antecedentes criminais (país de origem)', [
+        'ATESTADO DE ANTECEDENTES CRIMINAIS',
+        'Pais de origem: {nacionalidade}',
+        'Certifica-se que {nome} nao possui antecedentes criminais.',
+        'Documento legalizado e com traducao juramentada.',
+    ]),
+    ('DOC_PTBR', 'Comprovante de comunicação em português', [
+        'CERTIFICADO DE PROFICIENCIA EM LINGUA PORTUGUESA',
+        'CELPE-BRAS - Ministerio da Educacao',
+        'Certificamos que {nome} obteve nivel INTERMEDIARIO.',
+        'Comunicacao em portugues comprovada.',
+    ]),
+    ('DOC_RESIDENCIA', 'Comprovante de tempo de residência', [
+        'COMPROVANTE DE RESIDENCIA',
+        'Declaramos que {nome} reside no Brasil desde {data_residencia}.',
+        'Tempo de residencia comprovado por documentos oficiais.',
+    ]),
+    ('DOC_VIAGEM', 'Documento de viagem internacional', [
+        'PASSAPORTE / PASSPORT',
+        'Tipo/Type: P   Pais emissor: {nacionalidade}',
+        'Nome/Name: {nome}',
+        'Data de nascimento/Date of birth: {data_nasc}',
+        'Documento de viagem internacional',
+    ]),
+    ('DOC_REDUCAO', 'Comprovante de redução de prazo', [
+        'CERTIDAO DE NASCIMENTO',
+        'Registro civil de filho brasileiro de {nome}.',
+        'Reducao de prazo - filho nascido no Brasil.',
+    ]),
+    ('DOC_RNMREP', 'Documento de identificacao do representante legal', [
+        'CARTEIRA DE IDENTIDADE - REPRESENTANTE LEGAL',
+        'Nome: {mae}',
+        'RG: 12.345.678-9',
+    ]),
+    ('DOC_PORTARIA', 'Portaria de naturalização provisória', [
+        'MINISTERIO DA JUSTICA E SEGURANCA PUBLICA',
+        'PORTARIA DE NATURALIZACAO PROVISORIA',
+        'Concede a naturalizacao provisoria a {nome}.',
+    ]),
+]
+
+_NOMES = ['ANA', 'CARLOS', 'MARIA', 'JOSE', 'LUCIA', 'PEDRO', 'SOFIA', 'MIGUEL', 'ELENA', 'DIEGO']
+_SOBRENOMES = ['GARCIA', 'RODRIGUEZ', 'MARTINEZ', 'LOPEZ', 'PEREZ', 'SANCHEZ', 'RAMIREZ', 'TORRES']
+_PAISES = ['VENEZUELA', 'BOLIVIA', 'HAITI', 'PERU', 'COLOMBIA', 'ARGENTINA', 'PARAGUAI']
+
+
+def perfil_do_numero(numero: str) -> str:
+    if numero.startswith('2'):
+        return 'provisoria'
+    if numero.startswith('3'):
+        return 'definitiva'
+    return 'ordinaria'
+
+
+def gerar_caso(numero: str, fixtures_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Gera (ou carrega) o caso sintético associado ao número do processo."""
+    rnd = random.Random(int(numero) if numero.isdigit() else hash(numero))
+    perfil = perfil_do_numero(numero)
+    hoje = date.today()
+    data_inicial = hoje - timedelta(days=rnd.randint(30, 400))
+
+    if perfil == 'provisoria':
+        idade = rnd.randint(8, 16)
+    elif perfil == 'definitiva':
+        idade = rnd.randint(18, 20)
+    else:
+        idade = rnd.randint(25, 60)
+    nascimento = data_inicial - timedelta(days=idade * 365 + rnd.randint(10, 300))
+    residencia = hoje - timedelta(days=rnd.randint(5, 15) * 365)
+
+    nome = f'{rnd.choice(_NOMES)} {rnd.choice(_SOBRENOMES)} {rnd.choice(_SOBRENOMES)}'
+    caso: Dict[str, Any] = {
+        'numero': numero,
+        'perfil': perfil,
+        'nome': nome,
+        'pai': f'{rnd.choice(_NOMES)} {nome.split()[-1]}',
+        'mae': f'{rnd.choice(_NOMES)} {rnd.choice(_SOBRENOMES)}',
+        'nacionalidade': rnd.choice(_PAISES),
+        'data_nasc': nascimento.strftime('%d/%m/%Y'),
+        'data_residencia': residencia.strftime('%d/%m/%Y'),
+        'data_inicial': data_inicial,
+        'rnm': f'V{rnd.randint(100000, 999999)}-{rnd.randint(0, 9)}',
+        'cpf': f'{rnd.randint(100, 999)}.{rnd.randint(100, 999)}.{rnd.randint(100, 999)}-{rnd.randint(10, 99)}',
+        'validade': (hoje + timedelta(days=3650)).strftime('%d/%m/%Y'),
+        'sexo': rnd.choice(['Masculino', 'Feminino']),
+        'ciclo': rnd.randint(1, 3),
+    }
+
+    if perfil == 'provisoria':
+        caso['parecer'] = (
+            f'O requerente ingressou no Brasil antes de completar 10 anos de idade, em {caso["data_residencia"]}. '
+            'Propõe-se o DEFERIMENTO.'
+        )
+        docs = ['DOC_RNMREP', 'DOC_RNM', 'DOC_RESIDENCIA', 'DOC_VIAGEM']
+    elif perfil == 'definitiva':
+        caso['parecer'] = 'Requerente possui naturalização provisória. Nada consta. Propõe-se o DEFERIMENTO.'
+        docs = ['DOC_RNM', 'DOC_CPF', 'DOC_CERTCRIME', 'DOC_PORTARIA']
+    else:
+        caso['parecer'] = (
+            f'Residente no Brasil por prazo indeterminado desde {caso["data_residencia"]}, '
+            f'totalizando mais de 4 anos de residência. Nada consta. Propõe-se o DEFERIMENTO.'
+        )
+        docs = ['DOC_RNM', 'DOC_CPF', 'DOC_CERTCRIME', 'DOC_ANTCRIME', 'DOC_PTBR', 'DOC_RESIDENCIA', 'DOC_VIAGEM']
+    # ~10% dos casos com um documento ausente (exercita o caminho de "faltante")
+    if rnd.random() < 0.10:
+        docs.pop(rnd.randrange(len(docs)))
+    caso['documentos'] = docs
+
+    if fixtures_dir:
+        caminho = os.path.join(fixtures_dir, numero, 'caso.json')
+        if os.path.isfile(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                caso.update(json.load(f))
+    return caso
+
+
+def gerar_pdf_texto(linhas: List[str]) -> bytes:
+    """PDF mínimo de uma página com camada de texto (Helvetica, latin-1)."""
+    conteudo = ['BT', '/F1 11 Tf', '50 780 Td', '14 TL']
+    for linha in linhas:
+        texto = linha.encode('latin-1', 'replace').decode('latin-1')
+        texto = texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        conteudo.append(f'({texto}) Tj T*')
+    conteudo.append('ET')
+    stream = '\n'.join(conteudo).encode('latin-1')
+
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    saida = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for i, obj in enumerate(objetos, start=1):
+        offsets.append(len(saida))
+        saida += f'{i} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    inicio_xref = len(saida)
+    saida += f'xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n'.encode()
+    for off in offsets:
+        saida += f'{off:010d} 00000 n \n'.encode()
+    saida += f'trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n'.encode()
+    return bytes(saida)
+
+
+_MESES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+
+def _pagina(titulo: str, corpo: str) -> str:
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>{html.escape(titulo)}</title></head><body>{corpo}</body></html>'
+    )
+
+
+def _nome_arquivo(numero: str, doc_id: str) -> str:
+    return f'{doc_id.lower()}_{numero}.pdf'
+
+
+def _html_flow(caso: Dict[str, Any]) -> str:
+    d = caso['data_inicial']
+    subtitulo = f'Em andamento - aberto por Cidadão {d.day} de {_MESES[d.month - 1]} de {d.year} às 14:55'
+    linhas = []
+    for ciclo in range(1, caso['ciclo'] + 1):
+        href = f'/form-app/{caso["numero"]}/24/{ciclo}'
+        linhas.append(
+            '<tr class="ant-table-row"><td>'
+            f'<a class="col-with-link" title="Efetuar Distribuição" href="{href}">Efetuar Distribuição</a>'
+            '</td></tr>'
+        )
+    linhas.append('<tr class="ant-table-row"><td><a class="col-with-link" title="Iniciar Processo" '
+                  f'href="/form-app/{caso["numero"]}/1/1">Iniciar Processo</a></td></tr>')
+    corpo = (
+        f'<h1>Processo {caso["numero"]}</h1><span class="subtitle">{html.escape(subtitulo)}</span>'
+        f'<table class="ant-table"><tbody class="ant-table-tbody">{"".join(linhas)}</tbody></table>'
+    )
+    return _pagina(f'Fluxo {caso["numero"]}', corpo)
+
+
+def _html_form(caso: Dict[str, Any]) -> str:
+    numero = caso['numero']
+    partes_nome = caso['nome'].split(' ', 1)
+    campos = {
+        'PROTOCOLO': numero,
+        'ORD_NOM_COMPLETO': caso['nome'],
+        'NOME': partes_nome[0],
+        'SOBRENOME': partes_nome[1] if len(partes_nome) > 1 else '',
+        'ORD_FI1': caso['pai'],
+        'ORD_FI2': caso['mae'],
+        'PAI': caso['pai'],
+        'MAE': caso['mae'],
+        'ORD_NAS': caso['data_nasc'],
+        'DATA_NASC': caso['data_nasc'],
+        'NACIONALIDADE': caso['nacionalidade'],
+        'RNM': caso['rnm'],
+        'ORD_SEX': caso['sexo'],
+        'RES_DAT': caso['data_residencia'],
+    }
+    html_campos = ''.join(
+        f'<div class="field"><label for="{c}">{c}</label><input id="{c}" name="{c}" type="text" value="{html.escape(str(v))}"></div>'
+        for c, v in campos.items()
+    )
+    html_campos += (
+        '<div class="field"><label for="DATA_ENTRADA">Data de entrada no Brasil</label>'
+        f'<input id="DATA_ENTRADA" type="text" value="{caso["data_residencia"]}"></div>'
+        f'<div class="field"><label for="CHPF_PARECER">Parecer PF</label>'
+        f'<textarea id="CHPF_PARECER">{html.escape(caso["parecer"])}</textarea></div>'
+    )
+
+    titulos = {doc_id: titulo for doc_id, titulo, _ in DOCUMENTOS}
+    html_docs = []
+    linhas_tabela = []
+    for doc_id in caso['documentos']:
+        arquivo = _nome_arquivo(numero, doc_id)
+        href = f'/download/{numero}/{doc_id}'
+        botao = (
+            f'<a class="button button--icon" href="{href}" download="{arquivo}">'
+            '<i type="cloud_download" aria-label="Download">cloud_download</i></a>'
+        )
+        html_docs.append(
+            f'<div class="document-field" id="input__{doc_id}">'
+            f'<label>{html.escape(titulos[doc_id])}</label>'
+            f'<input id="{doc_id}" type="text" readonly value="{arquivo}">{botao}</div>'
+        )
+        linhas_tabela.append(
+            '<tr class="table-row">'
+            f'<td class="table-cell--DOCS_TIPO"><span>{html.escape(titulos[doc_id])}</span></td>'
+            '<td class="table-cell--DOCS_TIPO_OUTRO"><span></span></td>'
+            f'<td class="table-cell--DOCS_ANEXO"><a href="{href}" download="{arquivo}">{arquivo}</a></td>'
+            '</tr>'
+        )
+    corpo = (
+        f'<form id="form-app">{html_campos}{"".join(html_docs)}'
+        f'<table class="table"><tbody>{"".join(linhas_tabela)}</tbody></table></form>'
+    )
+    return _pagina('form-app', corpo)
+
+
+_RECURSOS_PESADOS = (
+    '<link rel="preload" as="font" type="font/woff2" crossorigin href="/sim/recursos/fonte-1.woff2">'
+    '<style>@font-face{font-family:SimIcons;src:url(/sim/recursos/fonte-2.woff2) format("woff2")}'
+    'body{font-family:SimIcons,sans-serif}</style>'
+    + ''.join(f'<img alt="" width="64" height="64" src="/sim/recursos/img-{i}.png">' for i in range(1, 7))
+    + '<script src="/sim/recursos/analytics.js"></script>'
+    '<script src="/sim/recursos/chat-widget.js"></script>'
+)
+
+_SCRIPT_CHAT = (
+    '(function(){var d=document.createElement("div");d.id="sim-chat";'
+    'for(var i=0;i<400;i++){var p=document.createElement("p");p.textContent="mensagem "+i;d.appendChild(p);}'
+    'document.body.appendChild(d);setInterval(function(){fetch("/sim/recursos/chat-widget-poll");},1000);})();'
+)
+
+
+def criar_app(fixtures_dir: Optional[str] = None, latencia_ms: int = 0, latencia_ocr_ms: int = 0,
+              recursos_pesados: bool = False) -> Flask:
+    app = Flask(__name__)
+    app.config['SIM_CONTADORES'] = {'paginas': 0, 'downloads': 0, 'ocr': 0, 'recursos': 0}
+
+    def _caso(numero: str) -> Dict[str, Any]:
+        numero = re.sub(r'\D', '', numero)
+        if not numero:
+            abort(404)
+        return gerar_caso(numero, fixtures_dir)
+
+    def _gravado(numero: str, nome: str) -> Optional[str]:
+        if not fixtures_dir:
+            return None
+        caminho = os.path.join(fixtures_dir, numero, nome)
+        if os.path.isfile(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return f.read()
+        return None
+
+    @app.before_request
+    def _latencia():
+        if latencia_ms > 0 and not request.path.startswith('/v1/'):
+            time.sleep(latencia_ms / 1000.0)
+        app.config['SIM_CONTADORES']['paginas'] += 1
+
+    @app.after_request
+    def _injetar_recursos(resp):
+        if recursos_pesados and resp.mimetype == 'text/html' and not resp.direct_passthrough:
+            corpo = resp.get_data(as_text=True)
+            if '</body>' in corpo:
+                resp.set_data(corpo.replace('</body>', _RECURSOS_PESADOS + '</body>', 1))
+        return resp
+
+    @app.get('/sim/recursos/<nome>')
+    def recurso(nome: str):
+        app.config['SIM_CONTADORES']['recursos'] += 1
+        if nome.endswith('.woff2'):
+            return Response(os.urandom(200 * 1024), mimetype='font/woff2')
+        if nome.endswith('.png'):
+            return Response(os.urandom(120 * 1024), mimetype='image/png')
+        if nome == 'chat-widget.js':
+            return Response(_SCRIPT_CHAT, mimetype='application/javascript')
+        if nome.endswith('.js'):
+            return Response('/* analytics simulado */' + 'x' * (150 * 1024), mimetype='application/javascript')
+        return Response(b'', status=204)
+
+    @app.get('/bpm')
+    def login_usuario():
+        corpo = (
+            '<form method="post" action="/bpm/usuario">'
+            '<input name="username" type="text" autocomplete="username">'
+            '<button type="submit"><span>Próxima</span></button></form>'
+        )
+        return _pagina('Login', corpo)
+
+    @app.post('/bpm/usuario')
+    def login_senha():
+        usuario = html.escape(request.form.get('username', ''))
+        corpo = (
+            '<form method="post" action="/bpm/entrar">'
+            f'<input name="username" type="hidden" value="{usuario}">'
+            '<input name="password" type="password" autocomplete="current-password">'
+            '<button type="submit"><span>Entrar</span></button></form>'
+        )
+        return _pagina('Senha', corpo)
+
+    @app.post('/bpm/entrar')
+    def login_entrar():
+        resp = make_response(redirect('/workspace'))
+        resp.set_cookie('lecom_sim_sessao', f'sim-{int(time.time())}', httponly=True)
+        return resp
+
+    @app.get('/workspace')
+    @app.get('/workspace/')
+    def workspace():
+        return _pagina('Workspace', '<h1>Workspace</h1><div class="workspace-home">Caixa de entrada</div>')
+
+    @app.get('/workspace/flow/<numero>')
+    def fluxo(numero: str):
+        return _gravado(numero, 'flow.html') or _html_flow(_caso(numero))
+
+    @app.get('/form-app/<numero>/<int:atividade>/<int:ciclo>')
+    def form_app(numero: str, atividade: int, ciclo: int):
+        return _pagina('form-app', f'<div class="form-app-shell">Atividade {atividade} ciclo {ciclo}</div>')
+
+    @app.get('/form-web')
+    def form_web():
+        numero = re.sub(r'\D', '', request.args.get('processInstanceId', ''))
+        if not numero:
+            abort(404)
+        corpo = f'<iframe id="iframe-form-app" src="/form-app-frame/{numero}" width="100%" height="2000"></iframe>'
+        return _pagina(f'form-web {numero}', corpo)
+
+    @app.get('/form-app-frame/<numero>')
+    def form_frame(numero: str):
+        return _gravado(numero, 'form.html') or _html_form(_caso(numero))
+
+    @app.get('/download/<numero>/<doc_id>')
+    def download(numero: str, doc_id: str):
+        caso = _caso(numero)
+        if doc_id not in caso['documentos']:
+            abort(404)
+        app.config['SIM_CONTADORES']['downloads'] += 1
+        dados: Optional[bytes] = None
+        if fixtures_dir:
+            caminho = os.path.join(fixtures_dir, caso['numero'], f'{doc_id}.pdf')
+            if os.path.isfile(caminho):
+                with open(caminho, 'rb') as f:
+                    dados = f.read()
+        if dados is None:
+            modelo = next(linhas for d, _, linhas in DOCUMENTOS if d == doc_id)
+            valores = {k: v for k, v in caso.items() if isinstance(v, str)}
+            dados = gerar_pdf_texto([linha.format(**valores) for linha in modelo])
+        resp = Response(dados, mimetype='application/pdf')
+        resp.headers['Content-Disposition'] = f'attachment; filename="{_nome_arquivo(caso["numero"], doc_id)}"'
+        return resp
+
+    @app.post('/v1/chat/completions')
+    def ocr_chat():
+        """Stand-in do Mistral: texto genérico ou JSON de campos, conforme o prompt."""
+        app.config['SIM_CONTADORES']['ocr'] += 1
+        if latencia_ocr_ms > 0:
+            time.sleep(latencia_ocr_ms / 1000.0)
+        payload = request.get_json(silent=True) or {}
+        prompt = json.dumps(payload.get('messages', []), ensure_ascii=False)[:20000]
+        if 'JSON' in prompt:
+            conteudo = json.dumps({
+                'nome': 'NOME SIMULADO', 'cpf': '000.000.000-00', 'data_nascimento': '01/01/1990',
+                'filiacao': 'MAE SIMULADA / PAI SIMULADO', 'rnm': 'V000000-0', 'classificacao': 'RESIDENTE',
+            }, ensure_ascii=False)
+        else:
+            conteudo = 'DOCUMENTO SIMULADO\nREPUBLICA FEDERATIVA DO BRASIL\nTexto extraído pelo OCR simulado.'
+        return {
+            'id': f'sim-{int(time.time() * 1000)}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'pixtral-12b-2409'),
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': conteudo},
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }
+
+    @app.get('/sim/contadores')
+    def contadores():
+        return dict(app.config['SIM_CONTADORES'])
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Simulador local do LECOM para benchmark offline')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=5055)
+    parser.add_argument('--fixtures', default=None, help='Diretório com casos gravados/anonimizados')
+    parser.add_argument('--latencia-ms', type=int, default=0, help='Latência artificial por página/download')
+    parser.add_argument('--latencia-ocr-ms', type=int, default=0, help='Latência artificial do OCR simulado')
+    parser.add_argument('--recursos-pesados', action='store_true',
+                        help='Injeta fontes, imagens, analytics e widget de chat nas páginas')
+    args = parser.parse_args(argv)
+
+    app = criar_app(args.fixtures, args.latencia_ms, args.latencia_ocr_ms, args.recursos_pesados)
+    print(f'[OK] Simulador LECOM em http://{args.host}:{args.porta}')
+    print(f'     LECOM_URL=http://{args.host}:{args.porta}/bpm  MISTRAL_API_URL=http://{args.host}:{args.porta}')
+    app.run(host=args.host, port=args.porta, threaded=True, use_reloader=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
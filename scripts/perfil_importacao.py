@@ -0,0 +1,161 @@
+"""
+Perfil de tempo de importação (python -X importtime) em tabela ranqueada.
+
+Executa o alvo num subprocesso limpo com `-X importtime`, agrega as linhas
+do stderr e lista os módulos mais caros (tempo acumulado e próprio).
+Serve para acompanhar regressões no boot do create_app / workers Celery.
+
+Uso:
+    python scripts/perfil_importacao.py                       # create_app()
+    python scripts/perfil_importacao.py --alvo celery         # celery_app
+    python scripts/perfil_importacao.py --codigo "import modular_app.tasks.workers"
+    python scripts/perfil_importacao.py --top 30 --saida perfil.json
+    python scripts/perfil_importacao.py --comparar perfil_base.json --limite-ms 1500
+
+Com --limite-ms o script retorna código 1 se o tempo total de import
+exceder o limite (útil em CI).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+ALVOS = {
+    'create_app': 'from modular_app import create_app; create_app()',
+    'modular_app': 'import modular_app',
+    'celery': 'import celery_app',
+    'workers': 'import modular_app.tasks.workers',
+    'security': 'import security.security_middleware_enhanced',
+}
+
+_LINHA = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$')
+
+
+def coletar(codigo: str) -> Dict[str, Any]:
+    """Roda `codigo` com -X importtime e devolve módulos + tempo de parede."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = RAIZ + os.pathsep + env.get('PYTHONPATH', '')
+    inicio = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ, env=env, capture_output=True, text=True,
+    )
+    parede_ms = (time.perf_counter() - inicio) * 1000.0
+
+    modulos: List[Dict[str, Any]] = []
+    for linha in proc.stderr.splitlines():
+        m = _LINHA.match(linha)
+        if not m:
+            continue
+        proprio_us, acumulado_us, recuo, nome = m.groups()
+        modulos.append({
+            'modulo': nome.strip(),
+            'proprio_ms': int(proprio_us) / 1000.0,
+            'acumulado_ms': int(acumulado_us) / 1000.0,
+            'nivel': max(0, len(recuo) - 1) // 2,
+        })
+
+    # Módulos de nível 0 (importados diretamente) somam o custo total de import
+    total_ms = sum(m['acumulado_ms'] for m in modulos if m['nivel'] == 0)
+    erro = None
+    if proc.returncode != 0:
+        erro = (proc.stderr.strip().splitlines() or ['erro desconhecido'])[-1]
+    return {
+        'codigo': codigo,
+        'total_import_ms': round(total_ms, 1),
+        'parede_ms': round(parede_ms, 1),
+        'qtd_modulos': len(modulos),
+        'modulos': modulos,
+        'erro': erro,
+    }
+
+
+def _pacote_raiz(nome: str) -> str:
+    return nome.split('.', 1)[0]
+
+
+def ranquear(perfil: Dict[str, Any], top: int) -> Dict[str, List[Dict[str, Any]]]:
+    modulos = perfil['modulos']
+    por_acumulado = sorted(modulos, key=lambda m: m['acumulado_ms'], reverse=True)[:top]
+    por_proprio = sorted(modulos, key=lambda m: m['proprio_ms'], reverse=True)[:top]
+    pacotes: Dict[str, float] = {}
+    for m in modulos:
+        raiz = _pacote_raiz(m['modulo'])
+        pacotes[raiz] = pacotes.get(raiz, 0.0) + m['proprio_ms']
+    por_pacote = [
+        {'pacote': p, 'proprio_ms': round(ms, 1)}
+        for p, ms in sorted(pacotes.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    ]
+    return {'acumulado': por_acumulado, 'proprio': por_proprio, 'pacotes': por_pacote}
+
+
+def _imprimir(perfil: Dict[str, Any], ranking: Dict[str, List[Dict[str, Any]]],
+              base: Optional[Dict[str, Any]]) -> None:
+    print(f"Alvo: {perfil['codigo']}")
+    print(f"Import total: {perfil['total_import_ms']:.1f} ms | parede: {perfil['parede_ms']:.1f} ms | "
+          f"{perfil['qtd_modulos']} módulos")
+    if perfil.get('erro'):
+        print(f"[AVISO] Alvo terminou com erro: {perfil['erro']}")
+    if base:
+        delta = perfil['total_import_ms'] - float(base.get('total_import_ms') or 0.0)
+        print(f"Comparado à base: {delta:+.1f} ms ({base.get('total_import_ms')} ms antes)")
+
+    base_pacotes = {p['pacote']: p['proprio_ms'] for p in (base or {}).get('ranking', {}).get('pacotes', [])}
+
+    print('\n  # | acumulado ms | próprio ms | módulo')
+    for i, m in enumerate(ranking['acumulado'], start=1):
+        print(f"{i:>3} | {m['acumulado_ms']:>12.1f} | {m['proprio_ms']:>10.1f} | {m['modulo']}")
+
+    print('\n  # | próprio ms | pacote' + (' | delta ms' if base else ''))
+    for i, p in enumerate(ranking['pacotes'], start=1):
+        extra = ''
+        if base:
+            extra = f" | {p['proprio_ms'] - base_pacotes.get(p['pacote'], 0.0):+.1f}"
+        print(f"{i:>3} | {p['proprio_ms']:>10.1f} | {p['pacote']}{extra}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Perfil de tempo de importação (-X importtime)')
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument('--alvo', choices=sorted(ALVOS), default='create_app')
+    grupo.add_argument('--codigo', default=None, help='Código Python arbitrário a perfilar')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--saida', default=None, help='Salvar perfil (JSON) para comparações futuras')
+    parser.add_argument('--comparar', default=None, help='Perfil JSON de referência')
+    parser.add_argument('--limite-ms', type=float, default=None, help='Falhar se o import total exceder')
+    args = parser.parse_args(argv)
+
+    perfil = coletar(args.codigo or ALVOS[args.alvo])
+    ranking = ranquear(perfil, args.top)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+
+    _imprimir(perfil, ranking, base)
+
+    if args.saida:
+        dados = {k: v for k, v in perfil.items() if k != 'modulos'}
+        dados['ranking'] = ranking
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        print(f'\n[SALVO] Perfil em {args.saida}')
+
+    if args.limite_ms is not None and perfil['total_import_ms'] > args.limite_ms:
+        print(f"\n[ERRO] Import total {perfil['total_import_ms']:.1f} ms excede o limite de {args.limite_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Reavalia casos arquivados com as regras atuais e relata as decisões que mudariam.
+
+Roda `OrdinariaService.analisar_elegibilidade` (e o
+`AnalisadorElegibilidadeSimples` da Definitiva) em um pool de processos,
+sem navegador nem OCR (ver `automation/services/reavaliacao_lote.py`).
+
+Uso:
+    python scripts/reavaliar_casos.py --fonte artefatos
+    python scripts/reavaliar_casos.py --fonte snapshots --diretorio dados_exportacao_ordinaria \
+        --processos 8 --saida reavaliacao.json
+    python scripts/reavaliar_casos.py --fonte global --arquivo resultados_ordinaria_global.json --limite 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from typing import List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from automation.services.reavaliacao_lote import (  # noqa: E402
+    ARQUIVO_GLOBAL,
+    DIRETORIO_SNAPSHOTS,
+    casos_de_artefatos,
+    casos_de_snapshots,
+    casos_do_json_global,
+    executar,
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Reavaliação offline das regras de elegibilidade')
+    parser.add_argument('--fonte', choices=('artefatos', 'snapshots', 'global'), default='artefatos')
+    parser.add_argument('--tipo', choices=('ordinaria', 'definitiva'), default=None,
+                        help='Filtra os artefatos por tipo (padrão: todos)')
+    parser.add_argument('--diretorio', default=os.path.join(RAIZ, DIRETORIO_SNAPSHOTS))
+    parser.add_argument('--arquivo', default=os.path.join(RAIZ, ARQUIVO_GLOBAL))
+    parser.add_argument('--processos', type=int, default=None, help='Tamanho do pool (padrão: núcleos)')
+    parser.add_argument('--limite', type=int, default=None, help='Máximo de casos')
+    parser.add_argument('--saida', default=None, help='Arquivo JSON para o relatório')
+    args = parser.parse_args(argv)
+
+    if args.fonte == 'artefatos':
+        casos = casos_de_artefatos(args.tipo)
+    elif args.fonte == 'snapshots':
+        casos = casos_de_snapshots(args.diretorio)
+    else:
+        casos = casos_do_json_global(args.arquivo)
+    if args.limite:
+        casos = itertools.islice(casos, args.limite)
+
+    relatorio = executar(casos, processos=args.processos)
+    relatorio['fonte'] = args.fonte
+
+    print('\n=== REAVALIAÇÃO ===')
+    print(f"[INFO] {relatorio['total']} caso(s) em {relatorio['duracao_s']} s "
+          f"({relatorio['casos_por_s']} casos/s, {relatorio['processos']} processo(s))")
+    for transicao, quantidade in relatorio['transicoes'].items():
+        antes, depois = transicao.split(' -> ')
+        marca = '[AVISO]' if antes != depois else '[OK]'
+        print(f"{marca} {transicao:<40} {quantidade:>7}")
+    for decisao, quantidade in relatorio['decisoes_novas'].items():
+        print(f"[INFO] {'(sem decisão gravada) -> ' + decisao:<40} {quantidade:>7}")
+    print(f"[INFO] Decisões alteradas: {relatorio['mudaram']}  Novas: {relatorio['novas']}  Erros: {relatorio['erros']}")
+    for mudanca in relatorio['mudancas'][:20]:
+        print(f"  {mudanca['numero_processo']}: {mudanca['antes']} -> {mudanca['depois']} ({mudanca['origem']})")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f'[SALVO] Relatório em {args.saida}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
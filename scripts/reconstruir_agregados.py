@@ -0,0 +1,47 @@
+"""
+Reconstrói os agregados (contadores e histogramas) a partir do banco de resultados.
+
+Apaga `agregados_contadores`/`agregados_histogramas` e recalcula tudo com a
+mesma regra da gravação incremental (`modular_app/services/agregados_resultados.py`).
+Use depois de importar resultados antigos ou de mudar as chaves dos agregados.
+
+Uso:
+    python scripts/reconstruir_agregados.py
+    python scripts/reconstruir_agregados.py --url sqlite:///planilhas/resultados.db --lote 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from modular_app.services.agregados_resultados import reconstruir_agregados, resumo  # noqa: E402
+from modular_app.services.resultados_db import BancoResultados  # noqa: E402
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Backfill dos agregados de resultados')
+    parser.add_argument('--url', default=None, help='URL SQLAlchemy (padrão: RESULTADOS_DB_URL ou planilhas/resultados.db)')
+    parser.add_argument('--lote', type=int, default=5000, help='Resultados lidos por bloco')
+    args = parser.parse_args(argv)
+
+    banco = BancoResultados(args.url)
+    print(f"[INFO] Reconstruindo agregados de {banco.url}...")
+    estatisticas = reconstruir_agregados(banco, lote=args.lote)
+    print(f"[OK] {estatisticas['resultados']} resultado(s) em {estatisticas['duracao_s']} s: "
+          f"{estatisticas['contadores']} contador(es), {estatisticas['histogramas']} balde(s) de histograma")
+    geral = resumo(banco)
+    print(json.dumps({k: geral[k] for k in ('analises', 'deferimentos', 'indeferimentos', 'analise_manual', 'erros')},
+                     ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
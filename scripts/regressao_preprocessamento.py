@@ -0,0 +1,182 @@
+"""
+Regressão do planejador de pré-processamento (pirâmide + perfil por tipo + plano por documento).
+
+Para cada documento de uma pasta (PDF/imagem), pré-processa as páginas com
+o pipeline histórico (`preprocess(apply_all=True)`) e com o planejador
+(`tipo_documento` inferido do nome do arquivo), mede o tempo por página e
+roda Tesseract nas duas versões.
+
+Qualidade do texto:
+  - se existir `<arquivo>.txt` ao lado do documento (gabarito), usa a
+    similaridade de caracteres (difflib) com o gabarito;
+  - senão, usa a fração de palavras "plausíveis" (>= 3 letras/dígitos).
+
+Uso:
+    python scripts/regressao_preprocessamento.py --pasta uploads/amostras
+    python scripts/regressao_preprocessamento.py --pasta amostras --max-paginas 2 \
+        --tolerancia 0.02 --saida regressao.json
+
+Retorna código 1 se o texto do planejador ficar pior que o histórico além
+da tolerância (média por documento) ou se --exigir-ganho não for atingido.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+EXTENSOES = ('.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff')
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+
+
+def _paginas(caminho: str, max_paginas: int):
+    import cv2
+    import numpy as np
+
+    if caminho.lower().endswith('.pdf'):
+        import fitz
+
+        with fitz.open(caminho) as doc:
+            for i in range(min(max_paginas, len(doc))):
+                pix = doc[i].get_pixmap(matrix=fitz.Matrix(3.0, 3.0))
+                arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+                yield cv2.cvtColor(arr, cv2.COLOR_RGB2BGR if pix.n == 3 else cv2.COLOR_RGBA2BGR)
+    else:
+        img = cv2.imread(caminho)
+        if img is not None:
+            yield img
+
+
+def _score_texto(texto: str, gabarito: Optional[str]) -> float:
+    if gabarito is not None:
+        return difflib.SequenceMatcher(None, ' '.join(texto.split()), ' '.join(gabarito.split())).ratio()
+    palavras = _PALAVRA.findall(texto)
+    if not palavras:
+        return 0.0
+    return sum(1 for p in palavras if len(p) >= 3) / len(palavras)
+
+
+def _ocr(img) -> str:
+    import pytesseract
+
+    return pytesseract.image_to_string(img, lang='por+eng')
+
+
+def avaliar_documento(caminho: str, max_paginas: int) -> Dict[str, Any]:
+    from automation.ocr.planejador_preprocessamento import normalizar_tipo_documento, planejar_imagem
+    from automation.ocr.preprocessing_ocr import ImagePreprocessor
+
+    gabarito = None
+    caminho_gabarito = os.path.splitext(caminho)[0] + '.txt'
+    if os.path.exists(caminho_gabarito):
+        with open(caminho_gabarito, 'r', encoding='utf-8') as f:
+            gabarito = f.read()
+
+    tipo = normalizar_tipo_documento(os.path.basename(caminho))
+    pre = ImagePreprocessor()
+    plano = None
+    paginas: List[Dict[str, Any]] = []
+    textos = {'historico': [], 'planejador': []}
+    for n, img in enumerate(_paginas(caminho, max_paginas)):
+        t0 = time.perf_counter()
+        img_hist, _ = pre.preprocess(img, apply_all=True)
+        ms_hist = (time.perf_counter() - t0) * 1000.0
+
+        t0 = time.perf_counter()
+        if plano is None:
+            plano = planejar_imagem(img, tipo)  # demais páginas reutilizam o plano
+        img_plan, meta = pre.preprocess(img, apply_all=True, plano=plano)
+        ms_plan = (time.perf_counter() - t0) * 1000.0
+
+        textos['historico'].append(_ocr(img_hist))
+        textos['planejador'].append(_ocr(img_plan))
+        paginas.append({
+            'pagina': n,
+            'ms_historico': round(ms_hist, 1),
+            'ms_planejador': round(ms_plan, 1),
+            'etapas_planejador': meta.get('etapas_aplicadas', []),
+        })
+
+    score_hist = _score_texto('\n'.join(textos['historico']), gabarito)
+    score_plan = _score_texto('\n'.join(textos['planejador']), gabarito)
+    return {
+        'arquivo': os.path.basename(caminho),
+        'tipo': tipo,
+        'gabarito': gabarito is not None,
+        'plano': plano.resumo() if plano else None,
+        'paginas': paginas,
+        'ms_pagina_historico': round(sum(p['ms_historico'] for p in paginas) / max(1, len(paginas)), 1),
+        'ms_pagina_planejador': round(sum(p['ms_planejador'] for p in paginas) / max(1, len(paginas)), 1),
+        'score_historico': round(score_hist, 4),
+        'score_planejador': round(score_plan, 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Regressão do planejador de pré-processamento')
+    parser.add_argument('--pasta', required=True, help='Pasta com documentos de amostra (e gabaritos .txt)')
+    parser.add_argument('--max-paginas', type=int, default=3)
+    parser.add_argument('--tolerancia', type=float, default=0.01, help='Perda máxima aceitável de score médio')
+    parser.add_argument('--exigir-ganho', type=float, default=None, help='Redução mínima (%%) do tempo por página')
+    parser.add_argument('--saida', default=None)
+    args = parser.parse_args(argv)
+
+    arquivos = sorted(
+        os.path.join(args.pasta, n) for n in os.listdir(args.pasta) if n.lower().endswith(EXTENSOES)
+    )
+    if not arquivos:
+        print(f'[ERRO] Nenhum documento em {args.pasta}')
+        return 1
+
+    resultados = []
+    for caminho in arquivos:
+        try:
+            r = avaliar_documento(caminho, args.max_paginas)
+        except Exception as e:
+            print(f'[AVISO] {os.path.basename(caminho)}: {e}')
+            continue
+        resultados.append(r)
+        print(f"{r['arquivo']:<45} {r['tipo']:<13} {r['ms_pagina_historico']:>8.1f} -> {r['ms_pagina_planejador']:>8.1f} ms/pág | "
+              f"texto {r['score_historico']:.3f} -> {r['score_planejador']:.3f}")
+
+    if not resultados:
+        print('[ERRO] Nenhum documento avaliado')
+        return 1
+
+    media = lambda chave: sum(r[chave] for r in resultados) / len(resultados)  # noqa: E731
+    ms_hist, ms_plan = media('ms_pagina_historico'), media('ms_pagina_planejador')
+    sc_hist, sc_plan = media('score_historico'), media('score_planejador')
+    ganho = (1 - ms_plan / ms_hist) * 100 if ms_hist else 0.0
+    print(f"\nMédia: {ms_hist:.1f} -> {ms_plan:.1f} ms/página ({ganho:+.1f}% de redução) | "
+          f"texto {sc_hist:.4f} -> {sc_plan:.4f}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({'documentos': resultados, 'ganho_tempo_pct': round(ganho, 1),
+                       'score_historico': sc_hist, 'score_planejador': sc_plan}, f, ensure_ascii=False, indent=2)
+        print(f'[SALVO] Relatório em {args.saida}')
+
+    falhou = False
+    if sc_plan < sc_hist - args.tolerancia:
+        print(f'[ERRO] Texto piorou além da tolerância ({sc_hist - sc_plan:.4f} > {args.tolerancia})')
+        falhou = True
+    if args.exigir_ganho is not None and ganho < args.exigir_ganho:
+        print(f'[ERRO] Redução de tempo {ganho:.1f}% abaixo do exigido ({args.exigir_ganho}%)')
+        falhou = True
+    if not falhou:
+        print('[OK] Sem regressão de texto')
+    return 1 if falhou else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Teste: duas threads renderizando PDFs diferentes no modo local do pool.
+
+O cache de documentos abertos (`fitz`) é por thread; abrir outro arquivo
+numa thread não pode fechar o documento que a outra ainda está
+renderizando. Aqui duas threads alternam entre PDFs diferentes (em disco e
+em memória) ao mesmo tempo e todas as páginas precisam voltar com payload
+e sem `erro_preprocessamento`.
+
+Uso:
+    python scripts/test_preprocessamento_threads.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import fitz  # noqa: E402
+
+from automation.ocr.preprocessing_pool import PoolPreprocessamento, _abrir_pdf, _abrir_pdf_memoria  # noqa: E402
+
+PAGINAS = 4
+RODADAS = 15
+
+
+def _gerar_pdf(rotulo: str) -> bytes:
+    doc = fitz.open()
+    for n in range(PAGINAS):
+        pagina = doc.new_page(width=595, height=842)
+        pagina.insert_text((72, 120), f'{rotulo} - pagina {n + 1}', fontsize=28)
+    conteudo = doc.tobytes()
+    doc.close()
+    return conteudo
+
+
+def main() -> int:
+    # Troca de thread bem frequente para expor a janela entre abrir e renderizar
+    sys.setswitchinterval(1e-6)
+    pool = PoolPreprocessamento(em_processo=True)
+    pdfs = {rotulo: _gerar_pdf(rotulo) for rotulo in ('A', 'B', 'C', 'D')}
+    diretorio = tempfile.mkdtemp(prefix='preproc_threads_')
+    caminhos = {}
+    for rotulo, conteudo in pdfs.items():
+        caminhos[rotulo] = os.path.join(diretorio, f'{rotulo}.pdf')
+        with open(caminhos[rotulo], 'wb') as f:
+            f.write(conteudo)
+
+    falhas = []
+
+    # 1) Intercalação determinística: A abre um PDF e para antes de renderizar;
+    #    B abre outro (o que esvazia o cache de B); A precisa continuar com o seu.
+    aberto, trocado = threading.Event(), threading.Event()
+
+    def _a():
+        doc = _abrir_pdf(caminhos['A'])
+        aberto.set()
+        trocado.wait(10)
+        if doc.is_closed:
+            falhas.append('documento da thread A fechado pela thread B')
+            return
+        doc[0].get_pixmap()
+
+    def _b():
+        aberto.wait(10)
+        _abrir_pdf_memoria('hash-B', lambda: pdfs['B'])
+        _abrir_pdf(caminhos['C'])
+        trocado.set()
+
+    threads = [threading.Thread(target=_a), threading.Thread(target=_b)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 2) Carga concorrente: as duas threads alternam entre arquivos e memória
+    inicio = threading.Barrier(2)
+
+    def _worker(rotulos):
+        inicio.wait()
+        for rodada in range(RODADAS):
+            for rotulo in rotulos:
+                try:
+                    if rodada % 2:
+                        paginas = pool.processar_paginas_pdf_memoria(pdfs[rotulo], f'hash-{rotulo}', range(PAGINAS), zoom=1.0)
+                    else:
+                        paginas = pool.processar_paginas_pdf(caminhos[rotulo], range(PAGINAS), zoom=1.0)
+                except Exception as e:
+                    falhas.append(f'{rotulo}/{rodada}: {e}')
+                    continue
+                if len(paginas) != PAGINAS:
+                    falhas.append(f'{rotulo}/{rodada}: {len(paginas)} página(s)')
+                for pagina in paginas:
+                    if not pagina.payload or 'erro_preprocessamento' in pagina.metadata:
+                        falhas.append(f'{rotulo}/{rodada}/p{pagina.indice}: {pagina.metadata.get("erro_preprocessamento")}')
+
+    threads = [
+        threading.Thread(target=_worker, args=(('A', 'B'),)),
+        threading.Thread(target=_worker, args=(('C', 'D'),)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for caminho in caminhos.values():
+        os.remove(caminho)
+    os.rmdir(diretorio)
+
+    if falhas:
+        print(f'[FAIL] {len(falhas)} falha(s):')
+        for falha in falhas[:20]:
+            print('   ', falha)
+        return 1
+    print(f'[OK] Cache por thread preservado; {2 * 2 * RODADAS * PAGINAS} páginas renderizadas em duas threads')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,27 +3,56 @@ Módulos de Segurança do Sistema de Automação MJSP
 Pacote contendo todas as 10 camadas de segurança implementadas
 """
 
-# Importar módulos principais
-from .security_config import security_config
-from .security_middleware import SecurityMiddleware, require_authentication, require_admin, log_sensitive_operation
-from .data_sanitizer import data_sanitizer
-
-# Importar módulos de conformidade LGPD
-try:
-    from .lgpd_compliance import lgpd_system
-except ImportError:
-    lgpd_system = None
-
-# Importar módulos de segurança avançada
-try:
-    from .security_config_enhanced import enhanced_security
-except ImportError:
-    enhanced_security = None
-
-try:
-    from .security_config_flexible import flexible_security_config
-except ImportError:
-    flexible_security_config = None
+import importlib
+import importlib.util
+
+# Os submódulos (cryptography, argon2, chaves RSA, monitores) são importados
+# sob demanda: `from security import enhanced_security` continua funcionando,
+# mas `import security.security_middleware_enhanced` não carrega o resto.
+_EXPORTS = {
+    'security_config': ('.security_config', 'security_config', None),
+    'SecurityMiddleware': ('.security_middleware', 'SecurityMiddleware', None),
+    'require_authentication': ('.security_middleware', 'require_authentication', None),
+    'require_admin': ('.security_middleware', 'require_admin', None),
+    'log_sensitive_operation': ('.security_middleware', 'log_sensitive_operation', None),
+    'data_sanitizer': ('.data_sanitizer', 'data_sanitizer', None),
+    # Módulos opcionais: None se alguma dependência não estiver instalada.
+    # As dependências são verificadas antes (find_spec), porque o módulo
+    # enhanced só importa cryptography/argon2 no primeiro uso.
+    'lgpd_system': ('.lgpd_compliance', 'lgpd_system', ('cryptography',)),
+    'enhanced_security': ('.security_config_enhanced', 'enhanced_security', ('cryptography', 'argon2')),
+    'flexible_security_config': ('.security_config_flexible', 'flexible_security_config', ('cryptography',)),
+}
+
+
+def _dependencias_instaladas(dependencias) -> bool:
+    for dependencia in dependencias:
+        try:
+            if importlib.util.find_spec(dependencia) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
+
+
+def __getattr__(nome):
+    try:
+        modulo, atributo, dependencias = _EXPORTS[nome]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}") from None
+    opcional = dependencias is not None
+    if opcional and not _dependencias_instaladas(dependencias):
+        valor = None
+    else:
+        try:
+            valor = getattr(importlib.import_module(modulo, __name__), atributo)
+        except ImportError:
+            if not opcional:
+                raise
+            valor = None
+    globals()[nome] = valor
+    return valor
+
 
 # Lista de módulos disponíveis
 __all__ = [
@@ -0,0 +1,75 @@
+"""
+Proxies de carregamento tardio para módulos pesados e singletons de segurança.
+
+Importar `cryptography`/`argon2` e instanciar as configurações (geração de
+chaves RSA, handlers de log, monitores) custa segundos no boot de cada
+worker Gunicorn/Celery. Com estes proxies o custo só é pago no primeiro
+uso efetivo (acesso a atributo ou chamada).
+"""
+
+import importlib
+import threading
+from typing import Any, Callable
+
+
+class LazyProxy:
+    """Resolve o objeto real via `carregador` no primeiro acesso (thread-safe)."""
+
+    __slots__ = ('_carregador', '_objeto', '_lock', '_descricao')
+
+    _VAZIO = object()
+
+    def __init__(self, carregador: Callable[[], Any], descricao: str = '') -> None:
+        object.__setattr__(self, '_carregador', carregador)
+        object.__setattr__(self, '_objeto', LazyProxy._VAZIO)
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, '_descricao', descricao)
+
+    def _resolver(self) -> Any:
+        objeto = object.__getattribute__(self, '_objeto')
+        if objeto is LazyProxy._VAZIO:
+            with object.__getattribute__(self, '_lock'):
+                objeto = object.__getattribute__(self, '_objeto')
+                if objeto is LazyProxy._VAZIO:
+                    objeto = object.__getattribute__(self, '_carregador')()
+                    object.__setattr__(self, '_objeto', objeto)
+        return objeto
+
+    @property
+    def carregado(self) -> bool:
+        return object.__getattribute__(self, '_objeto') is not LazyProxy._VAZIO
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self._resolver(), nome)
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        setattr(self._resolver(), nome, valor)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._resolver()(*args, **kwargs)
+
+    def __bool__(self) -> bool:
+        return bool(self._resolver())
+
+    def __repr__(self) -> str:
+        if self.carregado:
+            return repr(self._resolver())
+        return f'<LazyProxy {object.__getattribute__(self, "_descricao")} (não carregado)>'
+
+
+def lazy_module(nome: str) -> LazyProxy:
+    """Proxy para `importlib.import_module(nome)`."""
+    return LazyProxy(lambda: importlib.import_module(nome), nome)
+
+
+def lazy_attr(modulo: str, atributo: str) -> LazyProxy:
+    """Proxy para `from modulo import atributo` (classes/funções)."""
+    return LazyProxy(lambda: getattr(importlib.import_module(modulo), atributo), f'{modulo}.{atributo}')
+
+
+def lazy_instance(fabrica: Callable[[], Any], descricao: str = '') -> LazyProxy:
+    """Proxy para um singleton criado apenas no primeiro uso."""
+    return LazyProxy(fabrica, descricao or getattr(fabrica, '__name__', 'instancia'))
+
+
+__all__ = ['LazyProxy', 'lazy_module', 'lazy_attr', 'lazy_instance']
@@ -15,6 +15,10 @@ import base64
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+try:
+    from .lazy import lazy_instance
+except ImportError:  # importado fora do pacote (security/ no sys.path)
+    from lazy import lazy_instance
 
 class LGPDCompliance:
     """
@@ -442,7 +446,7 @@ class LGPDCompliance:
         return compliance_results
 
 # Instância global para uso em todo o sistema
-lgpd_system = LGPDCompliance()
+lgpd_system = lazy_instance(LGPDCompliance, 'lgpd_system')
 
 if __name__ == "__main__":
     print("🔒 TESTE DO SISTEMA LGPD")
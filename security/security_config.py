@@ -7,6 +7,10 @@ import base64
 import secrets
 from datetime import datetime, timedelta
 import hashlib
+try:
+    from .lazy import lazy_instance
+except ImportError:  # importado fora do pacote (security/ no sys.path)
+    from lazy import lazy_instance
 
 class SecurityConfig:
     """
@@ -257,5 +261,5 @@ class SecurityConfig:
             'Referrer-Policy': 'strict-origin-when-cross-origin'
         }
 
-# Instância global
-security_config = SecurityConfig() 
\ No newline at end of file
+# Instância global (criada no primeiro uso)
+security_config = lazy_instance(SecurityConfig, 'security_config') 
\ No newline at end of file
@@ -9,12 +9,22 @@ import secrets
 import base64
 import json
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-import argon2
+try:
+    from .lazy import lazy_attr, lazy_instance, lazy_module
+except ImportError:  # importado fora do pacote (security/ no sys.path)
+    from lazy import lazy_attr, lazy_instance, lazy_module
+
+# Dependências pesadas carregadas apenas no primeiro uso
+Fernet = lazy_attr('cryptography.fernet', 'Fernet')
+hashes = lazy_module('cryptography.hazmat.primitives.hashes')
+serialization = lazy_module('cryptography.hazmat.primitives.serialization')
+PBKDF2HMAC = lazy_attr('cryptography.hazmat.primitives.kdf.pbkdf2', 'PBKDF2HMAC')
+rsa = lazy_module('cryptography.hazmat.primitives.asymmetric.rsa')
+padding = lazy_module('cryptography.hazmat.primitives.asymmetric.padding')
+Cipher = lazy_attr('cryptography.hazmat.primitives.ciphers', 'Cipher')
+algorithms = lazy_module('cryptography.hazmat.primitives.ciphers.algorithms')
+modes = lazy_module('cryptography.hazmat.primitives.ciphers.modes')
+argon2 = lazy_module('argon2')
 import ipaddress
 import re
 from typing import Dict, List, Optional, Tuple, Any
@@ -598,5 +608,5 @@ class SecurityConfigEnhanced:
             self.logger.error(f"Erro na validação de arquivo: {e}")
             return False, "Erro na validação"
 
-# Instância global
-enhanced_security = SecurityConfigEnhanced()
+# Instância global (criada no primeiro uso: chaves RSA, handlers de log, etc.)
+enhanced_security = lazy_instance(SecurityConfigEnhanced, 'enhanced_security')
@@ -5,6 +5,10 @@ import base64
 import secrets
 from datetime import datetime, timedelta
 import hashlib
+try:
+    from .lazy import lazy_instance
+except ImportError:  # importado fora do pacote (security/ no sys.path)
+    from lazy import lazy_instance
 
 class FlexibleSecurityConfig:
     """
@@ -266,5 +270,5 @@ class FlexibleSecurityConfig:
         # Por exemplo, muitas requisições em sequência
         return True  # Sempre permitir para automações
 
-# Instância global
-flexible_security_config = FlexibleSecurityConfig() 
\ No newline at end of file
+# Instância global (criada no primeiro uso)
+flexible_security_config = lazy_instance(FlexibleSecurityConfig, 'flexible_security_config') 
\ No newline at end of file